@@ -185,14 +185,14 @@ async def list_audit_logs(
                     event_data = {"error": "Invalid JSON data"}
             
             log_entries.append(AuditLogEntry(
-                id=log.id,
+                id=str(log.id),
                 event_type=log.event_type,
                 event_category=log.event_category,
                 severity=log.severity,
                 user_id_hash=log.user_id_hash,
                 session_id_hash=log.session_id_hash,
-                correlation_id=log.correlation_id,
-                request_id=log.request_id,
+                correlation_id=str(log.correlation_id) if log.correlation_id else None,
+                request_id=str(log.request_id) if log.request_id else None,
                 event_message=log.event_message,
                 event_data=event_data,
                 success=log.success,
@@ -495,7 +495,7 @@ async def cleanup_audit_logs(
         if dry_run:
             # Calculate how many logs would be deleted
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
-            from app.models.secret_tag_opaque import SecurityAuditLog
+            from app.models import SecurityAuditLog
             
             count = db.query(SecurityAuditLog).filter(
                 SecurityAuditLog.timestamp < cutoff_date,
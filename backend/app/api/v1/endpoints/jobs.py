@@ -0,0 +1,58 @@
+from typing import Any
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+import logging
+
+from ....dependencies import get_db, get_current_user
+from ....models.user import User
+from ....schemas.job import JobResponse
+from ....services.job_service import job_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    job_id: UUID
+) -> Any:
+    """
+    Get the status of a background job, including its result once succeeded.
+    """
+    job = job_service.get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    job_id: UUID
+) -> Any:
+    """
+    Cancel a background job.
+    
+    Queued jobs are cancelled immediately; running jobs stop at the worker's
+    next heartbeat. Finished jobs are returned unchanged.
+    """
+    job = job_service.get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    job = job_service.cancel(db, job)
+    logger.info(f"Cancellation requested for job {job_id} by user {current_user.id}")
+    return job
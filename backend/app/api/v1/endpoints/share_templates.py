@@ -1,5 +1,7 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 import logging
 
@@ -14,15 +16,45 @@ from ....schemas.share_template import (
     ShareTemplateSummary
 )
 from ....services.share_template_service import share_template_service
+from ....services.template_catalog import template_catalog
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def _catalog_response(request: Request, etag: str, content: Any) -> Response:
+    """
+    Build a conditional response for catalog data.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        etag: Current catalog ETag
+        content: Response payload
+
+    Returns:
+        Response: 304 without a body if the client copy is current, else JSON
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
+
+
 @router.get("/", response_model=List[ShareTemplateSummary])
 def get_active_templates(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
@@ -30,17 +62,18 @@ def get_active_templates(
 ) -> Any:
     """
     Get all active share templates (summaries for UI dropdowns).
+
+    Served from the template catalog; honours If-None-Match.
     """
     try:
-        summaries = share_template_service.get_template_summaries(
-            db, active_only=True
-        )
+        catalog = template_catalog.get(db)
+        summaries = [template.summary() for template in catalog.active()]
         
         # Apply pagination manually since we're returning summaries
         paginated = summaries[skip:skip + limit]
         
         logger.info(f"Retrieved {len(paginated)} template summaries for user {current_user.id}")
-        return paginated
+        return _catalog_response(request, catalog.etag, paginated)
         
     except Exception as e:
         logger.error(f"Error retrieving template summaries: {e}")
@@ -53,14 +86,18 @@ def get_active_templates(
 @router.get("/{template_id}", response_model=ShareTemplateSchema)
 def get_template(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     template_id: str
 ) -> Any:
     """
     Get a specific template by template_id.
+
+    Served from the template catalog; honours If-None-Match.
     """
-    template = share_template_service.get_by_template_id(db, template_id=template_id)
+    catalog = template_catalog.get(db)
+    template = catalog.get(template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,38 +111,28 @@ def get_template(
         )
     
     logger.info(f"Retrieved template {template_id} for user {current_user.id}")
-    return template
+    return _catalog_response(request, catalog.etag, ShareTemplateSchema.model_validate(template))
 
 
 @router.get("/category/{category}", response_model=List[ShareTemplateSummary])
 def get_templates_by_category(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     category: str
 ) -> Any:
     """
     Get templates by category.
+
+    Served from the template catalog; honours If-None-Match.
     """
     try:
-        templates = share_template_service.get_by_category(
-            db, category=category, active_only=True
-        )
-        
-        summaries = [
-            {
-                "id": template.id,
-                "template_id": template.template_id,
-                "name": template.name,
-                "description": template.description,
-                "category": template.category,
-                "question_count": template.question_count
-            }
-            for template in templates
-        ]
+        catalog = template_catalog.get(db)
+        summaries = [template.summary() for template in catalog.active(category)]
         
         logger.info(f"Retrieved {len(summaries)} templates for category '{category}'")
-        return summaries
+        return _catalog_response(request, catalog.etag, summaries)
         
     except Exception as e:
         logger.error(f"Error retrieving templates for category '{category}': {e}")
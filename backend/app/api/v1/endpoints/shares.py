@@ -1,9 +1,13 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
+import json
 import logging
 
+import anyio.from_thread
+
 from ....dependencies import get_db, get_current_user
 from ....models.user import User
 from ....schemas.share import (
@@ -15,8 +19,10 @@ from ....schemas.share import (
     ShareUpdate,
     ShareStats
 )
+from ....schemas.job import JobResponse
+from ....services.share_access_service import public_share_cache, share_access_buffer
 from ....services.share_service import share_service
-from ....services.pdf_service import pdf_service
+from ....services.pdf_cache import CachedPDF, pdf_render_cache
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +82,83 @@ async def create_share(
         )
 
 
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_share(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: ShareCreateRequest
+) -> Any:
+    """
+    Queue the creation of a share.
+    
+    The request is validated immediately (400 on errors) and generation runs
+    on a background worker. Poll GET /api/v1/jobs/{id}; once succeeded, the
+    job result holds the ShareResponse fields.
+    """
+    try:
+        return share_service.enqueue_share(
+            db,
+            user_id=current_user.id,
+            request=request
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/stream")
+async def create_share_stream(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    request: ShareCreateRequest
+) -> StreamingResponse:
+    """
+    Create a new share, streaming generation progress as NDJSON.
+    
+    Validation errors are returned as a regular 400 before streaming starts.
+    The stream then carries one JSON object per line:
+    - {"event": "progress", "stage": ...} for each generation stage
+    - {"event": "answer", "answer": {...}} as soon as each answer is ready;
+      a later answer for the same question_id replaces the earlier one
+    - {"event": "complete", "share": {...}} with the ShareResponse fields,
+      or {"event": "error", "detail": ...}
+    """
+    try:
+        # Entry lookup is a synchronous query; keep it off the event loop
+        prepared = await run_in_threadpool(
+            share_service.prepare_share,
+            db,
+            user_id=current_user.id,
+            request=request
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    user_id = current_user.id
+
+    async def event_stream():
+        # The request's session is closed once the response starts; the
+        # service saves the share in a session of its own
+        async for event in share_service.stream_share(
+            user_id=user_id,
+            request=request,
+            prepared=prepared
+        ):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/", response_model=ShareListResponse)
 def get_user_shares(
     *,
@@ -338,34 +421,29 @@ def get_public_share(
     This endpoint is used by recipients to view shared summaries.
     """
     try:
-        share = share_service.get_by_token(db, token=token)
-        if not share:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Share not found"
-            )
-        
-        # Record access
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
-        referrer = request.headers.get("referer")
-        
-        share = share_service.access_share(
-            db=db,
-            share=share,
-            ip_address=client_ip,
-            user_agent=user_agent,
-            referrer=referrer,
+        cached = public_share_cache.get(token)
+        if cached is None:
+            share = share_service.get_by_token(db, token=token)
+            if not share:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Share not found"
+                )
+            share_service.ensure_accessible(share)
+            cached = public_share_cache.put(share)
+        
+        # Record access (written in batches by the access buffer)
+        share_access_buffer.record(
+            cached.share_id,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            referrer=request.headers.get("referer"),
             access_type="view"
         )
+        if not share_access_buffer.running:
+            share_access_buffer.flush(db)
         
-        return SharePublicResponse(
-            title=share.title,
-            content=share.content,
-            created_at=share.created_at,
-            expires_at=share.expires_at,
-            is_expired=share.is_expired
-        )
+        return Response(content=cached.body, media_type="application/json")
         
     except ValueError as e:
         raise HTTPException(
@@ -380,6 +458,14 @@ def get_public_share(
         )
 
 
+def _pdf_response(pdf: CachedPDF, filename: str) -> Response:
+    """Stream a cached PDF file, or send it from memory"""
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if pdf.path is not None:
+        return FileResponse(pdf.path, media_type="application/pdf", headers=headers)
+    return Response(content=pdf.content, media_type="application/pdf", headers=headers)
+
+
 @router.get("/{share_id}/pdf")
 def download_share_pdf(
     *,
@@ -408,29 +494,19 @@ def download_share_pdf(
                 detail="Access denied"
             )
         
-        # Generate PDF
-        pdf_bytes = pdf_service.generate_share_pdf(
-            share_content=share.content,
-            title=share.title,
-            created_at=share.created_at,
-            expires_at=share.expires_at
-        )
+        share_service.ensure_accessible(share)
+        
+        # Render (or reuse) the PDF; the render is coalesced on the event loop
+        pdf = anyio.from_thread.run(pdf_render_cache.get_or_render, share)
         
         # Record download access
-        share_service.access_share(
-            db=db,
-            share=share,
-            access_type="download"
-        )
+        share_access_buffer.record(share.id, access_type="download")
+        if not share_access_buffer.running:
+            share_access_buffer.flush(db)
         
         # Return PDF response
         filename = f"kotori_summary_{share.created_at.strftime('%Y%m%d')}_{share_id[:8]}.pdf"
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return _pdf_response(pdf, filename)
         
     except ValueError:
         raise HTTPException(
@@ -465,36 +541,25 @@ def download_public_share_pdf(
                 detail="Share not found"
             )
         
-        # Record access with client info
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
-        referrer = request.headers.get("referer")
+        share_service.ensure_accessible(share)
         
-        share = share_service.access_share(
-            db=db,
-            share=share,
-            ip_address=client_ip,
-            user_agent=user_agent,
-            referrer=referrer,
+        # Record access with client info (written in batches by the access buffer)
+        share_access_buffer.record(
+            share.id,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            referrer=request.headers.get("referer"),
             access_type="download"
         )
+        if not share_access_buffer.running:
+            share_access_buffer.flush(db)
         
-        # Generate PDF
-        pdf_bytes = pdf_service.generate_share_pdf(
-            share_content=share.content,
-            title=share.title,
-            created_at=share.created_at,
-            expires_at=share.expires_at
-        )
+        # Render (or reuse) the PDF; the render is coalesced on the event loop
+        pdf = anyio.from_thread.run(pdf_render_cache.get_or_render, share)
         
         # Return PDF response
         filename = f"kotori_summary_{share.created_at.strftime('%Y%m%d')}.pdf"
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return _pdf_response(pdf, filename)
         
     except ValueError as e:
         raise HTTPException(
@@ -1,10 +1,9 @@
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 import logging
 import json
-import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import uuid
 
 from ....dependencies import get_db, get_current_user
@@ -14,34 +13,44 @@ from ....schemas.template_import import (
     TemplateImportResponse,
     TemplateImportConfirmRequest,
     TemplateImportStatus,
-    TemplateImportError,
-    DocumentInfo,
-    ExtractedQuestion
+    TemplateImportError
 )
+from ....schemas.job import JobResponse
 from ....services.document_parser_service import document_parser_service, DocumentParsingError
-from ....services.gemini_service import gemini_service, GeminiError
+from ....services.job_service import JOB_SUCCEEDED, job_service
 from ....services.share_template_service import share_template_service
+from ....services.template_import_service import TEMPLATE_IMPORT_JOB, template_import_service
 from ....schemas.share_template import ShareTemplateCreate
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory storage for import sessions (in production, use Redis or database)
-import_sessions = {}
 
-def cleanup_expired_sessions():
-    """Clean up expired import sessions"""
-    now = datetime.now(timezone.utc)
-    expired_sessions = [
-        session_id for session_id, session_data in import_sessions.items()
-        if session_data.get('expires_at', now) < now
-    ]
-    for session_id in expired_sessions:
-        del import_sessions[session_id]
-    
-    if expired_sessions:
-        logger.info(f"Cleaned up {len(expired_sessions)} expired import sessions")
+def parse_request_data(request_data: Optional[str]) -> TemplateImportRequest:
+    """Parse the JSON-encoded TemplateImportRequest form field"""
+    if not request_data:
+        return TemplateImportRequest()
+    try:
+        return TemplateImportRequest(**json.loads(request_data))
+    except (json.JSONDecodeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid request data: {e}"
+        )
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an uploaded file and reject unnamed, oversized or unsupported files"""
+    file_content = await file.read()
+    try:
+        template_import_service.validate_upload(file_content, file.content_type or "", file.filename)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return file_content
 
 
 @router.post("/", response_model=TemplateImportResponse)
@@ -57,57 +66,24 @@ async def import_template_from_file(
     
     The file will be parsed and processed with Gemini to extract questions
     and create a structured template. The result is stored temporarily
-    for review before confirmation.
+    for review before confirmation. Use POST /jobs to run the extraction
+    in the background instead.
     """
-    start_time = time.time()
-    
-    # Clean up expired sessions
-    cleanup_expired_sessions()
-    
     try:
-        # Parse request data
-        request_params = TemplateImportRequest()
-        if request_data:
-            try:
-                request_dict = json.loads(request_data)
-                request_params = TemplateImportRequest(**request_dict)
-            except (json.JSONDecodeError, ValueError) as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid request data: {e}"
-                )
-        
-        # Validate file
-        if not file.filename:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File must have a filename"
-            )
-        
-        # Read file content
-        file_content = await file.read()
-        
-        # Validate file size
-        if not document_parser_service.validate_file_size(file_content, max_size_mb=10):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size exceeds 10MB limit"
-            )
-        
-        # Validate file type
+        request_params = parse_request_data(request_data)
+        file_content = await read_upload(file)
         content_type = file.content_type or ""
-        if not document_parser_service.is_supported_type(content_type):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported file type: {content_type}. Supported types: PDF, DOCX"
-            )
         
-        # Parse document
+        # Parse document and extract template
+        import_id = uuid.uuid4()
         try:
-            parsed_doc = document_parser_service.parse_file(
+            response = await template_import_service.extract_template(
+                db,
+                import_id=str(import_id),
                 file_content=file_content,
                 content_type=content_type,
-                filename=file.filename
+                filename=file.filename,
+                request_params=request_params
             )
         except DocumentParsingError as e:
             raise HTTPException(
@@ -115,104 +91,14 @@ async def import_template_from_file(
                 detail=f"Document parsing failed: {e}"
             )
         
-        # Extract template using Gemini
-        try:
-            gemini_response = await gemini_service.extract_template_from_document(
-                document_text=parsed_doc['text'],
-                document_type=parsed_doc['document_type']
-            )
-        except GeminiError as e:
-            logger.error(f"Gemini template extraction failed: {e}")
-            # Create fallback response
-            fallback_questions = [
-                {
-                    "id": "q1",
-                    "text": {"en": "Please describe your main concerns or symptoms."},
-                    "type": "open",
-                    "required": True,
-                    "help_text": "Extracted from uploaded document - please review and edit"
-                }
-            ]
-            
-            gemini_response = type('FallbackResponse', (), {
-                'template_id': f"imported-{uuid.uuid4().hex[:8]}",
-                'name': f"Imported Template - {file.filename}",
-                'description': "Template imported from document with fallback extraction",
-                'category': request_params.target_category or "imported",
-                'questions': fallback_questions,
-                'extraction_confidence': 0.3,
-                'extraction_notes': f"AI extraction failed: {e}. Using fallback template."
-            })()
-        
-        # Process extracted questions
-        extracted_questions = []
-        for i, question_data in enumerate(gemini_response.questions):
-            # Ensure proper structure
-            question_text = question_data.get('text', {})
-            if isinstance(question_text, str):
-                question_text = {"en": question_text}
-            
-            extracted_question = ExtractedQuestion(
-                id=question_data.get('id', f'q{i+1}'),
-                text=question_text,
-                type=question_data.get('type', 'open'),
-                required=question_data.get('required', True),
-                options=question_data.get('options'),
-                help_text=question_data.get('help_text'),
-                confidence=question_data.get('confidence', 0.8),
-                original_text=question_data.get('original_text')
-            )
-            extracted_questions.append(extracted_question)
-        
-        # Limit questions if requested
-        if len(extracted_questions) > request_params.max_questions:
-            extracted_questions = extracted_questions[:request_params.max_questions]
-        
-        # Create document info
-        document_info = DocumentInfo(
-            filename=file.filename,
-            document_type=parsed_doc['document_type'],
-            file_size_mb=len(file_content) / (1024 * 1024),
-            word_count=parsed_doc['word_count'],
-            character_count=parsed_doc['character_count'],
-            metadata=parsed_doc['metadata']
-        )
-        
-        # Create import session
-        import_id = str(uuid.uuid4())
-        session_data = {
-            'user_id': current_user.id,
-            'document_info': document_info.dict(),
-            'extracted_template': {
-                'template_id': gemini_response.template_id,
-                'name': request_params.custom_name or gemini_response.name,
-                'description': gemini_response.description,
-                'category': request_params.target_category or gemini_response.category,
-                'version': '1.0',
-                'questions': [q.dict() for q in extracted_questions]
-            },
-            'extraction_confidence': gemini_response.extraction_confidence,
-            'extraction_notes': gemini_response.extraction_notes,
-            'created_at': datetime.now(timezone.utc),
-            'expires_at': datetime.now(timezone.utc) + timedelta(hours=24),
-            'is_confirmed': False
-        }
-        
-        import_sessions[import_id] = session_data
-        
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Create response
-        response = TemplateImportResponse(
-            import_id=import_id,
-            document_info=document_info,
-            extracted_template=session_data['extracted_template'],
-            questions=extracted_questions,
-            extraction_confidence=gemini_response.extraction_confidence,
-            extraction_notes=gemini_response.extraction_notes,
-            processing_time_ms=processing_time_ms,
-            created_at=session_data['created_at']
+        # Store the import session
+        job_service.record(
+            db,
+            job_id=import_id,
+            job_type=TEMPLATE_IMPORT_JOB,
+            user_id=current_user.id,
+            payload=template_import_service.import_payload(file.filename, content_type, request_params),
+            result=response.model_dump(mode="json")
         )
         
         logger.info(f"Template import completed for user {current_user.id}: {import_id}")
@@ -228,6 +114,35 @@ async def import_template_from_file(
         )
 
 
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_template_import(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    file: UploadFile = File(...),
+    request_data: str = Form(None)  # JSON string of TemplateImportRequest
+) -> Any:
+    """
+    Queue a template import from a PDF or DOCX file.
+    
+    Returns immediately with a job; poll GET /api/v1/jobs/{id} until it
+    succeeds. The job result is the TemplateImportResponse, and the job id
+    is the import_id to confirm.
+    """
+    request_params = parse_request_data(request_data)
+    file_content = await read_upload(file)
+    content_type = file.content_type or ""
+    
+    job = job_service.enqueue(
+        db,
+        job_type=TEMPLATE_IMPORT_JOB,
+        user_id=current_user.id,
+        payload=template_import_service.import_payload(file.filename, content_type, request_params),
+        input_data=file_content
+    )
+    return job
+
+
 @router.post("/confirm", response_model=dict)
 async def confirm_imported_template(
     *,
@@ -243,29 +158,29 @@ async def confirm_imported_template(
     """
     try:
         # Get import session
-        session_data = import_sessions.get(request.import_id)
-        if not session_data:
+        import_job = template_import_service.get_session(db, request.import_id)
+        if not import_job or import_job.status != JOB_SUCCEEDED:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Import session not found or expired"
             )
         
         # Verify ownership
-        if session_data['user_id'] != current_user.id:
+        if import_job.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
             )
         
         # Check if already confirmed
-        if session_data.get('is_confirmed'):
+        if import_job.payload.get('is_confirmed'):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Template already confirmed and saved"
             )
         
         # Check expiration
-        if datetime.now(timezone.utc) > session_data['expires_at']:
+        if datetime.now(timezone.utc) > import_job.expires_at:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Import session has expired"
@@ -292,8 +207,7 @@ async def confirm_imported_template(
             )
         
         # Mark session as confirmed
-        session_data['is_confirmed'] = True
-        session_data['confirmed_template_id'] = template.id
+        template_import_service.mark_confirmed(db, import_job, template.id)
         
         logger.info(f"Confirmed imported template {template.template_id} for user {current_user.id}")
         
@@ -317,6 +231,7 @@ async def confirm_imported_template(
 @router.get("/{import_id}/status", response_model=TemplateImportStatus)
 def get_import_status(
     *,
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     import_id: str
 ) -> Any:
@@ -324,15 +239,15 @@ def get_import_status(
     Get the status of a template import session.
     """
     try:
-        session_data = import_sessions.get(import_id)
-        if not session_data:
+        import_job = template_import_service.get_session(db, import_id)
+        if not import_job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Import session not found"
             )
         
         # Verify ownership
-        if session_data['user_id'] != current_user.id:
+        if import_job.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
@@ -340,21 +255,27 @@ def get_import_status(
         
         # Determine status
         now = datetime.now(timezone.utc)
-        if now > session_data['expires_at']:
+        is_confirmed = import_job.payload.get('is_confirmed', False)
+        if now > import_job.expires_at:
             status_text = "expired"
-        elif session_data.get('is_confirmed'):
+        elif is_confirmed:
             status_text = "confirmed"
-        else:
+        elif import_job.status == JOB_SUCCEEDED:
             status_text = "pending"
+        elif import_job.is_finished:
+            status_text = import_job.status
+        else:
+            status_text = "processing"
         
+        extracted_template = (import_job.result or {}).get('extracted_template', {})
         return TemplateImportStatus(
             import_id=import_id,
             status=status_text,
-            document_filename=session_data['document_info']['filename'],
-            questions_extracted=len(session_data['extracted_template']['questions']),
-            created_at=session_data['created_at'],
-            expires_at=session_data['expires_at'],
-            is_confirmed=session_data.get('is_confirmed', False)
+            document_filename=import_job.payload.get('filename', ''),
+            questions_extracted=len(extracted_template.get('questions', [])),
+            created_at=import_job.created_at,
+            expires_at=import_job.expires_at,
+            is_confirmed=is_confirmed
         )
         
     except HTTPException:
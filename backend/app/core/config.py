@@ -96,6 +96,11 @@ class Settings(BaseSettings):
     
     # Gemini API settings - REQUIRED for sharing features
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
+    # Count prompt tokens with the model's count-tokens API instead of the local estimate
+    GEMINI_COUNT_TOKENS_API: bool = os.getenv("GEMINI_COUNT_TOKENS_API", "false").lower() == "true"
+    # Threads dedicated to blocking Gemini SDK calls and in-flight calls allowed per model
+    GEMINI_EXECUTOR_WORKERS: int = int(os.getenv("GEMINI_EXECUTOR_WORKERS", "16"))
+    GEMINI_MAX_INFLIGHT_PER_MODEL: int = int(os.getenv("GEMINI_MAX_INFLIGHT_PER_MODEL", "8"))
 
     # Google Cloud Speech V2 Settings (with safe defaults)
     SPEECH_MAX_ALTERNATIVES: int = int(os.getenv("SPEECH_MAX_ALTERNATIVES", "3"))
@@ -109,6 +114,65 @@ class Settings(BaseSettings):
     ENCRYPTION_MASTER_SALT: str = get_required_env("ENCRYPTION_MASTER_SALT")
     HIDDEN_MODE_TIMEOUT_MINUTES: int = int(os.getenv("HIDDEN_MODE_TIMEOUT_MINUTES", "2"))
 
+    # Shared rate limiter backend (per-process memory limiter if unset)
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+
+    # Share summary cache (in-process LRU; Redis tier is opt-in since summaries contain plaintext)
+    SHARE_SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv("SHARE_SUMMARY_CACHE_TTL_SECONDS", "86400"))
+    SHARE_SUMMARY_CACHE_MAX_ENTRIES: int = int(os.getenv("SHARE_SUMMARY_CACHE_MAX_ENTRIES", "256"))
+    SHARE_SUMMARY_CACHE_SHARED: bool = os.getenv("SHARE_SUMMARY_CACHE_SHARED", "false").lower() == "true"
+
+    # Rendered public share views and buffered access logging
+    PUBLIC_SHARE_CACHE_TTL_SECONDS: int = int(os.getenv("PUBLIC_SHARE_CACHE_TTL_SECONDS", "60"))
+    PUBLIC_SHARE_CACHE_MAX_ENTRIES: int = int(os.getenv("PUBLIC_SHARE_CACHE_MAX_ENTRIES", "1024"))
+    SHARE_ACCESS_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("SHARE_ACCESS_FLUSH_INTERVAL_SECONDS", "5"))
+    SHARE_ACCESS_MAX_BUFFERED: int = int(os.getenv("SHARE_ACCESS_MAX_BUFFERED", "100000"))
+
+    # Share template catalog (in-process; the TTL bounds staleness across instances)
+    TEMPLATE_CATALOG_TTL_SECONDS: int = int(os.getenv("TEMPLATE_CATALOG_TTL_SECONDS", "300"))
+
+    # Cached document parses/extractions unused for this long are swept
+    TEMPLATE_EXTRACTION_RETENTION_DAYS: int = int(os.getenv("TEMPLATE_EXTRACTION_RETENTION_DAYS", "90"))
+
+    # Scheduled sweeps of expired shares and sessions (rows per transaction)
+    EXPIRY_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("EXPIRY_SWEEP_INTERVAL_SECONDS", "300"))
+    EXPIRY_SWEEP_BATCH_SIZE: int = int(os.getenv("EXPIRY_SWEEP_BATCH_SIZE", "1000"))
+
+    # Retention of the monthly-partitioned log tables (whole months are dropped)
+    AUDIT_LOG_RETENTION_DAYS: int = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", "90"))
+    SHARE_ACCESS_RETENTION_DAYS: int = int(os.getenv("SHARE_ACCESS_RETENTION_DAYS", "365"))
+    HEALTH_LOG_RETENTION_DAYS: int = int(os.getenv("HEALTH_LOG_RETENTION_DAYS", "30"))
+    ALERT_RETENTION_DAYS: int = int(os.getenv("ALERT_RETENTION_DAYS", "180"))
+    LOG_PARTITION_MONTHS_AHEAD: int = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "2"))
+
+    # Buffered, hash-chained audit log writer
+    AUDIT_BUFFER_SIZE: int = int(os.getenv("AUDIT_BUFFER_SIZE", "10000"))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+
+    # Share PDF render cache (memory LRU; disk tier when PDF_CACHE_DIR is set)
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    PDF_CACHE_DIR: Optional[str] = os.getenv("PDF_CACHE_DIR")
+    PDF_CACHE_MAX_DISK_BYTES: int = int(os.getenv("PDF_CACHE_MAX_DISK_BYTES", str(512 * 1024 * 1024)))
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    # TrueType font for share PDFs in scripts the built-in fonts lack (e.g. Arabic, Hebrew, Cyrillic)
+    PDF_UNICODE_FONT_PATH: Optional[str] = os.getenv("PDF_UNICODE_FONT_PATH")
+
+    # Template import document parsing (separate processes with page/character budgets)
+    DOCUMENT_PARSE_WORKERS: int = int(os.getenv("DOCUMENT_PARSE_WORKERS", "2"))
+    DOCUMENT_PARSE_TIMEOUT_SECONDS: float = float(os.getenv("DOCUMENT_PARSE_TIMEOUT_SECONDS", "20"))
+    DOCUMENT_PARSE_MAX_PAGES: int = int(os.getenv("DOCUMENT_PARSE_MAX_PAGES", "50"))
+    DOCUMENT_PARSE_MAX_CHARS: int = int(os.getenv("DOCUMENT_PARSE_MAX_CHARS", "20000"))
+    DOCUMENT_PARSE_MEMORY_MB: int = int(os.getenv("DOCUMENT_PARSE_MEMORY_MB", "512"))
+
+    # Background job queue (set JOB_WORKER_CONCURRENCY=0 on API-only instances
+    # and run app/scripts/run_job_worker.py separately to scale workers independently)
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "1"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2.0"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+    JOB_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_DELAY_SECONDS", "10"))
+    JOB_RESULT_TTL_HOURS: int = int(os.getenv("JOB_RESULT_TTL_HOURS", "24"))
+
     # Feature flags
     ENABLE_SECRET_TAGS: bool = os.getenv("ENABLE_SECRET_TAGS", "false").lower() == "true"
 
@@ -2,6 +2,7 @@ import logging
 import time
 import traceback
 import json
+from contextlib import asynccontextmanager
 from uuid import UUID
 
 from fastapi import FastAPI
@@ -24,12 +25,21 @@ from app.api.v1.endpoints import maintenance as maintenance_router_module
 from app.api.v1.endpoints import share_templates as share_templates_router_module
 from app.api.v1.endpoints import shares as shares_router_module
 from app.api.v1.endpoints import template_import as template_import_router_module
+from app.api.v1.endpoints import jobs as jobs_router_module
 from app.api.v1 import monitoring as monitoring_router_module
 # New v1 authentication routers
 from app.api.v1 import auth as v1_auth_router
 # Secret tags router import removed in PBI-4 Stage 2
 # from app.api.v1 import secret_tags as v1_secret_tags_router
 from app.core.config import settings
+from app.services.job_service import JobWorker, job_service, load_job_handlers
+from app.services.gemini_service import gemini_service
+from app.services.share_access_service import share_access_buffer
+from app.services.pdf_cache import pdf_render_cache
+from app.services.document_parser_service import document_parser_service
+from app.services.expiry_sweeper import expiry_sweeper
+from app.services.audit_service import audit_log_writer
+from app.security.limiter_backend import get_limiter_engine
 # Legacy endpoints (non-authentication)
 from app.routers import journals_router
 from app.routers import reminders_router
@@ -71,11 +81,54 @@ class UUIDJSONResponse(JSONResponse):
         ).encode("utf-8")
 
 
+# In-process job workers (dedicated workers: app/scripts/run_job_worker.py)
+job_workers = []
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the in-process background services for the lifetime of the app.
+
+    Nothing is started in tests. On shutdown running jobs are handed back to
+    the queue, buffered share accesses, audit events and rate limit hits are
+    written, and the Gemini threads and worker processes are released.
+    """
+    if settings.ENVIRONMENT != "test":
+        if settings.JOB_WORKER_CONCURRENCY > 0:
+            load_job_handlers()
+            for _ in range(settings.JOB_WORKER_CONCURRENCY):
+                worker = JobWorker(job_service)
+                worker.start()
+                job_workers.append(worker)
+            logger.info(f"Started {len(job_workers)} background job workers")
+        share_access_buffer.start()
+        # Deactivates expired shares and deletes expired sessions on a schedule
+        expiry_sweeper.start()
+        audit_log_writer.start()
+        get_limiter_engine().start()
+
+    try:
+        yield
+    finally:
+        for worker in job_workers:
+            await worker.stop()
+        job_workers.clear()
+        await share_access_buffer.stop()
+        await expiry_sweeper.stop()
+        await audit_log_writer.stop()
+        await get_limiter_engine().stop()
+        gemini_service.shutdown()
+        pdf_render_cache.shutdown()
+        document_parser_service.shutdown()
+
+
 app = FastAPI(
     title="Kotori API",
     description="API for Kotori: Voice-Controlled Journaling Application",
     version="0.1.0",
     default_response_class=UUIDJSONResponse,  # Use our custom response class
+    lifespan=lifespan,
 )
 
 
@@ -234,6 +287,9 @@ app.include_router(shares_router_module.router, prefix="/api/v1/shares", tags=["
 # Template import endpoints
 app.include_router(template_import_router_module.router, prefix="/api/v1/template-import", tags=["Template Import"])
 
+# Background jobs endpoints
+app.include_router(jobs_router_module.router, prefix="/api/v1/jobs", tags=["Jobs"])
+
 # Legacy OPAQUE endpoints removed - replaced by V1 implementation
 
 # WebSocket endpoints
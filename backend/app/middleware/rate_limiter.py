@@ -6,7 +6,7 @@ processing system. It includes per-user and IP-based rate limiting, exponential
 backoff, abuse detection, and Redis-based distributed rate limiting.
 
 Security features:
-- Distributed rate limiting with Redis
+- Distributed rate limiting through the shared limiter engine (Redis)
 - Per-user and IP-based rate limiting
 - Exponential backoff for failed attempts
 - Abuse detection and alerting
@@ -14,19 +14,21 @@ Security features:
 """
 
 import logging
-import time
+import math
 import hashlib
-import json
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 from enum import Enum
-import redis
-from fastapi import Request, HTTPException, status
+from fastapi import Request, status
 from fastapi.responses import JSONResponse
-import asyncio
-from collections import defaultdict
-import threading
+
+from app.security.limiter_backend import (
+    LimitDecision,
+    LimiterEngine,
+    create_limiter_engine,
+    get_limiter_engine,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,18 +48,6 @@ class RateLimitConfig:
     cooldown_minutes: int
     enabled: bool = True
 
-@dataclass
-class RateLimitRule:
-    """Rate limiting rule definition"""
-    limit_type: RateLimitType
-    identifier: str
-    config: RateLimitConfig
-    window_start: datetime
-    request_count: int
-    last_request: datetime
-    violation_count: int = 0
-    blocked_until: Optional[datetime] = None
-
 class RateLimitViolation(Exception):
     """Exception raised when rate limit is exceeded"""
     def __init__(self, limit_type: RateLimitType, retry_after: int, message: str):
@@ -72,10 +62,15 @@ class EnhancedRateLimiter:
     
     This class provides comprehensive rate limiting capabilities including:
     - Per-user and IP-based rate limiting
-    - Distributed rate limiting with Redis
+    - Distributed rate limiting through the shared limiter engine
     - Exponential backoff for repeated violations
     - Abuse detection and alerting
     - Configurable rate limits and time windows
+    
+    Per-minute limits are exact sliding windows evaluated in one atomic
+    backend call (which also checks any active block). Hourly limits are
+    coarse, so they use locally batched counters that only reach the shared
+    backend every few requests.
     """
     
     # Default rate limit configurations
@@ -106,24 +101,18 @@ class EnhancedRateLimiter:
         )
     }
     
-    def __init__(self, redis_client: Optional[redis.Redis] = None, 
-                 use_redis: bool = True, configs: Optional[Dict[RateLimitType, RateLimitConfig]] = None):
+    def __init__(self, engine: Optional[LimiterEngine] = None,
+                 configs: Optional[Dict[RateLimitType, RateLimitConfig]] = None):
         """
         Initialize enhanced rate limiter.
         
         Args:
-            redis_client: Redis client for distributed rate limiting
-            use_redis: Whether to use Redis for storage
+            engine: Shared limiter engine (process-wide engine if omitted)
             configs: Custom rate limit configurations
         """
-        self.redis_client = redis_client
-        self.use_redis = use_redis and redis_client is not None
+        self.engine = engine or get_limiter_engine()
         self.configs = configs or self.DEFAULT_CONFIGS.copy()
         
-        # In-memory storage for non-Redis mode
-        self.memory_store: Dict[str, RateLimitRule] = {}
-        self.lock = threading.RLock()
-        
         # Abuse detection
         self.abuse_threshold = 5  # Number of violations before marking as abuse
         self.abuse_cooldown_hours = 24  # Hours to block after abuse detection
@@ -136,7 +125,7 @@ class EnhancedRateLimiter:
             'last_reset': datetime.now(timezone.utc)
         }
         
-        logger.info(f"Rate limiter initialized with Redis: {self.use_redis}")
+        logger.info(f"Rate limiter initialized with backend: {self.engine.backend_name}")
     
     def _get_key(self, limit_type: RateLimitType, identifier: str) -> str:
         """Generate storage key for rate limit rule."""
@@ -146,102 +135,8 @@ class EnhancedRateLimiter:
         """Hash identifier for privacy."""
         return hashlib.sha256(identifier.encode()).hexdigest()[:16]
     
-    def _get_rule_from_redis(self, key: str) -> Optional[RateLimitRule]:
-        """Retrieve rate limit rule from Redis."""
-        try:
-            data = self.redis_client.get(key)
-            if data:
-                rule_data = json.loads(data)
-                rule = RateLimitRule(
-                    limit_type=RateLimitType(rule_data['limit_type']),
-                    identifier=rule_data['identifier'],
-                    config=RateLimitConfig(**rule_data['config']),
-                    window_start=datetime.fromisoformat(rule_data['window_start']),
-                    request_count=rule_data['request_count'],
-                    last_request=datetime.fromisoformat(rule_data['last_request']),
-                    violation_count=rule_data.get('violation_count', 0),
-                    blocked_until=datetime.fromisoformat(rule_data['blocked_until']) if rule_data.get('blocked_until') else None
-                )
-                return rule
-        except Exception as e:
-            logger.error(f"Error retrieving rule from Redis: {e}")
-        return None
-    
-    def _store_rule_in_redis(self, key: str, rule: RateLimitRule):
-        """Store rate limit rule in Redis."""
-        try:
-            rule_data = {
-                'limit_type': rule.limit_type.value,
-                'identifier': rule.identifier,
-                'config': {
-                    'requests_per_minute': rule.config.requests_per_minute,
-                    'requests_per_hour': rule.config.requests_per_hour,
-                    'burst_size': rule.config.burst_size,
-                    'cooldown_minutes': rule.config.cooldown_minutes,
-                    'enabled': rule.config.enabled
-                },
-                'window_start': rule.window_start.isoformat(),
-                'request_count': rule.request_count,
-                'last_request': rule.last_request.isoformat(),
-                'violation_count': rule.violation_count,
-                'blocked_until': rule.blocked_until.isoformat() if rule.blocked_until else None
-            }
-            
-            # Store with TTL
-            ttl = 3600  # 1 hour TTL
-            self.redis_client.setex(key, ttl, json.dumps(rule_data))
-            
-        except Exception as e:
-            logger.error(f"Error storing rule in Redis: {e}")
-    
-    def _get_rule(self, limit_type: RateLimitType, identifier: str) -> RateLimitRule:
-        """Get or create rate limit rule."""
-        key = self._get_key(limit_type, identifier)
-        
-        if self.use_redis:
-            rule = self._get_rule_from_redis(key)
-            if rule:
-                return rule
-        else:
-            with self.lock:
-                if key in self.memory_store:
-                    return self.memory_store[key]
-        
-        # Create new rule
-        config = self.configs.get(limit_type, self.DEFAULT_CONFIGS[limit_type])
-        rule = RateLimitRule(
-            limit_type=limit_type,
-            identifier=identifier,
-            config=config,
-            window_start=datetime.now(timezone.utc),
-            request_count=0,
-            last_request=datetime.now(timezone.utc),
-            violation_count=0,
-            blocked_until=None
-        )
-        
-        self._store_rule(key, rule)
-        return rule
-    
-    def _store_rule(self, key: str, rule: RateLimitRule):
-        """Store rate limit rule."""
-        if self.use_redis:
-            self._store_rule_in_redis(key, rule)
-        else:
-            with self.lock:
-                self.memory_store[key] = rule
-    
-    def _is_window_expired(self, rule: RateLimitRule) -> bool:
-        """Check if the current time window has expired."""
-        now = datetime.now(timezone.utc)
-        return (now - rule.window_start).total_seconds() >= 60  # 1 minute window
-    
-    def _reset_window(self, rule: RateLimitRule):
-        """Reset the rate limit window."""
-        now = datetime.now(timezone.utc)
-        rule.window_start = now
-        rule.request_count = 0
-        rule.last_request = now
+    def _get_config(self, limit_type: RateLimitType) -> RateLimitConfig:
+        return self.configs.get(limit_type, self.DEFAULT_CONFIGS[limit_type])
     
     def _calculate_backoff(self, violation_count: int) -> int:
         """Calculate exponential backoff time in minutes."""
@@ -251,23 +146,73 @@ class EnhancedRateLimiter:
         backoff = min(base_cooldown * (2 ** violation_count), max_cooldown)
         return int(backoff)
     
-    def _detect_abuse(self, rule: RateLimitRule) -> bool:
-        """Detect if the rule represents abusive behavior."""
-        return rule.violation_count >= self.abuse_threshold
+    def _detect_abuse(self, violation_count: int) -> bool:
+        """Detect if the violation history represents abusive behavior."""
+        return violation_count >= self.abuse_threshold
+    
+    async def _record_violation(self, limit_type: RateLimitType, identifier: str) -> int:
+        """Record a violation and block the key; returns the block duration in seconds."""
+        key = self._get_key(limit_type, identifier)
+        violation_count, _ = await self.engine.increment(
+            f"{key}:violations", 1, self.abuse_cooldown_hours * 3600
+        )
+        
+        block_seconds = self._calculate_backoff(violation_count) * 60
+        if self._detect_abuse(violation_count):
+            block_seconds = self.abuse_cooldown_hours * 3600
+            logger.warning(f"Abuse detected for {limit_type.value} {identifier[:8]}... "
+                          f"Blocking for {self.abuse_cooldown_hours} hours")
+            self.stats['abuse_detections'] += 1
+        
+        await self.engine.block(f"{key}:block", block_seconds)
+        return block_seconds
     
-    def _apply_abuse_block(self, rule: RateLimitRule):
-        """Apply long-term block for abusive behavior."""
-        now = datetime.now(timezone.utc)
-        rule.blocked_until = now + timedelta(hours=self.abuse_cooldown_hours)
+    async def evaluate(self, limit_type: RateLimitType, identifier: str,
+                       operation: Optional[str] = None) -> LimitDecision:
+        """
+        Evaluate a request against the minute and hour limits.
+        
+        Args:
+            limit_type: Type of rate limit to check
+            identifier: Unique identifier (user ID, IP address, etc.)
+            operation: Optional operation name for operation-specific limits
+            
+        Returns:
+            LimitDecision: Decision including remaining requests in the minute window
+        """
+        self.stats['total_requests'] += 1
+        
+        # Create composite identifier for operation-specific limits
+        if operation and limit_type == RateLimitType.OPERATION:
+            identifier = f"{identifier}:{operation}"
+        
+        config = self._get_config(limit_type)
+        if not config.enabled:
+            return LimitDecision(True, config.requests_per_minute)
         
-        # Log abuse detection
-        logger.warning(f"Abuse detected for {rule.limit_type.value} {rule.identifier[:8]}... "
-                      f"Blocking until {rule.blocked_until}")
+        key = self._get_key(limit_type, identifier)
+        decision = await self.engine.sliding_window(
+            f"{key}:minute", config.requests_per_minute, 60, block_key=f"{key}:block"
+        )
         
-        self.stats['abuse_detections'] += 1
+        if decision.allowed:
+            hourly = await self.engine.fixed_window(
+                f"{key}:hour", config.requests_per_hour, 3600, batched=True
+            )
+            if hourly.allowed:
+                return decision
+            decision = hourly
+        elif decision.blocked:
+            # Already serving a block; don't escalate the backoff further
+            self.stats['blocked_requests'] += 1
+            return decision
+        
+        block_seconds = await self._record_violation(limit_type, identifier)
+        self.stats['blocked_requests'] += 1
+        return LimitDecision(False, 0, max(decision.retry_after, block_seconds))
     
-    def check_rate_limit(self, limit_type: RateLimitType, identifier: str, 
-                        operation: Optional[str] = None) -> Tuple[bool, Optional[int]]:
+    async def check_rate_limit(self, limit_type: RateLimitType, identifier: str, 
+                               operation: Optional[str] = None) -> Tuple[bool, Optional[int]]:
         """
         Check if request is within rate limits.
         
@@ -280,73 +225,17 @@ class EnhancedRateLimiter:
             Tuple of (allowed, retry_after_seconds)
         """
         try:
-            self.stats['total_requests'] += 1
-            
-            # Create composite identifier for operation-specific limits
-            if operation and limit_type == RateLimitType.OPERATION:
-                identifier = f"{identifier}:{operation}"
-            
-            rule = self._get_rule(limit_type, identifier)
-            now = datetime.now(timezone.utc)
-            
-            # Check if currently blocked
-            if rule.blocked_until and now < rule.blocked_until:
-                retry_after = int((rule.blocked_until - now).total_seconds())
-                self.stats['blocked_requests'] += 1
-                return False, retry_after
-            
-            # Reset window if expired
-            if self._is_window_expired(rule):
-                self._reset_window(rule)
-            
-            # Check rate limits
-            minute_limit = rule.config.requests_per_minute
-            hour_limit = rule.config.requests_per_hour
-            
-            # Check minute limit
-            if rule.request_count >= minute_limit:
-                rule.violation_count += 1
-                
-                # Calculate backoff
-                backoff_minutes = self._calculate_backoff(rule.violation_count)
-                rule.blocked_until = now + timedelta(minutes=backoff_minutes)
-                
-                # Check for abuse
-                if self._detect_abuse(rule):
-                    self._apply_abuse_block(rule)
-                
-                self._store_rule(self._get_key(limit_type, identifier), rule)
-                
-                retry_after = int((rule.blocked_until - now).total_seconds())
-                self.stats['blocked_requests'] += 1
-                return False, retry_after
-            
-            # Check hourly limit (simplified - would need more sophisticated windowing)
-            hour_window_start = now - timedelta(hours=1)
-            if rule.window_start < hour_window_start:
-                # For simplicity, reset hourly count if window is very old
-                # In production, this would use a sliding window
-                pass
-            
-            # Allow request
-            rule.request_count += 1
-            rule.last_request = now
-            
-            # Reset blocked status if block period expired
-            if rule.blocked_until and now >= rule.blocked_until:
-                rule.blocked_until = None
-                rule.violation_count = max(0, rule.violation_count - 1)  # Reduce violation count
-            
-            self._store_rule(self._get_key(limit_type, identifier), rule)
-            
-            return True, None
-            
+            decision = await self.evaluate(limit_type, identifier, operation)
         except Exception as e:
             logger.error(f"Error checking rate limit: {e}")
             # Fail open - allow request if there's an error
             return True, None
+        
+        if decision.allowed:
+            return True, None
+        return False, int(math.ceil(decision.retry_after))
     
-    def get_rate_limit_info(self, limit_type: RateLimitType, identifier: str) -> Dict:
+    async def get_rate_limit_info(self, limit_type: RateLimitType, identifier: str) -> Dict:
         """
         Get current rate limit information for an identifier.
         
@@ -358,33 +247,34 @@ class EnhancedRateLimiter:
             Dictionary containing rate limit information
         """
         try:
-            rule = self._get_rule(limit_type, identifier)
-            now = datetime.now(timezone.utc)
-            
-            # Calculate remaining requests
-            remaining = max(0, rule.config.requests_per_minute - rule.request_count)
+            config = self._get_config(limit_type)
+            key = self._get_key(limit_type, identifier)
             
-            # Calculate reset time
-            reset_time = rule.window_start + timedelta(minutes=1)
-            reset_seconds = max(0, int((reset_time - now).total_seconds()))
+            requests_used = await self.engine.window_count(f"{key}:minute", 60)
+            blocked_for = await self.engine.block_ttl(f"{key}:block")
+            violation_count, _ = await self.engine.increment(
+                f"{key}:violations", 0, self.abuse_cooldown_hours * 3600
+            )
             
             return {
                 'limit_type': limit_type.value,
-                'requests_per_minute': rule.config.requests_per_minute,
-                'requests_used': rule.request_count,
-                'requests_remaining': remaining,
-                'reset_time_seconds': reset_seconds,
-                'blocked': rule.blocked_until is not None and now < rule.blocked_until,
-                'blocked_until': rule.blocked_until.isoformat() if rule.blocked_until else None,
-                'violation_count': rule.violation_count,
-                'last_request': rule.last_request.isoformat()
+                'requests_per_minute': config.requests_per_minute,
+                'requests_used': requests_used,
+                'requests_remaining': max(0, config.requests_per_minute - requests_used),
+                'reset_time_seconds': 60,
+                'blocked': blocked_for > 0,
+                'blocked_until': (
+                    (datetime.now(timezone.utc) + timedelta(seconds=blocked_for)).isoformat()
+                    if blocked_for else None
+                ),
+                'violation_count': violation_count
             }
             
         except Exception as e:
             logger.error(f"Error getting rate limit info: {e}")
             return {'error': str(e)}
     
-    def reset_rate_limit(self, limit_type: RateLimitType, identifier: str):
+    async def reset_rate_limit(self, limit_type: RateLimitType, identifier: str):
         """
         Reset rate limit for an identifier (admin function).
         
@@ -394,13 +284,9 @@ class EnhancedRateLimiter:
         """
         try:
             key = self._get_key(limit_type, identifier)
-            
-            if self.use_redis:
-                self.redis_client.delete(key)
-            else:
-                with self.lock:
-                    if key in self.memory_store:
-                        del self.memory_store[key]
+            await self.engine.reset(
+                f"{key}:minute", f"{key}:hour", f"{key}:block", f"{key}:violations"
+            )
             
             logger.info(f"Rate limit reset for {limit_type.value} {identifier[:8]}...")
             
@@ -415,30 +301,17 @@ class EnhancedRateLimiter:
             'abuse_detections': self.stats['abuse_detections'],
             'block_rate': self.stats['blocked_requests'] / max(1, self.stats['total_requests']),
             'last_reset': self.stats['last_reset'].isoformat(),
-            'storage_backend': 'redis' if self.use_redis else 'memory',
-            'rules_count': len(self.memory_store) if not self.use_redis else 'unknown'
+            'storage_backend': self.engine.backend_name
         }
     
-    def cleanup_expired_rules(self):
-        """Clean up expired rate limit rules (for memory storage)."""
-        if self.use_redis:
-            return  # Redis handles TTL automatically
-        
+    async def cleanup_expired_rules(self):
+        """Flush batched counters and drop expired local limiter state."""
         try:
-            now = datetime.now(timezone.utc)
-            expired_keys = []
+            await self.engine.flush()
+            expired = self.engine.purge_expired()
             
-            with self.lock:
-                for key, rule in self.memory_store.items():
-                    # Remove rules that haven't been accessed in 1 hour
-                    if (now - rule.last_request).total_seconds() > 3600:
-                        expired_keys.append(key)
-                
-                for key in expired_keys:
-                    del self.memory_store[key]
-            
-            if expired_keys:
-                logger.info(f"Cleaned up {len(expired_keys)} expired rate limit rules")
+            if expired:
+                logger.info(f"Cleaned up {expired} expired rate limit rules")
                 
         except Exception as e:
             logger.error(f"Error cleaning up expired rules: {e}")
@@ -460,7 +333,7 @@ class RateLimitMiddleware:
             user_id = self._get_user_id(request)
             
             # Check IP-based rate limit
-            ip_allowed, ip_retry_after = self.rate_limiter.check_rate_limit(
+            ip_allowed, ip_retry_after = await self.rate_limiter.check_rate_limit(
                 RateLimitType.IP, client_ip
             )
             
@@ -470,14 +343,15 @@ class RateLimitMiddleware:
                 )
             
             # Check user-based rate limit if user is authenticated
+            user_decision = None
             if user_id:
-                user_allowed, user_retry_after = self.rate_limiter.check_rate_limit(
+                user_decision = await self.rate_limiter.evaluate(
                     RateLimitType.USER, str(user_id)
                 )
                 
-                if not user_allowed:
+                if not user_decision.allowed:
                     return self._create_rate_limit_response(
-                        "User rate limit exceeded", user_retry_after
+                        "User rate limit exceeded", int(math.ceil(user_decision.retry_after))
                     )
             
             # Check operation-specific rate limits for sensitive endpoints
@@ -485,7 +359,7 @@ class RateLimitMiddleware:
                 operation = self._get_operation_name(request)
                 identifier = str(user_id) if user_id else client_ip
                 
-                op_allowed, op_retry_after = self.rate_limiter.check_rate_limit(
+                op_allowed, op_retry_after = await self.rate_limiter.check_rate_limit(
                     RateLimitType.OPERATION, identifier, operation
                 )
                 
@@ -497,14 +371,14 @@ class RateLimitMiddleware:
             # Process request
             response = await call_next(request)
             
-            # Add rate limit headers
-            if user_id:
-                rate_info = self.rate_limiter.get_rate_limit_info(
-                    RateLimitType.USER, str(user_id)
+            # Add rate limit headers from the decision already made (no extra round-trip)
+            if user_decision is not None:
+                user_config = self.rate_limiter.configs.get(
+                    RateLimitType.USER, EnhancedRateLimiter.DEFAULT_CONFIGS[RateLimitType.USER]
                 )
-                response.headers["X-RateLimit-Limit"] = str(rate_info['requests_per_minute'])
-                response.headers["X-RateLimit-Remaining"] = str(rate_info['requests_remaining'])
-                response.headers["X-RateLimit-Reset"] = str(rate_info['reset_time_seconds'])
+                response.headers["X-RateLimit-Limit"] = str(user_config.requests_per_minute)
+                response.headers["X-RateLimit-Remaining"] = str(user_decision.remaining)
+                response.headers["X-RateLimit-Reset"] = "60"
             
             return response
             
@@ -583,25 +457,19 @@ class RateLimitMiddleware:
 # Factory functions
 def create_redis_rate_limiter(redis_url: str = "redis://localhost:6379", 
                              configs: Optional[Dict[RateLimitType, RateLimitConfig]] = None) -> EnhancedRateLimiter:
-    """Create rate limiter with Redis backend."""
-    try:
-        redis_client = redis.from_url(redis_url)
-        redis_client.ping()  # Test connection
-        return EnhancedRateLimiter(redis_client=redis_client, use_redis=True, configs=configs)
-    except Exception as e:
-        logger.warning(f"Failed to connect to Redis: {e}. Using memory backend.")
-        return EnhancedRateLimiter(use_redis=False, configs=configs)
+    """Create rate limiter backed by a shared Redis limiter engine."""
+    return EnhancedRateLimiter(engine=create_limiter_engine(redis_url), configs=configs)
 
 def create_memory_rate_limiter(configs: Optional[Dict[RateLimitType, RateLimitConfig]] = None) -> EnhancedRateLimiter:
     """Create rate limiter with in-memory backend."""
-    return EnhancedRateLimiter(use_redis=False, configs=configs)
+    return EnhancedRateLimiter(engine=create_limiter_engine(None), configs=configs)
 
 # Global rate limiter instance
 _global_rate_limiter = None
 
 def get_rate_limiter() -> EnhancedRateLimiter:
-    """Get global rate limiter instance."""
+    """Get global rate limiter instance (uses the process-wide limiter engine)."""
     global _global_rate_limiter
     if _global_rate_limiter is None:
-        _global_rate_limiter = create_redis_rate_limiter()
-    return _global_rate_limiter 
\ No newline at end of file
+        _global_rate_limiter = EnhancedRateLimiter()
+    return _global_rate_limiter
@@ -6,10 +6,12 @@ rate limiting, input validation, error handling, and other security measures.
 """
 
 import time
+import json
 import secrets
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, Iterator, List, Optional, Callable, Tuple
+from urllib.parse import parse_qsl
 from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
 from collections import defaultdict
@@ -18,6 +20,7 @@ from fastapi import Request, Response, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import Message
 
 from app.security.rate_limiter import RateLimitConfig, RateLimiterService
 from app.security.input_validator import InputValidator
@@ -27,10 +30,33 @@ from app.security.security_headers import SecurityHeadersManager, SecurityConfig
 from app.security.error_handler import ProductionErrorHandler, ErrorCategory, ErrorSeverity
 from app.core.config import Settings
 from app.core.security import audit_security_event
+from app.schemas.ciphertext import ciphertext_fields
+from app.schemas.journal import JournalEntryCreate, JournalEntryUpdate
+from app.schemas.vault import VaultBlobUploadRequest
 from app.utils.secure_utils import SecureTokenGenerator, SecureHasher
 
 logger = logging.getLogger(__name__)
 
+# Bodies that are never read or threat-scanned (uploads, audio, encrypted blobs)
+BINARY_CONTENT_TYPES = ('application/octet-stream', 'multipart/', 'audio/', 'image/', 'video/', 'application/pdf')
+
+# Larger text bodies are left to schema validation instead of being buffered here
+MAX_SCANNED_BODY_BYTES = 1024 * 1024
+
+
+def _request_ciphertext_fields() -> Dict[str, Optional[int]]:
+    """Ciphertext field names of the request schemas, with their largest maximum length"""
+    fields: Dict[str, Optional[int]] = {}
+    for schema in (JournalEntryCreate, JournalEntryUpdate, VaultBlobUploadRequest):
+        for name, max_length in ciphertext_fields(schema).items():
+            if name not in fields or (max_length or 0) > (fields[name] or 0):
+                fields[name] = max_length
+    return fields
+
+
+# Body fields that are only length- and charset-checked, never threat-scanned
+CIPHERTEXT_FIELDS = _request_ciphertext_fields()
+
 # Simple SecurityConfig class for backwards compatibility
 @dataclass
 class SecurityConfig:
@@ -391,15 +417,39 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             # Get content type
             content_type = request.headers.get('content-type', '')
             
-            if 'application/json' in content_type:
-                # For JSON, we'll validate after parsing
-                pass
-            elif 'application/x-www-form-urlencoded' in content_type:
-                # For form data, validate each field
-                pass
-            elif 'multipart/form-data' in content_type:
-                # For file uploads, validate file data
-                pass
+            # Binary bodies are never read, let alone scanned
+            if content_type.lower().startswith(BINARY_CONTENT_TYPES):
+                return
+            
+            is_json = 'application/json' in content_type
+            if not is_json and 'application/x-www-form-urlencoded' not in content_type:
+                return
+            
+            content_length = request.headers.get('content-length', '')
+            if not content_length.isdigit() or int(content_length) > MAX_SCANNED_BODY_BYTES:
+                return
+            
+            body = await request.body()
+            self._replay_body(request, body)
+            if not body:
+                return
+            
+            if is_json:
+                fields = self._iter_body_fields(json.loads(body))
+            else:
+                fields = iter(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+            
+            for field_name, value in fields:
+                if field_name in CIPHERTEXT_FIELDS:
+                    result = self.input_validator.validate_ciphertext(value, CIPHERTEXT_FIELDS[field_name])
+                else:
+                    result = self.input_validator.validate_input(value, 'string')
+                if not result.is_valid:
+                    context.threat_level += 1
+                    await self._log_security_event(context, 'invalid_body_field', {
+                        'field': field_name,
+                        'errors': result.errors
+                    })
             
         except Exception as e:
             context.threat_level += 1
@@ -407,6 +457,33 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 'error': str(e)
             })
     
+    def _iter_body_fields(self, data: Any, name: Optional[str] = None, max_depth: int = 10) -> Iterator[Tuple[Optional[str], str]]:
+        """Yield (field name, value) for every string of a parsed JSON body."""
+        if max_depth <= 0:
+            return
+        if isinstance(data, dict):
+            for key, value in data.items():
+                yield from self._iter_body_fields(value, key, max_depth - 1)
+        elif isinstance(data, list):
+            for item in data:
+                yield from self._iter_body_fields(item, name, max_depth - 1)
+        elif isinstance(data, str):
+            yield name, data
+    
+    def _replay_body(self, request: Request, body: bytes) -> None:
+        """Hand the body read here to the application, then resume the client's stream."""
+        receive = request._receive
+        replayed = False
+        
+        async def replay() -> Message:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        
+        request._receive = replay
+    
     async def _apply_timing_protection(self, request: Request, context: SecurityContext):
         """Apply timing attack protection."""
         if not self.timing_protection:
@@ -422,15 +499,13 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     
     async def _post_process_response(self, request: Request, response: Response, context: SecurityContext):
         """Post-process response with security measures."""
-        # Apply security headers
-        security_headers = self.headers_middleware.get_security_headers(
-            context.request_id,
-            request.url.scheme == 'https'
+        # Apply pre-encoded security headers; only HTML responses get the nonce
+        self.headers_middleware.apply_security_headers(
+            response,
+            request.url.scheme == 'https',
+            context.nonce
         )
         
-        for header_name, header_value in security_headers.items():
-            response.headers[header_name] = header_value
-        
         # Add security context to response
         response.headers['X-Request-ID'] = context.request_id
         response.headers['X-Security-Level'] = str(context.threat_level)
@@ -568,10 +643,6 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             if not self.suspicious_patterns[pattern_key]:
                 del self.suspicious_patterns[pattern_key]
         
-        # Clean up nonce cache
-        if hasattr(self.headers_middleware, 'cleanup_nonce_cache'):
-            self.headers_middleware.cleanup_nonce_cache()
-        
         # Memory cleanup
         if self.memory_manager:
             self.memory_manager.cleanup_all()
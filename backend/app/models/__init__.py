@@ -7,5 +7,8 @@ from .opaque_auth import OpaqueSession
 from .opaque_server_config import OpaqueServerConfig
 from .share_template import ShareTemplate
 from .share import Share, ShareAccess
+from .job import Job
+from .template_extraction import TemplateExtraction
+from .security_audit_log import SecurityAuditLog
 
-__all__ = ["User", "JournalEntry", "Tag", "Reminder", "OpaqueSession", "OpaqueServerConfig", "ShareTemplate", "Share", "ShareAccess"]
+__all__ = ["User", "JournalEntry", "Tag", "Reminder", "OpaqueSession", "OpaqueServerConfig", "ShareTemplate", "Share", "ShareAccess", "Job", "TemplateExtraction", "SecurityAuditLog"]
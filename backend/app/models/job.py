@@ -0,0 +1,56 @@
+import uuid
+from sqlalchemy import Boolean, Column, String, Text, Integer, TIMESTAMP, LargeBinary, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import ForeignKey
+from sqlalchemy.sql import func
+
+from .base import Base, TimestampMixin, UUID
+
+
+class Job(Base, TimestampMixin):
+    """
+    A unit of background work (share generation, template extraction)
+    claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+
+    # What to run and for whom
+    job_type = Column(String(50), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    payload = Column(JSONB, nullable=False, default=dict)
+    input_data = Column(LargeBinary, nullable=True)  # Encrypted user content (file bytes, plaintext entries); cleared once the job settles
+
+    # Lifecycle: queued -> running -> succeeded | failed | cancelled
+    status = Column(String(20), nullable=False, default='queued')
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    # Scheduling and worker leases
+    run_after = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String(64), nullable=True)
+    locked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    started_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers only ever scan the runnable part of the queue
+        Index(
+            "ix_jobs_queued_run_after",
+            "run_after",
+            postgresql_where=(status == 'queued'),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.job_type}, status={self.status})>"
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if the job reached a terminal state"""
+        return self.status in ('succeeded', 'failed', 'cancelled')
@@ -17,7 +17,7 @@ from app.models.base import Base, TimestampMixin, UUID
 
 
 class SystemHealth(Base):
-    """System health monitoring records"""
+    """System health monitoring records (partitioned by month on timestamp)"""
     __tablename__ = "system_health"
     
     id = Column(UUID, primary_key=True, default=uuid.uuid4, index=True)
@@ -57,7 +57,7 @@ class SystemHealth(Base):
 
 
 class ServiceHealth(Base):
-    """Service health monitoring records"""
+    """Service health monitoring records (partitioned by month on timestamp)"""
     __tablename__ = "service_health"
     
     id = Column(UUID, primary_key=True, default=uuid.uuid4, index=True)
@@ -92,7 +92,7 @@ class ServiceHealth(Base):
 
 
 class Alert(Base, TimestampMixin):
-    """Alert records"""
+    """Alert records (partitioned by month on created_at)"""
     __tablename__ = "alerts"
     
     id = Column(UUID, primary_key=True, default=uuid.uuid4, index=True)
@@ -0,0 +1,57 @@
+import uuid
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from .base import Base, UUID
+
+
+class SecurityAuditLog(Base):
+    """
+    Append-only security audit trail, written in batches by the audit writer
+    and hash-chained in sequence order for tamper evidence.
+
+    Partitioned by month on timestamp (see services/partition_service.py)
+    """
+    __tablename__ = "security_audit_logs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Event classification
+    event_type = Column(String(50), nullable=False)
+    event_category = Column(String(30), nullable=False)
+    severity = Column(String(20), nullable=False)
+
+    # Identifiers (hashed for privacy)
+    user_id_hash = Column(String(64), nullable=True)
+    session_id_hash = Column(String(64), nullable=True)
+    correlation_id = Column(UUID(as_uuid=True), nullable=True)
+    request_id = Column(UUID(as_uuid=True), nullable=True)
+    ip_address_hash = Column(String(64), nullable=True)
+    user_agent_hash = Column(String(64), nullable=True)
+
+    # Event content
+    event_data = Column(Text, nullable=True)  # JSON
+    event_message = Column(String(500), nullable=False)
+    is_sensitive = Column(Boolean, nullable=False, default=False)
+    success = Column(Boolean, nullable=True)
+    error_code = Column(String(50), nullable=True)
+    processing_time_ms = Column(Integer, nullable=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # Integrity chain: log_signature = HMAC(previous_signature, event) in sequence order
+    sequence = Column(BigInteger, nullable=True)
+    previous_signature = Column(String(128), nullable=True)
+    log_signature = Column(String(128), nullable=True)
+
+    __table_args__ = (
+        Index('idx_security_audit_logs_event_type', 'event_type'),
+        Index('idx_security_audit_logs_event_category', 'event_category'),
+        Index('idx_security_audit_logs_severity', 'severity'),
+        Index('idx_security_audit_logs_user_id_hash', 'user_id_hash'),
+        Index('idx_security_audit_logs_correlation_id', 'correlation_id'),
+        Index('idx_security_audit_logs_timestamp', 'timestamp'),
+        Index('idx_security_audit_logs_sequence', 'sequence'),
+    )
+
+    def __repr__(self):
+        return f"<SecurityAuditLog(id={self.id}, type={self.event_type}, sequence={self.sequence})>"
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Boolean, Column, String, Text, Integer, TIMESTAMP
+from sqlalchemy import Boolean, Column, Index, String, Text, Integer, TIMESTAMP
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
@@ -37,6 +37,11 @@ class Share(Base, TimestampMixin):
     
     # Relationships
     user = relationship("User", back_populates="shares")
+
+    __table_args__ = (
+        # Share listings and stats filter by owner and status, newest first
+        Index("ix_shares_user_active_created", "user_id", "is_active", "created_at"),
+    )
     
     def __repr__(self):
         return f"<Share(id={self.id}, token={self.share_token[:8]}..., user_id={self.user_id})>"
@@ -60,6 +65,8 @@ class Share(Base, TimestampMixin):
 class ShareAccess(Base, TimestampMixin):
     """
     Tracks access to shares for audit purposes
+
+    Partitioned by month on created_at (see services/partition_service.py)
     """
     __tablename__ = "share_access"
 
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base, TimestampMixin
+
+
+class TemplateExtraction(Base, TimestampMixin):
+    """
+    Parsed text and extracted template of an uploaded document, keyed by the
+    SHA-256 of the file so repeat imports skip parsing and Gemini
+    """
+    __tablename__ = "template_extractions"
+
+    document_digest = Column(String(64), primary_key=True)
+    document_type = Column(String(20), nullable=False)
+
+    # Parser output (text, metadata, counts); the uploader's filename is not kept
+    parsed_document = Column(JSONB, nullable=False)
+
+    # TemplateExtractionResponse, valid only for the prompt version it was made with
+    prompt_version = Column(String(20), nullable=True)
+    extraction = Column(JSONB, nullable=True)
+
+    hit_count = Column(Integer, nullable=False, default=0)
+    last_used_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<TemplateExtraction(digest={self.document_digest[:12]}..., prompt_version={self.prompt_version})>"
@@ -0,0 +1,113 @@
+"""
+Ciphertext Field Schemas
+
+Client-side encrypted payloads (entry content, wrapped keys, IVs, vault
+blobs) are opaque base64 strings. Fields declared with ``ciphertext_field``
+carry a schema marker so the input validator only checks their length and
+base64 charset and never runs the SQL injection / XSS heuristics over them.
+"""
+
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Optional, Type
+
+from pydantic import AfterValidator, BaseModel, Field
+
+# JSON schema extension key marking a field as opaque ciphertext
+CIPHERTEXT_MARKER = "x-ciphertext"
+
+# Upper bounds for base64 text, by kind of value
+MAX_CIPHERTEXT_LENGTH = 16 * 1024 * 1024
+MAX_KEY_MATERIAL_LENGTH = 1024
+
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/-_="
+
+
+def is_base64_text(value: str) -> bool:
+    """
+    Check that a string only uses the base64 (or base64url) alphabet.
+
+    The charset test deletes every alphabet byte in one C-level pass instead
+    of decoding the value, so it costs a fraction of ``base64.b64decode`` on
+    multi-megabyte ciphertext.
+
+    Args:
+        value: String to check
+
+    Returns:
+        bool: True if the string is non-empty, well-padded base64 text
+    """
+    if not value or not value.isascii():
+        return False
+
+    if value.encode("ascii").translate(None, _BASE64_ALPHABET):
+        return False
+
+    # Padding may only appear as the final one or two characters
+    padding = value.find("=")
+    if padding != -1 and (padding < len(value) - 2 or value[-1] != "="):
+        return False
+
+    return padding != 0
+
+
+def _validate_ciphertext(value: str) -> str:
+    # Empty strings are treated like an absent value by the services
+    if value and not is_base64_text(value):
+        raise ValueError("Invalid base64 encoding")
+    return value
+
+
+Ciphertext = Annotated[str, AfterValidator(_validate_ciphertext)]
+
+
+def ciphertext_field(
+    default: Any = None,
+    *,
+    max_length: int = MAX_CIPHERTEXT_LENGTH,
+    **kwargs: Any
+) -> Any:
+    """
+    Declare a schema field holding opaque base64 ciphertext.
+
+    Args:
+        default: Field default (``...`` for required fields)
+        max_length: Maximum length of the base64 text
+        **kwargs: Extra ``pydantic.Field`` arguments such as ``description``
+
+    Returns:
+        FieldInfo: Field definition carrying the ciphertext marker
+    """
+    return Field(
+        default,
+        max_length=max_length,
+        json_schema_extra={CIPHERTEXT_MARKER: True},
+        **kwargs
+    )
+
+
+@lru_cache(maxsize=None)
+def ciphertext_fields(model: Type[BaseModel]) -> Dict[str, Optional[int]]:
+    """
+    Get the ciphertext fields of a schema with their maximum lengths.
+
+    Args:
+        model: Pydantic model class
+
+    Returns:
+        Dict[str, Optional[int]]: Field name (and alias) to maximum length
+    """
+    fields: Dict[str, Optional[int]] = {}
+    for name, info in model.model_fields.items():
+        extra = info.json_schema_extra
+        if not isinstance(extra, dict) or not extra.get(CIPHERTEXT_MARKER):
+            continue
+
+        max_length = next(
+            (getattr(meta, "max_length") for meta in info.metadata if hasattr(meta, "max_length")),
+            None
+        )
+        fields[name] = max_length
+        if info.alias:
+            fields[info.alias] = max_length
+
+    return fields
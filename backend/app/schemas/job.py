@@ -0,0 +1,23 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+import uuid
+
+
+class JobResponse(BaseModel):
+    """Status of a background job; poll until status is succeeded, failed or cancelled"""
+    id: uuid.UUID = Field(..., description="Job UUID")
+    job_type: str = Field(..., description="Kind of work (share.create, template.import)")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    attempts: int = Field(..., description="Attempts started so far")
+    max_attempts: int = Field(..., description="Attempts before the job is failed")
+    cancel_requested: bool = Field(False, description="Whether cancellation was requested while running")
+    result: Optional[Dict[str, Any]] = Field(None, description="Job result once succeeded")
+    error: Optional[str] = Field(None, description="Last error, if any")
+    created_at: datetime = Field(..., description="Enqueue timestamp")
+    started_at: Optional[datetime] = Field(None, description="Start of the latest attempt")
+    finished_at: Optional[datetime] = Field(None, description="Completion timestamp")
+    expires_at: Optional[datetime] = Field(None, description="When the job and its result are deleted")
+
+    class Config:
+        from_attributes = True
@@ -3,6 +3,8 @@ from typing import Optional, List, Union
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.schemas.ciphertext import Ciphertext, MAX_KEY_MATERIAL_LENGTH, ciphertext_field
+
 
 # Base schema for Tag
 class TagBase(BaseModel):
@@ -38,10 +40,10 @@ class JournalEntryCreate(JournalEntryBase):
     
     # OPAQUE Secret Tag fields for encrypted entries
     secret_tag_id: Optional[bytes] = None
-    encrypted_content: Optional[str] = None
-    wrapped_key: Optional[str] = None
-    encryption_iv: Optional[str] = None
-    wrap_iv: Optional[str] = None
+    encrypted_content: Optional[Ciphertext] = ciphertext_field()
+    wrapped_key: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
+    encryption_iv: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
+    wrap_iv: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
     encryption_algorithm: Optional[str] = None
 
 
@@ -55,10 +57,10 @@ class JournalEntryUpdate(BaseModel):
     
     # OPAQUE Secret Tag updates
     secret_tag_id: Optional[bytes] = None
-    encrypted_content: Optional[str] = None
-    wrapped_key: Optional[str] = None
-    encryption_iv: Optional[str] = None
-    wrap_iv: Optional[str] = None
+    encrypted_content: Optional[Ciphertext] = ciphertext_field()
+    wrapped_key: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
+    encryption_iv: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
+    wrap_iv: Optional[Ciphertext] = ciphertext_field(max_length=MAX_KEY_MATERIAL_LENGTH)
     encryption_algorithm: Optional[str] = None
 
 
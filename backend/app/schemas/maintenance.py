@@ -32,6 +32,11 @@ class CleanupStatsResponse(BaseModel):
         description="Cleanup service configuration"
     )
     
+    expiry_sweeps: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Progress metrics of the scheduled expiry sweeps"
+    )
+    
     timestamp: str = Field(
         ...,
         description="Timestamp of statistics generation"
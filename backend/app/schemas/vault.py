@@ -11,6 +11,11 @@ from typing import Optional, Dict, List, Any
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
+from app.schemas.ciphertext import Ciphertext, MAX_KEY_MATERIAL_LENGTH, ciphertext_field
+
+# Base64 length of the largest accepted blob (100MB of AES-GCM ciphertext)
+MAX_VAULT_CIPHERTEXT_LENGTH = 4 * -(-100 * 1024 * 1024 // 3)
+
 
 class ContentTypeEnum(str, Enum):
     """Supported content types for vault blobs"""
@@ -32,22 +37,25 @@ class VaultBlobUploadRequest(BaseModel):
     All encryption is performed client-side using vault keys.
     """
     
-    ciphertext: str = Field(
+    ciphertext: Ciphertext = ciphertext_field(
         ...,
         description="Base64-encoded encrypted content (AES-GCM)",
-        min_length=1
+        min_length=1,
+        max_length=MAX_VAULT_CIPHERTEXT_LENGTH
     )
     
-    iv: str = Field(
+    iv: Ciphertext = ciphertext_field(
         ...,
         description="Base64-encoded initialization vector (12 bytes)",
-        min_length=1
+        min_length=1,
+        max_length=MAX_KEY_MATERIAL_LENGTH
     )
     
-    auth_tag: str = Field(
+    auth_tag: Ciphertext = ciphertext_field(
         ...,
         description="Base64-encoded authentication tag (16 bytes)",
-        min_length=1
+        min_length=1,
+        max_length=MAX_KEY_MATERIAL_LENGTH
     )
     
     content_type: str = Field(
@@ -69,9 +77,13 @@ class VaultBlobUploadRequest(BaseModel):
         max_length=36
     )
     
-    @field_validator('ciphertext', 'iv', 'auth_tag')
+    @field_validator('iv', 'auth_tag')
     def validate_base64(cls, v):
-        """Validate that fields are proper base64."""
+        """Validate that key material fields are proper base64.
+        
+        The ciphertext itself is only charset-checked (see ``Ciphertext``)
+        so large uploads are not decoded twice.
+        """
         try:
             decoded = base64.b64decode(v)
             if len(decoded) == 0:
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Run background job workers outside the API process.
+
+Lets share generation and template extraction scale independently of API
+instances (run those with JOB_WORKER_CONCURRENCY=0).
+
+Usage: python app/scripts/run_job_worker.py [--concurrency N] [--job-type TYPE ...]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.config import settings
+from app.services.job_service import JobWorker, job_service, load_job_handlers
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_workers(concurrency: int, job_types=None):
+    """Run workers until interrupted"""
+    load_job_handlers()
+    workers = [JobWorker(job_service, job_types=job_types) for _ in range(concurrency)]
+    logger.info(f"Running {concurrency} job workers for {job_types or job_service.job_types}")
+    try:
+        await asyncio.gather(*(worker.run_forever() for worker in workers))
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--concurrency", type=int, default=max(settings.JOB_WORKER_CONCURRENCY, 1),
+                        help="Number of jobs run concurrently")
+    parser.add_argument("--job-type", action="append", dest="job_types",
+                        help="Only run jobs of this type (repeatable)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_workers(args.concurrency, args.job_types))
+    except KeyboardInterrupt:
+        logger.info("Job workers stopped")
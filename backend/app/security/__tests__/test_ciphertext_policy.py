@@ -0,0 +1,53 @@
+import base64
+import json
+import os
+
+import pytest
+from pydantic import ValidationError
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.schemas.journal import JournalEntryCreate
+from app.schemas.vault import VaultBlobUploadRequest
+from app.middleware.security_middleware import SecurityMiddleware
+
+# Longer than the 1000 character limit applied to plain strings
+CIPHERTEXT = base64.b64encode(os.urandom(2048)).decode()
+
+
+class TestCiphertextPolicy:
+
+    def test_ciphertext_fields_are_charset_and_length_checked(self):
+        entry = {"entry_date": "2025-01-01T00:00:00Z", "title": "<b>day</b>"}
+
+        parsed = JournalEntryCreate(**entry, encrypted_content=CIPHERTEXT)
+        assert parsed.encrypted_content == CIPHERTEXT
+
+        with pytest.raises(ValidationError, match="Invalid base64 encoding"):
+            JournalEntryCreate(**entry, wrapped_key="not base64!")
+        with pytest.raises(ValidationError, match="too_long"):
+            JournalEntryCreate(**entry, wrapped_key="A" * 1028)
+
+    def test_vault_key_material_uses_ciphertext_type(self):
+        with pytest.raises(ValidationError, match="Invalid base64 encoding"):
+            VaultBlobUploadRequest(ciphertext=CIPHERTEXT, iv="<iv>", auth_tag="A" * 24, content_size=1)
+
+    def test_middleware_scans_text_fields_but_not_ciphertext_or_binary_bodies(self):
+        async def echo(request):
+            return Response(await request.body())
+
+        app = Starlette(routes=[Route("/echo", echo, methods=["POST"])])
+        app.add_middleware(SecurityMiddleware)
+        client = TestClient(app, headers={"accept": "application/json"})
+
+        body = json.dumps({"title": "<script>alert(1)</script>", "encrypted_content": CIPHERTEXT})
+        response = client.post("/echo", content=body, headers={"content-type": "application/json"})
+        assert response.content == body.encode()
+        assert response.headers["X-Security-Level"] == "1"
+
+        upload = b"<script>alert(1)</script>" + os.urandom(1024)
+        response = client.post("/echo", content=upload, headers={"content-type": "application/octet-stream"})
+        assert response.content == upload
+        assert response.headers["X-Security-Level"] == "0"
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+import fakeredis
+import fakeredis.aioredis
+
+from app.security.limiter_backend import (
+    LimiterEngine,
+    MemoryLimiterBackend,
+    RedisLimiterBackend,
+)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    """Run every test against both the in-memory and the (fake) Redis backend."""
+    if request.param == "memory":
+        return MemoryLimiterBackend()
+    return RedisLimiterBackend(fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+class TestLimiterBackends:
+    """Both backends must make identical decisions."""
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_enforces_limit(self, backend):
+        decisions = [await backend.sliding_window("k", 3, 60) for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+        assert 0 < decisions[3].retry_after <= 60
+
+    @pytest.mark.asyncio
+    async def test_block_short_circuits_sliding_window(self, backend):
+        await backend.block("k:block", 30)
+
+        decision = await backend.sliding_window("k", 10, 60)
+
+        assert not decision.allowed
+        assert decision.blocked
+        assert 0 < decision.retry_after <= 30
+        assert await backend.window_count("k", 60) == 0
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_drains_and_reports_retry(self, backend):
+        decisions = [await backend.token_bucket("tb", 2, 1) for _ in range(3)]
+
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert decisions[2].retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_increment_and_reset(self, backend):
+        assert (await backend.increment("c", 2, 60))[0] == 2
+        assert (await backend.increment("c", 3, 60))[0] == 5
+
+        await backend.reset("c")
+
+        assert (await backend.increment("c", 1, 60))[0] == 1
+
+
+class TestLimiterEngine:
+
+    @pytest.mark.asyncio
+    async def test_batched_counter_coalesces_backend_writes(self):
+        backend = MemoryLimiterBackend()
+        engine = LimiterEngine(backend, batch_size=5, flush_interval=3600)
+
+        # First hit flushes immediately (no previous flush), the next four stay local
+        for _ in range(5):
+            decision = await engine.fixed_window("hour", 100, 3600, batched=True)
+        assert decision.allowed
+        assert (await backend.increment("hour", 0, 3600))[0] == 1
+
+        await engine.flush()
+        assert (await backend.increment("hour", 0, 3600))[0] == 5
+
+    @pytest.mark.asyncio
+    async def test_batched_counter_evicts_least_recent_key_after_writing_it(self):
+        backend = MemoryLimiterBackend()
+        engine = LimiterEngine(backend, batch_size=100, flush_interval=3600)
+        engine.counters.max_keys = 2
+
+        for key in ("a", "a", "b", "c"):
+            await engine.fixed_window(key, 100, 3600, batched=True)
+
+        assert len(engine.counters) == 2
+        assert (await backend.increment("a", 0, 3600))[0] == 2
+
+    @pytest.mark.asyncio
+    async def test_maintenance_task_flushes_idle_counters(self):
+        backend = MemoryLimiterBackend()
+        engine = LimiterEngine(backend, batch_size=100, flush_interval=0.01)
+
+        await engine.fixed_window("hour", 100, 3600, batched=True)
+        await engine.fixed_window("hour", 100, 3600, batched=True)
+        engine.start()
+        await asyncio.sleep(0.05)
+
+        assert (await backend.increment("hour", 0, 3600))[0] == 2
+        await engine.stop()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_backend_on_shared_backend_error(self):
+        server = fakeredis.FakeServer()
+        server.connected = False
+        engine = LimiterEngine(RedisLimiterBackend(fakeredis.aioredis.FakeRedis(server=server)))
+
+        decisions = [await engine.sliding_window("k", 1, 60) for _ in range(2)]
+
+        assert [d.allowed for d in decisions] == [True, False]
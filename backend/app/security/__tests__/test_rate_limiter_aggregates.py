@@ -0,0 +1,115 @@
+import math
+
+import pytest
+
+from app.security.rate_limiter import (
+    DETECTION_EPOCH_REQUESTS,
+    AttackDetector,
+    EwmaStats,
+    HyperLogLog,
+    IdentifierStats,
+    RateLimitConfig,
+    SecondRingCounter,
+)
+
+
+class TestHyperLogLog:
+
+    @pytest.mark.parametrize("cardinality", [20, 200, 5000])
+    def test_estimate_is_within_three_standard_errors(self, cardinality):
+        sketch = HyperLogLog()
+        for i in range(cardinality):
+            sketch.add(f"/api/v1/items/{i}")
+            sketch.add(f"/api/v1/items/{i}")  # duplicates do not count
+
+        standard_error = 1.04 / math.sqrt(len(sketch.registers))
+        assert sketch.count() == pytest.approx(cardinality, rel=3 * standard_error)
+
+    def test_merge_estimates_the_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(150):
+            first.add(f"agent-{i}")
+            second.add(f"agent-{i + 100}")
+
+        merged = first.merge(second)
+
+        assert merged.count() == pytest.approx(250, rel=0.15)
+        assert first.count() == pytest.approx(150, rel=0.15)
+
+
+class TestSecondRingCounter:
+
+    def test_totals_cover_only_the_window(self):
+        ring = SecondRingCounter(size=10)
+        ring.record(100.2, success=True)
+        ring.record(100.7, success=False)
+        ring.record(105.0, success=False)
+
+        assert ring.totals(105.5, window=10) == (3, 2)
+        assert ring.totals(105.5, window=3) == (1, 1)
+        assert ring.totals(111.0, window=10) == (1, 1)
+
+    def test_reused_slot_is_reset_after_rollover(self):
+        ring = SecondRingCounter(size=10)
+        for _ in range(5):
+            ring.record(100.0, success=False)
+
+        # Second 110 maps to the same slot as second 100
+        ring.record(110.0, success=True)
+
+        assert ring.totals(110.0, window=10) == (1, 0)
+
+
+class TestEwmaStats:
+
+    def test_mean_decays_geometrically_towards_new_values(self):
+        stats = EwmaStats(alpha=0.2)
+        for _ in range(10):
+            stats.update(100.0)
+        assert stats.mean == 100.0
+        assert stats.std_dev == 0.0
+
+        for _ in range(5):
+            stats.update(200.0)
+
+        assert stats.mean == pytest.approx(200.0 - 100.0 * 0.8 ** 5)
+        assert stats.std_dev > 0
+
+
+class TestIdentifierStats:
+
+    def test_epochs_rotate_so_counts_stay_bounded(self):
+        stats = IdentifierStats()
+        for i in range(3 * DETECTION_EPOCH_REQUESTS):
+            stats.record(1000.0 + i, {"endpoint": "/auth/login" if i % 2 else "/api/items", "user_agent": "ua"})
+
+        assert stats.total == 2 * DETECTION_EPOCH_REQUESTS
+        assert stats.auth_requests == DETECTION_EPOCH_REQUESTS
+        assert stats.distinct_endpoints() == 2
+        assert stats.intervals.mean == pytest.approx(1.0)
+
+
+class TestAttackDetectorTracking:
+
+    def test_least_recently_used_identifier_is_evicted(self):
+        detector = AttackDetector(RateLimitConfig(max_tracked_identifiers=2))
+        detector._get_stats("a")
+        detector._get_stats("b")
+        detector.ip_reputation["b"] = 0.5
+        detector._get_stats("a")
+
+        detector._get_stats("c")
+
+        assert list(detector.request_stats) == ["a", "c"]
+        assert "b" not in detector.ip_reputation
+
+    def test_forget_idle_drops_identifiers_without_recent_requests(self):
+        detector = AttackDetector(RateLimitConfig())
+        for identifier, last_seen in (("old", 100.0), ("recent", 500.0)):
+            detector._get_stats(identifier).record(last_seen, {"endpoint": "/api/items"})
+            detector.ip_reputation[identifier] = 0.5
+
+        detector.forget_idle(cutoff_time=300.0)
+
+        assert list(detector.request_stats) == ["recent"]
+        assert detector.ip_reputation == {"recent": 0.5}
@@ -0,0 +1,76 @@
+import base64
+import os
+import re
+
+import pytest
+
+from app.security.input_validator import InputValidator
+from app.security.threat_scanner import OPAQUE_MIN_LENGTH, SQL_PATTERNS, XSS_PATTERNS, ThreatScanner
+
+
+@pytest.fixture
+def scanner():
+    return ThreatScanner()
+
+
+class TestThreatScanner:
+
+    def test_plain_prose_is_clean(self, scanner):
+        result = scanner.scan("I'm grateful (really): the walk today was lovely.")
+
+        assert result.sql_findings == []
+        assert result.xss_findings == []
+
+    def test_reports_sql_and_xss_in_one_scan(self, scanner):
+        result = scanner.scan("1' OR 1=1 -- <script>alert(1)</script>")
+
+        assert "SQL injection pattern detected: (?i)(--|#|/\\*|\\*/)" in result.sql_findings
+        assert "XSS pattern detected: (?i)<script[^>]*>.*?</script>" in result.xss_findings
+        assert "XSS pattern detected: (?i)alert\\s*\\(" in result.xss_findings
+
+    def test_keyword_threshold_counts_substrings(self, scanner):
+        assert scanner.scan("set the order").sql_findings == []
+        assert scanner.scan("offset set order").sql_findings == [
+            "Multiple SQL keywords detected: SET, ORDER, OFFSET"
+        ]
+
+    @pytest.mark.parametrize("value", [
+        "javascr\u0131pt:alert",
+        "JAVASCR\u0130PT:alert",
+        "1 un\u0131on select password",
+        "1; \u017fleep(5)",
+    ])
+    def test_trigger_gating_agrees_with_ignorecase_regexes(self, scanner, value):
+        expected = {f"SQL injection pattern detected: {p}" for p in SQL_PATTERNS if re.search(p, value)}
+        expected |= {f"XSS pattern detected: {p}" for p in XSS_PATTERNS if re.search(p, value)}
+
+        result = scanner.scan(value)
+
+        assert expected
+        assert expected <= set(result.sql_findings + result.xss_findings)
+
+    def test_obfuscated_entities(self, scanner):
+        result = scanner.scan("hello &lt;script&gt; there")
+
+        assert result.xss_findings == ["Suspicious HTML entity: &lt;script&gt;"]
+
+    def test_long_base64_blob_is_skipped(self, scanner):
+        blob = base64.urlsafe_b64encode(os.urandom(OPAQUE_MIN_LENGTH)).decode()
+
+        result = scanner.scan(blob)
+
+        assert result.skipped_opaque
+        assert not result.is_sql_injection
+
+    def test_short_or_mixed_strings_are_scanned(self, scanner):
+        assert not scanner.scan("U0VMRUNUIEZST00gV0hFUkU=").skipped_opaque
+        assert scanner.scan("A" * OPAQUE_MIN_LENGTH + " <script>x</script>").is_xss
+
+
+class TestInputValidatorSecurityChecks:
+
+    def test_validate_input_uses_scanner_findings(self):
+        result = InputValidator().validate_input("<iframe src=x></iframe>", "string")
+
+        assert not result.is_valid
+        assert result.errors == ["XSS attempt detected: XSS pattern detected: (?i)<iframe[^>]*>.*?</iframe>"]
@@ -23,6 +23,15 @@ import validators
 import hashlib
 import base64
 
+from app.schemas.ciphertext import is_base64_text
+from app.security.threat_scanner import (
+    SQL_KEYWORDS,
+    SQL_PATTERNS,
+    XSS_PATTERNS,
+    ScanResult,
+    threat_scanner,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,37 +67,8 @@ class SQLInjectionDetector:
     """Detector for SQL injection attempts."""
     
     def __init__(self):
-        self.sql_keywords = {
-            'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER',
-            'EXEC', 'EXECUTE', 'UNION', 'JOIN', 'WHERE', 'FROM', 'INTO',
-            'VALUES', 'SET', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
-            'GRANT', 'REVOKE', 'COMMIT', 'ROLLBACK', 'TRUNCATE', 'REPLACE'
-        }
-        
-        self.sql_patterns = [
-            # Union-based injection
-            r'(?i)\b(union\s+select|union\s+all\s+select)',
-            # Comment-based injection
-            r'(?i)(--|#|/\*|\*/)',
-            # Boolean-based injection
-            r'(?i)\b(or\s+1\s*=\s*1|and\s+1\s*=\s*1|or\s+\'1\'\s*=\s*\'1\'|and\s+\'1\'\s*=\s*\'1\')',
-            # Time-based injection
-            r'(?i)\b(waitfor\s+delay|sleep\s*\(|benchmark\s*\()',
-            # Stacked queries
-            r'(?i);\s*(drop|delete|insert|update|create|alter|exec|execute)',
-            # Information schema
-            r'(?i)\b(information_schema|sysobjects|syscolumns|pg_tables)',
-            # Function calls
-            r'(?i)\b(load_file|into\s+outfile|into\s+dumpfile|xp_cmdshell)',
-            # Hex encoding attempts
-            r'(?i)\b(0x[0-9a-f]+|char\s*\(|ascii\s*\(|hex\s*\()',
-            # Conditional statements
-            r'(?i)\b(if\s*\(|case\s+when|when\s+then|else\s+end)',
-            # Quotes and escaping
-            r'(?:\'\s*;\s*|\'\s*--|\'\s*#|\\\x27|\\\x22)',
-        ]
-        
-        self.compiled_patterns = [re.compile(pattern) for pattern in self.sql_patterns]
+        self.sql_keywords = set(SQL_KEYWORDS)
+        self.sql_patterns = list(SQL_PATTERNS)
     
     def detect_sql_injection(self, value: str) -> Tuple[bool, List[str]]:
         """
@@ -103,26 +83,8 @@ class SQLInjectionDetector:
         if not isinstance(value, str):
             return False, []
         
-        detected_patterns = []
-        
-        # Check for SQL keywords in suspicious contexts
-        normalized_value = value.upper()
-        suspicious_keywords = []
-        
-        for keyword in self.sql_keywords:
-            if keyword in normalized_value:
-                suspicious_keywords.append(keyword)
-        
-        # If multiple SQL keywords are present, it's suspicious
-        if len(suspicious_keywords) > 2:
-            detected_patterns.append(f"Multiple SQL keywords detected: {', '.join(suspicious_keywords)}")
-        
-        # Check regex patterns
-        for pattern in self.compiled_patterns:
-            if pattern.search(value):
-                detected_patterns.append(f"SQL injection pattern detected: {pattern.pattern}")
-        
-        return len(detected_patterns) > 0, detected_patterns
+        findings = threat_scanner.scan(value).sql_findings
+        return len(findings) > 0, findings
     
     def sanitize_sql_input(self, value: str) -> str:
         """
@@ -175,27 +137,7 @@ class XSSProtector:
             'p': ['style']
         }
         
-        self.dangerous_patterns = [
-            r'(?i)<script[^>]*>.*?</script>',
-            r'(?i)<iframe[^>]*>.*?</iframe>',
-            r'(?i)<object[^>]*>.*?</object>',
-            r'(?i)<embed[^>]*>.*?</embed>',
-            r'(?i)<applet[^>]*>.*?</applet>',
-            r'(?i)<form[^>]*>.*?</form>',
-            r'(?i)<meta[^>]*>',
-            r'(?i)<link[^>]*>',
-            r'(?i)javascript:',
-            r'(?i)vbscript:',
-            r'(?i)data:',
-            r'(?i)on\w+\s*=',
-            r'(?i)expression\s*\(',
-            r'(?i)eval\s*\(',
-            r'(?i)alert\s*\(',
-            r'(?i)confirm\s*\(',
-            r'(?i)prompt\s*\(',
-        ]
-        
-        self.compiled_patterns = [re.compile(pattern) for pattern in self.dangerous_patterns]
+        self.dangerous_patterns = list(XSS_PATTERNS)
     
     def detect_xss(self, value: str) -> Tuple[bool, List[str]]:
         """
@@ -210,26 +152,8 @@ class XSSProtector:
         if not isinstance(value, str):
             return False, []
         
-        detected_patterns = []
-        
-        # Check for dangerous patterns
-        for pattern in self.compiled_patterns:
-            if pattern.search(value):
-                detected_patterns.append(f"XSS pattern detected: {pattern.pattern}")
-        
-        # Check for HTML entities that might be used for obfuscation
-        if '&' in value and ';' in value:
-            # Check for suspicious entity combinations
-            suspicious_entities = [
-                '&lt;script&gt;', '&lt;iframe&gt;', '&lt;object&gt;',
-                '&quot;javascript:', '&quot;vbscript:', '&quot;data:'
-            ]
-            
-            for entity in suspicious_entities:
-                if entity in value.lower():
-                    detected_patterns.append(f"Suspicious HTML entity: {entity}")
-        
-        return len(detected_patterns) > 0, detected_patterns
+        findings = threat_scanner.scan(value).xss_findings
+        return len(findings) > 0, findings
     
     def sanitize_html(self, value: str, strict: bool = False) -> str:
         """
@@ -391,6 +315,10 @@ class InputValidator:
         Returns:
             ValidationResult: Validation result with errors and sanitized value
         """
+        # Ciphertext is opaque: charset and length only, never scanned
+        if input_type == 'ciphertext':
+            return self.validate_ciphertext(value)
+        
         result = ValidationResult(is_valid=True, sanitized_value=value)
         
         # Security checks
@@ -427,20 +355,23 @@ class InputValidator:
         return result
     
     def _check_security_issues(self, value: str, result: ValidationResult):
-        """Check for security issues in input."""
+        """Check for security issues in input with a single scan of the value."""
+        scan: ScanResult = threat_scanner.scan(value)
+        
         # SQL injection check
-        is_sql_injection, sql_patterns = self.sql_detector.detect_sql_injection(value)
-        if is_sql_injection:
-            result.errors.extend([f"SQL injection detected: {pattern}" for pattern in sql_patterns])
+        if scan.is_sql_injection:
+            result.errors.extend([f"SQL injection detected: {pattern}" for pattern in scan.sql_findings])
             result.is_valid = False
             result.sanitized_value = self.sql_detector.sanitize_sql_input(value)
         
         # XSS check
-        is_xss, xss_patterns = self.xss_protector.detect_xss(value)
-        if is_xss:
-            result.errors.extend([f"XSS attempt detected: {pattern}" for pattern in xss_patterns])
+        if scan.is_xss:
+            result.errors.extend([f"XSS attempt detected: {pattern}" for pattern in scan.xss_findings])
             result.is_valid = False
             result.sanitized_value = self.xss_protector.sanitize_html(value)
+        
+        if scan.skipped_opaque:
+            result.metadata['opaque'] = True
     
     def _is_valid_email(self, value: str) -> bool:
         """Check if value is a valid email."""
@@ -509,6 +440,34 @@ class InputValidator:
         
         return results
     
+    def validate_ciphertext(self, value: Any, max_length: Optional[int] = None) -> ValidationResult:
+        """
+        Validate an opaque ciphertext value.
+        
+        Ciphertext is only length- and charset-checked; it is never passed
+        through the SQL injection / XSS heuristics or the string sanitizers.
+        
+        Args:
+            value: Base64 ciphertext
+            max_length: Maximum allowed length
+            
+        Returns:
+            ValidationResult: Validation result
+        """
+        result = ValidationResult(is_valid=True, sanitized_value=value, metadata={'opaque': True})
+        
+        if value is None or value == '':
+            return result
+        
+        if not isinstance(value, str) or not is_base64_text(value):
+            result.errors.append('Invalid base64 encoding')
+            result.is_valid = False
+        elif max_length is not None and len(value) > max_length:
+            result.errors.append(f'Ciphertext too long (max {max_length} characters)')
+            result.is_valid = False
+        
+        return result
+    
     def sanitize_recursive(self, data: Any, max_depth: int = 10) -> Any:
         """
         Recursively sanitize nested data structures.
@@ -0,0 +1,504 @@
+"""
+Shared rate limiter engine used by every rate limiting middleware.
+
+All limiter state lives behind a single backend so that multiple API
+instances (e.g. Cloud Run replicas) enforce one shared limit instead of
+N per-process limits. The Redis backend evaluates each check as one atomic
+Lua script, so a sliding window or token bucket decision costs exactly one
+network round-trip. The in-memory backend implements identical semantics
+and is used for local development, tests and as a fallback when Redis is
+unreachable.
+"""
+
+import asyncio
+import logging
+import math
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MEMORY_KEYS = 100000
+DEFAULT_MAX_BATCHED_KEYS = 10000
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+
+
+# KEYS[1] = window zset, KEYS[2] = block key
+# ARGV = now_ms, window_ms, limit, member
+# Returns {allowed, remaining, retry_ms, blocked}
+SLIDING_WINDOW_SCRIPT = """
+local blocked_ms = redis.call('PTTL', KEYS[2])
+if blocked_ms > 0 then
+    return {0, 0, blocked_ms, 1}
+end
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, limit - count - 1, 0, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+local retry = window
+if oldest[2] then
+    retry = tonumber(oldest[2]) + window - now
+end
+return {0, 0, retry, 0}
+"""
+
+# KEYS[1] = bucket hash
+# ARGV = capacity, refill_per_ms, now_ms, cost
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {allowed, math.floor(tokens), retry}
+"""
+
+# KEYS[1] = counter
+# ARGV = amount, window_ms
+INCREMENT_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count == tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return {count, redis.call('PTTL', KEYS[1])}
+"""
+
+
+@dataclass
+class LimitDecision:
+    """Outcome of a single limiter check."""
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0  # seconds until the next request may succeed
+    blocked: bool = False  # denied because of an explicit block, not the window
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class LimiterBackend(ABC):
+    """Storage backend for limiter state. Every method is atomic."""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def sliding_window(self, key: str, limit: int, window: float, block_key: Optional[str] = None) -> LimitDecision:
+        """Record a hit in a sliding window log if it is under ``limit``."""
+
+    @abstractmethod
+    async def token_bucket(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> LimitDecision:
+        """Take ``cost`` tokens from a bucket refilled continuously."""
+
+    @abstractmethod
+    async def increment(self, key: str, amount: int, window: float) -> Tuple[int, float]:
+        """Add ``amount`` to a fixed-window counter; returns (count, seconds to reset)."""
+
+    @abstractmethod
+    async def window_count(self, key: str, window: float) -> int:
+        """Count hits currently inside a sliding window without recording one."""
+
+    @abstractmethod
+    async def block(self, key: str, duration: float):
+        """Mark ``key`` as blocked for ``duration`` seconds."""
+
+    @abstractmethod
+    async def block_ttl(self, key: str) -> float:
+        """Seconds left on a block, 0 if not blocked."""
+
+    @abstractmethod
+    async def reset(self, *keys: str):
+        """Delete limiter state."""
+
+
+class MemoryLimiterBackend(LimiterBackend):
+    """Per-process backend with the same semantics as the Redis scripts.
+
+    Keys are LRU-bounded by ``max_keys`` so a flood of unique identifiers
+    cannot grow memory without limit. All operations run without awaiting,
+    which keeps them atomic on the event loop.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+
+    def _get(self, key: str, now_ms: int) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now_ms:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    async def sliding_window(self, key: str, limit: int, window: float, block_key: Optional[str] = None) -> LimitDecision:
+        now = _now_ms()
+        window_ms = int(window * 1000)
+
+        blocked_until = self._get(block_key or f"{key}:block", now)
+        if blocked_until:
+            return LimitDecision(False, 0, (blocked_until - now) / 1000, blocked=True)
+
+        hits = self._get(key, now)
+        if hits is None:
+            hits = deque()
+        cutoff = now - window_ms
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+        count = len(hits)
+        if count < limit:
+            hits.append(now)
+            self._set(key, hits, now + window_ms)
+            return LimitDecision(True, limit - count - 1)
+
+        retry_ms = hits[0] + window_ms - now if hits else window_ms
+        return LimitDecision(False, 0, retry_ms / 1000)
+
+    async def token_bucket(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> LimitDecision:
+        now = _now_ms()
+        rate = refill_per_second / 1000
+
+        state = self._get(key, now)
+        tokens, ts = state if state else (capacity, now)
+        tokens = min(capacity, tokens + max(0, now - ts) * rate)
+
+        retry_ms = 0
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        else:
+            retry_ms = math.ceil((cost - tokens) / rate)
+
+        self._set(key, (tokens, now), now + math.ceil(capacity / rate) + 1000)
+        return LimitDecision(allowed, int(tokens), retry_ms / 1000)
+
+    async def increment(self, key: str, amount: int, window: float) -> Tuple[int, float]:
+        now = _now_ms()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            expires_at, count = now + int(window * 1000), 0
+        else:
+            expires_at, count = entry
+        count += amount
+        self._set(key, count, expires_at)
+        return count, (expires_at - now) / 1000
+
+    async def window_count(self, key: str, window: float) -> int:
+        now = _now_ms()
+        hits = self._get(key, now)
+        if not hits:
+            return 0
+        cutoff = now - int(window * 1000)
+        return sum(1 for hit in hits if hit > cutoff)
+
+    async def block(self, key: str, duration: float):
+        now = _now_ms()
+        blocked_until = now + int(duration * 1000)
+        self._set(key, blocked_until, blocked_until)
+
+    async def block_ttl(self, key: str) -> float:
+        now = _now_ms()
+        blocked_until = self._get(key, now)
+        return max(0.0, (blocked_until - now) / 1000) if blocked_until else 0.0
+
+    async def reset(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """Drop expired keys; returns the number removed."""
+        now = _now_ms()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+
+class RedisLimiterBackend(LimiterBackend):
+    """Redis backend; each check is one EVALSHA round-trip.
+
+    Works with any ``redis.asyncio``-compatible client, including
+    ``fakeredis.aioredis.FakeRedis`` in tests.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._increment = redis_client.register_script(INCREMENT_SCRIPT)
+
+    async def sliding_window(self, key: str, limit: int, window: float, block_key: Optional[str] = None) -> LimitDecision:
+        now = _now_ms()
+        allowed, remaining, retry_ms, blocked = await self._sliding_window(
+            keys=[key, block_key or f"{key}:block"],
+            args=[now, int(window * 1000), limit, f"{now}-{secrets.token_hex(4)}"],
+        )
+        return LimitDecision(bool(allowed), int(remaining), int(retry_ms) / 1000, bool(blocked))
+
+    async def token_bucket(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> LimitDecision:
+        allowed, tokens, retry_ms = await self._token_bucket(
+            keys=[key],
+            args=[capacity, repr(refill_per_second / 1000), _now_ms(), cost],
+        )
+        return LimitDecision(bool(allowed), int(tokens), int(retry_ms) / 1000)
+
+    async def increment(self, key: str, amount: int, window: float) -> Tuple[int, float]:
+        count, ttl_ms = await self._increment(keys=[key], args=[amount, int(window * 1000)])
+        return int(count), max(0, int(ttl_ms)) / 1000
+
+    async def window_count(self, key: str, window: float) -> int:
+        return int(await self.redis_client.zcount(key, _now_ms() - int(window * 1000) + 1, "+inf"))
+
+    async def block(self, key: str, duration: float):
+        await self.redis_client.set(key, 1, px=max(1, int(duration * 1000)))
+
+    async def block_ttl(self, key: str) -> float:
+        ttl_ms = await self.redis_client.pttl(key)
+        return max(0, int(ttl_ms)) / 1000
+
+    async def reset(self, *keys: str):
+        if keys:
+            await self.redis_client.delete(*keys)
+
+
+class BatchedCounter:
+    """Locally coalesced fixed-window counters.
+
+    Increments are accumulated in-process and written to the backend in one
+    call per key once ``batch_size`` hits are pending or ``flush_interval``
+    has elapsed. Reads combine the last known shared count with local
+    pending hits, trading a little precision for far fewer round-trips.
+    Intended for coarse, high-volume limits (hourly and global quotas).
+
+    Keys are LRU-bounded by ``max_keys``; an evicted key's pending hits are
+    written first. ``flush`` (run periodically by the engine's maintenance
+    task) also writes idle keys and drops expired ones.
+    """
+
+    def __init__(
+        self,
+        backend: LimiterBackend,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_keys: int = DEFAULT_MAX_BATCHED_KEYS,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        # key -> [pending, last_shared_count, reset_at, last_flush]
+        self._counters: 'OrderedDict[str, list]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    async def increment(self, key: str, window: float) -> int:
+        """Count one hit and return the approximate shared total for the window."""
+        now = time.time()
+        counter = self._counters.get(key)
+        if counter is None or now >= counter[2]:
+            counter = [0, 0, now + window, 0.0]
+            self._counters[key] = counter
+        self._counters.move_to_end(key)
+
+        counter[0] += 1
+        if counter[0] >= self.batch_size or now - counter[3] >= self.flush_interval:
+            await self._flush_key(key, counter, window, now)
+
+        while len(self._counters) > self.max_keys:
+            evicted_key, evicted = self._counters.popitem(last=False)
+            if evicted[0] and now < evicted[2]:
+                await self._flush_key(evicted_key, evicted, evicted[2] - now, now)
+        return counter[1] + counter[0]
+
+    async def _flush_key(self, key: str, counter: list, window: float, now: float):
+        pending = counter[0]
+        counter[0] = 0
+        counter[3] = now
+        try:
+            shared, reset_after = await self.backend.increment(key, pending, window)
+        except Exception as e:
+            counter[0] += pending
+            logger.warning(f"Batched counter flush failed for {key}: {e}")
+            return
+        counter[1] = shared
+        counter[2] = now + reset_after if reset_after else counter[2]
+
+    async def flush(self):
+        """Write every pending increment to the backend."""
+        now = time.time()
+        for key, counter in list(self._counters.items()):
+            if now >= counter[2]:
+                del self._counters[key]
+            elif counter[0]:
+                await self._flush_key(key, counter, counter[2] - now, now)
+
+
+class LimiterEngine:
+    """Unified limiter used by both rate limiting middlewares.
+
+    Checks go to the shared backend; if it errors the engine falls back to
+    a per-process memory backend so requests keep being limited locally
+    rather than failing open.
+    """
+
+    def __init__(self, backend: Optional[LimiterBackend] = None, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.backend = backend or MemoryLimiterBackend()
+        self.fallback = self.backend if isinstance(self.backend, MemoryLimiterBackend) else MemoryLimiterBackend()
+        self.counters = BatchedCounter(self.backend, batch_size, flush_interval)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def backend_name(self) -> str:
+        return self.backend.name
+
+    async def _call(self, method: str, *args, **kwargs):
+        try:
+            return await getattr(self.backend, method)(*args, **kwargs)
+        except Exception as e:
+            if self.backend is self.fallback:
+                raise
+            logger.warning(f"Shared limiter backend failed ({method}): {e}; using local fallback")
+            return await getattr(self.fallback, method)(*args, **kwargs)
+
+    async def sliding_window(self, key: str, limit: int, window: float, block_key: Optional[str] = None) -> LimitDecision:
+        return await self._call("sliding_window", key, limit, window, block_key)
+
+    async def token_bucket(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> LimitDecision:
+        return await self._call("token_bucket", key, capacity, refill_per_second, cost)
+
+    async def fixed_window(self, key: str, limit: int, window: float, batched: bool = False) -> LimitDecision:
+        """Fixed-window check; ``batched`` uses locally coalesced increments."""
+        if batched:
+            count = await self.counters.increment(key, window)
+            reset_after = window - (time.time() % window)
+        else:
+            count, reset_after = await self._call("increment", key, 1, window)
+        allowed = count <= limit
+        return LimitDecision(allowed, max(0, limit - count), 0.0 if allowed else reset_after)
+
+    async def window_count(self, key: str, window: float) -> int:
+        return await self._call("window_count", key, window)
+
+    async def block(self, key: str, duration: float):
+        await self._call("block", key, duration)
+
+    async def block_ttl(self, key: str) -> float:
+        return await self._call("block_ttl", key)
+
+    async def increment(self, key: str, amount: int, window: float) -> Tuple[int, float]:
+        return await self._call("increment", key, amount, window)
+
+    async def reset(self, *keys: str):
+        await self._call("reset", *keys)
+
+    async def flush(self):
+        await self.counters.flush()
+
+    async def run_forever(self):
+        """Flush batched counters and purge expired local state until cancelled."""
+        while True:
+            await asyncio.sleep(self.counters.flush_interval)
+            try:
+                await self.flush()
+                self.purge_expired()
+            except Exception as e:
+                logger.warning(f"Limiter maintenance failed: {e}")
+
+    def start(self) -> asyncio.Task:
+        """Start the maintenance task"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self):
+        """Stop the maintenance task and write pending counter hits"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Final limiter flush failed: {e}")
+
+    def purge_expired(self) -> int:
+        """Purge expired local state (the shared backend expires keys itself)."""
+        return self.fallback.purge_expired()
+
+
+def create_limiter_engine(redis_url: Optional[str] = None) -> LimiterEngine:
+    """
+    Create a limiter engine.
+
+    Args:
+        redis_url: Redis URL for the shared backend; memory backend if omitted
+
+    Returns:
+        LimiterEngine: Configured engine
+    """
+    if not redis_url:
+        return LimiterEngine(MemoryLimiterBackend())
+
+    try:
+        import redis.asyncio as redis_asyncio
+        client = redis_asyncio.from_url(redis_url)
+        return LimiterEngine(RedisLimiterBackend(client))
+    except Exception as e:
+        logger.warning(f"Failed to configure Redis limiter backend: {e}. Using memory backend.")
+        return LimiterEngine(MemoryLimiterBackend())
+
+
+_limiter_engine: Optional[LimiterEngine] = None
+
+
+def get_limiter_engine() -> LimiterEngine:
+    """Get the process-wide limiter engine (shared backend if REDIS_URL is set)."""
+    global _limiter_engine
+    if _limiter_engine is None:
+        from app.core.config import settings
+        _limiter_engine = create_limiter_engine(settings.REDIS_URL)
+    return _limiter_engine
@@ -8,17 +8,17 @@ attack pattern detection, and adaptive rate limiting based on threat analysis.
 import time
 import asyncio
 import json
-import redis
 import hashlib
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict, deque
+from collections import OrderedDict
 import logging
-import statistics
 from contextlib import asynccontextmanager
 import math
 
+from app.security.limiter_backend import LimiterEngine, LimitDecision, get_limiter_engine
+
 logger = logging.getLogger(__name__)
 
 # Rate limiting constants
@@ -29,6 +29,14 @@ DEFAULT_ADAPTIVE_FACTOR = 1.5
 MIN_RATE_LIMIT = 10
 MAX_RATE_LIMIT = 1000
 
+# Attack detection constants
+DEFAULT_MAX_TRACKED_IDENTIFIERS = 10000
+DETECTION_EPOCH_REQUESTS = 1000  # requests per identifier before aggregates rotate
+RING_WINDOW_SECONDS = 60
+HLL_PRECISION = 7
+TIMING_EWMA_ALPHA = 2 / (100 + 1)  # ~ last 100 timed requests
+INTERVAL_EWMA_ALPHA = 2 / (20 + 1)  # ~ last 20 inter-arrival gaps
+
 
 class RateLimitStrategy(Enum):
     """Rate limiting strategies."""
@@ -62,6 +70,7 @@ class RateLimitConfig:
     enable_attack_detection: bool = True
     enable_adaptive_limiting: bool = True
     cleanup_interval: int = 300  # seconds
+    max_tracked_identifiers: int = DEFAULT_MAX_TRACKED_IDENTIFIERS
 
 
 @dataclass
@@ -85,16 +94,218 @@ class RateLimitResult:
     attack_patterns: List[AttackPattern] = field(default_factory=list)
 
 
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash used by the streaming aggregates."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """Fixed-size cardinality estimator (2^precision one-byte registers)."""
+    
+    __slots__ = ('precision', 'registers')
+    
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    
+    def add(self, value: str):
+        """Add a value to the sketch."""
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remainder = (hashed << self.precision) & ((1 << 64) - 1)
+        rank = min(64 - self.precision, 64 - remainder.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Return a new sketch covering both inputs."""
+        merged = HyperLogLog(self.precision)
+        merged.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers, strict=True))
+        return merged
+    
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is accurate for the small cardinalities we care about
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class SecondRingCounter:
+    """Per-second request/failure counters over a fixed ring of buckets."""
+    
+    __slots__ = ('size', 'seconds', 'requests', 'failures')
+    
+    def __init__(self, size: int = RING_WINDOW_SECONDS):
+        self.size = size
+        self.seconds = [-1] * size
+        self.requests = [0] * size
+        self.failures = [0] * size
+    
+    def record(self, now: float, success: bool):
+        """Record one request at ``now``."""
+        second = int(now)
+        slot = second % self.size
+        if self.seconds[slot] != second:
+            self.seconds[slot] = second
+            self.requests[slot] = 0
+            self.failures[slot] = 0
+        self.requests[slot] += 1
+        if not success:
+            self.failures[slot] += 1
+    
+    def totals(self, now: float, window: int) -> Tuple[int, int]:
+        """Return (requests, failures) seen in the last ``window`` seconds."""
+        cutoff = int(now) - min(window, self.size)
+        requests = failures = 0
+        for slot in range(self.size):
+            if self.seconds[slot] > cutoff:
+                requests += self.requests[slot]
+                failures += self.failures[slot]
+        return requests, failures
+
+
+class EwmaStats:
+    """Exponentially weighted mean and variance."""
+    
+    __slots__ = ('alpha', 'count', 'mean', 'variance')
+    
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+    
+    def update(self, value: float):
+        """Fold a new sample into the running statistics."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        delta = value - self.mean
+        self.mean += self.alpha * delta
+        self.variance = (1 - self.alpha) * (self.variance + self.alpha * delta * delta)
+    
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class IdentifierStats:
+    """Streaming aggregates for a single requester.
+    
+    Window-based counts (``total``, ``auth_requests``, the diversity sketches)
+    cover the current epoch plus the previous one, so they approximate the
+    most recent ``DETECTION_EPOCH_REQUESTS``..``2 * DETECTION_EPOCH_REQUESTS``
+    requests without storing any of them.
+    """
+    ring: SecondRingCounter = field(default_factory=SecondRingCounter)
+    response_times: EwmaStats = field(default_factory=lambda: EwmaStats(TIMING_EWMA_ALPHA))
+    intervals: EwmaStats = field(default_factory=lambda: EwmaStats(INTERVAL_EWMA_ALPHA))
+    endpoints: HyperLogLog = field(default_factory=HyperLogLog)
+    user_agents: HyperLogLog = field(default_factory=HyperLogLog)
+    previous_endpoints: Optional[HyperLogLog] = None
+    previous_user_agents: Optional[HyperLogLog] = None
+    epoch_requests: int = 0
+    previous_requests: int = 0
+    epoch_auth_requests: int = 0
+    previous_auth_requests: int = 0
+    first_user_agent: Optional[str] = None
+    first_method: Optional[str] = None
+    uniform_client: bool = True
+    last_timestamp: float = 0.0
+    
+    @property
+    def total(self) -> int:
+        return self.epoch_requests + self.previous_requests
+    
+    @property
+    def auth_requests(self) -> int:
+        return self.epoch_auth_requests + self.previous_auth_requests
+    
+    def distinct_endpoints(self) -> int:
+        sketch = self.endpoints.merge(self.previous_endpoints) if self.previous_endpoints else self.endpoints
+        return sketch.count()
+    
+    def distinct_user_agents(self) -> int:
+        sketch = self.user_agents.merge(self.previous_user_agents) if self.previous_user_agents else self.user_agents
+        return sketch.count()
+    
+    def record(self, now: float, request_info: Dict[str, Any]):
+        """Fold one request into the aggregates."""
+        if self.epoch_requests >= DETECTION_EPOCH_REQUESTS:
+            self._rotate_epoch()
+        
+        endpoint = request_info.get('endpoint', '')
+        method = request_info.get('method', '')
+        user_agent = request_info.get('user_agent', '')
+        response_time = request_info.get('response_time', 0)
+        
+        self.ring.record(now, request_info.get('success', True))
+        self.epoch_requests += 1
+        if 'auth' in endpoint:
+            self.epoch_auth_requests += 1
+        self.endpoints.add(endpoint)
+        self.user_agents.add(user_agent)
+        
+        if response_time > 0:
+            self.response_times.update(response_time)
+        
+        if self.first_user_agent is None:
+            self.first_user_agent = user_agent
+            self.first_method = method
+        elif user_agent != self.first_user_agent or method != self.first_method:
+            self.uniform_client = False
+        
+        if self.last_timestamp:
+            self.intervals.update(now - self.last_timestamp)
+        self.last_timestamp = now
+    
+    def _rotate_epoch(self):
+        self.previous_endpoints = self.endpoints
+        self.previous_user_agents = self.user_agents
+        self.previous_requests = self.epoch_requests
+        self.previous_auth_requests = self.epoch_auth_requests
+        self.endpoints = HyperLogLog()
+        self.user_agents = HyperLogLog()
+        self.epoch_requests = 0
+        self.epoch_auth_requests = 0
+        self.first_user_agent = None
+        self.first_method = None
+        self.uniform_client = True
+
+
 class AttackDetector:
-    """Sophisticated attack pattern detection."""
+    """Sophisticated attack pattern detection.
+    
+    Each detector reads constant-size streaming aggregates instead of
+    rescanning request history, and the number of tracked identifiers is
+    LRU-bounded by ``config.max_tracked_identifiers``.
+    """
     
     def __init__(self, config: RateLimitConfig):
         self.config = config
-        self.request_patterns: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
-        self.failure_rates: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
-        self.timing_patterns: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
-        self.user_agent_patterns: Dict[str, int] = defaultdict(int)
-        self.ip_reputation: Dict[str, float] = defaultdict(float)
+        self.request_stats: 'OrderedDict[str, IdentifierStats]' = OrderedDict()
+        self.ip_reputation: Dict[str, float] = {}
+    
+    def _get_stats(self, identifier: str) -> IdentifierStats:
+        """Get (or start tracking) aggregates for identifier, evicting the LRU entry."""
+        stats = self.request_stats.get(identifier)
+        if stats is not None:
+            self.request_stats.move_to_end(identifier)
+            return stats
+        
+        stats = IdentifierStats()
+        self.request_stats[identifier] = stats
+        while len(self.request_stats) > self.config.max_tracked_identifiers:
+            evicted, _ = self.request_stats.popitem(last=False)
+            self.ip_reputation.pop(evicted, None)
+        return stats
     
     def analyze_request_pattern(
         self, 
@@ -115,39 +326,31 @@ class AttackDetector:
         current_time = time.time()
         
         # Record request
-        self.request_patterns[identifier].append({
-            'timestamp': current_time,
-            'endpoint': request_info.get('endpoint', ''),
-            'method': request_info.get('method', ''),
-            'user_agent': request_info.get('user_agent', ''),
-            'success': request_info.get('success', True),
-            'response_time': request_info.get('response_time', 0)
-        })
+        stats = self._get_stats(identifier)
+        stats.record(current_time, request_info)
         
         # Analyze different attack patterns
-        patterns.extend(self._detect_brute_force(identifier))
-        patterns.extend(self._detect_credential_stuffing(identifier))
-        patterns.extend(self._detect_timing_attacks(identifier))
-        patterns.extend(self._detect_enumeration(identifier))
-        patterns.extend(self._detect_ddos(identifier))
-        patterns.extend(self._detect_scraping(identifier))
+        patterns.extend(self._detect_brute_force(stats, current_time))
+        patterns.extend(self._detect_credential_stuffing(stats))
+        patterns.extend(self._detect_timing_attacks(stats))
+        patterns.extend(self._detect_enumeration(stats))
+        patterns.extend(self._detect_ddos(stats, current_time))
+        patterns.extend(self._detect_scraping(stats))
         
         return patterns
     
-    def _detect_brute_force(self, identifier: str) -> List[AttackPattern]:
+    def _detect_brute_force(self, stats: IdentifierStats, current_time: float) -> List[AttackPattern]:
         """Detect brute force attacks."""
         patterns = []
-        requests = self.request_patterns[identifier]
         
-        if len(requests) < 10:
+        if stats.total < 10:
             return patterns
         
         # Check for rapid successive failures
-        recent_requests = [r for r in requests if time.time() - r['timestamp'] < 60]
-        failures = [r for r in recent_requests if not r['success']]
+        recent_requests, failures = stats.ring.totals(current_time, 60)
         
-        if len(failures) > 5:
-            failure_rate = len(failures) / len(recent_requests)
+        if failures > 5:
+            failure_rate = failures / recent_requests
             if failure_rate > 0.7:
                 patterns.append(AttackPattern(
                     attack_type=AttackType.BRUTE_FORCE,
@@ -155,55 +358,55 @@ class AttackDetector:
                     severity=7,
                     details={
                         'failure_rate': failure_rate,
-                        'failures': len(failures),
-                        'requests': len(recent_requests)
+                        'failures': failures,
+                        'requests': recent_requests
                     }
                 ))
         
         return patterns
     
-    def _detect_credential_stuffing(self, identifier: str) -> List[AttackPattern]:
+    def _detect_credential_stuffing(self, stats: IdentifierStats) -> List[AttackPattern]:
         """Detect credential stuffing attacks."""
         patterns = []
-        requests = self.request_patterns[identifier]
         
-        if len(requests) < 20:
+        if stats.total < 20:
             return patterns
         
         # Check for requests from different user agents
-        user_agents = set(r['user_agent'] for r in requests)
-        auth_endpoints = [r for r in requests if 'auth' in r.get('endpoint', '')]
+        auth_requests = stats.auth_requests
+        if auth_requests <= 10:
+            return patterns
         
-        if len(auth_endpoints) > 10 and len(user_agents) > 3:
-            confidence = min(len(auth_endpoints) / 20, 1.0)
+        user_agents = stats.distinct_user_agents()
+        if user_agents > 3:
+            confidence = min(auth_requests / 20, 1.0)
             patterns.append(AttackPattern(
                 attack_type=AttackType.CREDENTIAL_STUFFING,
                 confidence=confidence,
                 severity=8,
                 details={
-                    'auth_requests': len(auth_endpoints),
-                    'user_agents': len(user_agents),
-                    'diversity_score': len(user_agents) / len(auth_endpoints)
+                    'auth_requests': auth_requests,
+                    'user_agents': user_agents,
+                    'diversity_score': user_agents / auth_requests
                 }
             ))
         
         return patterns
     
-    def _detect_timing_attacks(self, identifier: str) -> List[AttackPattern]:
+    def _detect_timing_attacks(self, stats: IdentifierStats) -> List[AttackPattern]:
         """Detect timing attacks."""
         patterns = []
-        requests = self.request_patterns[identifier]
         
-        if len(requests) < 15:
+        if stats.total < 15:
             return patterns
         
         # Analyze response time patterns
-        response_times = [r['response_time'] for r in requests if r['response_time'] > 0]
+        timing = stats.response_times
         
-        if len(response_times) > 10:
+        if timing.count > 10:
             # Check for unusually consistent timing patterns
-            std_dev = statistics.stdev(response_times)
-            mean_time = statistics.mean(response_times)
+            std_dev = timing.std_dev
+            mean_time = timing.mean
             
             # Very low standard deviation might indicate timing analysis
             if std_dev < mean_time * 0.1 and mean_time > 0.1:
@@ -221,48 +424,44 @@ class AttackDetector:
         
         return patterns
     
-    def _detect_enumeration(self, identifier: str) -> List[AttackPattern]:
+    def _detect_enumeration(self, stats: IdentifierStats) -> List[AttackPattern]:
         """Detect enumeration attacks."""
         patterns = []
-        requests = self.request_patterns[identifier]
+        total_requests = stats.total
         
-        if len(requests) < 10:
+        if total_requests <= 20:
             return patterns
         
-        # Check for sequential or pattern-based endpoint access
-        endpoints = [r['endpoint'] for r in requests]
-        unique_endpoints = set(endpoints)
-        
         # High diversity in endpoints might indicate enumeration
-        if len(unique_endpoints) > 10 and len(endpoints) > 20:
-            diversity_score = len(unique_endpoints) / len(endpoints)
+        unique_endpoints = stats.distinct_endpoints()
+        if unique_endpoints > 10:
+            diversity_score = min(unique_endpoints / total_requests, 1.0)
             if diversity_score > 0.7:
                 patterns.append(AttackPattern(
                     attack_type=AttackType.ENUMERATION,
                     confidence=diversity_score,
                     severity=5,
                     details={
-                        'unique_endpoints': len(unique_endpoints),
-                        'total_requests': len(endpoints),
+                        'unique_endpoints': unique_endpoints,
+                        'total_requests': total_requests,
                         'diversity_score': diversity_score
                     }
                 ))
         
         return patterns
     
-    def _detect_ddos(self, identifier: str) -> List[AttackPattern]:
+    def _detect_ddos(self, stats: IdentifierStats, current_time: float) -> List[AttackPattern]:
         """Detect DDoS attacks."""
         patterns = []
-        requests = self.request_patterns[identifier]
         
-        if len(requests) < 50:
+        if stats.total < 50:
             return patterns
         
         # Check for high request volume in short time
-        recent_requests = [r for r in requests if time.time() - r['timestamp'] < 10]
+        recent_requests, _ = stats.ring.totals(current_time, 10)
         
-        if len(recent_requests) > 30:
-            rate = len(recent_requests) / 10  # requests per second
+        if recent_requests > 30:
+            rate = recent_requests / 10  # requests per second
             if rate > 3:
                 patterns.append(AttackPattern(
                     attack_type=AttackType.DDOS,
@@ -270,67 +469,72 @@ class AttackDetector:
                     severity=9,
                     details={
                         'requests_per_second': rate,
-                        'recent_requests': len(recent_requests)
+                        'recent_requests': recent_requests
                     }
                 ))
         
         return patterns
     
-    def _detect_scraping(self, identifier: str) -> List[AttackPattern]:
+    def _detect_scraping(self, stats: IdentifierStats) -> List[AttackPattern]:
         """Detect web scraping."""
         patterns = []
-        requests = self.request_patterns[identifier]
         
-        if len(requests) < 20:
+        if stats.total < 20:
             return patterns
         
-        # Check for automated request patterns
-        user_agents = [r['user_agent'] for r in requests]
-        methods = [r['method'] for r in requests]
-        
         # Check for consistent user agent and method patterns
-        if len(set(user_agents)) == 1 and len(set(methods)) == 1:
+        if stats.uniform_client and stats.intervals.count > 3:
             # Check for regular intervals
-            timestamps = [r['timestamp'] for r in requests[-20:]]
-            if len(timestamps) > 3:
-                intervals = [timestamps[i+1] - timestamps[i] for i in range(len(timestamps)-1)]
-                if intervals:
-                    interval_std = statistics.stdev(intervals) if len(intervals) > 1 else 0
-                    mean_interval = statistics.mean(intervals)
-                    
-                    if interval_std < mean_interval * 0.2 and mean_interval < 10:
-                        confidence = max(0, 1 - (interval_std / mean_interval))
-                        patterns.append(AttackPattern(
-                            attack_type=AttackType.SCRAPING,
-                            confidence=confidence,
-                            severity=4,
-                            details={
-                                'interval_consistency': confidence,
-                                'mean_interval': mean_interval,
-                                'std_deviation': interval_std
-                            }
-                        ))
+            interval_std = stats.intervals.std_dev
+            mean_interval = stats.intervals.mean
+            
+            if mean_interval > 0 and interval_std < mean_interval * 0.2 and mean_interval < 10:
+                confidence = max(0, 1 - (interval_std / mean_interval))
+                patterns.append(AttackPattern(
+                    attack_type=AttackType.SCRAPING,
+                    confidence=confidence,
+                    severity=4,
+                    details={
+                        'interval_consistency': confidence,
+                        'mean_interval': mean_interval,
+                        'std_deviation': interval_std
+                    }
+                ))
         
         return patterns
     
     def update_ip_reputation(self, identifier: str, patterns: List[AttackPattern]):
         """Update IP reputation based on attack patterns."""
+        reputation = self.ip_reputation.get(identifier, 0.0)
+        
         if not patterns:
             # Slowly improve reputation for clean requests
-            self.ip_reputation[identifier] = max(0, self.ip_reputation[identifier] - 0.01)
-            return
-        
-        # Decrease reputation based on attack patterns
-        for pattern in patterns:
-            reputation_penalty = pattern.confidence * pattern.severity * 0.1
-            self.ip_reputation[identifier] += reputation_penalty
+            reputation = max(0, reputation - 0.01)
+        else:
+            # Decrease reputation based on attack patterns
+            for pattern in patterns:
+                reputation += pattern.confidence * pattern.severity * 0.1
+            
+            # Cap reputation at 10
+            reputation = min(10, reputation)
         
-        # Cap reputation at 10
-        self.ip_reputation[identifier] = min(10, self.ip_reputation[identifier])
+        if reputation > 0 and identifier in self.request_stats:
+            self.ip_reputation[identifier] = reputation
+        else:
+            self.ip_reputation.pop(identifier, None)
     
     def get_threat_score(self, identifier: str) -> float:
         """Get overall threat score for an identifier."""
         return self.ip_reputation.get(identifier, 0.0)
+    
+    def forget_idle(self, cutoff_time: float):
+        """Stop tracking identifiers with no requests since ``cutoff_time``."""
+        while self.request_stats:
+            identifier, stats = next(iter(self.request_stats.items()))
+            if stats.last_timestamp >= cutoff_time:
+                break
+            self.request_stats.popitem(last=False)
+            self.ip_reputation.pop(identifier, None)
 
 
 class AdaptiveRateLimiter:
@@ -347,10 +551,14 @@ class AdaptiveRateLimiter:
         base_limit = self.config.max_requests
         
         if not patterns:
-            # Gradually restore normal limits
+            # Gradually restore normal limits; identifiers at the base limit are not tracked
             current = self.current_limits.get(identifier, base_limit)
-            self.current_limits[identifier] = min(base_limit, current + 1)
-            return self.current_limits[identifier]
+            restored = min(base_limit, current + 1)
+            if restored < base_limit:
+                self.current_limits[identifier] = restored
+            else:
+                self.current_limits.pop(identifier, None)
+            return restored
         
         # Reduce limits based on attack patterns
         threat_score = sum(p.confidence * p.severity for p in patterns)
@@ -391,11 +599,8 @@ class AdaptiveRateLimiter:
         if current_time - self.last_cleanup < self.config.cleanup_interval:
             return
         
-        # Clean up request patterns
-        for identifier, requests in self.attack_detector.request_patterns.items():
-            cutoff_time = current_time - 3600  # Keep 1 hour of data
-            while requests and requests[0]['timestamp'] < cutoff_time:
-                requests.popleft()
+        # Drop identifiers idle for over an hour
+        self.attack_detector.forget_idle(current_time - 3600)
         
         # Clean up IP reputation (decay over time)
         for identifier in list(self.attack_detector.ip_reputation.keys()):
@@ -403,19 +608,21 @@ class AdaptiveRateLimiter:
             if self.attack_detector.ip_reputation[identifier] < 0.01:
                 del self.attack_detector.ip_reputation[identifier]
         
+        # Adaptive limits only matter for identifiers still being tracked
+        for identifier in list(self.current_limits.keys()):
+            if identifier not in self.attack_detector.request_stats:
+                del self.current_limits[identifier]
+        
         self.last_cleanup = current_time
 
 
 class RateLimiterService:
-    """Main rate limiting service with multiple strategies and Redis support."""
+    """Main rate limiting service with multiple strategies over the shared limiter engine."""
     
-    def __init__(self, config: RateLimitConfig, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, config: RateLimitConfig, engine: Optional[LimiterEngine] = None):
         self.config = config
-        self.redis_client = redis_client
-        self.local_cache: Dict[str, List[float]] = defaultdict(list)
+        self.engine = engine or get_limiter_engine()
         self.adaptive_limiter = AdaptiveRateLimiter(config) if config.enable_adaptive_limiting else None
-        self.token_buckets: Dict[str, Dict[str, float]] = {}
-        self.leaky_buckets: Dict[str, Dict[str, float]] = {}
     
     async def check_rate_limit(
         self, 
@@ -479,176 +686,45 @@ class RateLimiterService:
         window_start = int(current_time // self.config.window_size) * self.config.window_size
         
         key = f"rate_limit:fixed:{identifier}:{window_start}"
+        decision = await self.engine.fixed_window(key, limit, self.config.window_size)
         
-        if self.redis_client:
-            try:
-                count = await self._redis_increment(key, self.config.window_size)
-                remaining = max(0, limit - count)
-                allowed = count <= limit
-            except Exception as e:
-                logger.warning(f"Redis rate limit check failed: {e}")
-                # Fallback to local cache
-                allowed, remaining = self._local_fixed_window_check(identifier, limit, window_start)
-        else:
-            allowed, remaining = self._local_fixed_window_check(identifier, limit, window_start)
-        
-        reset_time = window_start + self.config.window_size
-        
-        return RateLimitResult(
-            allowed=allowed,
-            remaining_requests=remaining,
-            reset_time=reset_time
-        )
+        return self._to_result(decision, window_start + self.config.window_size)
     
     async def _check_sliding_window(self, identifier: str, limit: int) -> RateLimitResult:
         """Check rate limit using sliding window strategy."""
-        current_time = time.time()
-        window_start = current_time - self.config.window_size
-        
-        if self.redis_client:
-            try:
-                count = await self._redis_sliding_window_check(identifier, window_start, current_time)
-                remaining = max(0, limit - count)
-                allowed = count <= limit
-            except Exception as e:
-                logger.warning(f"Redis sliding window check failed: {e}")
-                # Fallback to local cache
-                allowed, remaining = self._local_sliding_window_check(identifier, limit, window_start)
-        else:
-            allowed, remaining = self._local_sliding_window_check(identifier, limit, window_start)
-        
-        reset_time = current_time + self.config.window_size
+        key = f"rate_limit:sliding:{identifier}"
+        decision = await self.engine.sliding_window(key, limit, self.config.window_size)
         
-        return RateLimitResult(
-            allowed=allowed,
-            remaining_requests=remaining,
-            reset_time=reset_time
-        )
+        return self._to_result(decision, time.time() + self.config.window_size)
     
     async def _check_token_bucket(self, identifier: str, limit: int) -> RateLimitResult:
         """Check rate limit using token bucket strategy."""
-        current_time = time.time()
-        
-        if identifier not in self.token_buckets:
-            self.token_buckets[identifier] = {
-                'tokens': float(limit),
-                'last_refill': current_time
-            }
+        key = f"rate_limit:token:{identifier}"
+        decision = await self.engine.token_bucket(key, limit, limit / self.config.window_size)
         
-        bucket = self.token_buckets[identifier]
-        
-        # Refill tokens
-        time_passed = current_time - bucket['last_refill']
-        tokens_to_add = time_passed * (limit / self.config.window_size)
-        bucket['tokens'] = min(limit, bucket['tokens'] + tokens_to_add)
-        bucket['last_refill'] = current_time
-        
-        # Check if tokens available
-        if bucket['tokens'] >= 1:
-            bucket['tokens'] -= 1
-            allowed = True
-        else:
-            allowed = False
-        
-        remaining = int(bucket['tokens'])
-        reset_time = current_time + (1 - bucket['tokens']) * (self.config.window_size / limit)
-        
-        return RateLimitResult(
-            allowed=allowed,
-            remaining_requests=remaining,
-            reset_time=reset_time
-        )
+        return self._to_result(decision, time.time() + decision.retry_after)
     
     async def _check_leaky_bucket(self, identifier: str, limit: int) -> RateLimitResult:
-        """Check rate limit using leaky bucket strategy."""
-        current_time = time.time()
-        
-        if identifier not in self.leaky_buckets:
-            self.leaky_buckets[identifier] = {
-                'volume': 0.0,
-                'last_leak': current_time
-            }
-        
-        bucket = self.leaky_buckets[identifier]
-        
-        # Leak tokens
-        time_passed = current_time - bucket['last_leak']
-        leak_amount = time_passed * (limit / self.config.window_size)
-        bucket['volume'] = max(0, bucket['volume'] - leak_amount)
-        bucket['last_leak'] = current_time
-        
-        # Check if bucket has capacity
-        if bucket['volume'] < limit:
-            bucket['volume'] += 1
-            allowed = True
-        else:
-            allowed = False
+        """Check rate limit using leaky bucket strategy.
         
-        remaining = int(limit - bucket['volume'])
-        reset_time = current_time + (bucket['volume'] - limit + 1) * (self.config.window_size / limit)
+        A leaky bucket used as a meter admits exactly the same requests as a
+        token bucket of equal capacity and rate, so it shares that script.
+        """
+        key = f"rate_limit:leaky:{identifier}"
+        decision = await self.engine.token_bucket(key, limit, limit / self.config.window_size)
         
+        return self._to_result(decision, time.time() + decision.retry_after)
+    
+    @staticmethod
+    def _to_result(decision: LimitDecision, reset_time: float) -> RateLimitResult:
+        """Convert an engine decision into a rate limit result."""
         return RateLimitResult(
-            allowed=allowed,
-            remaining_requests=remaining,
-            reset_time=reset_time
+            allowed=decision.allowed,
+            remaining_requests=decision.remaining,
+            reset_time=reset_time,
+            retry_after=decision.retry_after if not decision.allowed else None
         )
     
-    def _local_fixed_window_check(self, identifier: str, limit: int, window_start: float) -> Tuple[bool, int]:
-        """Local cache implementation of fixed window check."""
-        key = f"{identifier}:{window_start}"
-        
-        if key not in self.local_cache:
-            self.local_cache[key] = []
-        
-        count = len(self.local_cache[key])
-        
-        if count < limit:
-            self.local_cache[key].append(time.time())
-            return True, limit - count - 1
-        else:
-            return False, 0
-    
-    def _local_sliding_window_check(self, identifier: str, limit: int, window_start: float) -> Tuple[bool, int]:
-        """Local cache implementation of sliding window check."""
-        if identifier not in self.local_cache:
-            self.local_cache[identifier] = []
-        
-        # Remove old entries
-        current_time = time.time()
-        self.local_cache[identifier] = [
-            t for t in self.local_cache[identifier] 
-            if current_time - t < self.config.window_size
-        ]
-        
-        count = len(self.local_cache[identifier])
-        
-        if count < limit:
-            self.local_cache[identifier].append(current_time)
-            return True, limit - count - 1
-        else:
-            return False, 0
-    
-    async def _redis_increment(self, key: str, expire_time: int) -> int:
-        """Increment Redis counter with expiration."""
-        pipe = self.redis_client.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, expire_time)
-        results = await pipe.execute()
-        return results[0]
-    
-    async def _redis_sliding_window_check(self, identifier: str, window_start: float, current_time: float) -> int:
-        """Redis implementation of sliding window check."""
-        key = f"rate_limit:sliding:{identifier}"
-        
-        pipe = self.redis_client.pipeline()
-        pipe.zremrangebyscore(key, 0, window_start)
-        pipe.zadd(key, {str(current_time): current_time})
-        pipe.zcard(key)
-        pipe.expire(key, self.config.window_size)
-        results = await pipe.execute()
-        
-        return results[2]  # zcard result
-    
     def get_attack_summary(self, identifier: str) -> Dict[str, Any]:
         """Get attack summary for identifier."""
         if not self.adaptive_limiter:
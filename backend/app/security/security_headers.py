@@ -7,7 +7,7 @@ and other security policies to protect against common web vulnerabilities.
 
 import secrets
 import time
-from typing import Dict, List, Optional, Set, Union, Any
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union, Any
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
@@ -333,27 +333,59 @@ class PermissionsPolicyBuilder:
         return ', '.join(policy_parts)
 
 
+# Sentinel substituted into the compiled CSP template; never emitted on the wire
+_NONCE_PLACEHOLDER = "__KOTORI_CSP_NONCE__"
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+@dataclass(frozen=True)
+class CompiledHeaderSet:
+    """Security headers for one response class, pre-encoded at startup."""
+    static_headers: Tuple[Tuple[bytes, bytes], ...]
+    header_names: FrozenSet[bytes]
+    csp_header_name: bytes
+    csp_nonce_parts: Tuple[bytes, ...]
+    nonce_base_headers: Tuple[Tuple[bytes, bytes], ...]
+
+    def render(self, nonce: str) -> RawHeaders:
+        """
+        Render raw headers with a per-request CSP nonce.
+        
+        Args:
+            nonce: CSP nonce to substitute
+            
+        Returns:
+            RawHeaders: (name, value) byte pairs ready for the ASGI response
+        """
+        headers = list(self.nonce_base_headers)
+        headers.append((self.csp_header_name, nonce.encode("latin-1").join(self.csp_nonce_parts)))
+        return headers
+
+
 class SecurityHeadersManager:
-    """Manager for all security headers."""
+    """Manager for all security headers.
+    
+    Header values are compiled once per response class (HTTPS/plain HTTP)
+    when the manager is created. Per-request work is limited to splicing the
+    CSP nonce into HTML responses; every other response reuses the same
+    pre-encoded tuples.
+    """
     
     def __init__(self, config: SecurityConfig):
         self.config = config
-        self.nonce_cache: Dict[str, str] = {}
+        self._compiled: Dict[bool, CompiledHeaderSet] = {
+            is_https: self._compile_header_set(is_https) for is_https in (True, False)
+        }
     
-    def generate_nonce(self, request_id: str) -> str:
+    def generate_nonce(self) -> str:
         """
-        Generate or retrieve nonce for request.
+        Generate a fresh CSP nonce.
         
-        Args:
-            request_id: Unique request identifier
-            
         Returns:
             str: Nonce value
         """
-        if request_id not in self.nonce_cache:
-            self.nonce_cache[request_id] = secrets.token_urlsafe(self.config.csp_nonce_length)
-        
-        return self.nonce_cache[request_id]
+        return secrets.token_urlsafe(self.config.csp_nonce_length)
     
     def get_hsts_header(self) -> str:
         """
@@ -389,33 +421,30 @@ class SecurityHeadersManager:
         
         return ct_value
     
-    def get_security_headers(self, request_id: str, is_https: bool = True) -> Dict[str, str]:
+    def _compile_header_set(self, is_https: bool) -> CompiledHeaderSet:
         """
-        Get all security headers.
+        Build and encode every security header for one response class.
         
         Args:
-            request_id: Unique request identifier
-            is_https: Whether the request is over HTTPS
+            is_https: Whether the response is served over HTTPS
             
         Returns:
-            Dict[str, str]: Security headers
+            CompiledHeaderSet: Pre-encoded headers
         """
-        headers = {}
+        headers: Dict[str, str] = {}
         
         # HSTS (only for HTTPS)
         if is_https:
             headers['Strict-Transport-Security'] = self.get_hsts_header()
         
-        # CSP
-        nonce = self.generate_nonce(request_id)
-        csp_builder = ContentSecurityPolicyBuilder(self.config)
-        csp_builder.build_default_policy().add_nonce(nonce)
-        headers[csp_builder.get_header_name()] = csp_builder.build()
+        # CSP without a nonce, used for non-HTML responses
+        csp_builder = ContentSecurityPolicyBuilder(self.config).build_default_policy()
+        csp_header_name = csp_builder.get_header_name()
+        headers[csp_header_name] = csp_builder.build()
         
         # Permissions Policy
         if self.config.feature_policy_enabled:
-            permissions_builder = PermissionsPolicyBuilder()
-            headers['Permissions-Policy'] = permissions_builder.build()
+            headers['Permissions-Policy'] = PermissionsPolicyBuilder().build()
         
         # Other security headers
         headers['X-Frame-Options'] = self.config.frame_options
@@ -433,20 +462,95 @@ class SecurityHeadersManager:
         # Prevent MIME type sniffing
         headers['X-Robots-Tag'] = 'noindex, nofollow'
         
-        return headers
+        # CSP template for HTML responses, split around the nonce placeholder
+        nonce_builder = ContentSecurityPolicyBuilder(self.config).build_default_policy()
+        nonce_template = nonce_builder.add_nonce(_NONCE_PLACEHOLDER).build()
+        csp_nonce_parts = tuple(
+            part.encode("latin-1") for part in nonce_template.split(_NONCE_PLACEHOLDER)
+        )
+        
+        encoded_csp_name = csp_header_name.lower().encode("latin-1")
+        static_headers = tuple(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        )
+        
+        return CompiledHeaderSet(
+            static_headers=static_headers,
+            header_names=frozenset(name for name, _ in static_headers),
+            csp_header_name=encoded_csp_name,
+            csp_nonce_parts=csp_nonce_parts,
+            nonce_base_headers=tuple(
+                header for header in static_headers if header[0] != encoded_csp_name
+            ),
+        )
+    
+    def get_raw_security_headers(self, is_https: bool = True, nonce: Optional[str] = None) -> RawHeaders:
+        """
+        Get pre-encoded security headers.
+        
+        Args:
+            is_https: Whether the request is over HTTPS
+            nonce: CSP nonce for HTML responses; None reuses the static CSP
+            
+        Returns:
+            RawHeaders: (name, value) byte pairs
+        """
+        compiled = self._compiled[is_https]
+        if nonce is None:
+            return list(compiled.static_headers)
+        return compiled.render(nonce)
     
-    def cleanup_nonce_cache(self, max_age: int = 3600):
+    def get_security_headers(self, is_https: bool = True, nonce: Optional[str] = None) -> Dict[str, str]:
         """
-        Clean up old nonces from cache.
+        Get all security headers as strings.
         
         Args:
-            max_age: Maximum age of nonces in seconds
+            is_https: Whether the request is over HTTPS
+            nonce: CSP nonce for HTML responses
+            
+        Returns:
+            Dict[str, str]: Security headers
         """
-        # Simple cleanup - in production, you'd want to track timestamps
-        if len(self.nonce_cache) > 1000:
-            # Keep only the most recent 500 nonces
-            recent_nonces = dict(list(self.nonce_cache.items())[-500:])
-            self.nonce_cache = recent_nonces
+        return {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in self.get_raw_security_headers(is_https, nonce)
+        }
+    
+    def apply_security_headers(self, response, is_https: bool = True, nonce: Optional[str] = None) -> Optional[str]:
+        """
+        Attach security headers to a response in place.
+        
+        JSON and other non-HTML responses receive the shared pre-encoded
+        header block; only HTML responses get a per-request CSP nonce.
+        
+        Args:
+            response: Starlette response
+            is_https: Whether the request is over HTTPS
+            nonce: Nonce to use for HTML responses (generated if omitted)
+            
+        Returns:
+            Optional[str]: Nonce applied to the response, if any
+        """
+        compiled = self._compiled[is_https]
+        raw_headers = response.raw_headers
+        
+        content_type = b""
+        for name, value in raw_headers:
+            if name == b"content-type":
+                content_type = value
+                break
+        
+        if content_type.startswith(b"text/html"):
+            nonce = nonce or self.generate_nonce()
+            security_headers = compiled.render(nonce)
+        else:
+            nonce = None
+            security_headers = compiled.static_headers
+        
+        raw_headers[:] = [header for header in raw_headers if header[0] not in compiled.header_names]
+        raw_headers.extend(security_headers)
+        return nonce
 
 
 class CORSSecurityManager:
@@ -587,7 +691,6 @@ class SecurityHeadersMiddleware:
         Returns:
             Response with security headers
         """
-        # Generate request ID for nonce
         request_id = getattr(request, 'id', secrets.token_urlsafe(8))
         
         # Check if HTTPS
@@ -602,11 +705,8 @@ class SecurityHeadersMiddleware:
         # Process request
         response = await call_next(request)
         
-        # Add security headers
-        security_headers = self.headers_manager.get_security_headers(request_id, is_https)
-        
-        for header_name, header_value in security_headers.items():
-            response.headers[header_name] = header_value
+        # Add security headers (nonce is only generated for HTML responses)
+        nonce = self.headers_manager.apply_security_headers(response, is_https)
         
         # Add CORS headers
         origin = request.headers.get('origin', '')
@@ -626,7 +726,8 @@ class SecurityHeadersMiddleware:
         
         # Add security metadata to response
         response.headers['X-Request-ID'] = request_id
-        response.headers['X-Content-Security-Policy-Nonce'] = self.headers_manager.generate_nonce(request_id)
+        if nonce:
+            response.headers['X-Content-Security-Policy-Nonce'] = nonce
         
         return response
     
@@ -666,17 +767,14 @@ class SecurityHeadersMiddleware:
         
         return response
     
-    def get_csp_nonce(self, request_id: str) -> str:
+    def get_csp_nonce(self) -> str:
         """
-        Get CSP nonce for request.
+        Get a fresh CSP nonce.
         
-        Args:
-            request_id: Request identifier
-            
         Returns:
             str: CSP nonce
         """
-        return self.headers_manager.generate_nonce(request_id)
+        return self.headers_manager.generate_nonce()
 
 
 # Global instances
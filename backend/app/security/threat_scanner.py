@@ -0,0 +1,212 @@
+"""
+Single-pass input threat scanner.
+
+This module holds the SQL injection keywords and patterns and the XSS
+patterns used by the input validator, compiled once per process. A string
+is lower-cased once, the way ``re.IGNORECASE`` compares characters, and
+checked against the literal triggers every pattern requires; only patterns whose triggers are present run their regular
+expression, so ordinary prose is cleared with a few substring searches.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Pattern, Tuple
+
+# SQL keywords; more than SQL_KEYWORD_THRESHOLD distinct hits flag the input
+SQL_KEYWORDS = (
+    'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER',
+    'EXEC', 'EXECUTE', 'UNION', 'JOIN', 'WHERE', 'FROM', 'INTO',
+    'VALUES', 'SET', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
+    'GRANT', 'REVOKE', 'COMMIT', 'ROLLBACK', 'TRUNCATE', 'REPLACE'
+)
+SQL_KEYWORD_THRESHOLD = 2
+
+SQL_PATTERNS = (
+    # Union-based injection
+    r'(?i)\b(union\s+select|union\s+all\s+select)',
+    # Comment-based injection
+    r'(?i)(--|#|/\*|\*/)',
+    # Boolean-based injection
+    r'(?i)\b(or\s+1\s*=\s*1|and\s+1\s*=\s*1|or\s+\'1\'\s*=\s*\'1\'|and\s+\'1\'\s*=\s*\'1\')',
+    # Time-based injection
+    r'(?i)\b(waitfor\s+delay|sleep\s*\(|benchmark\s*\()',
+    # Stacked queries
+    r'(?i);\s*(drop|delete|insert|update|create|alter|exec|execute)',
+    # Information schema
+    r'(?i)\b(information_schema|sysobjects|syscolumns|pg_tables)',
+    # Function calls
+    r'(?i)\b(load_file|into\s+outfile|into\s+dumpfile|xp_cmdshell)',
+    # Hex encoding attempts
+    r'(?i)\b(0x[0-9a-f]+|char\s*\(|ascii\s*\(|hex\s*\()',
+    # Conditional statements
+    r'(?i)\b(if\s*\(|case\s+when|when\s+then|else\s+end)',
+    # Quotes and escaping
+    r'(?:\'\s*;\s*|\'\s*--|\'\s*#|\\\x27|\\\x22)',
+)
+
+XSS_PATTERNS = (
+    r'(?i)<script[^>]*>.*?</script>',
+    r'(?i)<iframe[^>]*>.*?</iframe>',
+    r'(?i)<object[^>]*>.*?</object>',
+    r'(?i)<embed[^>]*>.*?</embed>',
+    r'(?i)<applet[^>]*>.*?</applet>',
+    r'(?i)<form[^>]*>.*?</form>',
+    r'(?i)<meta[^>]*>',
+    r'(?i)<link[^>]*>',
+    r'(?i)javascript:',
+    r'(?i)vbscript:',
+    r'(?i)data:',
+    r'(?i)on\w+\s*=',
+    r'(?i)expression\s*\(',
+    r'(?i)eval\s*\(',
+    r'(?i)alert\s*\(',
+    r'(?i)confirm\s*\(',
+    r'(?i)prompt\s*\(',
+)
+
+# Literal substrings (lower-case ASCII) at least one of which must be present for
+# the pattern at the same index to match; patterns whose triggers are all
+# absent are not evaluated
+SQL_TRIGGERS = (
+    ('union',),
+    ('--', '#', '/*', '*/'),
+    ('=',),
+    ('waitfor', 'sleep', 'benchmark'),
+    (';',),
+    ('information_schema', 'sysobjects', 'syscolumns', 'pg_tables'),
+    ('load_file', 'outfile', 'dumpfile', 'xp_cmdshell'),
+    ('0x', 'char', 'ascii', 'hex'),
+    ('(', 'when', 'else'),
+    ("'", '\\'),
+)
+
+XSS_TRIGGERS = (
+    ('<',), ('<',), ('<',), ('<',), ('<',), ('<',), ('<',), ('<',),
+    ('javascript:',),
+    ('vbscript:',),
+    ('data:',),
+    ('=',),
+    ('(',), ('(',), ('(',), ('(',), ('(',),
+)
+
+# Non-ASCII characters re.IGNORECASE matches to an ASCII letter (dotted and
+# dotless i, long s, Kelvin sign); mapped before lower() so trigger gating
+# never rules out a string the expression would match
+_IGNORECASE_ASCII = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+# HTML entities that may be used to obfuscate an XSS payload
+SUSPICIOUS_ENTITIES = (
+    '&lt;script&gt;', '&lt;iframe&gt;', '&lt;object&gt;',
+    '&quot;javascript:', '&quot;vbscript:', '&quot;data:'
+)
+
+# Long strings made only of base64/base64url characters (ciphertext, keys,
+# IVs) cannot contain any structural pattern and only produce keyword noise
+OPAQUE_MIN_LENGTH = 256
+_OPAQUE_RE = re.compile(r'[A-Za-z0-9+/_-]+={0,2}')
+
+
+@dataclass(frozen=True)
+class CompiledThreatPattern:
+    """A detection pattern together with the literals that gate it."""
+    pattern: Pattern[str]
+    triggers: Tuple[str, ...]
+    message: str
+
+    def search(self, value: str, lowered: str) -> bool:
+        """Run the expression only if one of its trigger literals is present."""
+        for trigger in self.triggers:
+            if trigger in lowered:
+                return self.pattern.search(value) is not None
+        return False
+
+
+@dataclass
+class ScanResult:
+    """Findings of a single scan, split per threat category."""
+    sql_findings: List[str] = field(default_factory=list)
+    xss_findings: List[str] = field(default_factory=list)
+    skipped_opaque: bool = False
+
+    @property
+    def is_sql_injection(self) -> bool:
+        return bool(self.sql_findings)
+
+    @property
+    def is_xss(self) -> bool:
+        return bool(self.xss_findings)
+
+
+def _compile(patterns: Tuple[str, ...], triggers: Tuple[Tuple[str, ...], ...], template: str) -> Tuple[CompiledThreatPattern, ...]:
+    """Compile a pattern list with its trigger literals."""
+    return tuple(
+        CompiledThreatPattern(re.compile(pattern), pattern_triggers, template.format(pattern))
+        for pattern, pattern_triggers in zip(patterns, triggers, strict=True)
+    )
+
+
+class ThreatScanner:
+    """Scan strings for SQL injection and XSS indicators in a single pass."""
+
+    def __init__(self, opaque_min_length: Optional[int] = OPAQUE_MIN_LENGTH):
+        """
+        Compile the detection patterns.
+
+        Args:
+            opaque_min_length: Minimum length from which base64-only strings are
+                treated as opaque and skipped; None disables the short-circuit
+        """
+        self.opaque_min_length = opaque_min_length
+        self.sql_patterns = _compile(SQL_PATTERNS, SQL_TRIGGERS, 'SQL injection pattern detected: {}')
+        self.xss_patterns = _compile(XSS_PATTERNS, XSS_TRIGGERS, 'XSS pattern detected: {}')
+
+    def is_opaque(self, value: str) -> bool:
+        """Check whether a string is a long base64-like blob."""
+        return (
+            self.opaque_min_length is not None
+            and len(value) >= self.opaque_min_length
+            and _OPAQUE_RE.fullmatch(value) is not None
+        )
+
+    def scan(self, value: str) -> ScanResult:
+        """
+        Scan a string once for all SQL injection and XSS indicators.
+
+        Args:
+            value: Input value to check
+
+        Returns:
+            ScanResult: Findings per category, in the detectors' message format
+        """
+        result = ScanResult()
+        if not isinstance(value, str) or not value:
+            return result
+
+        if self.is_opaque(value):
+            result.skipped_opaque = True
+            return result
+
+        # Keywords keep their historical upper-case substring semantics
+        normalized_value = value.upper()
+        keywords = [keyword for keyword in SQL_KEYWORDS if keyword in normalized_value]
+        if len(keywords) > SQL_KEYWORD_THRESHOLD:
+            result.sql_findings.append(f"Multiple SQL keywords detected: {', '.join(keywords)}")
+
+        lowered = value.translate(_IGNORECASE_ASCII).lower()
+        result.sql_findings.extend(
+            compiled.message for compiled in self.sql_patterns if compiled.search(value, lowered)
+        )
+        result.xss_findings.extend(
+            compiled.message for compiled in self.xss_patterns if compiled.search(value, lowered)
+        )
+
+        if '&' in lowered and ';' in lowered:
+            result.xss_findings.extend(
+                f"Suspicious HTML entity: {entity}" for entity in SUSPICIOUS_ENTITIES if entity in lowered
+            )
+
+        return result
+
+
+# Shared scanner; patterns are compiled once per process
+threat_scanner = ThreatScanner()
@@ -0,0 +1,43 @@
+"""
+Shared fixtures for service tests.
+
+Services run against an in-memory SQLite database holding only the tables a
+test module lists in its module-level ``TABLES`` (models). Postgres column
+types are rendered with their closest SQLite equivalent.
+"""
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+
+from app.db.session_factory import DatabaseSessionFactory, reset_session_factory, set_session_factory
+from app.models.base import Base
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def session_factory(request):
+    """SQLite session factory with the module's TABLES, installed as the app's factory."""
+    factory = DatabaseSessionFactory("sqlite://")
+    models = getattr(request.module, "TABLES", [])
+    Base.metadata.create_all(factory.get_engine(), tables=[model.__table__ for model in models])
+    set_session_factory(factory)
+    yield factory
+    reset_session_factory()
+    factory.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory.get_session()
+    yield session
+    session.close()
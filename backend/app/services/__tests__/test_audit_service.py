@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import event, update
+
+from app.models import SecurityAuditLog
+from app.services.audit_service import AuditLogWriter, SecurityAuditService
+
+TABLES = [SecurityAuditLog]
+
+
+class _RunningWriter(AuditLogWriter):
+    """Writer that behaves as if the background task were active"""
+
+    @property
+    def running(self) -> bool:
+        return True
+
+
+def _log(service, index, severity="info"):
+    return service.log_event(
+        event_type="login_failed",
+        event_category="auth",
+        severity=severity,
+        message=f"event {index}",
+        user_id="user-1",
+        ip_address="10.0.0.1",
+        event_data={"attempt": index},
+        success=False
+    )
+
+
+def test_events_are_buffered_then_written_as_one_chained_batch(db):
+    service = SecurityAuditService(_RunningWriter(signing_key="test-key", batch_size=100))
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    handles = [_log(service, i) for i in range(5)]
+
+    assert statements == []
+    assert service.writer.pending == 5
+
+    assert service.writer.flush(db) == 5
+    assert sum(statement.startswith("INSERT") for statement in statements) == 1
+
+    rows = db.query(SecurityAuditLog).order_by(SecurityAuditLog.sequence).all()
+    assert [row.sequence for row in rows] == [1, 2, 3, 4, 5]
+    assert [str(row.id) for row in rows] == [handle.id for handle in handles]
+    assert all(row.previous_signature == prev.log_signature for prev, row in zip(rows[:-1], rows[1:], strict=True))
+    assert rows[0].user_id_hash != "user-1"
+    assert all(service.verify_log_integrity(db, row.id) for row in rows)
+
+    _log(service, 5)
+    service.writer.flush(db)
+    assert db.query(SecurityAuditLog).filter(SecurityAuditLog.sequence == 6).one().previous_signature == rows[-1].log_signature
+    assert service.detect_brute_force_attack(db, user_id="user-1", failure_threshold=5)
+
+
+def test_tampered_entry_fails_verification(db):
+    service = SecurityAuditService(AuditLogWriter(signing_key="test-key"))
+    handles = [service.log_event(db, **event) for event in (
+        {"event_type": "a", "event_category": "system", "severity": "info", "message": "first"},
+        {"event_type": "b", "event_category": "system", "severity": "info", "message": "second"},
+    )]
+
+    db.execute(update(SecurityAuditLog).where(SecurityAuditLog.event_type == "a").values(event_message="edited"))
+    db.commit()
+
+    assert not service.verify_log_integrity(db, handles[0].id)
+    assert service.verify_log_integrity(db, handles[1].id)
+
+
+def test_full_buffer_drops_routine_events_and_writes_critical_ones(db, monkeypatch):
+    writer = _RunningWriter(signing_key="test-key", max_pending=2, batch_size=100)
+    service = SecurityAuditService(writer)
+    monkeypatch.setattr(writer, "flush_pending", lambda: pytest.fail("backlog flushed synchronously"))
+
+    _log(service, 0)
+    _log(service, 1)
+    assert _log(service, 2) is None
+    assert writer.dropped == 1
+
+    # Only the critical event is written; the backlog stays with the writer
+    assert _log(service, 3, severity="critical") is not None
+    assert writer.pending == 2
+    assert [row.event_message for row in db.query(SecurityAuditLog).all()] == ["event 3"]
+
+    assert writer.flush(db) == 2
+    rows = db.query(SecurityAuditLog).order_by(SecurityAuditLog.sequence).all()
+    assert all(service.verify_log_integrity(db, row.id) for row in rows)
+
+
+def test_synchronous_writes_leave_the_callers_transaction_alone(db):
+    service = SecurityAuditService(AuditLogWriter(signing_key="test-key"))
+    transitions = []
+    event.listen(db, "after_commit", lambda session: transitions.append("commit"))
+    event.listen(db, "after_rollback", lambda session: transitions.append("rollback"))
+
+    handle = service.log_event(
+        db,
+        event_type="attack_pattern_detected",
+        event_category="security",
+        severity="critical",
+        message="detected",
+        user_id_hash="a" * 64,
+        ip_address_hash="b" * 64
+    )
+
+    assert transitions == []
+    row = db.query(SecurityAuditLog).one()
+    assert str(row.id) == handle.id
+    assert (row.user_id_hash, row.ip_address_hash) == ("a" * 64, "b" * 64)
@@ -0,0 +1,62 @@
+import multiprocessing
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.services.document_parser_service import DocumentParserService, DocumentParsingError
+from app.services.pdf_service import pdf_service
+
+
+def make_pdf(pages: int) -> bytes:
+    content = {
+        "answers": [
+            {"question_text": f"Question {i}", "answer": "A fairly long answer. " * 40, "confidence": 0.9}
+            for i in range(pages * 2)
+        ],
+        "template_info": {"name": "Intake"},
+        "generation_metadata": {},
+        "target_language": "en",
+        "entry_count": 1,
+    }
+    return pdf_service.generate_share_pdf(content, "Intake form", datetime.now(timezone.utc))
+
+
+def slow_parse(self, file_content, content_type, filename=""):
+    time.sleep(30)
+
+
+class TestDocumentParserService:
+
+    def test_pdf_text_stops_at_character_budget(self):
+        parser = DocumentParserService(max_pages=100, max_chars=3000, parse_workers=0)
+
+        parsed = parser.parse_file(make_pdf(10), "application/pdf", "intake.pdf")
+
+        assert parsed["character_count"] <= 3000
+        assert parsed["metadata"]["truncated"]
+        assert parsed["metadata"]["pages_read"] < parsed["metadata"]["page_count"]
+        assert parsed["text"].startswith("--- Page 1 ---")
+
+    @pytest.mark.asyncio
+    async def test_process_parse_uses_the_instance_budgets(self):
+        parser = DocumentParserService(max_pages=100, max_chars=3000, parse_workers=1)
+
+        parsed = await parser.parse_file_async(make_pdf(10), "application/pdf", "intake.pdf")
+
+        assert parsed["character_count"] <= 3000
+        assert parsed["metadata"]["truncated"]
+
+    @pytest.mark.asyncio
+    async def test_hung_parse_times_out_and_its_process_is_terminated(self):
+        parser = DocumentParserService(parse_workers=1, timeout_seconds=0.5, worker_memory_mb=0)
+
+        with patch.object(DocumentParserService, "parse_file", slow_parse):
+            started = time.monotonic()
+            with pytest.raises(DocumentParsingError, match="timed out"):
+                await parser.parse_file_async(b"%PDF-1.4", "application/pdf", "slow.pdf")
+
+        assert time.monotonic() - started < 5
+        assert not parser._processes
+        assert not multiprocessing.active_children()
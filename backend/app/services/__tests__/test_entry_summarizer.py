@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.entry_summarizer import EntrySummarizer, chunk_entries
+from app.services.summary_cache import SummaryCache
+
+
+def make_entries(count, chars=400):
+    return [
+        {"entry_date": f"2025-01-{i + 1:02d}", "title": None, "content": f"day {i} " + "x" * chars}
+        for i in range(count)
+    ]
+
+
+class TestEntrySummarizer:
+
+    def test_chunks_respect_budget_and_keep_earlier_boundaries(self):
+        entries = make_entries(20)
+
+        chunks = chunk_entries(entries, token_budget=300)
+        extended = chunk_entries(entries + make_entries(25)[20:], token_budget=300)
+
+        assert sum(len(chunk) for chunk in chunks) == 20
+        assert all(sum(len(text) for text in chunk) <= 300 * 4 for chunk in chunks)
+        assert extended[:len(chunks) - 1] == chunks[:-1]
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_covers_all_entries_and_reuses_chunks(self):
+        prompts = []
+
+        async def generate(prompt, max_output_tokens):
+            prompts.append(prompt)
+            return f"summary {len(prompts)}"
+
+        summarizer = EntrySummarizer(
+            generate,
+            SummaryCache(max_entries=100),
+            model_name="test-model",
+            chunk_token_budget=300,
+            reduce_fan_in=3
+        )
+        entries = make_entries(30)
+        chunk_count = len(chunk_entries(entries, 300))
+
+        summary = await summarizer.summarize(entries, "en")
+
+        map_prompts = [p for p in prompts if p.startswith("You are a helpful assistant. Summarize")]
+        assert summary
+        assert len(map_prompts) == chunk_count
+        assert all(f"day {i} " in "".join(map_prompts) for i in range(30))
+        assert len(prompts) > chunk_count  # at least one reduce level
+
+        prompts.clear()
+        await summarizer.summarize(entries + make_entries(31)[30:], "en")
+
+        # Only the last (changed) chunk is summarized again; merges above it are redone
+        assert len([p for p in prompts if p.startswith("You are a helpful assistant. Summarize")]) == 1
+
+    @pytest.mark.asyncio
+    async def test_single_chunk_summary_is_reused_when_range_grows(self):
+        prompts = []
+
+        async def generate(prompt, max_output_tokens):
+            prompts.append(prompt)
+            return f"summary {len(prompts)}"
+
+        summarizer = EntrySummarizer(generate, SummaryCache(max_entries=100), model_name="test-model", chunk_token_budget=300)
+        entries = make_entries(30)
+        first_chunk = make_entries(len(chunk_entries(entries, 300)[0]))
+
+        await summarizer.summarize(first_chunk, "en")
+        prompts.clear()
+        await summarizer.summarize(entries, "en")
+
+        assert not any("day 0 " in p for p in prompts if p.startswith("You are a helpful assistant. Summarize"))
@@ -0,0 +1,63 @@
+import importlib
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.models import OpaqueSession, Share
+from app.services.expiry_sweeper import ExpirySweeper
+from app.services.share_service import public_share_cache, share_service
+
+# app.services re-exports the session_service instance under the module's name
+session_module = importlib.import_module("app.services.session_service")
+
+TABLES = [Share, OpaqueSession]
+
+
+def test_expired_shares_are_deactivated_in_batches(db, monkeypatch):
+    now = datetime.now(timezone.utc)
+    for i in range(30):
+        db.add(Share(
+            share_token=f"token-{i}",
+            title="Share",
+            content={},
+            template_id="t",
+            user_id=uuid.uuid4(),
+            expires_at=now - timedelta(hours=1) if i < 25 else now + timedelta(days=1),
+        ))
+    db.commit()
+
+    invalidated = []
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    sweeper = ExpirySweeper(batch_size=10)
+    sweeper.register("expired_shares", lambda session: share_service.cleanup_expired_shares(session, batch_size=10))
+
+    monkeypatch.setattr(public_share_cache, "invalidate", invalidated.append)
+
+    assert sweeper.run_sweep("expired_shares", db) == 25
+
+    assert len(commits) == 3
+    assert sorted(invalidated) == sorted(f"token-{i}" for i in range(25))
+    assert db.query(Share).filter(Share.is_active.is_(True)).count() == 5
+    stats = sweeper.get_statistics()["expired_shares"]
+    assert stats["runs"] == 1 and stats["rows_total"] == 25 and stats["last_error"] is None
+
+
+def test_expired_sessions_are_kept_for_retention_and_their_keys_ended(db, monkeypatch):
+    now = datetime.now(timezone.utc)
+    for session_id, expires_at in (
+        ("long-expired", now - timedelta(days=30)),
+        ("just-expired", now - timedelta(hours=1)),
+        ("active", now + timedelta(hours=1)),
+    ):
+        db.add(OpaqueSession(session_id=session_id, user_id=uuid.uuid4(), session_state="authenticated", expires_at=expires_at))
+    db.commit()
+
+    ended = []
+    monkeypatch.setattr(session_module, "end_session_keys", ended.append)
+    monkeypatch.setattr(session_module.jwt_service, "cleanup_expired_tokens", lambda: 0)
+
+    assert session_module.session_service.cleanup_expired_sessions(db) == 1
+    assert ended == ["long-expired"]
+    assert {row.session_id for row in db.query(OpaqueSession)} == {"just-expired", "active"}
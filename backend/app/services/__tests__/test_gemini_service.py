@@ -344,3 +344,203 @@ class TestGeminiService:
         assert result is not None
         assert "batching" in result.processing_notes.lower()
         assert len(result.answers) > 0  # Should have some answers from batches
+
+    @pytest.mark.asyncio
+    async def test_share_summary_is_served_from_cache(self):
+        """Identical entries, template version and language reuse the cached summary."""
+        from app.services.gemini_service import ShareSummaryResponse, QuestionAnswer
+
+        service = GeminiService()
+        service.model = MagicMock()
+        calls = 0
+
+        async def mock_generate(entries, template, target_language, on_progress=None):
+            nonlocal calls
+            calls += 1
+            return ShareSummaryResponse(
+                answers=[QuestionAnswer(question_id="q1", question_text="Q", answer="A", confidence=0.9)],
+                source_language="en",
+                target_language=target_language,
+                entry_count=len(entries),
+            )
+
+        service._generate_share_summary_uncached = mock_generate
+
+        template = {"template_id": "t", "version": "1.0", "questions": [{"id": "q1", "text": "Q"}]}
+        first = await service.generate_share_summary([{"content": "slept  well", "entry_date": "2024-01-01"}], template, "en")
+        second = await service.generate_share_summary([{"content": "slept well ", "entry_date": "2024-01-01"}], template, "en")
+        await service.generate_share_summary([{"content": "slept well", "entry_date": "2024-01-01"}], template, "es")
+        await service.generate_share_summary(
+            [{"content": "slept well", "entry_date": "2024-01-01"}], {**template, "version": "1.1"}, "en"
+        )
+
+        assert second == first
+        assert calls == 3
+
+    @pytest.mark.asyncio
+    async def test_batched_summary_runs_batches_concurrently_in_order(self):
+        """Batches fan out concurrently, transient failures are retried and answers keep question order."""
+        from app.services.gemini_service import ShareSummaryResponse, QuestionAnswer
+
+        service = GeminiService()
+        in_flight = 0
+        peak = 0
+        attempts: dict = {}
+
+        async def mock_generate_full(entries, template, target_language, summary_override=None):
+            nonlocal in_flight, peak
+            batch_key = template['questions'][0]['id']
+            attempts[batch_key] = attempts.get(batch_key, 0) + 1
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                # Later batches finish first to exercise ordered merging
+                await asyncio.sleep(0.01 * (10 - int(batch_key[1:])))
+                if batch_key == 'q4' and attempts[batch_key] == 1:
+                    raise GeminiError("transient")
+                return ShareSummaryResponse(
+                    answers=[
+                        QuestionAnswer(question_id=q['id'], question_text=q['text'], answer="A", confidence=0.9)
+                        for q in template['questions']
+                    ],
+                    source_language="en",
+                    target_language=target_language,
+                    entry_count=len(entries),
+                )
+            finally:
+                in_flight -= 1
+
+        service._generate_full_template_summary = mock_generate_full
+
+        template = {"template_id": "t", "questions": [{"id": f"q{i}", "text": f"Q{i}"} for i in range(1, 10)]}
+        with patch('app.services.gemini_service.CALL_RETRY_BASE_DELAY', 0):
+            result = await service._generate_batched_template_summary([{"content": "x"}], template, "en")
+
+        assert [qa.question_id for qa in result.answers] == [f"q{i}" for i in range(1, 10)]
+        assert peak == 3
+        assert attempts == {'q1': 1, 'q4': 2, 'q7': 1}
+
+    @pytest.mark.asyncio
+    async def test_each_model_call_takes_one_rate_limit_token(self):
+        """Single-shot and batched summaries take exactly one token per model call."""
+        from app.services.gemini_service import ShareSummaryResponse, QuestionAnswer
+
+        service = GeminiService()
+        tokens = 0
+        model_calls = 0
+
+        async def count_token(model_name=None):
+            nonlocal tokens
+            tokens += 1
+
+        async def mock_structured(prompt, response_schema, **kwargs):
+            nonlocal model_calls
+            model_calls += 1
+            return ShareSummaryResponse(
+                answers=[QuestionAnswer(question_id="q1", question_text="Q", answer="A", confidence=0.9)],
+                source_language="en",
+                target_language="en",
+                entry_count=1,
+            )
+
+        service.rate_limiter.check_rate_limit = count_token
+        service._generate_with_structured_output = mock_structured
+        entries = [{"content": "slept well", "entry_date": "2024-01-01"}]
+        template = {"template_id": "t", "questions": [{"id": f"q{i}", "text": f"Q{i}"} for i in range(1, 7)]}
+
+        await service._generate_share_summary_uncached(entries, {**template, "questions": template["questions"][:1]}, "en")
+        assert (tokens, model_calls) == (1, 1)
+
+        await service._generate_batched_template_summary(entries, template, "en")
+        assert tokens == model_calls == 3
+
+    def test_response_schema_is_compiled_once_per_model(self):
+        """Schemas are built once per response model and handed out as independent copies."""
+        from app.services.gemini_service import ShareSummaryResponse
+
+        service = GeminiService()
+        with patch.object(
+            ShareSummaryResponse, 'model_json_schema', wraps=ShareSummaryResponse.model_json_schema
+        ) as build:
+            first = service._get_response_schema(ShareSummaryResponse)
+            first['properties'].clear()
+            second = service._get_response_schema(ShareSummaryResponse)
+
+        assert build.call_count == 1
+        assert 'answers' in second['properties']
+        assert '$defs' not in second
+
+    @pytest.mark.asyncio
+    async def test_override_model_handles_are_reused_and_calls_capped_per_model(self):
+        """Escalation models are built once and each model's in-flight calls are bounded."""
+        import threading
+        import time
+
+        service = GeminiService()
+        service.model = MagicMock()
+        service.vertex_backend = False
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def blocking_call():
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return "ok"
+
+        with patch('app.services.gemini_service.genai.GenerativeModel') as model_cls, \
+             patch('app.services.gemini_service.settings.GEMINI_MAX_INFLIGHT_PER_MODEL', 2):
+            assert service._get_model('gemini-2.5-pro') is service._get_model('gemini-2.5-pro')
+            results = await asyncio.gather(*(
+                service._run_model_call('gemini-2.5-pro', blocking_call) for _ in range(6)
+            ))
+        service.shutdown()
+
+        assert model_cls.call_count == 1
+        assert service._get_model(service.model_name) is service.model
+        assert results == ["ok"] * 6
+        assert peak == 2
+
+
+class TestGeminiRateLimiter:
+    """Async token bucket limiter used for Gemini calls."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_arrival_order_without_deadlock(self):
+        from app.services.gemini_service import AsyncTokenBucket
+
+        bucket = AsyncTokenBucket(capacity=2, refill_per_second=100)
+        order = []
+
+        async def call(i):
+            await bucket.acquire()
+            order.append(i)
+
+        await asyncio.wait_for(asyncio.gather(*(call(i) for i in range(8))), timeout=1)
+
+        assert order == list(range(8))
+
+    @pytest.mark.asyncio
+    async def test_models_have_separate_buckets_and_token_debt_blocks(self):
+        from app.security.limiter_backend import LimiterEngine
+        from app.services.gemini_service import GeminiRateLimiter, ModelQuota
+
+        limiter = GeminiRateLimiter(
+            quotas={"flash": ModelQuota(1, 600), "pro": ModelQuota(1, 600)},
+            engine=LimiterEngine(),
+        )
+
+        await limiter.check_rate_limit("flash")
+        # Pro is unaffected by the exhausted Flash request bucket
+        await asyncio.wait_for(limiter.check_rate_limit("pro"), timeout=0.1)
+
+        limiter.record_usage("pro", 605)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter._get_buckets("pro").tokens.acquire(0), timeout=0.2)
+        # Debt of 5 tokens refills at 10 tokens/second
+        await asyncio.wait_for(limiter._get_buckets("pro").tokens.acquire(0), timeout=1)
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.job import Job
+from app.services.job_service import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobService,
+    JobWorker,
+)
+
+TABLES = [Job]
+
+
+@pytest.fixture
+def service():
+    return JobService(lease_seconds=60, retry_base_delay=0)
+
+
+class TestJobService:
+
+    @pytest.mark.asyncio
+    async def test_worker_runs_job_and_drops_input(self, session_factory, service):
+        async def handler(db, job):
+            return {"echo": service.read_input(job).decode("utf-8"), "payload": job.payload}
+
+        service.register("echo", handler)
+        db = session_factory.get_session()
+        job = service.enqueue(db, job_type="echo", user_id=uuid.uuid4(), payload={"n": 1}, input_data=b"secret")
+        assert b"secret" not in job.input_data
+
+        assert await JobWorker(service, poll_interval=0).run_once()
+        assert not await JobWorker(service, poll_interval=0).run_once()
+
+        db.refresh(job)
+        assert job.status == JOB_SUCCEEDED
+        assert job.result == {"echo": "secret", "payload": {"n": 1}}
+        assert job.attempts == 1
+        assert job.input_data is None
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_retried_until_attempts_run_out(self, session_factory, service):
+        calls = 0
+
+        async def handler(db, job):
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("upstream unavailable")
+
+        service.register("flaky", handler)
+        db = session_factory.get_session()
+        job = service.enqueue(db, job_type="flaky", user_id=uuid.uuid4(), max_attempts=2)
+        worker = JobWorker(service, poll_interval=0)
+
+        await worker.run_once()
+        db.refresh(job)
+        assert job.status == JOB_QUEUED
+        assert job.error == "upstream unavailable"
+
+        await worker.run_once()
+        db.refresh(job)
+        assert job.status == JOB_FAILED
+        assert calls == 2
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_value_errors_are_not_retried(self, session_factory, service):
+        async def handler(db, job):
+            raise ValueError("Template 'x' not found")
+
+        service.register("invalid", handler)
+        db = session_factory.get_session()
+        job = service.enqueue(db, job_type="invalid", user_id=uuid.uuid4(), max_attempts=3)
+
+        await JobWorker(service, poll_interval=0).run_once()
+
+        db.refresh(job)
+        assert job.status == JOB_FAILED
+        assert job.attempts == 1
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_job_is_never_claimed(self, session_factory, service):
+        async def handler(db, job):
+            raise AssertionError("cancelled job must not run")
+
+        service.register("noop", handler)
+        db = session_factory.get_session()
+        job = service.enqueue(db, job_type="noop", user_id=uuid.uuid4(), input_data=b"x")
+
+        job = service.cancel(db, job)
+
+        assert job.status == JOB_CANCELLED
+        assert job.input_data is None
+        assert not await JobWorker(service, poll_interval=0).run_once()
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_worker_that_lost_its_lease_leaves_the_job_alone(self, session_factory, service):
+        async def handler(db, job):
+            # The lease expired and another worker claimed the job meanwhile
+            other = session_factory.get_session()
+            other.query(Job).filter(Job.id == job.id).update({"locked_by": "other-worker"})
+            other.commit()
+            other.close()
+            await asyncio.sleep(1)
+            return {"done": True}
+
+        service.register("slow", handler)
+        db = session_factory.get_session()
+        job = service.enqueue(db, job_type="slow", user_id=uuid.uuid4())
+
+        assert await JobWorker(service, poll_interval=0, heartbeat_interval=0.05).run_once()
+
+        db.refresh(job)
+        assert job.status == JOB_RUNNING
+        assert job.locked_by == "other-worker"
+        assert job.result is None
+        db.close()
+
+    def test_claim_skips_rows_locked_by_other_workers(self, service):
+        service.register("noop", None)
+        captured = {}
+
+        class CapturingSession:
+            def execute(self, query):
+                captured["sql"] = str(query.compile(dialect=postgresql.dialect()))
+                raise StopIteration
+
+        with pytest.raises(StopIteration):
+            service.claim(CapturingSession(), "worker-1")
+
+        assert "FOR UPDATE SKIP LOCKED" in captured["sql"]
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.partition_service import PartitionManager, add_months, month_start, partition_name
+
+
+def test_month_arithmetic():
+    month = month_start(datetime(2026, 11, 17, 23, 30, tzinfo=timezone(timedelta(hours=-5))))
+
+    assert month == datetime(2026, 11, 1, tzinfo=timezone.utc)
+    assert add_months(month, 2) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert add_months(month, -11) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert partition_name("share_access", month) == "share_access_p202611"
+
+
+def test_maintenance_is_a_no_op_without_partitioned_tables(db):
+    assert PartitionManager().maintain(db) == 0
+
+
+def test_dropping_a_partition_archives_the_rows_that_outlive_retention():
+    class RecordingSession:
+        def __init__(self):
+            self.statements = []
+            self.committed = False
+
+        def execute(self, statement):
+            self.statements.append(str(statement))
+            return SimpleNamespace(rowcount=3)
+
+        def commit(self):
+            self.committed = True
+
+    db = RecordingSession()
+
+    assert PartitionManager().drop_partition(db, "security_audit_logs", "security_audit_logs_p202601") == 3
+    assert db.statements == [
+        'INSERT INTO "security_audit_logs_archive" SELECT * FROM "security_audit_logs_p202601" WHERE is_sensitive',
+        'ALTER TABLE "security_audit_logs" DETACH PARTITION "security_audit_logs_p202601"',
+        'DROP TABLE "security_audit_logs_p202601"',
+    ]
+    assert db.committed
@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.models import Share
+from app.services.pdf_cache import PDFRenderCache, pdf_cache_key
+
+
+def make_share(**kwargs):
+    now = datetime.now(timezone.utc)
+    return Share(
+        id=uuid.uuid4(),
+        share_token=uuid.uuid4().hex,
+        title="Weekly summary",
+        content={
+            "answers": [{"question_text": "How did you sleep?", "answer": "Well", "confidence": 0.9}],
+            "template_info": {"template_id": "t", "name": "Sleep", "version": "1.0"},
+            "generation_metadata": {},
+            "target_language": "en",
+            "entry_count": 3,
+        },
+        template_id="t",
+        target_language="en",
+        user_id=uuid.uuid4(),
+        created_at=now,
+        updated_at=now,
+        **kwargs
+    )
+
+
+class TestPDFRenderCache:
+
+    def test_key_changes_with_share_updates(self):
+        share = make_share()
+        key = pdf_cache_key(share)
+
+        assert pdf_cache_key(share) == key
+        share.updated_at = datetime.now(timezone.utc).replace(year=2030)
+        assert pdf_cache_key(share) != key
+
+    @pytest.mark.asyncio
+    async def test_concurrent_downloads_render_once(self):
+        cache = PDFRenderCache(render_workers=0)
+        share = make_share()
+
+        with patch('app.services.pdf_cache._render_share_pdf', return_value=b"%PDF-1.4 test") as render:
+            results = await asyncio.gather(*(cache.get_or_render(share) for _ in range(5)))
+            again = await cache.get_or_render(share)
+
+        assert render.call_count == 1
+        assert all(result.content == b"%PDF-1.4 test" for result in results)
+        assert again.content == b"%PDF-1.4 test"
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_serves_files_within_budget(self, tmp_path):
+        cache = PDFRenderCache(directory=str(tmp_path), max_disk_bytes=2 * 1024 * 1024, render_workers=0)
+        share = make_share()
+
+        rendered = await cache.get_or_render(share)
+        cached = cache.get(pdf_cache_key(share))
+
+        assert rendered.path == cached.path
+        assert cached.path.read_bytes().startswith(b"%PDF")
+
+        cache.max_disk_bytes = 0
+        cache.put("other", b"%PDF-1.4 other")
+        assert list(tmp_path.glob("*.pdf")) == []
@@ -0,0 +1,69 @@
+import pytest
+
+from app.services.prompt_budget import PromptPlanner, TokenCounter, estimate_tokens
+
+
+def make_entries(count, chars):
+    return [{"entry_date": f"2025-01-{i + 1:02d}", "content": "x" * chars} for i in range(count)]
+
+
+class TestPromptPlanner:
+
+    def test_non_ascii_text_is_not_underestimated(self):
+        assert estimate_tokens("abcd" * 10) == 10
+        assert estimate_tokens("日記" * 10) == 20
+
+    @pytest.mark.asyncio
+    async def test_plan_picks_strategy_up_front(self):
+        planner = PromptPlanner(TokenCounter(), input_token_budget=2000)
+        questions = [{"id": f"q{i}", "text": "How was it?"} for i in range(40)]
+
+        single = await planner.plan(make_entries(3, 400), questions[:5])
+        batched = await planner.plan(make_entries(3, 400), questions)
+        map_reduce = await planner.plan(make_entries(30, 400), questions[:5])
+
+        assert single.strategy == "single"
+        assert batched.strategy == "batched"
+        assert sum(len(batch) for batch in batched.question_batches) == 40
+        assert batched.batch_size <= planner.max_questions_per_call
+        assert map_reduce.strategy == "map_reduce"
+
+    @pytest.mark.asyncio
+    async def test_token_counts_are_cached_per_text(self):
+        calls = []
+
+        async def count_fn(text):
+            calls.append(text)
+            return len(text)
+
+        counter = TokenCounter(count_fn)
+
+        first = await counter.count_many(["alpha", "beta", "alpha"])
+        second = await counter.count_many(["alpha", "beta"])
+
+        assert first == [5, 4, 5]
+        assert second == [5, 4]
+        assert sorted(set(calls)) == ["alpha", "beta"]
+        assert len(calls) <= 3
+
+    def test_fit_entries_keeps_most_recent_within_budget(self):
+        planner = PromptPlanner(TokenCounter(), input_token_budget=1000)
+        entries = make_entries(10, 400)
+
+        fitted = planner.fit_entries(entries)
+
+        assert 0 < len(fitted) < 10
+        assert fitted == entries[-len(fitted):]
+
+    @pytest.mark.asyncio
+    async def test_fit_entries_uses_the_counts_plan_measured(self):
+        async def count_fn(text):
+            return 300
+
+        planner = PromptPlanner(TokenCounter(count_fn), input_token_budget=1000)
+        entries = make_entries(10, 400)
+
+        plan = await planner.plan(entries, [])
+
+        assert plan.entry_tokens == 3000
+        assert planner.fit_entries(entries) == entries[-1:]
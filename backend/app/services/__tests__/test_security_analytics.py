@@ -0,0 +1,52 @@
+import pytest
+
+from app.models import SecurityAuditLog
+from app.services.audit_service import AuditLogWriter, SecurityAuditService
+from app.services.security_analytics import AttackPattern, SecurityAnalytics
+
+TABLES = [SecurityAuditLog]
+
+
+@pytest.fixture
+def analytics(db, monkeypatch):
+    monkeypatch.setattr(SecurityAnalytics, "start_analytics", lambda self: None)
+    analytics = SecurityAnalytics(db)
+    # Detections are logged as events too; keep them out of these counts
+    monkeypatch.setattr(analytics, "_log_pattern_detection", lambda event, patterns: None)
+    return analytics
+
+
+def _log_failures(db, count):
+    audit = SecurityAuditService(AuditLogWriter(signing_key="test-key"))
+    for _ in range(count):
+        audit.log_event(
+            db,
+            event_type="user_login_failure",
+            event_category="auth",
+            severity="warning",
+            message="login failed",
+            user_id="user-1",
+            ip_address="10.0.0.1",
+            success=False
+        )
+
+
+def test_each_tick_analyzes_only_new_events(db, analytics):
+    _log_failures(db, 3)
+    analytics._analyze_security_events()
+
+    assert analytics.security_metrics['total_events_analyzed'] == 3
+    assert analytics.last_sequence == 3
+    assert not any(event.patterns for event in analytics.recent_events)
+
+    analytics._analyze_security_events()
+    assert analytics.security_metrics['total_events_analyzed'] == 3
+
+    _log_failures(db, 2)
+    analytics._analyze_security_events()
+
+    assert analytics.security_metrics['total_events_analyzed'] == 5
+    assert len(analytics.recent_events) == 5
+    # Window state carries over between ticks: the fifth failure trips the rule
+    assert analytics.recent_events[-1].patterns == [AttackPattern.BRUTE_FORCE]
+    assert analytics.recent_events[-2].patterns == []
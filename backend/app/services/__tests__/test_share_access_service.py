@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.models import Share, ShareAccess
+from app.services.pdf_cache import PDFRenderCache
+from app.services.share_access_service import PublicShareCache, ShareAccessBuffer
+
+TABLES = [Share, ShareAccess]
+
+
+def make_share(db=None, **kwargs):
+    share = Share(
+        id=uuid.uuid4(),
+        share_token=uuid.uuid4().hex,
+        title="Weekly summary",
+        content={
+            "answers": [],
+            "template_info": {"template_id": "t"},
+            "generation_metadata": {},
+            "generated_at": "2025-01-01T00:00:00+00:00",
+            "source_language": "en",
+            "target_language": "en",
+            "entry_count": 0,
+        },
+        template_id="t",
+        user_id=uuid.uuid4(),
+        **kwargs
+    )
+    if db is not None:
+        db.add(share)
+        db.commit()
+    return share
+
+
+class TestShareAccessService:
+
+    def test_flush_writes_events_with_one_counter_update_per_share(self, db):
+        first = make_share(db)
+        second = make_share(db)
+        buffer = ShareAccessBuffer()
+
+        for _ in range(3):
+            buffer.record(first.id, ip_address="10.0.0.1", user_agent="agent")
+        buffer.record(second.id, access_type="download")
+
+        assert db.query(ShareAccess).count() == 0
+        assert buffer.flush(db) == 4
+        assert buffer.flush(db) == 0
+
+        db.expire_all()
+        assert first.access_count == 3
+        assert second.access_count == 1
+        assert first.last_accessed_at is not None
+        assert db.query(ShareAccess).filter(ShareAccess.access_type == "download").count() == 1
+        assert db.query(ShareAccess).filter(ShareAccess.ip_address_hash.isnot(None)).count() == 3
+
+    def test_events_of_deleted_shares_are_discarded(self, db):
+        share = make_share(db)
+        # Only share_access -> shares is checked (the users table is not created here)
+        db.execute(text("PRAGMA foreign_keys=ON"))
+        buffer = ShareAccessBuffer(max_pending=10, max_buffered=10)
+
+        buffer.record(share.id)
+        buffer.record(uuid.uuid4())
+
+        assert buffer.flush(db) == 1
+        assert buffer.pending == 0
+        assert db.query(ShareAccess).count() == 1
+
+        for _ in range(12):
+            buffer.record(share.id)
+        assert buffer.pending == 10
+        assert buffer.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_download_flush_keeps_cached_pdf(self, db):
+        share = make_share(db, updated_at=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        buffer = ShareAccessBuffer()
+        cache = PDFRenderCache(render_workers=0)
+
+        with patch('app.services.pdf_cache._render_share_pdf', return_value=b"%PDF-1.4 test") as render:
+            await cache.get_or_render(share)
+            buffer.record(share.id, access_type="download")
+            buffer.flush(db)
+            db.refresh(share)
+            await cache.get_or_render(share)
+
+        assert share.access_count == 1
+        assert render.call_count == 1
+
+    def test_cache_serves_rendered_share_until_invalidated(self):
+        share = make_share(created_at=datetime.now(timezone.utc), expires_at=datetime.now(timezone.utc) + timedelta(days=1))
+        cache = PublicShareCache(ttl_seconds=60)
+
+        assert cache.get(share.share_token) is None
+        cache.put(share)
+        cached = cache.get(share.share_token)
+
+        assert cached.share_id == share.id
+        assert b'"title":"Weekly summary"' in cached.body
+
+        cache.invalidate(share.share_token)
+        assert cache.get(share.share_token) is None
+
+    def test_share_past_expiry_is_not_cached(self):
+        share = make_share(created_at=datetime.now(timezone.utc), expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        cache = PublicShareCache(ttl_seconds=60)
+
+        cache.put(share)
+
+        assert cache.get(share.share_token) is None
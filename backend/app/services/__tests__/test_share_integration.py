@@ -221,6 +221,49 @@ class TestShareIntegration:
         print(f"✅ Template validation successful: {wellness_template['name']}")
         print(f"✅ Template has {len(wellness_template['questions'])} questions")
 
+    @pytest.mark.asyncio
+    async def test_stream_share_emits_answers_before_completion(self):
+        """Answers are streamed as Gemini produces them, followed by the persisted share."""
+        import uuid
+        from types import SimpleNamespace
+        from app.schemas.share import ShareCreateRequest
+        from app.services.gemini_service import QuestionAnswer, ShareSummaryResponse
+        from app.services.share_service import PreparedShare, share_service
+
+        questions = [{"id": "q1", "text": "Mood?"}, {"id": "q2", "text": "Sleep?"}]
+        answers = [
+            QuestionAnswer(question_id=q["id"], question_text=q["text"], answer=f"Answer {q['id']}", confidence=0.9)
+            for q in questions
+        ]
+
+        async def fake_generate(entries, template, target_language, on_progress=None):
+            await on_progress("stage", {"stage": "batching"})
+            for answer in answers:
+                await on_progress("answers", {"answers": [answer]})
+            return ShareSummaryResponse(answers=answers, source_language="en", target_language="en", entry_count=1)
+
+        now = datetime.now()
+        persisted = SimpleNamespace(
+            id=uuid.uuid4(), share_token="token", title="t", template_id="tpl", target_language="en",
+            entry_count=1, question_count=2, created_at=now, expires_at=None, access_count=0, is_active=True
+        )
+        prepared = PreparedShare(template=None, entries=[], entry_data=[{}], questions_list=questions, template_payload={})
+        request = ShareCreateRequest(template_id="tpl")
+
+        with patch("app.services.share_service.gemini_service.generate_share_summary", side_effect=fake_generate), \
+                patch("app.services.share_service.get_session_factory"), \
+                patch.object(share_service, "_persist_share", return_value=persisted):
+            events = [
+                event async for event in share_service.stream_share(
+                    user_id=uuid.uuid4(), request=request, prepared=prepared
+                )
+            ]
+
+        kinds = [event["event"] for event in events]
+        assert kinds == ["progress", "progress", "answer", "answer", "progress", "complete"]
+        assert [event["answer"]["question_id"] for event in events if event["event"] == "answer"] == ["q1", "q2"]
+        assert events[-1]["share"]["share_token"] == "token"
+
 
 if __name__ == "__main__":
     """
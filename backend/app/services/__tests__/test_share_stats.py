@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.models import Share
+from app.services.share_service import share_service
+
+TABLES = [Share]
+
+
+def test_share_stats_are_aggregated_without_loading_content(db):
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    for i in range(1200):
+        db.add(Share(
+            share_token=uuid.uuid4().hex,
+            title=f"Share {i}",
+            content={"answers": ["x" * 100]},
+            template_id="sleep" if i % 3 else "mood",
+            target_language="es" if i % 4 == 0 else "en",
+            user_id=user_id,
+            is_active=i % 10 != 0,
+            access_count=2,
+            expires_at=now - timedelta(days=1) if i % 5 == 1 else None,
+            created_at=now - timedelta(minutes=i),
+        ))
+    db.add(Share(share_token="other", title="Other", content={}, template_id="mood", user_id=uuid.uuid4()))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    stats = share_service.get_share_stats(db, user_id=user_id)
+
+    assert stats["total_shares"] == 1200
+    assert stats["active_shares"] == 1200 - 120 - 240
+    assert stats["total_accesses"] == 2400
+    assert stats["shares_by_template"] == {"mood": 400, "sleep": 800}
+    assert stats["shares_by_language"] == {"es": 300, "en": 900}
+    assert [item["title"] for item in stats["recent_activity"]] == [f"Share {i}" for i in range(10)]
+    assert len(statements) == 2
+    assert not any("content" in statement for statement in statements)
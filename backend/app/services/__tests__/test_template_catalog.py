@@ -0,0 +1,74 @@
+import pytest
+
+from app.api.v1.endpoints.share_templates import _etag_matches
+from app.models.share_template import ShareTemplate
+from app.schemas.share_template import ShareTemplateCreate, ShareTemplateUpdate
+from app.services.share_template_service import share_template_service
+from app.services.template_catalog import template_catalog
+
+TABLES = [ShareTemplate]
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    template_catalog.invalidate()
+    yield
+    template_catalog.invalidate()
+
+
+def make_template(template_id: str, category: str = "wellness") -> ShareTemplateCreate:
+    return ShareTemplateCreate(
+        template_id=template_id,
+        name=template_id.upper(),
+        category=category,
+        version="1.0",
+        questions=[{"id": "q1", "text": {"en": "How have you been sleeping?"}, "type": "open"}],
+    )
+
+
+class TestTemplateCatalog:
+
+    def test_catalog_is_loaded_once_and_invalidated_on_change(self, db):
+        share_template_service.create_template(db, obj_in=make_template("sleep"))
+        catalog = template_catalog.get(db)
+
+        # Rows written behind the service's back are not seen until invalidation
+        db.add(ShareTemplate(**make_template("mood").dict()))
+        db.commit()
+        assert template_catalog.get(db) is catalog
+        assert template_catalog.get_template(db, "mood") is None
+
+        template = share_template_service.get_by_template_id(db, template_id="sleep")
+        share_template_service.update_template(db, db_obj=template, obj_in=ShareTemplateUpdate(name="Sleep"))
+        updated = template_catalog.get(db)
+        assert updated.version != catalog.version
+        assert updated.get("sleep").name == "Sleep"
+        assert {t.template_id for t in updated.active("wellness")} == {"sleep", "mood"}
+
+        share_template_service.deactivate_template(db, template_id="mood")
+        assert [t.template_id for t in template_catalog.get(db).active()] == ["sleep"]
+        assert template_catalog.get_template(db, "mood").is_active is False
+
+    def test_load_overtaken_by_invalidation_is_not_kept(self, db, monkeypatch):
+        share_template_service.create_template(db, obj_in=make_template("sleep"))
+        load = template_catalog._load
+
+        def load_then_change(session):
+            catalog = load(session)
+            template = share_template_service.get_by_template_id(session, template_id="sleep")
+            share_template_service.update_template(session, db_obj=template, obj_in=ShareTemplateUpdate(name="Sleep"))
+            return catalog
+
+        monkeypatch.setattr(template_catalog, "_load", load_then_change)
+        assert template_catalog.get(db).get("sleep").name == "SLEEP"
+        monkeypatch.setattr(template_catalog, "_load", load)
+        assert template_catalog.get(db).get("sleep").name == "Sleep"
+
+    def test_etag_matching(self):
+        etag = '"abc123"'
+        assert _etag_matches('"abc123"', etag)
+        assert _etag_matches('W/"abc123"', etag)
+        assert _etag_matches('"old", "abc123"', etag)
+        assert _etag_matches("*", etag)
+        assert not _etag_matches('"old"', etag)
+        assert not _etag_matches(None, etag)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.template_extraction import TemplateExtraction
+from app.schemas.template_import import TemplateImportRequest
+from app.services.gemini_service import GeminiError, TemplateExtractionResponse
+from app.services.template_extraction_cache import template_extraction_cache
+from app.services.template_import_service import template_import_service
+
+TABLES = [TemplateExtraction]
+
+
+PARSED = {
+    "text": "1. How often do you feel tired?",
+    "metadata": {"page_count": 1},
+    "document_type": "pdf",
+    "filename": "phq9.pdf",
+    "word_count": 7,
+    "character_count": 31,
+}
+
+EXTRACTION = TemplateExtractionResponse(
+    template_id="phq-9",
+    name="PHQ-9",
+    questions=[{"id": "q1", "text": {"en": "How often do you feel tired?"}, "type": "open"}],
+    extraction_confidence=0.9,
+)
+
+
+async def run_import(db, import_id):
+    return await template_import_service.extract_template(
+        db,
+        import_id=import_id,
+        file_content=b"%PDF-1.4 questionnaire",
+        content_type="application/pdf",
+        filename="upload.pdf",
+        request_params=TemplateImportRequest()
+    )
+
+
+class TestTemplateExtractionCache:
+
+    @pytest.mark.asyncio
+    async def test_repeat_import_skips_parsing_and_gemini(self, db):
+        with patch("app.services.template_import_service.document_parser_service.parse_file_async",
+                   new=AsyncMock(return_value=dict(PARSED))) as parse, \
+             patch("app.services.template_import_service.gemini_service.extract_template_from_document",
+                   new=AsyncMock(return_value=EXTRACTION)) as extract:
+            first = await run_import(db, "import-1")
+            second = await run_import(db, "import-2")
+
+        assert parse.await_count == 1
+        assert extract.await_count == 1
+        assert second.questions == first.questions
+        assert second.document_info.filename == "upload.pdf"
+        assert second.extracted_template["template_id"] != first.extracted_template["template_id"]
+        assert db.query(TemplateExtraction).one().hit_count == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_extraction_is_not_cached(self, db):
+        with patch("app.services.template_import_service.document_parser_service.parse_file_async",
+                   new=AsyncMock(return_value=dict(PARSED))) as parse, \
+             patch("app.services.template_import_service.gemini_service.extract_template_from_document",
+                   new=AsyncMock(side_effect=[GeminiError("unavailable"), EXTRACTION])) as extract:
+            fallback = await run_import(db, "import-1")
+            retried = await run_import(db, "import-2")
+
+        assert fallback.extraction_confidence == 0.3
+        assert retried.extraction_confidence == 0.9
+        assert parse.await_count == 1
+        assert extract.await_count == 2
+
+    def test_documents_unused_past_retention_are_swept(self, db):
+        now = datetime.now(timezone.utc)
+        for digest, last_used_at in (("stale", now - timedelta(days=400)), ("recent", now - timedelta(days=1))):
+            db.add(TemplateExtraction(
+                document_digest=digest, document_type="pdf", parsed_document={}, last_used_at=last_used_at
+            ))
+        db.commit()
+
+        assert template_extraction_cache.cleanup_unused(db) == 1
+        assert [row.document_digest for row in db.query(TemplateExtraction).all()] == ["recent"]
@@ -1,39 +1,626 @@
 """
-Audit Service - DISABLED in PBI-4 Stage 2
+Security audit logging.
 
-This service was disabled when secret-tag schema was removed.
-The SecurityAuditLog, SecurityMetrics, and SecurityAlert models no longer exist after Stage 2 cleanup.
+``SecurityAuditService.log_event`` never touches the database: events are
+hashed for privacy, stamped and appended to a bounded in-memory buffer that a
+background writer drains with multi-row inserts into ``security_audit_logs``.
+Each batch is hash-chained while it is written (``log_signature`` is an HMAC
+over the event and the previous row's signature, in ``sequence`` order) under
+a transaction-level advisory lock, so several instances share one chain.
+
+When the buffer is full, a critical event is written on its own, synchronously,
+and other events are dropped and counted. When the writer is not running (tests,
+scripts) events are written as they are logged.
 """
 
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import json
 import logging
+import threading
+import uuid
+from collections import deque
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Union
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.session_factory import get_session_factory
+from ..models.security_audit_log import SecurityAuditLog
+from .expiry_sweeper import sweep_in_batches
+from .partition_service import partition_manager
 
 logger = logging.getLogger(__name__)
 
+# Serializes chain extension across writers (pg_advisory_xact_lock key)
+AUDIT_CHAIN_LOCK_KEY = 0x61756469  # "audi"
+
+# Fields covered by log_signature, in signing order
+SIGNED_FIELDS = (
+    "id", "sequence", "timestamp", "event_type", "event_category", "severity",
+    "user_id_hash", "session_id_hash", "correlation_id", "request_id",
+    "ip_address_hash", "user_agent_hash", "event_data", "event_message",
+    "is_sensitive", "success", "error_code", "processing_time_ms",
+)
+
+_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("audit_correlation_id", default=None)
+
+
 class AuditServiceError(Exception):
     """Exception raised by audit service operations."""
     pass
 
+
 class AuditIntegrityError(AuditServiceError):
     """Exception raised during audit integrity operations."""
     pass
 
-class SecurityAuditService:
-    """Disabled audit service - security audit functionality removed."""
-    
-    def __init__(self, *args, **kwargs):
-        logger.warning("Audit service is disabled - SecurityAuditLog models removed in PBI-4 Stage 2")
-    
-    def log_security_event(self, *args, **kwargs):
-        """Log security events - disabled, returns None."""
+
+def _hash_identifier(value: Optional[Any]) -> Optional[str]:
+    """Hash identifiers (user, session, IP, user agent) for privacy"""
+    if value is None or value == "":
+        return None
+    return hashlib.sha256(str(value).encode()).hexdigest()
+
+
+def _as_uuid(value: Optional[Union[str, uuid.UUID]]) -> Optional[uuid.UUID]:
+    """Coerce correlation/request ids to UUIDs; free-form ids map to a stable uuid5"""
+    if value is None or value == "":
         return None
-    
-    def get_audit_logs(self, *args, **kwargs):
-        """Get audit logs - disabled, returns empty list."""
-        return []
-    
-    def generate_security_report(self, *args, **kwargs):
-        """Generate security report - disabled, returns empty report."""
-        return {"status": "disabled", "message": "Audit service disabled in PBI-4 Stage 2"}
-
-# Create disabled service instance
-audit_service = SecurityAuditService()
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return uuid.uuid5(uuid.NAMESPACE_OID, str(value))
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def sign_event(key: bytes, previous_signature: str, event: Dict[str, Any]) -> str:
+    """
+    Compute the chained signature of an audit event.
+
+    Args:
+        key: HMAC key
+        previous_signature: Signature of the previous event in the chain ("" for the first)
+        event: Column values of the event
+
+    Returns:
+        str: Hex HMAC-SHA256
+    """
+    payload = json.dumps(
+        [previous_signature] + [_canonical_value(event.get(name)) for name in SIGNED_FIELDS],
+        separators=(",", ":"),
+        default=str,
+    )
+    return hmac.new(key, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+@dataclass(frozen=True)
+class QueuedAuditEvent:
+    """Handle of an accepted audit event"""
+    id: str
+    correlation_id: Optional[str]
+    timestamp: datetime
+
+
+class AuditLogWriter:
+    """Bounded buffer of audit events drained by a background batch writer."""
+
+    def __init__(
+        self,
+        signing_key: str,
+        max_pending: int = 10000,
+        flush_interval: float = 1.0,
+        batch_size: int = 500
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            signing_key: Key of the integrity chain HMAC
+            max_pending: Buffer capacity
+            flush_interval: Seconds between background flushes
+            batch_size: Events per insert statement and transaction
+        """
+        self.signing_key = signing_key.encode("utf-8")
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered events"""
+        return len(self._pending)
+
+    @property
+    def running(self) -> bool:
+        """Whether the background writer is active"""
+        return self._task is not None and not self._task.done()
+
+    def submit(self, event: Dict[str, Any], critical: bool = False) -> bool:
+        """
+        Buffer an event for the next batch.
+
+        Synchronous writes use a session of their own, so committing or
+        rolling back the audit batch never touches the caller's transaction.
+
+        Args:
+            event: Column values of the event
+            critical: Write this event synchronously instead of dropping it when the buffer is full
+
+        Returns:
+            bool: False if the event was dropped
+        """
+        with self._lock:
+            accepted = len(self._pending) < self.max_pending
+            if accepted:
+                self._pending.append(event)
+            pending = len(self._pending)
+
+        if not accepted:
+            if critical:
+                # Backpressure: write this event alone, the backlog stays with the writer
+                self._write_now(event)
+                return True
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Audit buffer full, {self.dropped} events dropped so far")
+            return False
+
+        if not self.running:
+            self._flush_now()
+        elif critical or pending >= self.batch_size:
+            self._request_flush()
+        return True
+
+    def _write_now(self, event: Dict[str, Any]) -> None:
+        try:
+            with get_session_factory().get_session_context() as session:
+                self._write_batch(session, [event])
+            self.written += 1
+        except Exception as e:
+            with self._lock:
+                self._pending.appendleft(event)
+            logger.error(f"Synchronous audit write failed, event stays buffered: {e}")
+        self._request_flush()
+
+    def _flush_now(self) -> None:
+        try:
+            self.flush_pending()
+        except Exception as e:
+            logger.error(f"Synchronous audit write failed, events stay buffered: {e}")
+
+    def flush(self, db: Session) -> int:
+        """
+        Write buffered events in chained batches.
+
+        Events of a failed batch are put back at the head of the buffer.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of events written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(len(self._pending), self.batch_size)
+                    events = [self._pending.popleft() for _ in range(count)]
+                if not events:
+                    break
+
+                try:
+                    self._write_batch(db, events)
+                except Exception as e:
+                    db.rollback()
+                    with self._lock:
+                        self._pending.extendleft(reversed(events))
+                    self.last_error = str(e)
+                    raise
+                written += len(events)
+
+        if written:
+            self.written += written
+            self.last_flush_at = datetime.now(timezone.utc)
+            self.last_error = None
+            logger.debug(f"Wrote {written} audit events")
+        return written
+
+    def _write_batch(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": AUDIT_CHAIN_LOCK_KEY})
+
+        last = db.execute(
+            select(SecurityAuditLog.sequence, SecurityAuditLog.log_signature)
+            .where(SecurityAuditLog.sequence.isnot(None))
+            .order_by(SecurityAuditLog.sequence.desc())
+            .limit(1)
+        ).first()
+        sequence, previous = (last[0], last[1] or "") if last else (0, "")
+
+        rows = []
+        for event in events:
+            sequence += 1
+            row = dict(event, sequence=sequence, previous_signature=previous)
+            row["log_signature"] = sign_event(self.signing_key, previous, row)
+            previous = row["log_signature"]
+            rows.append(row)
+
+        db.execute(insert(SecurityAuditLog), rows)
+        db.commit()
+
+    def flush_pending(self) -> int:
+        """Flush buffered events in a new session."""
+        with get_session_factory().get_session_context() as db:
+            return self.flush(db)
+
+    def _request_flush(self) -> None:
+        # Called from request threads; wake the writer on its own loop
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run_forever(self) -> None:
+        """Write buffered events until cancelled"""
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+
+            if not self.pending:
+                continue
+            try:
+                await asyncio.to_thread(self.flush_pending)
+            except Exception as e:
+                logger.error(f"Audit flush failed, retrying later: {e}")
+
+    def start(self) -> asyncio.Task:
+        """Start the background writer"""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background writer and write what is left"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._loop = None
+        if not self.pending:
+            return
+
+        try:
+            await asyncio.to_thread(self.flush_pending)
+        except Exception as e:
+            logger.error(f"Final audit flush failed, {self.pending} events lost: {e}")
+
+
+class SecurityAuditService:
+    """Security audit logging through the shared batch writer."""
+
+    # Event types used by services
+    EVENT_SYSTEM_ERROR = "system_error"
+    EVENT_SYSTEM_MAINTENANCE = "system_maintenance"
+
+    # Privacy settings
+    HASH_USER_IDS = True
+    HASH_IP_ADDRESSES = True
+    HASH_USER_AGENTS = True
+
+    AUTH_FAILURE_EVENT_TYPES = ("opaque_login_finish", "login_failed", "auth_failure")
+
+    def __init__(self, writer: Optional["AuditLogWriter"] = None):
+        self.writer = writer or audit_log_writer
+
+    @contextmanager
+    def audit_context(self, correlation_id: Optional[str] = None) -> Iterator[str]:
+        """Tag events logged inside the block with a correlation id"""
+        correlation_id = correlation_id or str(uuid.uuid4())
+        token = _correlation_id.set(correlation_id)
+        try:
+            yield correlation_id
+        finally:
+            _correlation_id.reset(token)
+
+    def log_event(
+        self,
+        db: Optional[Session] = None,
+        *,
+        event_type: str,
+        event_category: str,
+        severity: str,
+        message: str,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        event_data: Optional[Dict[str, Any]] = None,
+        success: Optional[bool] = None,
+        error_code: Optional[str] = None,
+        processing_time_ms: Optional[int] = None,
+        is_sensitive: bool = False,
+        user_id_hash: Optional[str] = None,
+        ip_address_hash: Optional[str] = None
+    ) -> Optional[QueuedAuditEvent]:
+        """
+        Queue an audit event; nothing is written on the calling path.
+
+        Args:
+            db: Caller's session; unused, fallback writes open their own session
+            event_type: Type of event
+            event_category: auth, session, security, system, ...
+            severity: info, warning, error or critical
+            message: Human-readable message
+            user_id: User identifier (stored hashed)
+            session_id: Session identifier (stored hashed)
+            correlation_id: Correlation id (defaults to the audit context's)
+            request_id: Request identifier
+            ip_address: Client IP address (stored hashed)
+            user_agent: Client user agent (stored hashed)
+            event_data: Additional JSON-serializable data
+            success: Whether the event represents success
+            error_code: Error code if applicable
+            processing_time_ms: Processing time
+            is_sensitive: Whether the event contains sensitive information
+            user_id_hash: Already hashed user identifier, stored as given (instead of user_id)
+            ip_address_hash: Already hashed IP address, stored as given (instead of ip_address)
+
+        Returns:
+            Optional[QueuedAuditEvent]: Handle of the event, or None if it was dropped
+        """
+        correlation_id = correlation_id or _correlation_id.get()
+        event = {
+            "id": uuid.uuid4(),
+            "timestamp": datetime.now(timezone.utc),
+            "event_type": event_type[:50],
+            "event_category": event_category[:30],
+            "severity": severity,
+            "user_id_hash": user_id_hash or (_hash_identifier(user_id) if self.HASH_USER_IDS else user_id),
+            "session_id_hash": _hash_identifier(session_id),
+            "correlation_id": _as_uuid(correlation_id),
+            "request_id": _as_uuid(request_id),
+            "ip_address_hash": ip_address_hash or (_hash_identifier(ip_address) if self.HASH_IP_ADDRESSES else ip_address),
+            "user_agent_hash": _hash_identifier(user_agent) if self.HASH_USER_AGENTS else user_agent,
+            "event_data": json.dumps(event_data, default=str) if event_data is not None else None,
+            "event_message": message[:500],
+            "is_sensitive": is_sensitive,
+            "success": success,
+            "error_code": error_code,
+            "processing_time_ms": processing_time_ms,
+        }
+
+        if not self.writer.submit(event, critical=severity == "critical"):
+            return None
+        return QueuedAuditEvent(
+            id=str(event["id"]),
+            correlation_id=str(event["correlation_id"]) if event["correlation_id"] else None,
+            timestamp=event["timestamp"]
+        )
+
+    def log_security_event(
+        self,
+        db: Optional[Session] = None,
+        *,
+        event_type: str,
+        user_id: Optional[str] = None,
+        success: Optional[bool] = None,
+        correlation_id: Optional[str] = None,
+        additional_data: Optional[Dict[str, Any]] = None,
+        severity: Optional[str] = None
+    ) -> Optional[QueuedAuditEvent]:
+        """Queue a system/security event (maintenance, errors)"""
+        return self.log_event(
+            db,
+            event_type=event_type,
+            event_category="system",
+            severity=severity or ("info" if success is not False else "error"),
+            message=event_type.replace("_", " "),
+            user_id=user_id,
+            correlation_id=correlation_id,
+            event_data=additional_data,
+            success=success
+        )
+
+    def get_audit_logs(
+        self,
+        db: Session,
+        *,
+        user_id: Optional[str] = None,
+        event_category: Optional[str] = None,
+        event_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[SecurityAuditLog]:
+        """
+        Get audit logs, newest first.
+
+        Filtering on time lets Postgres prune to the matching monthly partitions.
+
+        Returns:
+            List[SecurityAuditLog]: Matching entries
+        """
+        query = db.query(SecurityAuditLog)
+        if user_id:
+            query = query.filter(SecurityAuditLog.user_id_hash == _hash_identifier(user_id))
+        if event_category:
+            query = query.filter(SecurityAuditLog.event_category == event_category)
+        if event_type:
+            query = query.filter(SecurityAuditLog.event_type == event_type)
+        if severity:
+            query = query.filter(SecurityAuditLog.severity == severity)
+        if start_time:
+            query = query.filter(SecurityAuditLog.timestamp >= start_time)
+        if end_time:
+            query = query.filter(SecurityAuditLog.timestamp <= end_time)
+
+        return query.order_by(SecurityAuditLog.timestamp.desc()).offset(offset).limit(limit).all()
+
+    def verify_log_integrity(self, db: Session, log_id: Union[str, uuid.UUID]) -> bool:
+        """
+        Verify an entry's signature and its link to the previous entry.
+
+        A previous entry removed by retention is not treated as a break.
+
+        Raises:
+            AuditIntegrityError: If the entry does not exist
+        """
+        log = db.get(SecurityAuditLog, _as_uuid(log_id))
+        if log is None:
+            raise AuditIntegrityError(f"Audit log {log_id} not found")
+        if log.sequence is None or log.log_signature is None:
+            return False
+
+        values = {name: getattr(log, name) for name in SIGNED_FIELDS}
+        expected = sign_event(self.writer.signing_key, log.previous_signature or "", values)
+        if not hmac.compare_digest(expected, log.log_signature):
+            return False
+
+        if log.sequence > 1:
+            previous = db.execute(
+                select(SecurityAuditLog.log_signature).where(SecurityAuditLog.sequence == log.sequence - 1)
+            ).scalar()
+            if previous is not None and previous != log.previous_signature:
+                return False
+        return True
+
+    def detect_brute_force_attack(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        ip_address: Optional[str] = None,
+        time_window_minutes: int = 15,
+        failure_threshold: int = 5
+    ) -> bool:
+        """Whether a user (optionally from one IP) has too many recent authentication failures"""
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=time_window_minutes)
+        query = db.query(SecurityAuditLog.id).filter(
+            SecurityAuditLog.timestamp >= cutoff,
+            SecurityAuditLog.event_category == "auth",
+            SecurityAuditLog.success.is_(False),
+            SecurityAuditLog.user_id_hash == _hash_identifier(user_id)
+        )
+        if ip_address:
+            query = query.filter(SecurityAuditLog.ip_address_hash == _hash_identifier(ip_address))
+        return query.limit(failure_threshold).count() >= failure_threshold
+
+    def cleanup_old_logs(self, db: Session, *, retention_days: int, batch_size: int = 1000) -> int:
+        """
+        Remove audit logs past retention.
+
+        Sensitive entries are always kept. Expired months are dropped as
+        whole partitions after their sensitive entries are moved to
+        security_audit_logs_archive; elsewhere (unpartitioned tables, the
+        default partition) non-sensitive rows are deleted in bounded batches.
+
+        Returns:
+            int: Number of entries removed
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        table = SecurityAuditLog.__tablename__
+        removed = 0
+        for name in partition_manager.expired_partitions(db, table, cutoff):
+            rows = db.execute(text(f'SELECT count(*) FROM "{name}"')).scalar() or 0
+            removed += rows - partition_manager.drop_partition(db, table, name)
+
+        def delete_batch(limit: int):
+            batch = (
+                select(SecurityAuditLog.id)
+                .where(SecurityAuditLog.timestamp < cutoff, SecurityAuditLog.is_sensitive.is_(False))
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            return (
+                SecurityAuditLog.__table__.delete()
+                .where(SecurityAuditLog.id.in_(batch.scalar_subquery()))
+                .returning(SecurityAuditLog.id)
+            )
+
+        return removed + sweep_in_batches(db, delete_batch, batch_size=batch_size).rows
+
+    def generate_security_report(
+        self, db: Session, *, start_time: Optional[datetime] = None, end_time: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Counts of events by category and severity over a time range (default: last 24h)"""
+        from sqlalchemy import func
+
+        end_time = end_time or datetime.now(timezone.utc)
+        start_time = start_time or end_time - timedelta(hours=24)
+        rows = db.execute(
+            select(SecurityAuditLog.event_category, SecurityAuditLog.severity, func.count())
+            .where(SecurityAuditLog.timestamp >= start_time, SecurityAuditLog.timestamp <= end_time)
+            .group_by(SecurityAuditLog.event_category, SecurityAuditLog.severity)
+        ).all()
+
+        by_category: Dict[str, int] = {}
+        by_severity: Dict[str, int] = {}
+        for category, severity, count in rows:
+            by_category[category] = by_category.get(category, 0) + count
+            by_severity[severity] = by_severity.get(severity, 0) + count
+        return {
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "total_events": sum(by_category.values()),
+            "events_by_category": by_category,
+            "events_by_severity": by_severity,
+        }
+
+    def get_service_health(self) -> Dict[str, Any]:
+        """Get writer health: buffer fill, drops and last flush."""
+        writer = self.writer
+        degraded = writer.last_error is not None or writer.pending >= writer.max_pending
+        return {
+            "status": "degraded" if degraded else "healthy",
+            "writer_running": writer.running,
+            "pending": writer.pending,
+            "max_pending": writer.max_pending,
+            "written": writer.written,
+            "dropped": writer.dropped,
+            "last_flush_at": writer.last_flush_at.isoformat() if writer.last_flush_at else None,
+            "last_error": writer.last_error,
+        }
+
+
+# Global instances
+audit_log_writer = AuditLogWriter(
+    signing_key=settings.SECRET_KEY,
+    max_pending=settings.AUDIT_BUFFER_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.AUDIT_BATCH_SIZE
+)
+audit_service = SecurityAuditService(audit_log_writer)
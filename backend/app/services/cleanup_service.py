@@ -12,13 +12,14 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text, func
+from sqlalchemy import delete, func, select, text
 from contextlib import contextmanager
 
-from app.models import User  # SecretTag, WrappedKey, OpaqueSession removed in PBI-4 Stage 2
+from app.models import OpaqueSession, User  # SecretTag, WrappedKey removed in PBI-4 Stage 2
 from app.services.session_service import session_service
 from app.services.vault_service import VaultService
 from app.services.audit_service import audit_service
+from app.services.expiry_sweeper import expiry_sweeper, sweep_in_batches
 from app.crypto.key_manager import SecureKeyStore, SessionKeyManager
 from app.crypto.secure_memory import SecureMemoryManager
 
@@ -45,7 +46,7 @@ class CleanupService:
     
     # Configuration constants
     DEFAULT_BATCH_SIZE = 100
-    DEFAULT_SESSION_RETENTION_DAYS = 7
+    DEFAULT_SESSION_RETENTION_DAYS = session_service.EXPIRED_SESSION_RETENTION_DAYS
     DEFAULT_AUDIT_LOG_RETENTION_DAYS = 90
     DEFAULT_VAULT_ORPHAN_DAYS = 30
     MAX_CLEANUP_DURATION_SECONDS = 300  # 5 minutes
@@ -147,35 +148,30 @@ class CleanupService:
                 # Calculate cutoff time for session retention
                 cutoff_time = datetime.now(timezone.utc) - timedelta(days=self.session_retention_days)
                 
-                # Clean up OPAQUE sessions in batches
-                while True:
-                    expired_sessions = self.db.query(OpaqueSession).filter(
-                        OpaqueSession.expires_at < cutoff_time
-                    ).limit(self.batch_size).all()
-                    
-                    if not expired_sessions:
-                        break
-                    
-                    batch_count = len(expired_sessions)
-                    session_ids = []
-                    
-                    # Collect session IDs and delete sessions
-                    for session in expired_sessions:
-                        session_ids.append(session.session_id)
-                        self.db.delete(session)
-                    
-                    # Clean up associated session keys
+                # Delete expired OPAQUE sessions in bounded, set-based batches
+                def delete_batch(limit: int):
+                    batch = (
+                        select(OpaqueSession.session_id)
+                        .where(OpaqueSession.expires_at < cutoff_time)
+                        .limit(limit)
+                        .with_for_update(skip_locked=True)
+                    )
+                    return (
+                        delete(OpaqueSession)
+                        .where(OpaqueSession.session_id.in_(batch.scalar_subquery()))
+                        .returning(OpaqueSession.session_id)
+                    )
+                
+                # Clean up associated session keys
+                def end_sessions(session_ids: List[str]) -> None:
                     for session_id in session_ids:
-                        keys_cleaned = self._session_key_manager.end_session(session_id)
-                        stats['session_keys'] += keys_cleaned
-                    
-                    self.db.commit()
-                    stats['opaque_sessions'] += batch_count
-                    
-                    logger.debug(f"Cleaned {batch_count} expired OPAQUE sessions")
-                    
-                    if batch_count < self.batch_size:
-                        break
+                        stats['session_keys'] += self._session_key_manager.end_session(session_id)
+                
+                result = sweep_in_batches(
+                    self.db, delete_batch, batch_size=self.batch_size, on_batch=end_sessions
+                )
+                stats['opaque_sessions'] = result.rows
+                logger.debug(f"Cleaned {result.rows} expired OPAQUE sessions in {result.batches} batches")
                 
                 # Clean up orphaned wrapped keys
                 orphaned_keys_cleaned = self._cleanup_orphaned_wrapped_keys()
@@ -290,8 +286,7 @@ class CleanupService:
             
             try:
                 # Clean up old audit logs
-                audit_cutoff = datetime.now(timezone.utc) - timedelta(days=self.audit_retention_days)
-                audit_logs_cleaned = self._cleanup_audit_logs(audit_cutoff)
+                audit_logs_cleaned = self._cleanup_audit_logs()
                 stats['audit_logs_cleaned'] = audit_logs_cleaned
                 
                 # Clean up other expired records
@@ -481,6 +476,7 @@ class CleanupService:
                     'audit_retention_days': self.audit_retention_days,
                     'vault_orphan_days': self.vault_orphan_days
                 },
+                'expiry_sweeps': expiry_sweeper.get_statistics(),
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
             
@@ -574,11 +570,9 @@ class CleanupService:
         # For now, return 0 as placeholder
         return 0
     
-    def _cleanup_audit_logs(self, cutoff_time: datetime) -> int:
-        """Clean up old audit logs."""
-        # This would be implemented based on audit service schema
-        # For now, return 0 as placeholder
-        return 0
+    def _cleanup_audit_logs(self) -> int:
+        """Remove audit logs past retention; returns rows removed."""
+        return self._audit_service.cleanup_old_logs(self.db, retention_days=self.audit_retention_days)
     
     def _cleanup_expired_database_records(self) -> int:
         """Clean up other expired database records."""
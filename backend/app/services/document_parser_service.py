@@ -1,7 +1,12 @@
+import asyncio
+import io
 import logging
-from typing import Dict, Any, Optional
-import tempfile
-from pathlib import Path
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from typing import Dict, Any, List, Optional, Set
+
+from ..core.config import settings
 
 # PDF parsing
 try:
@@ -26,10 +31,69 @@ class DocumentParsingError(Exception):
     pass
 
 
+def _limit_worker_memory(limit_mb: int) -> None:
+    """Parsing process setup: cap the address space a parse may add"""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        limit = current + limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, OSError, ValueError) as e:
+        logger.warning(f"Could not limit document parser memory: {e}")
+
+
+def _parse_in_worker(
+    conn: Connection,
+    max_pages: int,
+    max_chars: int,
+    memory_mb: int,
+    file_content: bytes,
+    content_type: str,
+    filename: str
+) -> None:
+    """Parsing process entry point; sends ``(True, result)`` or ``(False, error)``"""
+    _limit_worker_memory(memory_mb)
+    parser = DocumentParserService(max_pages=max_pages, max_chars=max_chars, parse_workers=0)
+    try:
+        conn.send((True, parser.parse_file(file_content, content_type, filename)))
+    except Exception as e:
+        conn.send((False, str(e)))
+    finally:
+        conn.close()
+
+
 class DocumentParserService:
     """Service for parsing text content from PDF and DOCX files"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_pages: int = 50,
+        max_chars: int = 20000,
+        parse_workers: int = 2,
+        timeout_seconds: float = 20.0,
+        worker_memory_mb: int = 512
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            max_pages: Pages read from a PDF at most
+            max_chars: Characters of text collected at most (the extraction
+                prompt uses far less)
+            parse_workers: Concurrent parsing processes (parse in a thread when 0)
+            timeout_seconds: Time a document may take to parse
+            worker_memory_mb: Memory a parsing process may add (0 for no limit)
+        """
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parse_workers = parse_workers
+        self.timeout_seconds = timeout_seconds
+        self.worker_memory_mb = worker_memory_mb
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._processes: Set[multiprocessing.process.BaseProcess] = set()
         self.supported_types = []
         
         if PdfReader:
@@ -77,55 +141,121 @@ class DocumentParserService:
             logger.error(f"Failed to parse document {filename}: {e}")
             raise DocumentParsingError(f"Document parsing failed: {e}")
 
+    async def parse_file_async(self, file_content: bytes, content_type: str, filename: str = "") -> Dict[str, Any]:
+        """
+        Parse an uploaded file off the event loop, in a parsing process.
+
+        Each document gets its own process, at most ``parse_workers`` at a
+        time. A parse still running after ``timeout_seconds`` is terminated,
+        so a hostile document cannot keep a CPU busy.
+
+        Args:
+            file_content: Raw file bytes
+            content_type: MIME type of the file
+            filename: Original filename (for type detection fallback)
+
+        Returns:
+            Dictionary with parsed content and metadata
+
+        Raises:
+            DocumentParsingError: If the document cannot be parsed in time
+        """
+        if self.parse_workers <= 0:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(self.parse_file, file_content, content_type, filename),
+                    timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                raise DocumentParsingError(f"Document parsing timed out after {self.timeout_seconds:.0f} seconds")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.parse_workers)
+        async with self._slots:
+            return await self._parse_in_process(file_content, content_type, filename)
+
+    async def _parse_in_process(self, file_content: bytes, content_type: str, filename: str) -> Dict[str, Any]:
+        """Parse in a dedicated process that is terminated if it overruns the timeout."""
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_parse_in_worker,
+            args=(sender, self.max_pages, self.max_chars, self.worker_memory_mb, file_content, content_type, filename),
+            daemon=True
+        )
+        process.start()
+        sender.close()
+        self._processes.add(process)
+        try:
+            if not await asyncio.to_thread(receiver.poll, self.timeout_seconds):
+                logger.warning(f"Parsing {filename} timed out, terminating its process")
+                raise DocumentParsingError(f"Document parsing timed out after {self.timeout_seconds:.0f} seconds")
+            try:
+                ok, payload = await asyncio.to_thread(receiver.recv)
+            except EOFError:
+                # The process died, e.g. by exceeding its memory limit
+                raise DocumentParsingError("Document parsing failed: parsing process exited unexpectedly")
+        finally:
+            receiver.close()
+            await asyncio.to_thread(self._stop_process, process)
+
+        if not ok:
+            raise DocumentParsingError(payload)
+        return payload
+
+    def _stop_process(self, process: multiprocessing.process.BaseProcess) -> None:
+        self._processes.discard(process)
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+
+    def shutdown(self) -> None:
+        """Stop the parsing processes."""
+        for process in list(self._processes):
+            self._stop_process(process)
+
     def _parse_pdf(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """Parse text content from PDF file"""
         if not PdfReader:
             raise DocumentParsingError("PDF parsing not available - pypdf not installed")
 
         try:
-            # Create temporary file for PDF processing
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-                
-                # Read PDF
-                reader = PdfReader(temp_file.name)
-                
-                # Extract metadata
-                metadata = {
-                    'page_count': len(reader.pages),
-                    'title': reader.metadata.title if reader.metadata else None,
-                    'author': reader.metadata.author if reader.metadata else None,
-                    'subject': reader.metadata.subject if reader.metadata else None,
-                }
-                
-                # Extract text from all pages
-                text_content = ""
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_content += f"\n--- Page {page_num + 1} ---\n"
-                            text_content += page_text
-                    except Exception as e:
-                        logger.warning(f"Failed to extract text from page {page_num + 1}: {e}")
-                        continue
-                
-                # Clean up temp file
-                Path(temp_file.name).unlink(missing_ok=True)
-                
-                if not text_content.strip():
-                    raise DocumentParsingError("No text content found in PDF")
-                
-                return {
-                    'text': text_content.strip(),
-                    'metadata': metadata,
-                    'document_type': 'pdf',
-                    'filename': filename,
-                    'word_count': len(text_content.split()),
-                    'character_count': len(text_content)
-                }
+            # Read PDF straight from memory; pages are parsed as they are accessed
+            reader = PdfReader(io.BytesIO(file_content))
+            page_count = len(reader.pages)
+            
+            # Extract metadata
+            metadata = {
+                'page_count': page_count,
+                'title': reader.metadata.title if reader.metadata else None,
+                'author': reader.metadata.author if reader.metadata else None,
+                'subject': reader.metadata.subject if reader.metadata else None,
+            }
+            
+            # Extract text page by page until the page or character budget is spent
+            parts: List[str] = []
+            char_count = 0
+            pages_read = 0
+            for page_num in range(min(page_count, self.max_pages)):
+                if char_count >= self.max_chars:
+                    break
+                pages_read += 1
+                try:
+                    page_text = reader.pages[page_num].extract_text()
+                except Exception as e:
+                    logger.warning(f"Failed to extract text from page {page_num + 1}: {e}")
+                    continue
+                if page_text:
+                    parts.append(f"\n--- Page {page_num + 1} ---\n")
+                    parts.append(page_text)
+                    char_count += len(page_text)
+            
+            metadata['pages_read'] = pages_read
+            metadata['truncated'] = pages_read < page_count or char_count > self.max_chars
+            return self._build_result(parts, metadata, 'pdf', filename)
                 
+        except DocumentParsingError:
+            raise
         except Exception as e:
             logger.error(f"PDF parsing error: {e}")
             raise DocumentParsingError(f"Failed to parse PDF: {e}")
@@ -136,61 +266,77 @@ class DocumentParserService:
             raise DocumentParsingError("DOCX parsing not available - python-docx not installed")
 
         try:
-            # Create temporary file for DOCX processing
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-                
-                # Read DOCX
-                doc = Document(temp_file.name)
-                
-                # Extract metadata
-                properties = doc.core_properties
-                metadata = {
-                    'title': properties.title,
-                    'author': properties.author,
-                    'subject': properties.subject,
-                    'created': properties.created.isoformat() if properties.created else None,
-                    'modified': properties.modified.isoformat() if properties.modified else None,
-                    'paragraph_count': len(doc.paragraphs)
-                }
-                
-                # Extract text from paragraphs
-                text_content = ""
-                for para in doc.paragraphs:
-                    if para.text.strip():
-                        text_content += para.text + "\n"
-                
-                # Extract text from tables
-                for table in doc.tables:
-                    text_content += "\n--- Table ---\n"
-                    for row in table.rows:
-                        row_text = []
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                row_text.append(cell.text.strip())
-                        if row_text:
-                            text_content += " | ".join(row_text) + "\n"
-                
-                # Clean up temp file
-                Path(temp_file.name).unlink(missing_ok=True)
-                
-                if not text_content.strip():
-                    raise DocumentParsingError("No text content found in DOCX")
-                
-                return {
-                    'text': text_content.strip(),
-                    'metadata': metadata,
-                    'document_type': 'docx',
-                    'filename': filename,
-                    'word_count': len(text_content.split()),
-                    'character_count': len(text_content)
-                }
+            # Read DOCX straight from memory
+            doc = Document(io.BytesIO(file_content))
+            paragraphs = doc.paragraphs
+            
+            # Extract metadata
+            properties = doc.core_properties
+            metadata = {
+                'title': properties.title,
+                'author': properties.author,
+                'subject': properties.subject,
+                'created': properties.created.isoformat() if properties.created else None,
+                'modified': properties.modified.isoformat() if properties.modified else None,
+                'paragraph_count': len(paragraphs)
+            }
+            
+            parts: List[str] = []
+            char_count = 0
+            
+            # Extract text from paragraphs
+            for para in paragraphs:
+                if char_count >= self.max_chars:
+                    break
+                if para.text.strip():
+                    parts.append(para.text + "\n")
+                    char_count += len(para.text) + 1
+            
+            # Extract text from tables
+            for table in doc.tables:
+                if char_count >= self.max_chars:
+                    break
+                parts.append("\n--- Table ---\n")
+                for row in table.rows:
+                    row_text = []
+                    for cell in row.cells:
+                        if cell.text.strip():
+                            row_text.append(cell.text.strip())
+                    if row_text:
+                        line = " | ".join(row_text) + "\n"
+                        parts.append(line)
+                        char_count += len(line)
+            
+            metadata['truncated'] = char_count >= self.max_chars
+            return self._build_result(parts, metadata, 'docx', filename)
                 
+        except DocumentParsingError:
+            raise
         except Exception as e:
             logger.error(f"DOCX parsing error: {e}")
             raise DocumentParsingError(f"Failed to parse DOCX: {e}")
 
+    def _build_result(
+        self,
+        parts: List[str],
+        metadata: Dict[str, Any],
+        document_type: str,
+        filename: str
+    ) -> Dict[str, Any]:
+        """Join extracted text (capped at ``max_chars``) into the parse result"""
+        text_content = "".join(parts).strip()[:self.max_chars]
+        if not text_content:
+            raise DocumentParsingError(f"No text content found in {document_type.upper()}")
+        
+        return {
+            'text': text_content,
+            'metadata': metadata,
+            'document_type': document_type,
+            'filename': filename,
+            'word_count': len(text_content.split()),
+            'character_count': len(text_content)
+        }
+
     def validate_file_size(self, file_content: bytes, max_size_mb: int = 10) -> bool:
         """Validate file size is within limits"""
         size_mb = len(file_content) / (1024 * 1024)
@@ -208,4 +354,10 @@ class DocumentParserService:
 
 
 # Create service instance
-document_parser_service = DocumentParserService()
+document_parser_service = DocumentParserService(
+    max_pages=settings.DOCUMENT_PARSE_MAX_PAGES,
+    max_chars=settings.DOCUMENT_PARSE_MAX_CHARS,
+    parse_workers=settings.DOCUMENT_PARSE_WORKERS,
+    timeout_seconds=settings.DOCUMENT_PARSE_TIMEOUT_SECONDS,
+    worker_memory_mb=settings.DOCUMENT_PARSE_MEMORY_MB
+)
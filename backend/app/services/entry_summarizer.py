@@ -0,0 +1,219 @@
+"""
+Hierarchical map-reduce summarization of journal entries.
+
+Entry sets too large for a single prompt are split, in chronological order,
+into chunks that fit a token budget. Chunks are summarized concurrently
+(map) and the partial summaries are merged in small groups, level by level,
+until one summary remains (reduce), so the model input stays bounded however
+long the date range is and latency grows with the depth of the tree rather
+than the number of entries. Every chunk and merge result is cached under a
+digest of its inputs: extending a date range only summarizes the new chunks.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .prompt_budget import estimate_tokens, format_entry
+from .summary_cache import SUMMARY_PROMPT_VERSION, SummaryCache
+
+logger = logging.getLogger(__name__)
+
+# Input budget of one map call and number of summaries merged per reduce call
+CHUNK_TOKEN_BUDGET = 6000
+REDUCE_FAN_IN = 6
+
+# Output budgets of chunk and intermediate summaries, and of the final merge
+PARTIAL_SUMMARY_TOKENS = 600
+FINAL_SUMMARY_TOKENS = 800
+
+# (prompt, max_output_tokens) -> generated text
+TextGenerator = Callable[[str, int], Awaitable[str]]
+
+
+def chunk_entries(entries: List[Dict[str, Any]], token_budget: int = CHUNK_TOKEN_BUDGET) -> List[List[str]]:
+    """
+    Split entries into chronological chunks that each fit the token budget.
+
+    Chunks are filled greedily from the oldest entry, so appending newer
+    entries leaves the boundaries (and cache keys) of earlier chunks intact.
+
+    Args:
+        entries: Journal entries with content, entry_date and title
+        token_budget: Maximum estimated tokens per chunk
+
+    Returns:
+        List[List[str]]: Rendered entries grouped by chunk
+    """
+    ordered = sorted(
+        (entry for entry in entries if (entry.get('content') or '').strip()),
+        key=lambda entry: str(entry.get('entry_date') or '')
+    )
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for entry in ordered:
+        text = format_entry(entry, token_budget)
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class EntrySummarizer:
+    """Summarize arbitrarily many entries within fixed model input limits."""
+
+    def __init__(
+        self,
+        generate: TextGenerator,
+        cache: SummaryCache,
+        *,
+        model_name: str,
+        chunk_token_budget: int = CHUNK_TOKEN_BUDGET,
+        reduce_fan_in: int = REDUCE_FAN_IN,
+        max_concurrency: int = 4
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            generate: Coroutine producing plain text for a prompt
+            cache: Cache for chunk and merge summaries
+            model_name: Model used by ``generate`` (part of the cache key)
+            chunk_token_budget: Input budget of one map call
+            reduce_fan_in: Number of summaries merged per reduce call
+            max_concurrency: Maximum concurrent model calls
+        """
+        self.generate = generate
+        self.cache = cache
+        self.model_name = model_name
+        self.chunk_token_budget = chunk_token_budget
+        self.reduce_fan_in = max(reduce_fan_in, 2)
+        self.max_concurrency = max_concurrency
+
+    async def summarize(self, entries: List[Dict[str, Any]], target_language: str) -> str:
+        """
+        Summarize all entries into a single bullet list.
+
+        Args:
+            entries: Journal entries (content, entry_date, title)
+            target_language: Language of the summary
+
+        Returns:
+            str: Summary text, or an empty string if nothing could be summarized
+        """
+        chunks = chunk_entries(entries, self.chunk_token_budget)
+        if not chunks:
+            return ""
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # One cap for every chunk, so a chunk's cached summary is reused
+        # whether or not the range grows past a single chunk
+        summaries = await self._run_level(
+            semaphore,
+            [("map", chunk) for chunk in chunks],
+            target_language,
+            PARTIAL_SUMMARY_TOKENS
+        )
+
+        depth = 1
+        while len(summaries) > 1:
+            groups = [
+                summaries[i:i + self.reduce_fan_in]
+                for i in range(0, len(summaries), self.reduce_fan_in)
+            ]
+            is_final = len(groups) == 1
+            summaries = await self._run_level(
+                semaphore,
+                [("reduce", group) for group in groups],
+                target_language,
+                FINAL_SUMMARY_TOKENS if is_final else PARTIAL_SUMMARY_TOKENS
+            )
+            depth += 1
+
+        logger.info(f"Summarized {len(entries)} entries in {len(chunks)} chunks ({depth} levels)")
+        return summaries[0] if summaries else ""
+
+    async def _run_level(
+        self,
+        semaphore: asyncio.Semaphore,
+        tasks: List[Tuple[str, List[str]]],
+        target_language: str,
+        max_output_tokens: int
+    ) -> List[str]:
+        """Summarize every input of one tree level concurrently, keeping their order."""
+        results = await asyncio.gather(*(
+            self._summarize_part(semaphore, kind, parts, target_language, max_output_tokens)
+            for kind, parts in tasks
+        ))
+        # A failed part is dropped rather than failing the whole summary
+        return [result for result in results if result]
+
+    async def _summarize_part(
+        self,
+        semaphore: asyncio.Semaphore,
+        kind: str,
+        parts: List[str],
+        target_language: str,
+        max_output_tokens: int
+    ) -> Optional[str]:
+        # A lone summary needs no merge call
+        if kind == "reduce" and len(parts) == 1:
+            return parts[0]
+
+        key = self._cache_key(kind, parts, target_language, max_output_tokens)
+
+        async def build() -> Tuple[str, bool]:
+            async with semaphore:
+                text = await self.generate(self._prompt(kind, parts, target_language), max_output_tokens)
+            return text, bool(text)
+
+        try:
+            summary, _ = await self.cache.get_or_create(key, build)
+            return summary
+        except Exception as e:
+            logger.warning(f"Entry {kind} summarization failed for {len(parts)} parts, skipping: {e}")
+            return None
+
+    def _cache_key(self, kind: str, parts: List[str], target_language: str, max_output_tokens: int) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            {
+                "prompt_version": SUMMARY_PROMPT_VERSION,
+                "kind": kind,
+                "model": self.model_name,
+                "language": target_language,
+                "max_output_tokens": max_output_tokens,
+            },
+            sort_keys=True,
+        ).encode("utf-8"))
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1e")
+        return f"entries:{digest.hexdigest()}"
+
+    def _prompt(self, kind: str, parts: List[str], target_language: str) -> str:
+        if kind == "map":
+            return (
+                "You are a helpful assistant. Summarize the following journal entries into a concise bullet list "
+                f"in {target_language}. Focus on symptoms, mood, activities, notable events, and any health-related mentions. "
+                "Keep dates for notable events.\n\n"
+                "ENTRIES:\n" + "\n\n".join(parts)
+            )
+
+        sections = "\n\n".join(f"PERIOD {i + 1}:\n{part}" for i, part in enumerate(parts))
+        return (
+            "You are a helpful assistant. The following bullet lists summarize consecutive periods of a journal, "
+            f"oldest first. Merge them into a single concise bullet list in {target_language}. Keep recurring "
+            "patterns, changes over time, symptoms, mood, activities and notable events; drop repetition.\n\n"
+            + sections
+        )
@@ -0,0 +1,201 @@
+"""
+Scheduled sweeps of expired rows.
+
+Each sweep runs as a sequence of small, set-based statements of the form
+``UPDATE/DELETE ... WHERE id IN (SELECT id ... LIMIT n FOR UPDATE SKIP
+LOCKED) RETURNING ...``, each in its own transaction. No ORM objects are
+loaded, locks are held for one batch at a time, and rows locked by a
+concurrent sweeper on another instance are skipped rather than waited on.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from ..core.config import settings
+from ..db.session_factory import get_session_factory
+
+logger = logging.getLogger(__name__)
+
+# Builds one batch statement (UPDATE/DELETE ... RETURNING <key>) for a batch size
+BatchStatement = Callable[[int], Executable]
+# Runs one sweep and returns the number of rows it touched
+Sweep = Callable[[Session], int]
+
+
+@dataclass
+class SweepResult:
+    """Outcome of a batched sweep"""
+    rows: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+
+
+@dataclass
+class SweepMetrics:
+    """Progress metrics of a registered sweep"""
+    runs: int = 0
+    rows_total: int = 0
+    last_rows: int = 0
+    last_duration_seconds: float = 0.0
+    last_run_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    failures: int = 0
+
+
+def sweep_in_batches(
+    db: Session,
+    statement: BatchStatement,
+    *,
+    batch_size: int,
+    on_batch: Optional[Callable[[List[Any]], None]] = None
+) -> SweepResult:
+    """
+    Run a batch statement until it affects fewer rows than the batch size.
+
+    Every batch is committed on its own so locks and transaction size stay
+    bounded however many rows qualify.
+
+    Args:
+        db: Database session
+        statement: Builds the statement for one batch; it must RETURN one column
+        batch_size: Maximum rows per batch
+        on_batch: Called with the returned values after each committed batch
+
+    Returns:
+        SweepResult: Rows affected, batches run and elapsed time
+    """
+    result = SweepResult()
+    started = time.monotonic()
+    while True:
+        try:
+            values = db.execute(
+                statement(batch_size), execution_options={"synchronize_session": False}
+            ).scalars().all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if values:
+            result.rows += len(values)
+            result.batches += 1
+            if on_batch is not None:
+                on_batch(values)
+        if len(values) < batch_size:
+            break
+
+    result.duration_seconds = time.monotonic() - started
+    return result
+
+
+class ExpirySweeper:
+    """Run registered sweeps periodically and keep their progress metrics."""
+
+    def __init__(self, interval: float = 300.0, batch_size: int = 1000):
+        """
+        Initialize the sweeper.
+
+        Args:
+            interval: Seconds between sweep runs
+            batch_size: Rows per transaction for sweeps using the default
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self._sweeps: Dict[str, Sweep] = {}
+        self._metrics: Dict[str, SweepMetrics] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, sweep: Sweep) -> None:
+        """Register a sweep to run on every cycle"""
+        self._sweeps[name] = sweep
+        self._metrics.setdefault(name, SweepMetrics())
+
+    def run_sweep(self, name: str, db: Session) -> int:
+        """
+        Run one registered sweep and record its metrics.
+
+        Args:
+            name: Registered sweep name
+            db: Database session
+
+        Returns:
+            int: Rows affected
+        """
+        metrics = self._metrics[name]
+        started = time.monotonic()
+        metrics.runs += 1
+        metrics.last_run_at = datetime.now(timezone.utc)
+        try:
+            rows = self._sweeps[name](db)
+        except Exception as e:
+            metrics.failures += 1
+            metrics.last_error = str(e)
+            raise
+        finally:
+            metrics.last_duration_seconds = time.monotonic() - started
+
+        metrics.last_rows = rows
+        metrics.rows_total += rows
+        metrics.last_error = None
+        if rows:
+            logger.info(f"Sweep {name}: {rows} rows in {metrics.last_duration_seconds:.2f}s")
+        return rows
+
+    def run_once(self) -> Dict[str, int]:
+        """Run every registered sweep, each in its own session."""
+        results = {}
+        for name in list(self._sweeps):
+            try:
+                with get_session_factory().get_session_context() as db:
+                    results[name] = self.run_sweep(name, db)
+            except Exception as e:
+                logger.error(f"Sweep {name} failed, retrying next cycle: {e}")
+        return results
+
+    async def run_forever(self) -> None:
+        """Run sweeps every interval until cancelled"""
+        while True:
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        """Start the background sweeper"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background sweeper"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get per-sweep progress metrics."""
+        return {
+            name: {
+                "runs": metrics.runs,
+                "rows_total": metrics.rows_total,
+                "last_rows": metrics.last_rows,
+                "last_duration_seconds": metrics.last_duration_seconds,
+                "last_run_at": metrics.last_run_at.isoformat() if metrics.last_run_at else None,
+                "last_error": metrics.last_error,
+                "failures": metrics.failures,
+            }
+            for name, metrics in self._metrics.items()
+        }
+
+
+# Global instance
+expiry_sweeper = ExpirySweeper(
+    interval=settings.EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.EXPIRY_SWEEP_BATCH_SIZE
+)
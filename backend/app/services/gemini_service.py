@@ -1,12 +1,16 @@
 import logging
 import json
-import hashlib
 import os
 import base64
-from typing import List, Dict, Optional, Any
-from functools import lru_cache
+import copy
+import functools
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, Tuple, Type, Callable, Awaitable, TypeVar, Deque, Set
 import asyncio
-from datetime import datetime
 
 import google.generativeai as genai
 from google.oauth2 import service_account
@@ -22,10 +26,34 @@ except Exception:
 from pydantic import BaseModel, Field
 
 from ..core.config import settings
+from ..security.limiter_backend import LimiterEngine, MemoryLimiterBackend, get_limiter_engine
 from ..schemas.share_template import TemplateQuestion
+from .entry_summarizer import EntrySummarizer
+from .prompt_budget import PromptPlanner, TokenCounter, format_entry
+from .summary_cache import create_summary_cache, summary_cache_key
 
 logger = logging.getLogger(__name__)
 
+# Prefix of placeholder answers produced when a batch fails; such summaries are never cached
+FALLBACK_ANSWER_PREFIX = "Unable to generate answer due to processing error"
+
+# Fan-out limits for multi-call generation (batched questions, Pro escalation)
+MAX_CONCURRENT_CALLS = 4
+CALL_RETRY_ATTEMPTS = 3
+CALL_RETRY_BASE_DELAY = 0.5
+
+# Question batch size used when a single-shot response still hits the token limit
+FALLBACK_BATCH_SIZE = 3
+
+# Bump when the template extraction prompt or schema changes so cached extractions are redone
+TEMPLATE_EXTRACTION_PROMPT_VERSION = "1"
+
+T = TypeVar("T")
+
+# Receives (event, data) progress notifications during share summary generation:
+# ("stage", {"stage": ...}) and ("answers", {"answers": [QuestionAnswer, ...]})
+SummaryProgressCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
 
 class QuestionAnswer(BaseModel):
     """Individual Q&A pair for structured output"""
@@ -36,6 +64,15 @@ class QuestionAnswer(BaseModel):
     source_entries: Optional[List[str]] = Field(None, description="IDs of journal entries used")
 
 
+class SingleAnswerResponse(BaseModel):
+    """Structured response for a single escalated question"""
+    question_id: str
+    question_text: str
+    answer: str
+    confidence: float
+    source_entries: Optional[List[str]] = None
+
+
 class ShareSummaryResponse(BaseModel):
     """Structured response from Gemini for share summary generation"""
     answers: List[QuestionAnswer] = Field(..., description="List of Q&A pairs")
@@ -81,8 +118,24 @@ class GeminiService:
 
     def __init__(self):
         self.model = None
+        self.model_name = 'gemini-2.5-flash'
         self.vertex_backend = False
         self.rate_limiter = GeminiRateLimiter()
+        self.summary_cache = create_summary_cache()
+        self._response_schemas: Dict[Type[BaseModel], Dict[str, Any]] = {}
+        # Model handles for overrides (e.g. Pro escalation), built lazily and reused
+        self._models: Dict[str, Any] = {}
+        self._model_slots: Dict[str, asyncio.Semaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.entry_summarizer = EntrySummarizer(
+            self._generate_text,
+            self.summary_cache,
+            model_name=self.model_name,
+            max_concurrency=MAX_CONCURRENT_CALLS
+        )
+        self.prompt_planner = PromptPlanner(
+            TokenCounter(self._count_tokens if settings.GEMINI_COUNT_TOKENS_API else None)
+        )
         self.initialize_client()
 
     def initialize_client(self):
@@ -102,7 +155,7 @@ class GeminiService:
                     else:
                         vertexai.init(project=project_id, location=location)
                         auth_mode = "adc_service_account"
-                    self.model = VertexGenerativeModel('gemini-2.5-flash')
+                    self.model = VertexGenerativeModel(self.model_name)
                     self.vertex_backend = True
                     logger.info(
                         "Vertex AI initialized with gemini-2.5-flash model (project=%s, location=%s, auth=%s)",
@@ -125,7 +178,7 @@ class GeminiService:
                 logger.warning("Neither GOOGLE_APPLICATION_CREDENTIALS nor GEMINI_API_KEY configured - sharing features will be disabled")
                 return
 
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+            self.model = genai.GenerativeModel(self.model_name)
             self.vertex_backend = False
             logger.info("Gemini client initialized successfully with gemini-2.5-flash model (direct API)")
         except Exception as e:
@@ -176,7 +229,8 @@ class GeminiService:
         self,
         entries: List[Dict[str, Any]],
         template: Dict[str, Any],
-        target_language: str = "en"
+        target_language: str = "en",
+        on_progress: Optional[SummaryProgressCallback] = None
     ) -> ShareSummaryResponse:
         """
         Generate a structured summary by mapping journal entries to template questions
@@ -185,28 +239,83 @@ class GeminiService:
             entries: List of journal entries (decrypted content)
             template: Template with questions to answer
             target_language: Target language for output
+            on_progress: Optional callback notified of stages and of answers as
+                soon as they are available; later notifications for a question
+                replace earlier ones
             
         Returns:
             ShareSummaryResponse with structured Q&A pairs
         """
         self._check_availability()
-        await self.rate_limiter.check_rate_limit()
 
+        async def generate() -> Tuple[str, bool]:
+            response = await self._generate_share_summary_uncached(entries, template, target_language, on_progress)
+            cacheable = not any(qa.answer.startswith(FALLBACK_ANSWER_PREFIX) for qa in response.answers)
+            return response.model_dump_json(), cacheable
+
+        cache_key = summary_cache_key(entries, template, target_language, self.model_name)
+        payload, cached = await self.summary_cache.get_or_create(cache_key, generate)
+        response = ShareSummaryResponse.model_validate_json(payload)
+        if cached:
+            logger.info(f"Served share summary from cache (key={cache_key[:12]})")
+            await self._notify(on_progress, "answers", {"answers": response.answers})
+        return response
+
+    async def _notify(self, on_progress: Optional[SummaryProgressCallback], event: str, data: Dict[str, Any]):
+        """Deliver a progress notification; a failing listener never fails generation."""
+        if on_progress is None:
+            return
+        try:
+            await on_progress(event, data)
+        except Exception as e:
+            logger.warning(f"Share summary progress listener failed on {event}: {e}")
+
+    async def _generate_share_summary_uncached(
+        self,
+        entries: List[Dict[str, Any]],
+        template: Dict[str, Any],
+        target_language: str,
+        on_progress: Optional[SummaryProgressCallback] = None
+    ) -> ShareSummaryResponse:
+        """Generate a share summary with Gemini, bypassing the summary cache."""
         try:
-            # Heuristic summarization for very long inputs
-            total_chars = sum(len(e.get('content') or '') for e in entries)
+            # Choose single-shot, batched or map-reduce before spending a call
+            plan = await self.prompt_planner.plan(entries, template.get('questions', []))
+            logger.info(
+                f"Share summary plan: {plan.strategy} (~{plan.entry_tokens} entry tokens, "
+                f"{plan.question_count} questions in {len(plan.question_batches)} calls)"
+            )
             summary_text: Optional[str] = None
-            if total_chars > 15000:
+            if plan.summarize_entries:
+                await self._notify(on_progress, "stage", {"stage": "summarizing"})
                 summary_text = await self._summarize_entries(entries=entries, target_language=target_language)
 
-            # Try full template generation first
-            try:
-                response = await self._generate_full_template_summary(
+            if len(plan.question_batches) > 1:
+                await self._notify(on_progress, "stage", {"stage": "batching"})
+                response = await self._generate_batched_template_summary(
                     entries=entries,
                     template=template,
                     target_language=target_language,
-                    summary_override=summary_text
+                    summary_override=summary_text,
+                    on_progress=on_progress,
+                    question_batches=plan.question_batches
+                )
+                logger.info(f"Generated share summary using batching with {len(response.answers)} Q&A pairs")
+                return response
+
+            # Try full template generation first
+            try:
+                await self._notify(on_progress, "stage", {"stage": "generating"})
+                response = await self._call_with_retries(
+                    lambda: self._generate_full_template_summary(
+                        entries=entries,
+                        template=template,
+                        target_language=target_language,
+                        summary_override=summary_text
+                    ),
+                    description="share summary"
                 )
+                await self._notify(on_progress, "answers", {"answers": response.answers})
                 
                 # Confidence-aware escalation to Pro for weak answers
                 improved_response = await self._maybe_escalate_low_confidence(
@@ -216,6 +325,11 @@ class GeminiService:
                     target_language=target_language,
                     summary_override=summary_text
                 )
+                refined = [
+                    new for new, old in zip(improved_response.answers, response.answers, strict=True) if new is not old
+                ]
+                if refined:
+                    await self._notify(on_progress, "answers", {"answers": refined})
 
                 logger.info(f"Generated share summary with {len(improved_response.answers)} Q&A pairs (escalation applied={improved_response is not response})")
                 return improved_response
@@ -224,11 +338,13 @@ class GeminiService:
                 logger.warning(f"Full template generation hit token limit, falling back to batching: {token_error}")
                 
                 # Fallback: Generate in batches to avoid token limits
+                await self._notify(on_progress, "stage", {"stage": "batching"})
                 response = await self._generate_batched_template_summary(
                     entries=entries,
                     template=template,
                     target_language=target_language,
-                    summary_override=summary_text
+                    summary_override=summary_text,
+                    on_progress=on_progress
                 )
                 
                 logger.info(f"Generated share summary using batching with {len(response.answers)} Q&A pairs")
@@ -254,7 +370,7 @@ class GeminiService:
             TemplateExtractionResponse with extracted template
         """
         self._check_availability()
-        await self.rate_limiter.check_rate_limit()
+        await self.rate_limiter.check_rate_limit(self.model_name)
 
         try:
             # Create prompt for template extraction
@@ -278,7 +394,7 @@ class GeminiService:
     async def _generate_with_structured_output(
         self,
         prompt: str,
-        response_schema: BaseModel,
+        response_schema: Type[BaseModel],
         temperature: float = 0.7,
         max_output_tokens: int = 2000,
         model_name_override: Optional[str] = None
@@ -287,28 +403,16 @@ class GeminiService:
         Generate content with structured output using Gemini's response schema feature
         """
         try:
-            # Convert Pydantic model to JSON schema for Gemini
-            json_schema = response_schema.model_json_schema()
-            
-            # Remove $defs and inline definitions for Gemini compatibility
-            if '$defs' in json_schema:
-                defs = json_schema.pop('$defs')
-                json_schema = self._inline_definitions(json_schema, defs)
-
-            # Remove combinators (anyOf/oneOf/allOf) and nullable wrappers
-            json_schema = self._remove_schema_combinators(json_schema)
-
-            # Prune unsupported JSON Schema keywords
-            json_schema = self._prune_schema_keywords(json_schema)
+            # Gemini-compatible JSON schema, compiled once per response model
+            json_schema = self._get_response_schema(response_schema)
             
             # Generate content with structured output
             if self.vertex_backend:
                 # Vertex AI path
-                model = self.model
-                if model_name_override and isinstance(model, VertexGenerativeModel):
-                    model = VertexGenerativeModel(model_name_override)
-                response = await asyncio.to_thread(
-                    model.generate_content,
+                model_name = model_name_override or self.model_name
+                response = await self._run_model_call(
+                    model_name,
+                    self._get_model(model_name).generate_content,
                     prompt,
                     generation_config=VertexGenerationConfig(
                         response_mime_type="application/json",
@@ -319,11 +423,10 @@ class GeminiService:
                 )
             else:
                 # Direct Gemini API path
-                model = self.model
-                if model_name_override and isinstance(model, genai.GenerativeModel):
-                    model = genai.GenerativeModel(model_name_override)
-                response = await asyncio.to_thread(
-                    model.generate_content,
+                model_name = model_name_override or self.model_name
+                response = await self._run_model_call(
+                    model_name,
+                    self._get_model(model_name).generate_content,
                     prompt,
                     generation_config=genai.GenerationConfig(
                         response_mime_type="application/json",
@@ -334,7 +437,7 @@ class GeminiService:
                 )
             
             # Check for token limit issues before parsing
-            self._check_finish_reason_and_log_usage(response)
+            self._check_finish_reason_and_log_usage(response, model_name_override or self.model_name)
             
             # Parse the structured response (robust across SDKs and backends)
             structured_text = self._extract_structured_json_text(response)
@@ -348,6 +451,81 @@ class GeminiService:
             logger.error(f"Gemini API call failed: {e}")
             raise GeminiError(f"API call failed: {e}")
 
+    def _get_model(self, model_name: str) -> Any:
+        """
+        Get the model handle for ``model_name``.
+
+        The primary model is the one set up by ``initialize_client``; handles
+        for other models are created on first use with the same backend and
+        reused afterwards.
+        """
+        if model_name == self.model_name or self.model is None:
+            return self.model
+
+        model = self._models.get(model_name)
+        if model is None:
+            if self.vertex_backend:
+                model = VertexGenerativeModel(model_name)
+            else:
+                model = genai.GenerativeModel(model_name)
+            self._models[model_name] = model
+            logger.info(f"Created Gemini model handle for {model_name}")
+        return model
+
+    async def _run_model_call(self, model_name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking SDK call on the Gemini executor.
+
+        Calls are capped per model so a burst of share generations queues
+        here instead of occupying the default executor that other
+        ``asyncio.to_thread`` users share.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.GEMINI_EXECUTOR_WORKERS,
+                thread_name_prefix="gemini"
+            )
+        slots = self._model_slots.get(model_name)
+        if slots is None:
+            slots = asyncio.Semaphore(settings.GEMINI_MAX_INFLIGHT_PER_MODEL)
+            self._model_slots[model_name] = slots
+
+        async with slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """Release the Gemini executor threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_response_schema(self, response_schema: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Get the Gemini-compatible JSON schema of a response model.
+        
+        The schema is built once per model class; callers receive a copy since
+        the SDKs rewrite schema dicts in place.
+        """
+        compiled = self._response_schemas.get(response_schema)
+        if compiled is None:
+            # Convert Pydantic model to JSON schema for Gemini
+            compiled = response_schema.model_json_schema()
+            
+            # Remove $defs and inline definitions for Gemini compatibility
+            if '$defs' in compiled:
+                defs = compiled.pop('$defs')
+                compiled = self._inline_definitions(compiled, defs)
+
+            # Remove combinators (anyOf/oneOf/allOf) and nullable wrappers
+            compiled = self._remove_schema_combinators(compiled)
+
+            # Prune unsupported JSON Schema keywords
+            compiled = self._prune_schema_keywords(compiled)
+            self._response_schemas[response_schema] = compiled
+
+        return copy.deepcopy(compiled)
+
     def _extract_structured_json_text(self, response: Any) -> str:
         """Extract JSON text from a Gemini/Vertex response regardless of backend shape.
 
@@ -441,8 +619,8 @@ class GeminiService:
         # Nothing worked
         raise GeminiError("API call failed: Cannot get the response text")
 
-    def _check_finish_reason_and_log_usage(self, response: Any) -> None:
-        """Check response finish_reason and log usage metadata for debugging."""
+    def _check_finish_reason_and_log_usage(self, response: Any, model_name: Optional[str] = None) -> None:
+        """Check response finish_reason, log usage metadata and account it against the token quota."""
         try:
             # Helper to safely get attribute or dict key
             def get(obj: Any, name: str, default: Any = None) -> Any:
@@ -459,6 +637,8 @@ class GeminiService:
                 completion_tokens = get(usage_metadata, "candidates_token_count", 0)
                 total_tokens = get(usage_metadata, "total_token_count", 0)
                 logger.info(f"Gemini usage: prompt={prompt_tokens}, completion={completion_tokens}, total={total_tokens}")
+                if isinstance(total_tokens, int):
+                    self.rate_limiter.record_usage(model_name or self.model_name, total_tokens)
             
             # Check candidates for finish_reason
             candidates = get(response, "candidates") or []
@@ -494,7 +674,8 @@ class GeminiService:
         # Create structured prompt for Q&A generation
         prompt = self._create_qa_generation_prompt(entries, template, target_language, summary_override=summary_override)
 
-        # Generate content with structured output (Flash default)
+        # Generate content with structured output (Flash default); callers
+        # run this under _call_with_retries, which takes the rate limit token
         response = await self._generate_with_structured_output(
             prompt=prompt,
             response_schema=ShareSummaryResponse,
@@ -510,7 +691,9 @@ class GeminiService:
         entries: List[Dict[str, Any]],
         template: Dict[str, Any],
         target_language: str,
-        summary_override: Optional[str] = None
+        summary_override: Optional[str] = None,
+        on_progress: Optional[SummaryProgressCallback] = None,
+        question_batches: Optional[List[List[Dict[str, Any]]]] = None
     ) -> ShareSummaryResponse:
         """Generate summary by batching questions to avoid token limits."""
         questions = template.get('questions', [])
@@ -524,18 +707,17 @@ class GeminiService:
                 processing_notes="No questions in template"
             )
         
-        # Split questions into batches of 3-4 questions each
-        BATCH_SIZE = 3
-        question_batches = [questions[i:i + BATCH_SIZE] for i in range(0, len(questions), BATCH_SIZE)]
-        
-        all_answers = []
+        # Planned batches, or small ones after a single-shot call hit the token limit
+        if question_batches is None:
+            question_batches = [
+                questions[i:i + FALLBACK_BATCH_SIZE] for i in range(0, len(questions), FALLBACK_BATCH_SIZE)
+            ]
         batch_count = len(question_batches)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
         
-        logger.info(f"Processing {len(questions)} questions in {batch_count} batches of up to {BATCH_SIZE} questions each")
+        logger.info(f"Processing {len(questions)} questions in {batch_count} batches of up to {max(len(b) for b in question_batches)} questions each")
         
-        for batch_idx, question_batch in enumerate(question_batches):
-            logger.info(f"Processing batch {batch_idx + 1}/{batch_count} with {len(question_batch)} questions")
-            
+        async def process_batch(batch_idx: int, question_batch: List[Dict[str, Any]]) -> List[QuestionAnswer]:
             # Create a mini-template for this batch
             batch_template = {
                 'template_id': template.get('template_id'),
@@ -545,21 +727,25 @@ class GeminiService:
             }
             
             try:
-                # Generate for this batch
-                batch_response = await self._generate_full_template_summary(
-                    entries=entries,
-                    template=batch_template,
-                    target_language=target_language,
-                    summary_override=summary_override
-                )
-                
-                # Collect answers from this batch
-                all_answers.extend(batch_response.answers)
+                async with semaphore:
+                    logger.info(f"Processing batch {batch_idx + 1}/{batch_count} with {len(question_batch)} questions")
+                    batch_response = await self._call_with_retries(
+                        lambda: self._generate_full_template_summary(
+                            entries=entries,
+                            template=batch_template,
+                            target_language=target_language,
+                            summary_override=summary_override
+                        ),
+                        description=f"batch {batch_idx + 1}/{batch_count}"
+                    )
+                await self._notify(on_progress, "answers", {"answers": batch_response.answers})
+                return list(batch_response.answers)
                 
             except Exception as e:
                 logger.error(f"Failed to process batch {batch_idx + 1}: {e}")
                 
                 # Create fallback answers for this batch
+                fallback_answers = []
                 for question in question_batch:
                     q_raw = question.get('text')
                     if isinstance(q_raw, dict):
@@ -567,14 +753,21 @@ class GeminiService:
                     else:
                         q_text = q_raw or 'No question text'
                     
-                    fallback_answer = QuestionAnswer(
+                    fallback_answers.append(QuestionAnswer(
                         question_id=question.get('id', 'unknown'),
                         question_text=q_text,
-                        answer=f"Unable to generate answer due to processing error: {str(e)[:100]}",
+                        answer=f"{FALLBACK_ANSWER_PREFIX}: {str(e)[:100]}",
                         confidence=0.0,
                         source_entries=None
-                    )
-                    all_answers.append(fallback_answer)
+                    ))
+                await self._notify(on_progress, "answers", {"answers": fallback_answers})
+                return fallback_answers
+        
+        # Batches run concurrently; gather keeps template question order
+        batch_results = await asyncio.gather(
+            *(process_batch(batch_idx, question_batch) for batch_idx, question_batch in enumerate(question_batches))
+        )
+        all_answers = [answer for batch_answers in batch_results for answer in batch_answers]
         
         # Combine all batch results into final response
         return ShareSummaryResponse(
@@ -585,6 +778,33 @@ class GeminiService:
             processing_notes=f"Generated using batching ({batch_count} batches)"
         )
 
+    async def _call_with_retries(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        description: str,
+        attempts: int = CALL_RETRY_ATTEMPTS,
+        model_name: Optional[str] = None
+    ) -> T:
+        """
+        Run one Gemini call under the rate limiter, retrying transient failures.
+        
+        Token-limit errors are not retried since the same prompt would hit the
+        limit again. Retries back off exponentially with full jitter so
+        concurrent callers do not retry in lockstep.
+        """
+        for attempt in range(attempts):
+            await self.rate_limiter.check_rate_limit(model_name or self.model_name)
+            try:
+                return await operation()
+            except GeminiMaxTokensError:
+                raise
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = random.uniform(0, CALL_RETRY_BASE_DELAY * (2 ** attempt))
+                logger.warning(f"Gemini call for {description} failed (attempt {attempt + 1}/{attempts}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+
     def _inline_definitions(self, schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
         """
         Inline $defs references in the schema for Gemini compatibility
@@ -664,6 +884,11 @@ class GeminiService:
 
         return transform(schema)
 
+    def _format_entries_text(self, entries: List[Dict[str, Any]]) -> str:
+        """Render entries for a prompt, in the format the prompt planner measures."""
+        fitted = self.prompt_planner.fit_entries(entries)
+        return "".join(f"Entry {i+1} {format_entry(entry)}\n\n" for i, entry in enumerate(fitted))
+
     def _create_qa_generation_prompt(
         self,
         entries: List[Dict[str, Any]],
@@ -678,11 +903,8 @@ class GeminiService:
         if summary_override:
             entries_text = f"SUMMARY OF ENTRIES (model generated):\n{summary_override}\n\n"
         else:
-            for i, entry in enumerate(entries[:20]):  # Limit to 20 entries
-                content = entry.get('content', '')
-                if len(content) > 500:  # Truncate long entries
-                    content = content[:500] + "..."
-                entries_text += f"Entry {i+1} ({entry.get('entry_date', 'unknown date')}):\n{content}\n\n"
+            # The prompt planner only goes direct when every entry fits the budget
+            entries_text = self._format_entries_text(entries)
 
         # Prepare questions
         questions_text = ""
@@ -736,43 +958,38 @@ IMPORTANT:
     async def _summarize_entries(self, entries: List[Dict[str, Any]], target_language: str) -> str:
         """Summarize a large set of entries into a concise bullet list for downstream QA."""
         try:
-            # Lightweight instruction, JSON not required
-            joined_text = "\n\n".join(
-                [
-                    f"[{e.get('entry_date','unknown')}] { (e.get('content') or '')[:800] }"
-                    for e in entries[:50]
-                ]
-            )
-            prompt = (
-                "You are a helpful assistant. Summarize the following journal entries into a concise bullet list "
-                f"in {target_language}. Focus on symptoms, mood, activities, notable events, and any health-related mentions.\n\n"
-                f"ENTRIES:\n{joined_text}"
-            )
+            return await self.entry_summarizer.summarize(entries, target_language)
+        except Exception as e:
+            logger.warning(f"Entry summarization failed, proceeding without summary: {e}")
+            return ""
+
+    async def _count_tokens(self, text: str) -> int:
+        """Count tokens of a text with the primary model's tokenizer."""
+        response = await self._run_model_call(self.model_name, self.model.count_tokens, text)
+        return int(response.total_tokens)
+
+    async def _generate_text(self, prompt: str, max_output_tokens: int, temperature: float = 0.3) -> str:
+        """Generate plain text (no structured output) with the primary model."""
+        async def call() -> str:
             # Use Flash for speed, plain text output
             if self.vertex_backend:
-                model = self.model
-                response = await asyncio.to_thread(
-                    model.generate_content,
-                    prompt,
-                    generation_config=VertexGenerationConfig(
-                        temperature=0.3,
-                        max_output_tokens=800,
-                    ),
-                )
+                generation_config = VertexGenerationConfig(temperature=temperature, max_output_tokens=max_output_tokens)
             else:
-                model = self.model
-                response = await asyncio.to_thread(
-                    model.generate_content,
-                    prompt,
-                    generation_config=genai.GenerationConfig(
-                        temperature=0.3,
-                        max_output_tokens=800,
-                    ),
-                )
+                generation_config = genai.GenerationConfig(temperature=temperature, max_output_tokens=max_output_tokens)
+            response = await self._run_model_call(
+                self.model_name,
+                self.model.generate_content,
+                prompt,
+                generation_config=generation_config,
+            )
+            try:
+                self._check_finish_reason_and_log_usage(response, self.model_name)
+            except GeminiMaxTokensError:
+                # A summary cut at the output limit is still usable
+                logger.warning("Summary generation stopped at the output token limit")
             return (response.text or "").strip()
-        except Exception as e:
-            logger.warning(f"Entry summarization failed, proceeding without summary: {e}")
-            return ""
+
+        return await self._call_with_retries(call, description="entry summarization")
 
     async def _maybe_escalate_low_confidence(
         self,
@@ -791,27 +1008,29 @@ IMPORTANT:
                 return original
             to_refine = low_confidence[:MAX_ESCALATIONS]
 
-            refined_answers: Dict[str, QuestionAnswer] = {}
-            for qa in to_refine:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+
+            async def refine(qa: QuestionAnswer) -> Optional[QuestionAnswer]:
                 single_prompt = self._create_single_question_prompt(
                     entries=entries, question_id=qa.question_id, question_text=qa.question_text or "", target_language=target_language, summary_override=summary_override
                 )
-                # Use the same schema but expect a single answer wrapper
-                class SingleAnswerResponse(BaseModel):
-                    question_id: str
-                    question_text: str
-                    answer: str
-                    confidence: float
-                    source_entries: Optional[List[str]] = None
-
-                result = await self._generate_with_structured_output(
-                    prompt=single_prompt,
-                    response_schema=SingleAnswerResponse,
-                    temperature=0.3,
-                    max_output_tokens=2048,  # Increased from 800 for Pro model
-                    model_name_override='gemini-2.5-pro'
-                )
-                refined_answers[qa.question_id] = QuestionAnswer(
+                try:
+                    async with semaphore:
+                        result = await self._call_with_retries(
+                            lambda: self._generate_with_structured_output(
+                                prompt=single_prompt,
+                                response_schema=SingleAnswerResponse,
+                                temperature=0.3,
+                                max_output_tokens=2048,  # Increased from 800 for Pro model
+                                model_name_override='gemini-2.5-pro'
+                            ),
+                            description=f"escalation of {qa.question_id}",
+                            model_name='gemini-2.5-pro'
+                        )
+                except Exception as e:
+                    logger.warning(f"Escalation of {qa.question_id} failed, keeping original answer: {e}")
+                    return None
+                return QuestionAnswer(
                     question_id=result.question_id,
                     question_text=result.question_text,
                     answer=result.answer,
@@ -819,6 +1038,13 @@ IMPORTANT:
                     source_entries=result.source_entries,
                 )
 
+            refined_results = await asyncio.gather(*(refine(qa) for qa in to_refine))
+            refined_answers: Dict[str, QuestionAnswer] = {
+                qa.question_id: refined
+                for qa, refined in zip(to_refine, refined_results, strict=True)
+                if refined is not None
+            }
+
             # Merge
             merged = []
             for qa in original.answers:
@@ -848,11 +1074,7 @@ IMPORTANT:
         if summary_override:
             entries_text = f"SUMMARY OF ENTRIES (model generated):\n{summary_override}\n\n"
         else:
-            for i, entry in enumerate(entries[:20]):
-                content = entry.get('content', '')
-                if len(content) > 800:
-                    content = content[:800] + "..."
-                entries_text += f"Entry {i+1} ({entry.get('entry_date','unknown date')}):\n{content}\n\n"
+            entries_text = self._format_entries_text(entries)
 
         prompt = f"""
 You are a careful assistant. Answer the SINGLE question below based strictly on the journal entries.
@@ -919,44 +1141,221 @@ IMPORTANT:
 
         return prompt
 
-    @lru_cache(maxsize=100)
-    def _cache_key(self, entries_hash: str, template_id: str, language: str) -> str:
-        """Generate cache key for responses"""
-        return hashlib.sha256(
-            f"{entries_hash}:{template_id}:{language}".encode()
-        ).hexdigest()
+
+@dataclass(frozen=True)
+class ModelQuota:
+    """Per-model Gemini quota."""
+    requests_per_minute: int
+    tokens_per_minute: int
+
+
+# Flash and Pro have separate quotas; unknown models get the limiter default
+DEFAULT_MODEL_QUOTAS: Dict[str, ModelQuota] = {
+    'gemini-2.5-flash': ModelQuota(requests_per_minute=60, tokens_per_minute=1_000_000),
+    'gemini-2.5-pro': ModelQuota(requests_per_minute=20, tokens_per_minute=500_000),
+}
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket with a FIFO waiter queue.
+
+    No lock is held while waiting: callers that cannot be served immediately
+    park on a future, and a single loop timer grants tokens to the queue head
+    when enough have refilled, so callers are served in arrival order and a
+    late caller can never overtake a waiting one.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def debit(self, amount: float):
+        """Consume tokens after the fact; the balance may go negative."""
+        self._refill()
+        self.tokens -= amount
+        if self._waiters:
+            self._reschedule()
+
+    async def acquire(self, cost: float = 1.0):
+        """
+        Wait until ``cost`` tokens are available and take them.
+
+        Args:
+            cost: Tokens to take; 0 waits until the balance is no longer negative
+        """
+        cost = min(cost, self.capacity)
+        self._refill()
+        if not self._waiters and self.tokens >= cost:
+            self.tokens -= cost
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, cost))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the cancellation landed: give the tokens back
+            if future.done() and not future.cancelled():
+                self.tokens += cost
+                self._schedule()
+            raise
+
+    def _grant(self):
+        self._refill()
+        while self._waiters:
+            future, cost = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self.tokens < cost:
+                break
+            self.tokens -= cost
+            self._waiters.popleft()
+            future.set_result(None)
+
+    def _reschedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def _schedule(self):
+        loop = asyncio.get_running_loop()
+        if self._timer is not None and self._timer_loop is not loop:
+            # Waiters from a previous (closed) event loop can never be resumed
+            self._timer.cancel()
+            self._timer = None
+            self._waiters = deque(w for w in self._waiters if w[0].get_loop() is loop)
+
+        self._grant()
+        if not self._waiters or self._timer is not None:
+            return
+
+        _, cost = self._waiters[0]
+        delay = max((cost - self.tokens) / self.refill_per_second, 0.001)
+        self._timer = loop.call_later(delay, self._on_timer)
+        self._timer_loop = loop
+
+    def _on_timer(self):
+        self._timer = None
+        self._schedule()
+
+
+@dataclass
+class _ModelBuckets:
+    requests: AsyncTokenBucket
+    tokens: AsyncTokenBucket
 
 
 class GeminiRateLimiter:
-    """Simple rate limiter for Gemini API calls"""
-    
-    def __init__(self, requests_per_minute: int = 60):
+    """
+    Per-model request and token rate limiter for Gemini API calls.
+
+    Each model gets a requests-per-minute bucket and a tokens-per-minute
+    bucket. Requests take a slot up front; tokens are debited afterwards from
+    the response ``usage_metadata``, and new calls wait while the token
+    balance is in debt. When the shared limiter backend is configured the
+    same quotas are also enforced across instances.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        quotas: Optional[Dict[str, ModelQuota]] = None,
+        engine: Optional[LimiterEngine] = None
+    ):
         self.rpm = requests_per_minute
-        self.request_times = []
-        self.lock = asyncio.Lock()
+        self.quotas = dict(DEFAULT_MODEL_QUOTAS if quotas is None else quotas)
+        self.default_quota = ModelQuota(requests_per_minute, DEFAULT_MODEL_QUOTAS['gemini-2.5-flash'].tokens_per_minute)
+        self._engine = engine
+        self._buckets: Dict[str, _ModelBuckets] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    def _quota(self, model_name: str) -> ModelQuota:
+        return self.quotas.get(model_name, self.default_quota)
+
+    def _get_buckets(self, model_name: str) -> _ModelBuckets:
+        buckets = self._buckets.get(model_name)
+        if buckets is None:
+            quota = self._quota(model_name)
+            buckets = _ModelBuckets(
+                requests=AsyncTokenBucket(quota.requests_per_minute, quota.requests_per_minute / 60),
+                tokens=AsyncTokenBucket(quota.tokens_per_minute, quota.tokens_per_minute / 60),
+            )
+            self._buckets[model_name] = buckets
+        return buckets
 
-    async def check_rate_limit(self):
-        """Check if we can make a request without exceeding rate limits"""
-        async with self.lock:
-            now = datetime.now()
-            
-            # Remove requests older than 1 minute
-            self.request_times = [
-                req_time for req_time in self.request_times
-                if (now - req_time).total_seconds() < 60
-            ]
-            
-            # Check if we're at the limit
-            if len(self.request_times) >= self.rpm:
-                wait_time = 60 - (now - self.request_times[0]).total_seconds()
-                if wait_time > 0:
-                    logger.warning(f"Rate limit reached, waiting {wait_time:.2f} seconds")
-                    await asyncio.sleep(wait_time)
-                    # Retry the check
-                    return await self.check_rate_limit()
-            
-            # Record this request
-            self.request_times.append(now)
+    @property
+    def engine(self) -> Optional[LimiterEngine]:
+        """Shared limiter engine, or None when only the local buckets apply."""
+        if self._engine is None:
+            self._engine = get_limiter_engine()
+        return None if self._engine.backend_name == MemoryLimiterBackend.name else self._engine
+
+    async def check_rate_limit(self, model_name: str = 'gemini-2.5-flash'):
+        """
+        Wait until a request to ``model_name`` fits the request and token quotas.
+
+        Args:
+            model_name: Model the request is sent to
+        """
+        buckets = self._get_buckets(model_name)
+        await buckets.requests.acquire()
+        await buckets.tokens.acquire(0)
+
+        engine = self.engine
+        if engine is not None:
+            await self._acquire_shared(engine, model_name)
+
+    async def _acquire_shared(self, engine: LimiterEngine, model_name: str):
+        quota = self._quota(model_name)
+        while True:
+            decision = await engine.token_bucket(
+                f"gemini:{model_name}:rpm", quota.requests_per_minute, quota.requests_per_minute / 60
+            )
+            if decision.allowed:
+                break
+            await asyncio.sleep(decision.retry_after + random.uniform(0, 0.1))
+
+        while True:
+            used, reset_after = await engine.increment(f"gemini:{model_name}:tpm", 0, 60)
+            if used < quota.tokens_per_minute:
+                return
+            logger.warning(f"Gemini token quota for {model_name} reached across instances, waiting {reset_after:.2f} seconds")
+            await asyncio.sleep(reset_after + random.uniform(0, 0.1))
+
+    def record_usage(self, model_name: str, total_tokens: int):
+        """
+        Account the tokens consumed by a completed request.
+
+        Args:
+            model_name: Model the request was sent to
+            total_tokens: ``usage_metadata.total_token_count`` of the response
+        """
+        if not total_tokens:
+            return
+
+        self._get_buckets(model_name).tokens.debit(total_tokens)
+
+        engine = self.engine
+        if engine is not None:
+            task = asyncio.get_running_loop().create_task(
+                engine.increment(f"gemini:{model_name}:tpm", int(total_tokens), 60)
+            )
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
 
 # Create service instance
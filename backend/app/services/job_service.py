@@ -0,0 +1,557 @@
+"""
+Background Job Queue
+
+Durable, database-backed queue for work too slow to run inside a request
+(Gemini share generation, template extraction). Rows of the ``jobs`` table
+are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of
+workers - in the API process or in dedicated worker processes - can poll the
+same table without two of them running the same job. Clients enqueue a job
+and poll it by id.
+
+Job input (user content such as plaintext entries or uploaded files) is
+stored encrypted with AES-GCM under a key derived from ``SECRET_KEY`` and
+bound to the job's owner; handlers read it through ``JobService.read_input``.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.session_factory import get_session_factory
+from ..models.job import Job
+from .expiry_sweeper import expiry_sweeper, sweep_in_batches
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Heartbeat outcomes
+LEASE_HELD = "held"
+LEASE_CANCEL_REQUESTED = "cancel_requested"
+LEASE_LOST = "lost"
+
+INPUT_NONCE_SIZE = 12
+
+# Handlers receive the worker's session and the claimed job and return the
+# JSON-serializable result stored on the job
+JobHandler = Callable[[Session, Job], Awaitable[Dict[str, Any]]]
+
+
+class JobError(Exception):
+    """Permanent job failure; the job is failed without further retries"""
+    pass
+
+
+class JobService:
+    """Enqueue, claim and settle background jobs"""
+
+    def __init__(
+        self,
+        lease_seconds: int = settings.JOB_LEASE_SECONDS,
+        retry_base_delay: float = settings.JOB_RETRY_BASE_DELAY_SECONDS,
+        result_ttl_hours: int = settings.JOB_RESULT_TTL_HOURS,
+        secret_key: str = settings.SECRET_KEY
+    ):
+        """
+        Initialize the job service.
+
+        Args:
+            lease_seconds: Time without heartbeat after which a running job is
+                considered abandoned and requeued
+            retry_base_delay: Base delay of the exponential retry backoff
+            result_ttl_hours: How long job rows (and results) are kept
+            secret_key: Secret the job input encryption key is derived from
+        """
+        self.lease_seconds = lease_seconds
+        self.retry_base_delay = retry_base_delay
+        self.result_ttl_hours = result_ttl_hours
+        self._handlers: Dict[str, JobHandler] = {}
+        self._input_cipher = AESGCM(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"jobs.input_data"
+        ).derive(secret_key.encode("utf-8")))
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Register the coroutine that runs jobs of a given type"""
+        self._handlers[job_type] = handler
+
+    def get_handler(self, job_type: str) -> Optional[JobHandler]:
+        """Get the handler registered for a job type"""
+        return self._handlers.get(job_type)
+
+    @property
+    def job_types(self) -> List[str]:
+        """Job types this process can run"""
+        return list(self._handlers)
+
+    def enqueue(
+        self,
+        db: Session,
+        *,
+        job_type: str,
+        user_id: UUID,
+        payload: Optional[Dict[str, Any]] = None,
+        input_data: Optional[bytes] = None,
+        max_attempts: int = 3
+    ) -> Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            db: Database session
+            job_type: Registered job type
+            user_id: Owner of the job
+            payload: Non-sensitive parameters, visible while the job exists
+            input_data: User content needed by the job; stored encrypted and
+                dropped once the job settles
+            max_attempts: Total attempts before the job is failed
+
+        Returns:
+            Job: The queued job
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type '{job_type}'")
+
+        now = datetime.now(timezone.utc)
+        job = Job(
+            job_type=job_type,
+            user_id=user_id,
+            payload=payload or {},
+            input_data=self._seal_input(user_id, input_data) if input_data is not None else None,
+            status=JOB_QUEUED,
+            attempts=0,
+            max_attempts=max_attempts,
+            cancel_requested=False,
+            run_after=now,
+            expires_at=now + timedelta(hours=self.result_ttl_hours)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        logger.info(f"Enqueued {job_type} job {job.id} for user {user_id}")
+        return job
+
+    def record(
+        self,
+        db: Session,
+        *,
+        job_type: str,
+        user_id: UUID,
+        payload: Dict[str, Any],
+        result: Dict[str, Any],
+        job_id: Optional[UUID] = None
+    ) -> Job:
+        """
+        Store the outcome of work that was run inline as a succeeded job,
+        so it can be looked up like a queued one.
+        """
+        now = datetime.now(timezone.utc)
+        job = Job(
+            id=job_id or uuid.uuid4(),
+            job_type=job_type,
+            user_id=user_id,
+            payload=payload,
+            status=JOB_SUCCEEDED,
+            result=result,
+            attempts=1,
+            max_attempts=1,
+            cancel_requested=False,
+            run_after=now,
+            started_at=now,
+            finished_at=now,
+            expires_at=now + timedelta(hours=self.result_ttl_hours)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def read_input(self, job: Job) -> Optional[bytes]:
+        """Decrypt a job's input (None once the job has settled)"""
+        if job.input_data is None:
+            return None
+        nonce, ciphertext = job.input_data[:INPUT_NONCE_SIZE], job.input_data[INPUT_NONCE_SIZE:]
+        return self._input_cipher.decrypt(nonce, ciphertext, job.user_id.bytes)
+
+    def _seal_input(self, user_id: UUID, data: bytes) -> bytes:
+        # The owner id is authenticated data: input cannot be moved to another user's job
+        nonce = os.urandom(INPUT_NONCE_SIZE)
+        return nonce + self._input_cipher.encrypt(nonce, data, user_id.bytes)
+
+    def get_job(self, db: Session, job_id: UUID, user_id: UUID) -> Optional[Job]:
+        """Get a job owned by a user"""
+        return db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+
+    def cancel(self, db: Session, job: Job) -> Job:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs are
+        flagged and stopped by their worker at the next heartbeat.
+        """
+        if job.status == JOB_QUEUED:
+            self._settle(job, JOB_CANCELLED)
+        elif job.status == JOB_RUNNING:
+            job.cancel_requested = True
+
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def claim(
+        self,
+        db: Session,
+        worker_id: str,
+        job_types: Optional[Sequence[str]] = None
+    ) -> Optional[Job]:
+        """
+        Claim the oldest runnable job, skipping rows locked by other workers.
+
+        Args:
+            db: Database session
+            worker_id: Identifier recorded as the job's lease holder
+            job_types: Restrict to these job types (defaults to registered ones)
+
+        Returns:
+            Optional[Job]: The claimed job, now running, or None if the queue is empty
+        """
+        now = datetime.now(timezone.utc)
+        query = (
+            select(Job)
+            .where(
+                Job.status == JOB_QUEUED,
+                Job.run_after <= now,
+                Job.job_type.in_(job_types or self.job_types)
+            )
+            .order_by(Job.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = db.execute(query).scalars().first()
+        if job is None:
+            db.rollback()
+            return None
+
+        job.status = JOB_RUNNING
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.started_at = now
+        job.attempts += 1
+        db.commit()
+        return job
+
+    def heartbeat(self, db: Session, job_id: UUID, worker_id: str) -> str:
+        """
+        Extend a running job's lease.
+
+        Returns:
+            str: LEASE_HELD, LEASE_CANCEL_REQUESTED (stop and mark the job
+            cancelled) or LEASE_LOST (stop without touching the job, which
+            was requeued or settled and may belong to another worker)
+        """
+        job = db.get(Job, job_id, with_for_update=True)
+        if job is None or job.status != JOB_RUNNING or job.locked_by != worker_id:
+            db.rollback()
+            return LEASE_LOST
+
+        job.locked_at = datetime.now(timezone.utc)
+        db.commit()
+        return LEASE_CANCEL_REQUESTED if job.cancel_requested else LEASE_HELD
+
+    def complete(self, db: Session, job: Job, result: Dict[str, Any], *, worker_id: str) -> bool:
+        """Mark a job as succeeded with its result, if the worker still holds its lease"""
+        if not self._holds_lease(db, job, worker_id):
+            return False
+        job.result = result
+        job.error = None
+        self._settle(job, JOB_SUCCEEDED)
+        db.commit()
+        return True
+
+    def fail(self, db: Session, job: Job, error: str, retryable: bool = True, *, worker_id: str) -> bool:
+        """Record a failed attempt, requeueing with backoff while attempts remain"""
+        if not self._holds_lease(db, job, worker_id):
+            return False
+        self._record_failure(job, error, retryable)
+        db.commit()
+        return True
+
+    def mark_cancelled(self, db: Session, job: Job, *, worker_id: str) -> bool:
+        """Mark a running job as cancelled once its worker stopped it"""
+        if not self._holds_lease(db, job, worker_id):
+            return False
+        self._settle(job, JOB_CANCELLED)
+        db.commit()
+        return True
+
+    def release(self, db: Session, job: Job, *, worker_id: str) -> bool:
+        """Return a job to the queue without counting the attempt (worker shutdown)"""
+        if not self._holds_lease(db, job, worker_id):
+            return False
+        job.status = JOB_QUEUED
+        job.attempts = max(job.attempts - 1, 0)
+        job.locked_by = None
+        job.locked_at = None
+        db.commit()
+        return True
+
+    def _holds_lease(self, db: Session, job: Job, worker_id: str) -> bool:
+        # Lock and reload the row: the lease may have expired and been requeued
+        db.refresh(job, with_for_update=True)
+        if job.status == JOB_RUNNING and job.locked_by == worker_id:
+            return True
+        db.rollback()
+        logger.warning(f"Worker {worker_id} lost the lease on job {job.id}, leaving it untouched")
+        return False
+
+    def requeue_stale(self, db: Session) -> int:
+        """
+        Requeue running jobs whose worker stopped sending heartbeats.
+
+        Returns:
+            int: Number of jobs requeued or failed
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        stale_jobs = db.execute(
+            select(Job)
+            .where(Job.status == JOB_RUNNING, Job.locked_at < cutoff)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        for job in stale_jobs:
+            logger.warning(f"Job {job.id} lost its worker {job.locked_by}, requeueing")
+            self._record_failure(job, "Worker lease expired", retryable=True)
+
+        db.commit()
+        return len(stale_jobs)
+
+    def purge_expired(self, db: Session) -> int:
+        """
+        Delete settled jobs past their retention time, in bounded batches.
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        now = datetime.now(timezone.utc)
+
+        def delete_batch(limit: int):
+            batch = (
+                select(Job.id)
+                .where(
+                    Job.status.in_([JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED]),
+                    Job.expires_at < now
+                )
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            return delete(Job).where(Job.id.in_(batch.scalar_subquery())).returning(Job.id)
+
+        return sweep_in_batches(db, delete_batch, batch_size=expiry_sweeper.batch_size).rows
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given number of attempts made"""
+        return self.retry_base_delay * (2 ** max(attempts - 1, 0)) * random.uniform(1.0, 1.25)
+
+    def _record_failure(self, job: Job, error: str, retryable: bool) -> None:
+        job.error = error[:1000]
+        if retryable and job.attempts < job.max_attempts and not job.cancel_requested:
+            job.status = JOB_QUEUED
+            job.run_after = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(job.attempts))
+            job.locked_by = None
+            job.locked_at = None
+        else:
+            self._settle(job, JOB_CANCELLED if job.cancel_requested else JOB_FAILED)
+
+    def _settle(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.now(timezone.utc)
+        job.locked_by = None
+        job.locked_at = None
+        # User content is only needed while the job can still run
+        job.input_data = None
+
+
+class JobWorker:
+    """Poll the queue and run claimed jobs, one at a time"""
+
+    def __init__(
+        self,
+        service: JobService,
+        *,
+        worker_id: Optional[str] = None,
+        job_types: Optional[Sequence[str]] = None,
+        poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS,
+        heartbeat_interval: Optional[float] = None,
+        maintenance_interval: float = 60.0
+    ):
+        """
+        Initialize a worker.
+
+        Args:
+            service: Job service to claim from
+            worker_id: Lease holder id (defaults to host:pid:random)
+            job_types: Restrict to these job types
+            poll_interval: Sleep between polls of an empty queue
+            heartbeat_interval: Lease renewal and cancellation check period
+            maintenance_interval: Period of stale-lease and retention sweeps
+        """
+        self.service = service
+        self.worker_id = (worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}")[:64]
+        self.job_types = job_types
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or max(service.lease_seconds / 4, 1.0)
+        self.maintenance_interval = maintenance_interval
+        self._last_maintenance = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> bool:
+        """
+        Claim and run a single job.
+
+        Returns:
+            bool: True if a job was run, False if the queue was empty
+        """
+        db = get_session_factory().get_session()
+        try:
+            job = await asyncio.to_thread(self.service.claim, db, self.worker_id, self.job_types)
+            if job is None:
+                return False
+
+            await self._execute(db, job)
+            return True
+        finally:
+            db.close()
+
+    async def _execute(self, db: Session, job: Job) -> None:
+        job_id = job.id
+        handler = self.service.get_handler(job.job_type)
+        if handler is None:
+            await asyncio.to_thread(
+                self.service.fail, db, job, f"No handler for job type '{job.job_type}'",
+                retryable=False, worker_id=self.worker_id
+            )
+            return
+
+        logger.info(f"Worker {self.worker_id} running {job.job_type} job {job_id} (attempt {job.attempts})")
+        task = asyncio.create_task(handler(db, job))
+        lease = LEASE_HELD
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.heartbeat_interval)
+                if done:
+                    break
+                lease = await asyncio.to_thread(self._heartbeat, job_id)
+                if lease != LEASE_HELD:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    break
+        except asyncio.CancelledError:
+            # Worker shutdown: stop the handler and hand the job back
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            db.rollback()
+            await asyncio.to_thread(self.service.release, db, job, worker_id=self.worker_id)
+            raise
+
+        if lease == LEASE_LOST:
+            # The job was requeued or settled elsewhere; it is no longer ours to write
+            db.rollback()
+            logger.warning(f"Worker {self.worker_id} stopped job {job_id} after losing its lease")
+            return
+
+        if task.cancelled():
+            db.rollback()
+            if await asyncio.to_thread(self.service.mark_cancelled, db, job, worker_id=self.worker_id):
+                logger.info(f"Job {job_id} cancelled")
+            return
+
+        error = task.exception()
+        if error is None:
+            if await asyncio.to_thread(self.service.complete, db, job, task.result(), worker_id=self.worker_id):
+                logger.info(f"Job {job_id} succeeded")
+            return
+
+        db.rollback()
+        retryable = not isinstance(error, (JobError, ValueError))
+        logger.error(f"Job {job_id} failed: {error}")
+        await asyncio.to_thread(self.service.fail, db, job, str(error), retryable, worker_id=self.worker_id)
+
+    def _heartbeat(self, job_id: UUID) -> str:
+        try:
+            with get_session_factory().get_session_context() as db:
+                return self.service.heartbeat(db, job_id, self.worker_id)
+        except Exception as e:
+            # Keep running; the lease only expires after several missed heartbeats
+            logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+            return LEASE_HELD
+
+    async def _maintain(self) -> None:
+        now = asyncio.get_running_loop().time()
+        if now - self._last_maintenance < self.maintenance_interval:
+            return
+
+        self._last_maintenance = now
+        requeued, purged = await asyncio.to_thread(self._run_maintenance)
+        if requeued or purged:
+            logger.info(f"Job maintenance: {requeued} stale jobs requeued, {purged} expired jobs purged")
+
+    def _run_maintenance(self) -> Tuple[int, int]:
+        with get_session_factory().get_session_context() as db:
+            return self.service.requeue_stale(db), self.service.purge_expired(db)
+
+    async def run_forever(self) -> None:
+        """Run jobs until cancelled"""
+        logger.info(f"Job worker {self.worker_id} started")
+        while True:
+            try:
+                await self._maintain()
+                worked = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} error: {e}")
+                worked = False
+
+            if not worked:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> asyncio.Task:
+        """Start the worker loop as a background task"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the worker loop, releasing any job in progress"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+def load_job_handlers() -> None:
+    """Import the modules that register job handlers"""
+    from . import share_service, template_import_service  # noqa: F401
+
+
+# Global job service instance
+job_service = JobService()
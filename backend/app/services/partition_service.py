@@ -0,0 +1,283 @@
+"""
+Monthly partitions of the append-only log tables.
+
+``security_audit_logs``, ``share_access``, ``system_health``,
+``service_health`` and ``alerts`` are range-partitioned by month on their
+timestamp column (see migration ``f6a7b8c9d0e1``). Partitions are named
+``<table>_pYYYYMM``; each table also has a ``<table>_default`` partition as
+a safety net for rows outside the prepared months.
+
+Retention detaches and drops whole partitions instead of deleting rows, and
+upcoming months are created ahead of time so writes never land in the
+default partition. Rows that must outlive retention (sensitive audit
+entries) are first copied into the table's unpartitioned archive, so an
+expired month can always be dropped. Both run from the expiry sweeper. Queries that filter on
+the partition column are pruned to the matching months by Postgres.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .expiry_sweeper import expiry_sweeper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A log table partitioned by month"""
+    name: str
+    column: str
+    retention_days: int
+    # SQL condition for rows that outlive retention; they are moved to archive_table
+    # before their partition is dropped
+    archive_rows: Optional[str] = None
+    archive_table: Optional[str] = None
+
+
+PARTITIONED_TABLES: Tuple[PartitionedTable, ...] = (
+    PartitionedTable(
+        "security_audit_logs", "timestamp", settings.AUDIT_LOG_RETENTION_DAYS,
+        archive_rows="is_sensitive", archive_table="security_audit_logs_archive"
+    ),
+    PartitionedTable("share_access", "created_at", settings.SHARE_ACCESS_RETENTION_DAYS),
+    PartitionedTable("system_health", "timestamp", settings.HEALTH_LOG_RETENTION_DAYS),
+    PartitionedTable("service_health", "timestamp", settings.HEALTH_LOG_RETENTION_DAYS),
+    PartitionedTable("alerts", "created_at", settings.ALERT_RETENTION_DAYS),
+)
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant (UTC) of the month containing value"""
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months"""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of the partition holding the given month"""
+    return f"{table}_p{month:%Y%m}"
+
+
+class PartitionManager:
+    """Create upcoming and drop expired monthly partitions."""
+
+    def __init__(self, tables: Tuple[PartitionedTable, ...] = PARTITIONED_TABLES, months_ahead: int = 2):
+        """
+        Initialize the manager.
+
+        Args:
+            tables: Partitioned tables and their retention
+            months_ahead: Future months to keep partitions ready for
+        """
+        self.tables: Dict[str, PartitionedTable] = {table.name: table for table in tables}
+        self.months_ahead = months_ahead
+
+    def is_partitioned(self, db: Session, table: str) -> bool:
+        """Whether the table exists and is partitioned (always False off Postgres)"""
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace"
+            ),
+            {"table": table}
+        ).first() is not None
+
+    def list_partitions(self, db: Session, table: str) -> List[Tuple[str, datetime]]:
+        """
+        List the monthly partitions of a table.
+
+        Args:
+            db: Database session
+            table: Partitioned table name
+
+        Returns:
+            List[Tuple[str, datetime]]: Partition names with their month start, oldest first
+        """
+        names = db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table AND parent.relnamespace = current_schema()::regnamespace"
+            ),
+            {"table": table}
+        ).scalars().all()
+
+        prefix = f"{table}_p"
+        partitions = []
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            try:
+                month = datetime.strptime(name[len(prefix):], "%Y%m").replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            partitions.append((name, month))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def ensure_partitions(self, db: Session, table: str, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create the partitions of the current and upcoming months.
+
+        Args:
+            db: Database session
+            table: Partitioned table name
+            now: Reference time (defaults to now)
+
+        Returns:
+            List[str]: Names of the partitions created
+        """
+        current = month_start(now or datetime.now(timezone.utc))
+        existing = {name for name, _ in self.list_partitions(db, table)}
+        created = []
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                self._create_partition(db, table, name, month)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Could not create partition {name}, retrying next cycle: {e}")
+                continue
+            created.append(name)
+
+        if created:
+            logger.info(f"Created partitions {', '.join(created)}")
+        return created
+
+    def _create_partition(self, db: Session, table: str, name: str, month: datetime) -> None:
+        """
+        Create one monthly partition in a single transaction.
+
+        Rows of that month already in the default partition (maintenance fell
+        behind) would make the CREATE fail, so the default partition is
+        detached, the rows are moved into the new partition and the default
+        is attached again.
+        """
+        column = self.tables[table].column
+        default = f"{table}_default"
+        bounds = {"start": month, "end": add_months(month, 1)}
+        in_month = f'"{column}" >= :start AND "{column}" < :end'
+
+        has_default = db.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is not None
+        misplaced = has_default and db.execute(
+            text(f'SELECT 1 FROM "{default}" WHERE {in_month} LIMIT 1'), bounds
+        ).first() is not None
+
+        if misplaced:
+            db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+        db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        if misplaced:
+            moved = db.execute(text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_month}'), bounds).rowcount
+            db.execute(text(f'DELETE FROM "{default}" WHERE {in_month}'), bounds)
+            db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+            logger.info(f"Moved {moved} rows from {default} into {name}")
+        db.commit()
+
+    def expired_partitions(self, db: Session, table: str, cutoff: datetime) -> List[str]:
+        """
+        List the partitions whose whole month is older than cutoff.
+
+        Args:
+            db: Database session
+            table: Partitioned table name
+            cutoff: Rows older than this may be discarded
+
+        Returns:
+            List[str]: Partition names, oldest first (empty if the table is not partitioned)
+        """
+        if not self.is_partitioned(db, table):
+            return []
+        return [name for name, month in self.list_partitions(db, table) if add_months(month, 1) <= cutoff]
+
+    def drop_partition(self, db: Session, table: str, name: str) -> int:
+        """
+        Detach and drop one partition, archiving the rows that outlive retention.
+
+        The archive copy, detach and drop share one transaction.
+
+        Args:
+            db: Database session
+            table: Partitioned table name
+            name: Partition to drop
+
+        Returns:
+            int: Number of rows moved to the archive table
+        """
+        archived = 0
+        spec = self.tables.get(table)
+        if spec is not None and spec.archive_rows:
+            archived = db.execute(text(
+                f'INSERT INTO "{spec.archive_table}" SELECT * FROM "{name}" WHERE {spec.archive_rows}'
+            )).rowcount
+        db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        db.execute(text(f'DROP TABLE "{name}"'))
+        db.commit()
+        if archived:
+            logger.info(f"Archived {archived} rows of {name} into {spec.archive_table}")
+        return archived
+
+    def drop_partitions_before(self, db: Session, table: str, cutoff: datetime) -> List[str]:
+        """
+        Detach and drop the partitions whose whole month is older than cutoff.
+
+        Args:
+            db: Database session
+            table: Partitioned table name
+            cutoff: Rows older than this may be discarded
+
+        Returns:
+            List[str]: Names of the partitions dropped
+        """
+        dropped = self.expired_partitions(db, table, cutoff)
+        for name in dropped:
+            self.drop_partition(db, table, name)
+
+        if dropped:
+            logger.info(f"Dropped expired partitions {', '.join(dropped)}")
+        return dropped
+
+    def maintain(self, db: Session) -> int:
+        """
+        Prepare upcoming partitions and apply retention on every partitioned table.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of partitions dropped
+        """
+        now = datetime.now(timezone.utc)
+        dropped = 0
+        for table in self.tables.values():
+            if not self.is_partitioned(db, table.name):
+                continue
+            self.ensure_partitions(db, table.name, now)
+            cutoff = now - timedelta(days=table.retention_days)
+            dropped += len(self.drop_partitions_before(db, table.name, cutoff))
+        return dropped
+
+
+# Global instance
+partition_manager = PartitionManager(months_ahead=settings.LOG_PARTITION_MONTHS_AHEAD)
+expiry_sweeper.register("log_partitions", partition_manager.maintain)
@@ -0,0 +1,272 @@
+"""
+Render cache for share PDFs.
+
+Generated PDFs are keyed by share id, share ``updated_at``, template version
+and language, so any edit to a share produces a new key and stale documents
+simply age out. Documents live in a byte-bounded in-process LRU and, when
+``PDF_CACHE_DIR`` is set, in a size-bounded directory from which repeat
+downloads are streamed as files. ReportLab layout runs in a process pool so
+it holds neither the event loop nor a request thread.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..models.share import Share
+from .pdf_service import pdf_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when the share PDF layout changes so cached documents are not served
+PDF_LAYOUT_VERSION = "1"
+
+
+def pdf_cache_key(share: Share) -> str:
+    """
+    Build the cache key of a share's PDF.
+
+    Args:
+        share: Share to render
+
+    Returns:
+        str: Hex SHA-256 digest of the render inputs
+    """
+    content = share.content if isinstance(share.content, dict) else {}
+    template_info = content.get('template_info') or {}
+    parts = [
+        PDF_LAYOUT_VERSION,
+        str(share.id),
+        share.updated_at.isoformat() if share.updated_at else "",
+        str(template_info.get('version') or ""),
+        share.target_language or content.get('target_language') or "",
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _render_share_pdf(
+    share_content: Dict[str, Any],
+    title: str,
+    created_at: datetime,
+    expires_at: Optional[datetime]
+) -> bytes:
+    """Process pool entry point"""
+    return pdf_service.generate_share_pdf(
+        share_content=share_content,
+        title=title,
+        created_at=created_at,
+        expires_at=expires_at
+    )
+
+
+@dataclass
+class CachedPDF:
+    """A rendered PDF, in memory or on disk"""
+    content: Optional[bytes] = None
+    path: Optional[Path] = None
+
+
+class PDFRenderCache:
+    """Byte-bounded memory LRU with an optional disk tier for rendered share PDFs."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        render_workers: int = 2
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached documents
+            directory: Directory of the disk tier (disabled when None)
+            max_disk_bytes: Disk budget for cached documents
+            render_workers: Rendering processes (render in a thread when 0)
+        """
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self.render_workers = render_workers
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, "asyncio.Future[CachedPDF]"] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"PDF cache directory unavailable, using memory only: {e}")
+                self.directory = None
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.directory / f"{key}.pdf" if self.directory is not None else None
+
+    def get(self, key: str) -> Optional[CachedPDF]:
+        """
+        Look up a rendered PDF.
+
+        Args:
+            key: Cache key from ``pdf_cache_key``
+
+        Returns:
+            Optional[CachedPDF]: The cached document, or None on a miss
+        """
+        path = self._disk_path(key)
+        if path is not None and path.is_file():
+            # Refresh mtime so disk eviction is least recently used
+            with contextlib.suppress(OSError):
+                os.utime(path)
+            self.hits += 1
+            return CachedPDF(path=path)
+
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CachedPDF(content=content)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, content: bytes) -> CachedPDF:
+        """
+        Store a rendered PDF, on disk when the disk tier is enabled.
+
+        Args:
+            key: Cache key from ``pdf_cache_key``
+            content: PDF bytes
+
+        Returns:
+            CachedPDF: The stored document
+        """
+        path = self._disk_path(key)
+        if path is not None:
+            try:
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(content)
+                os.replace(tmp_path, path)
+                self._evict_disk()
+                return CachedPDF(path=path)
+            except OSError as e:
+                logger.warning(f"PDF cache disk write failed, keeping document in memory: {e}")
+
+        if len(content) <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                self._size -= len(previous) if previous is not None else 0
+                self._entries[key] = content
+                self._size += len(content)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return CachedPDF(content=content)
+
+    def _evict_disk(self) -> None:
+        """Remove the least recently used files beyond the disk budget."""
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        for _, size, file_path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(file_path)
+                total -= size
+
+    async def get_or_render(self, share: Share) -> CachedPDF:
+        """
+        Return a share's cached PDF or render it once, coalescing concurrent callers.
+
+        Args:
+            share: Share to render
+
+        Returns:
+            CachedPDF: The rendered document
+        """
+        key = pdf_cache_key(share)
+        # The disk tier stats and touches files; keep that off the event loop
+        cached = await asyncio.to_thread(self.get, key) if self.directory is not None else self.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[CachedPDF]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            content = await self._render(share)
+            cached = await asyncio.to_thread(self.put, key, content)
+            future.set_result(cached)
+            return cached
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _render(self, share: Share) -> bytes:
+        args = (share.content, share.title, share.created_at, share.expires_at)
+        if self.render_workers <= 0:
+            return await asyncio.to_thread(_render_share_pdf, *args)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.render_workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, _render_share_pdf, *args)
+        except BrokenProcessPool as e:
+            logger.warning(f"PDF render pool failed, rendering in a thread: {e}")
+            self._pool = None
+            return await asyncio.to_thread(_render_share_pdf, *args)
+
+    def shutdown(self) -> None:
+        """Stop the render processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "disk_tier": self.directory is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Create cache instance
+pdf_render_cache = PDFRenderCache(
+    max_bytes=settings.PDF_CACHE_MAX_BYTES,
+    directory=settings.PDF_CACHE_DIR,
+    max_disk_bytes=settings.PDF_CACHE_MAX_DISK_BYTES,
+    render_workers=settings.PDF_RENDER_WORKERS
+)
@@ -1,19 +1,207 @@
 import logging
 import io
 import tempfile
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional
 from datetime import datetime
 from pathlib import Path
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus.flowables import Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
+from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY, TA_RIGHT
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Built-in CID fonts for CJK target languages (no font files needed)
+CJK_FONTS = {
+    'zh': 'STSong-Light',
+    'ja': 'HeiseiMin-W3',
+    'ko': 'HYSMyeongJo-Medium',
+}
+
+# Languages set right-aligned; they need PDF_UNICODE_FONT_PATH for their glyphs
+RTL_LANGUAGES = {'ar', 'he', 'fa', 'ur'}
+
+# Registered name of the optional TrueType font for scripts Helvetica lacks
+UNICODE_FONT_NAME = 'ShareUnicode'
+
+# Flowables laid out ahead of the current page when streaming a share
+STORY_WINDOW = 32
+
+METADATA_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+PRIVACY_NOTICE = """
+<para align="center">
+<i>This document contains personal health information. Please handle with appropriate confidentiality.</i>
+</para>
+"""
+
+
+def _register_fonts() -> Optional[str]:
+    """Register the CJK fonts and, when configured, the Unicode TrueType font."""
+    # Single-face fonts: <b>/<i> markup falls back to the regular face
+    for font_name in CJK_FONTS.values():
+        pdfmetrics.registerFont(UnicodeCIDFont(font_name))
+        registerFontFamily(font_name, normal=font_name, bold=font_name, italic=font_name, boldItalic=font_name)
+
+    font_path = settings.PDF_UNICODE_FONT_PATH
+    if not font_path:
+        return None
+    try:
+        pdfmetrics.registerFont(TTFont(UNICODE_FONT_NAME, font_path))
+        registerFontFamily(
+            UNICODE_FONT_NAME,
+            normal=UNICODE_FONT_NAME,
+            bold=UNICODE_FONT_NAME,
+            italic=UNICODE_FONT_NAME,
+            boldItalic=UNICODE_FONT_NAME
+        )
+        return UNICODE_FONT_NAME
+    except Exception as e:
+        logger.warning(f"Failed to register PDF font {font_path}, using built-in fonts: {e}")
+        return None
+
+
+UNICODE_FONT = _register_fonts()
+
+
+def _build_stylesheet(font_name: Optional[str] = None, rtl: bool = False) -> StyleSheet1:
+    """Build the share stylesheet, optionally with a font for non-Latin scripts"""
+    styles = getSampleStyleSheet()
+
+    # Title style
+    styles.add(ParagraphStyle(
+        name='ShareTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=20,
+        textColor=colors.HexColor('#2D5A87'),  # Kotori teal-like color
+        alignment=TA_CENTER
+    ))
+
+    # Subtitle style
+    styles.add(ParagraphStyle(
+        name='ShareSubtitle',
+        parent=styles['Heading2'],
+        fontSize=12,
+        spaceAfter=12,
+        textColor=colors.HexColor('#666666'),
+        alignment=TA_CENTER
+    ))
+
+    # Question style
+    styles.add(ParagraphStyle(
+        name='Question',
+        parent=styles['Heading3'],
+        fontSize=12,
+        spaceBefore=16,
+        spaceAfter=8,
+        textColor=colors.HexColor('#2D5A87'),
+        leftIndent=0
+    ))
+
+    # Answer style
+    styles.add(ParagraphStyle(
+        name='Answer',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12,
+        alignment=TA_JUSTIFY,
+        leftIndent=20,
+        rightIndent=20,
+        leading=14
+    ))
+
+    # Footer style
+    styles.add(ParagraphStyle(
+        name='Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#999999'),
+        alignment=TA_CENTER,
+        spaceBefore=20
+    ))
+
+    # Metadata style
+    styles.add(ParagraphStyle(
+        name='Metadata',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#666666'),
+        spaceAfter=6
+    ))
+
+    if font_name:
+        for style in styles.byName.values():
+            if isinstance(style, ParagraphStyle):
+                style.fontName = font_name
+                if font_name in CJK_FONTS.values():
+                    style.wordWrap = 'CJK'
+    if rtl:
+        for name in ('Question', 'Answer', 'Metadata'):
+            styles[name].alignment = TA_RIGHT
+
+    return styles
+
+
+@lru_cache(maxsize=None)
+def get_share_styles(language: Optional[str] = None) -> StyleSheet1:
+    """
+    Get the (shared, read-only) stylesheet for a target language.
+
+    Args:
+        language: Target language code such as 'en', 'ja' or 'zh-TW'
+
+    Returns:
+        StyleSheet1: Stylesheet using a font that covers the language
+    """
+    base = (language or 'en').split('-')[0].split('_')[0].lower()
+    if base in CJK_FONTS:
+        return _build_stylesheet(CJK_FONTS[base])
+    if base in RTL_LANGUAGES:
+        return _build_stylesheet(UNICODE_FONT, rtl=True)
+    return _build_stylesheet(UNICODE_FONT)
+
+
+class _FlowableStream(list):
+    """
+    Story that pulls flowables from an iterator as the document consumes them.
+
+    ReportLab pops flowables off the front of the story and checks its
+    length before each one; topping the list up at that point keeps only a
+    window of flowables alive instead of the whole share.
+    """
+
+    def __init__(self, flowables: Iterator[Flowable], window: int = STORY_WINDOW):
+        super().__init__()
+        self._source = flowables
+        self._window = window
+
+    def __len__(self) -> int:
+        while self._source is not None and super().__len__() < self._window:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return super().__len__()
+
 
 class PDFGenerationError(Exception):
     """Exception raised when PDF generation fails"""
@@ -24,73 +212,7 @@ class PDFService:
     """Service for generating PDF documents from share content"""
 
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles for consistent formatting"""
-        
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='ShareTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=20,
-            textColor=colors.HexColor('#2D5A87'),  # Kotori teal-like color
-            alignment=TA_CENTER
-        ))
-        
-        # Subtitle style
-        self.styles.add(ParagraphStyle(
-            name='ShareSubtitle',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=12,
-            textColor=colors.HexColor('#666666'),
-            alignment=TA_CENTER
-        ))
-        
-        # Question style
-        self.styles.add(ParagraphStyle(
-            name='Question',
-            parent=self.styles['Heading3'],
-            fontSize=12,
-            spaceBefore=16,
-            spaceAfter=8,
-            textColor=colors.HexColor('#2D5A87'),
-            leftIndent=0
-        ))
-        
-        # Answer style
-        self.styles.add(ParagraphStyle(
-            name='Answer',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=12,
-            alignment=TA_JUSTIFY,
-            leftIndent=20,
-            rightIndent=20,
-            leading=14
-        ))
-        
-        # Footer style
-        self.styles.add(ParagraphStyle(
-            name='Footer',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#999999'),
-            alignment=TA_CENTER,
-            spaceBefore=20
-        ))
-        
-        # Metadata style
-        self.styles.add(ParagraphStyle(
-            name='Metadata',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#666666'),
-            spaceAfter=6
-        ))
+        self.styles = get_share_styles()
 
     def generate_share_pdf(
         self,
@@ -123,45 +245,49 @@ class PDFService:
                 bottomMargin=72,
                 title=title
             )
+            styles = get_share_styles(share_content.get('target_language'))
             
-            # Build document content
-            story = []
-            
-            # Add header
-            self._add_header(story, title, share_content, created_at, expires_at)
-            
-            # Add Q&A content
-            self._add_qa_content(story, share_content)
-            
-            # Add footer
-            self._add_footer(story, share_content, created_at)
-            
-            # Build PDF
-            doc.build(story)
+            # Build PDF, laying out flowables as they are produced
+            doc.build(_FlowableStream(self._iter_share_flowables(
+                styles, title, share_content, created_at, expires_at
+            )))
             
             # Get PDF bytes
             pdf_bytes = buffer.getvalue()
             buffer.close()
             
-            logger.info(f"Generated PDF with {len(pdf_bytes)} bytes")
+            logger.info(f"Generated PDF with {len(pdf_bytes)} bytes ({doc.page} pages)")
             return pdf_bytes
             
         except Exception as e:
             logger.error(f"Failed to generate PDF: {e}")
             raise PDFGenerationError(f"PDF generation failed: {e}")
 
-    def _add_header(
+    def _iter_share_flowables(
         self,
-        story: list,
+        styles: StyleSheet1,
         title: str,
         content: Dict[str, Any],
         created_at: datetime,
         expires_at: Optional[datetime]
-    ):
-        """Add header section to PDF"""
+    ) -> Iterator[Flowable]:
+        """Produce the flowables of a share document in order"""
+        yield from self._header_flowables(styles, title, content, created_at, expires_at)
+        yield from self._qa_flowables(styles, content)
+        yield from self._footer_flowables(styles, content, created_at)
+
+    def _header_flowables(
+        self,
+        styles: StyleSheet1,
+        title: str,
+        content: Dict[str, Any],
+        created_at: datetime,
+        expires_at: Optional[datetime]
+    ) -> Iterator[Flowable]:
+        """Header section of the PDF"""
         
         # Main title
-        story.append(Paragraph(title, self.styles['ShareTitle']))
+        yield Paragraph(title, styles['ShareTitle'])
         
         # Template info
         template_info = content.get('template_info', {})
@@ -171,7 +297,7 @@ class PDFService:
         subtitle = f"Based on: {template_name}"
         if template_desc:
             subtitle += f" - {template_desc}"
-        story.append(Paragraph(subtitle, self.styles['ShareSubtitle']))
+        yield Paragraph(subtitle, styles['ShareSubtitle'])
         
         # Metadata table
         metadata_data = [
@@ -184,26 +310,19 @@ class PDFService:
             metadata_data.append(['Expires:', expires_at.strftime('%B %d, %Y')])
         
         metadata_table = Table(metadata_data, colWidths=[1.5*inch, 4*inch])
-        metadata_table.setStyle(TableStyle([
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        metadata_table.setStyle(METADATA_TABLE_STYLE)
         
-        story.append(Spacer(1, 12))
-        story.append(metadata_table)
-        story.append(Spacer(1, 20))
+        yield Spacer(1, 12)
+        yield metadata_table
+        yield Spacer(1, 20)
 
-    def _add_qa_content(self, story: list, content: Dict[str, Any]):
-        """Add Q&A content to PDF"""
+    def _qa_flowables(self, styles: StyleSheet1, content: Dict[str, Any]) -> Iterator[Flowable]:
+        """Q&A content of the PDF"""
         
         answers = content.get('answers', [])
         
         if not answers:
-            story.append(Paragraph("No content available.", self.styles['Normal']))
+            yield Paragraph("No content available.", styles['Normal'])
             return
         
         for i, qa in enumerate(answers, 1):
@@ -213,24 +332,24 @@ class PDFService:
             
             # Question
             question_with_number = f"Q{i}: {question_text}"
-            story.append(Paragraph(question_with_number, self.styles['Question']))
+            yield Paragraph(question_with_number, styles['Question'])
             
             # Answer
-            story.append(Paragraph(answer_text, self.styles['Answer']))
+            yield Paragraph(answer_text, styles['Answer'])
             
             # Confidence indicator (if low confidence)
             if confidence < 0.7:
                 confidence_note = f"<i>Note: This answer has lower confidence ({confidence:.1%}). Please verify with additional information.</i>"
-                story.append(Paragraph(confidence_note, self.styles['Metadata']))
+                yield Paragraph(confidence_note, styles['Metadata'])
             
             # Add space between Q&A pairs
             if i < len(answers):
-                story.append(Spacer(1, 12))
+                yield Spacer(1, 12)
 
-    def _add_footer(self, story: list, content: Dict[str, Any], created_at: datetime):
-        """Add footer section to PDF"""
+    def _footer_flowables(self, styles: StyleSheet1, content: Dict[str, Any], created_at: datetime) -> Iterator[Flowable]:
+        """Footer section of the PDF"""
         
-        story.append(Spacer(1, 30))
+        yield Spacer(1, 30)
         
         # Generation info
         generation_info = content.get('generation_metadata', {})
@@ -244,17 +363,11 @@ class PDFService:
         </para>
         """
         
-        story.append(Paragraph(footer_text, self.styles['Footer']))
+        yield Paragraph(footer_text, styles['Footer'])
         
         # Privacy notice
-        privacy_text = """
-        <para align="center">
-        <i>This document contains personal health information. Please handle with appropriate confidentiality.</i>
-        </para>
-        """
-        
-        story.append(Spacer(1, 12))
-        story.append(Paragraph(privacy_text, self.styles['Footer']))
+        yield Spacer(1, 12)
+        yield Paragraph(PRIVACY_NOTICE, styles['Footer'])
 
     def generate_template_pdf(self, template_data: Dict[str, Any]) -> bytes:
         """
@@ -0,0 +1,218 @@
+"""
+Token budgeting for share summary prompts.
+
+Before any generation call the planner measures the entries and questions
+of a share and picks the strategy up front: a single call when everything
+fits, question batches sized to the output budget, and map-reduce
+summarization of the entries when they exceed the input budget. Token
+counts come from the model's count-tokens API when enabled (cached per text
+digest) and otherwise from a character-class heuristic.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ASCII text averages ~4 characters per token; other scripts are counted
+# one token per character, which over-estimates accented Latin slightly
+CHARS_PER_TOKEN = 4
+
+# Entries (or their summary) may use this much of a question-answering prompt
+INPUT_TOKEN_BUDGET = 24000
+PROMPT_OVERHEAD_TOKENS = 600
+
+# Output accounting for structured answers; 2.5 models spend part of
+# max_output_tokens on thinking, which is reserved up front
+MAX_OUTPUT_TOKENS = 8192
+THINKING_RESERVE_TOKENS = 3000
+RESPONSE_OVERHEAD_TOKENS = 200
+TOKENS_PER_ANSWER = 300
+
+# Concurrent count-tokens API calls
+COUNT_CONCURRENCY = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text."""
+    if text.isascii():
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN + non_ascii
+
+
+def format_entry(entry: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+    """Render one entry for a prompt, optionally truncated to about max_tokens."""
+    content = " ".join(str(entry.get('content') or '').split())
+    header = f"[{entry.get('entry_date') or 'unknown'}] "
+    if entry.get('title'):
+        header += f"{entry['title']}: "
+
+    if max_tokens is not None:
+        max_chars = max_tokens * CHARS_PER_TOKEN - len(header)
+        if len(content) > max_chars:
+            content = content[:max(max_chars - 3, 0)] + "..."
+    return header + content
+
+
+class TokenCounter:
+    """Count tokens per text, preferring the model tokenizer and caching by digest."""
+
+    def __init__(
+        self,
+        count_fn: Optional[Callable[[str], Awaitable[int]]] = None,
+        max_entries: int = 4096
+    ):
+        """
+        Initialize the counter.
+
+        Args:
+            count_fn: Coroutine returning the model's token count for a text;
+                the heuristic estimate is used when None or when it fails
+            max_entries: Maximum number of cached counts
+        """
+        self.count_fn = count_fn
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+
+    async def count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        if self.count_fn is None or not text:
+            return estimate_tokens(text)
+
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cached = self._counts.get(key)
+        if cached is not None:
+            self._counts.move_to_end(key)
+            return cached
+
+        try:
+            tokens = await self.count_fn(text)
+        except Exception as e:
+            logger.warning(f"Token count API failed, using estimate: {e}")
+            return estimate_tokens(text)
+
+        self._counts[key] = tokens
+        while len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return tokens
+
+    def cached_count(self, text: str) -> int:
+        """Count from the cache without calling the API; the estimate for texts not counted yet."""
+        cached = self._counts.get(hashlib.sha256(text.encode("utf-8")).hexdigest()) if self.count_fn else None
+        return cached if cached is not None else estimate_tokens(text)
+
+    async def count_many(self, texts: List[str]) -> List[int]:
+        """Count the tokens of several texts, with bounded API concurrency."""
+        if self.count_fn is None:
+            return [estimate_tokens(text) for text in texts]
+
+        semaphore = asyncio.Semaphore(COUNT_CONCURRENCY)
+
+        async def count_one(text: str) -> int:
+            async with semaphore:
+                return await self.count(text)
+
+        return list(await asyncio.gather(*(count_one(text) for text in texts)))
+
+
+@dataclass
+class PromptPlan:
+    """How a share summary will be generated"""
+    entry_tokens: int
+    question_count: int
+    summarize_entries: bool
+    question_batches: List[List[Any]] = field(default_factory=list)
+
+    @property
+    def batch_size(self) -> int:
+        return max((len(batch) for batch in self.question_batches), default=0)
+
+    @property
+    def strategy(self) -> str:
+        if self.summarize_entries:
+            return "map_reduce"
+        if len(self.question_batches) > 1:
+            return "batched"
+        return "single"
+
+
+class PromptPlanner:
+    """Choose single-shot, batched or map-reduce generation before calling the model."""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        input_token_budget: int = INPUT_TOKEN_BUDGET,
+        max_output_tokens: int = MAX_OUTPUT_TOKENS
+    ):
+        self.counter = counter
+        self.input_token_budget = input_token_budget
+        self.max_output_tokens = max_output_tokens
+
+    @property
+    def max_questions_per_call(self) -> int:
+        """Questions whose answers fit one response"""
+        available = self.max_output_tokens - THINKING_RESERVE_TOKENS - RESPONSE_OVERHEAD_TOKENS
+        return max(available // TOKENS_PER_ANSWER, 1)
+
+    async def plan(self, entries: List[Dict[str, Any]], questions: List[Any]) -> PromptPlan:
+        """
+        Plan the generation of a share summary.
+
+        Args:
+            entries: Journal entries to answer from
+            questions: Template questions (strings or dicts)
+
+        Returns:
+            PromptPlan: Whether to summarize entries first and how to batch questions
+        """
+        entry_counts = await self.counter.count_many([format_entry(entry) for entry in entries])
+        entry_tokens = sum(entry_counts)
+        question_tokens = sum(estimate_tokens(str(question)) for question in questions)
+
+        summarize_entries = entry_tokens + question_tokens + PROMPT_OVERHEAD_TOKENS > self.input_token_budget
+
+        size = self.max_questions_per_call
+        # Spread questions evenly across the calls the output budget requires
+        call_count = max(-(-len(questions) // size), 1)
+        size = -(-len(questions) // call_count) if questions else size
+        batches = [questions[i:i + size] for i in range(0, len(questions), size)]
+
+        return PromptPlan(
+            entry_tokens=entry_tokens,
+            question_count=len(questions),
+            summarize_entries=summarize_entries,
+            question_batches=batches
+        )
+
+    def fit_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep the most recent entries that fit the input budget, in their
+        original order. Only trims when entries are sent unsummarized despite
+        exceeding the budget (e.g. after a failed summarization).
+
+        Entries are measured with the counts ``plan`` cached, so both agree.
+        """
+        budget = self.input_token_budget - PROMPT_OVERHEAD_TOKENS
+        ranked = sorted(
+            range(len(entries)),
+            key=lambda i: str(entries[i].get('entry_date') or ''),
+            reverse=True
+        )
+
+        kept = set()
+        used = 0
+        for i in ranked:
+            used += self.counter.cached_count(format_entry(entries[i]))
+            if used > budget:
+                break
+            kept.add(i)
+
+        if len(kept) < len(entries):
+            logger.warning(f"Prompt keeps the {len(kept)} most recent of {len(entries)} entries to fit the token budget")
+        return [entry for i, entry in enumerate(entries) if i in kept]
@@ -6,11 +6,12 @@ anomaly detection, threat intelligence, and security metrics aggregation while m
 privacy-preserving analytics and zero-knowledge compliance.
 """
 
+import bisect
 import logging
 import threading
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Deque, Dict, Hashable, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
@@ -23,7 +24,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.services.audit_service import SecurityAuditService
-# SecurityAuditLog import removed in PBI-4 Stage 2
+from app.models import SecurityAuditLog
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -92,6 +93,46 @@ class SecurityMetrics:
     top_threat_sources: List[Tuple[str, int]]
 
 
+class SlidingWindow:
+    """Per-key events within a trailing time window, expired as new events arrive"""
+
+    def __init__(self, window: timedelta):
+        self.window = window
+        self._events: Dict[Hashable, Deque[Tuple[datetime, Any]]] = defaultdict(deque)
+
+    def add(self, key: Hashable, timestamp: datetime, value: Any = None) -> Deque[Tuple[datetime, Any]]:
+        """Record an event and return the key's events still in the window"""
+        events = self._events[key]
+        events.append((timestamp, value))
+        self._expire(events, timestamp)
+        return events
+
+    def values(self, key: Hashable) -> List[Any]:
+        """Values recorded for a key"""
+        return [value for _, value in self._events.get(key, ())]
+
+    def count(self, key: Hashable) -> int:
+        """Number of events recorded for a key"""
+        events = self._events.get(key)
+        return len(events) if events else 0
+
+    def prune(self, now: datetime) -> None:
+        """Expire old events and forget idle keys"""
+        for key in list(self._events):
+            events = self._events[key]
+            self._expire(events, now)
+            if not events:
+                del self._events[key]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _expire(self, events: Deque[Tuple[datetime, Any]], now: datetime) -> None:
+        cutoff = now - self.window
+        while events and events[0][0] < cutoff:
+            events.popleft()
+
+
 class SecurityAnalytics:
     """
     Comprehensive security analytics service
@@ -119,12 +160,17 @@ class SecurityAnalytics:
         
         # Security event storage
         self.recent_events = deque(maxlen=10000)
+        # High-watermark: sequence of the last audit log analyzed (None until the first tick)
+        self.last_sequence: Optional[int] = None
+        self.initial_lookback = timedelta(minutes=5)
+        self.fetch_batch_size = 1000
         self.threat_patterns = {}
         self.user_baselines = {}  # user_id_hash -> baseline behavior
         self.ip_baselines = {}    # ip_address_hash -> baseline behavior
         
         # Detection rules
         self.detection_rules = self._load_detection_rules()
+        self._init_detection_state()
         
         # Metrics
         self.security_metrics = {
@@ -213,12 +259,9 @@ class SecurityAnalytics:
         """Background analytics loop"""
         while self.analytics_active:
             try:
-                # Analyze recent security events
+                # Analyze new security events (baselines are updated per batch)
                 self._analyze_security_events()
                 
-                # Update baselines
-                self._update_behavioral_baselines()
-                
                 # Clean up old data
                 self._cleanup_old_data()
                 
@@ -227,59 +270,127 @@ class SecurityAnalytics:
                 self.logger.error(f"Error in security analytics loop: {e}")
                 time.sleep(60)
     
+    def _init_detection_state(self):
+        """Create the incremental state behind the windowed detectors"""
+        rules = self.detection_rules
+        self.failures_by_ip = SlidingWindow(timedelta(minutes=rules['brute_force_detection']['window_minutes']))
+        self.failures_by_user = SlidingWindow(timedelta(minutes=rules['brute_force_detection']['window_minutes']))
+        self.failures_by_ip_user = SlidingWindow(timedelta(minutes=rules['brute_force_detection']['window_minutes']))
+        self.auth_attempts_by_ip = SlidingWindow(
+            timedelta(minutes=rules['credential_stuffing_detection']['window_minutes'])
+        )
+        self.requests_by_ip = SlidingWindow(timedelta(minutes=rules['enumeration_detection']['window_minutes']))
+        self.rate_limit_violations_by_ip = SlidingWindow(
+            timedelta(minutes=rules['rate_limit_bypass_detection']['window_minutes'])
+        )
+        # Processing times of the last recent_events.maxlen events, kept sorted for range counts
+        self.processing_times: Deque[float] = deque()
+        self.sorted_processing_times: List[float] = []
+    
     def _analyze_security_events(self):
-        """Analyze recent security events for threats"""
+        """Analyze audit events logged since the last run"""
         try:
             start_time = time.time()
+            analyzed = 0
             
-            # Get recent audit logs
-            recent_logs = self._get_recent_audit_logs()
-            
-            # Convert to security events
-            security_events = []
-            for log in recent_logs:
-                event = SecurityEvent(
-                    event_id=log.id,
-                    event_type=log.event_type,
-                    severity=log.severity,
-                    timestamp=log.timestamp,
-                    user_id_hash=log.user_id_hash,
-                    ip_address_hash=log.ip_address_hash,
-                    session_id_hash=log.session_id_hash,
-                    event_data=json.loads(log.event_data) if log.event_data else {}
-                )
-                security_events.append(event)
-            
-            # Analyze events for attack patterns
-            for event in security_events:
-                self._analyze_event_for_patterns(event)
+            while True:
+                logs = self._get_new_audit_logs()
+                
+                security_events = []
+                for log in logs:
+                    event_data = json.loads(log.event_data) if log.event_data else {}
+                    if log.success is not None:
+                        event_data.setdefault('success', log.success)
+                    if log.processing_time_ms is not None:
+                        event_data.setdefault('processing_time_ms', log.processing_time_ms)
+                    
+                    timestamp = log.timestamp
+                    if timestamp.tzinfo is None:
+                        timestamp = timestamp.replace(tzinfo=timezone.utc)
+                    
+                    security_events.append(SecurityEvent(
+                        event_id=str(log.id),
+                        event_type=log.event_type,
+                        severity=log.severity,
+                        timestamp=timestamp,
+                        user_id_hash=log.user_id_hash,
+                        ip_address_hash=log.ip_address_hash,
+                        session_id_hash=log.session_id_hash,
+                        event_data=event_data
+                    ))
+                
+                # Analyze events in log order, updating detection state as we go
+                for event in security_events:
+                    self._record_event(event)
+                    self._analyze_event_for_patterns(event)
+                
+                with self.lock:
+                    self.recent_events.extend(security_events)
+                    if logs:
+                        self.last_sequence = logs[-1].sequence
+                
+                self._update_behavioral_baselines(security_events)
+                analyzed += len(security_events)
+                if len(logs) < self.fetch_batch_size:
+                    break
             
-            # Store events
             with self.lock:
-                self.recent_events.extend(security_events)
-                self.security_metrics['total_events_analyzed'] += len(security_events)
+                self.security_metrics['total_events_analyzed'] += analyzed
                 self.security_metrics['analysis_runtime_ms'] = int((time.time() - start_time) * 1000)
                 self.last_analysis = datetime.now(timezone.utc)
             
         except Exception as e:
             self.logger.error(f"Error analyzing security events: {e}")
     
-    def _get_recent_audit_logs(self) -> List:
-        """Get recent audit logs for analysis"""
-        try:
-            # Get logs from last 5 minutes
-            cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=5)
-            
-            logs = self.db.query(SecurityAuditLog).filter(
-                SecurityAuditLog.timestamp >= cutoff_time,
-                SecurityAuditLog.event_category.in_(['auth', 'security', 'session'])
-            ).order_by(SecurityAuditLog.timestamp.desc()).limit(1000).all()
-            
-            return logs
-            
-        except Exception as e:
-            self.logger.error(f"Error getting recent audit logs: {e}")
-            return []
+    def _get_new_audit_logs(self) -> List:
+        """
+        Get the next batch of audit logs after the high-watermark.
+        
+        The cursor is the chain sequence rather than the timestamp: batches are
+        committed in sequence order, so rows never appear behind the cursor.
+        The first run starts from the initial lookback window.
+        """
+        query = self.db.query(SecurityAuditLog).filter(
+            SecurityAuditLog.event_category.in_(['auth', 'security', 'session'])
+        )
+        if self.last_sequence is None:
+            query = query.filter(
+                SecurityAuditLog.sequence.isnot(None),
+                SecurityAuditLog.timestamp >= datetime.now(timezone.utc) - self.initial_lookback
+            )
+        else:
+            query = query.filter(SecurityAuditLog.sequence > self.last_sequence)
+        
+        return query.order_by(SecurityAuditLog.sequence).limit(self.fetch_batch_size).all()
+    
+    def _record_event(self, event: SecurityEvent):
+        """Add an event to the windowed detection state"""
+        timestamp = event.timestamp
+        ip_hash = event.ip_address_hash
+        user_hash = event.user_id_hash
+        
+        if event.event_type in ['opaque_login_finish', 'user_login_failure']:
+            if ip_hash:
+                self.auth_attempts_by_ip.add(ip_hash, timestamp, user_hash)
+            if not event.event_data.get('success', True):
+                if ip_hash:
+                    self.failures_by_ip.add(ip_hash, timestamp)
+                if user_hash:
+                    self.failures_by_user.add(user_hash, timestamp)
+                if ip_hash and user_hash:
+                    self.failures_by_ip_user.add((ip_hash, user_hash), timestamp)
+        
+        if ip_hash:
+            self.requests_by_ip.add(ip_hash, timestamp)
+            if event.event_type == 'rate_limit_exceeded':
+                self.rate_limit_violations_by_ip.add(ip_hash, timestamp)
+        
+        processing_time = event.event_data.get('processing_time_ms', 0) or 0
+        self.processing_times.append(processing_time)
+        bisect.insort(self.sorted_processing_times, processing_time)
+        if len(self.processing_times) > self.recent_events.maxlen:
+            expired = self.processing_times.popleft()
+            del self.sorted_processing_times[bisect.bisect_left(self.sorted_processing_times, expired)]
     
     def _analyze_event_for_patterns(self, event: SecurityEvent):
         """Analyze a single event for attack patterns"""
@@ -333,22 +444,10 @@ class SecurityAnalytics:
         if event.event_data.get('success', True):
             return False
         
-        # Count recent failures from same IP or user
-        window_start = datetime.now(timezone.utc) - timedelta(
-            minutes=self.detection_rules['brute_force_detection']['window_minutes']
-        )
-        
-        failure_count = 0
-        for recent_event in self.recent_events:
-            if recent_event.timestamp < window_start:
-                continue
-            
-            if (recent_event.ip_address_hash == event.ip_address_hash or
-                recent_event.user_id_hash == event.user_id_hash):
-                
-                if (recent_event.event_type in ['opaque_login_finish', 'user_login_failure'] and
-                    not recent_event.event_data.get('success', True)):
-                    failure_count += 1
+        # Failures in the window from the same IP or against the same user
+        failure_count = self.failures_by_ip.count(event.ip_address_hash) + self.failures_by_user.count(event.user_id_hash)
+        if event.ip_address_hash and event.user_id_hash:
+            failure_count -= self.failures_by_ip_user.count((event.ip_address_hash, event.user_id_hash))
         
         max_failures = self.detection_rules['brute_force_detection']['max_failures']
         if failure_count >= max_failures:
@@ -369,27 +468,16 @@ class SecurityAnalytics:
         if not event.ip_address_hash:
             return False
         
-        window_start = datetime.now(timezone.utc) - timedelta(
-            minutes=self.detection_rules['credential_stuffing_detection']['window_minutes']
-        )
-        
-        attempt_count = 0
-        unique_users = set()
-        
-        for recent_event in self.recent_events:
-            if recent_event.timestamp < window_start:
-                continue
-            
-            if recent_event.ip_address_hash == event.ip_address_hash:
-                if recent_event.event_type in ['opaque_login_finish', 'user_login_failure']:
-                    attempt_count += 1
-                    if recent_event.user_id_hash:
-                        unique_users.add(recent_event.user_id_hash)
-        
         max_attempts = self.detection_rules['credential_stuffing_detection']['max_attempts']
         unique_threshold = self.detection_rules['credential_stuffing_detection']['unique_user_threshold']
         
-        if attempt_count >= max_attempts and len(unique_users) >= unique_threshold:
+        attempt_count = self.auth_attempts_by_ip.count(event.ip_address_hash)
+        if attempt_count < max_attempts:
+            return False
+        
+        unique_users = {user_hash for user_hash in self.auth_attempts_by_ip.values(event.ip_address_hash) if user_hash}
+        
+        if len(unique_users) >= unique_threshold:
             event.confidence = min(1.0, (attempt_count * len(unique_users)) / (max_attempts * unique_threshold))
             return True
         
@@ -401,18 +489,17 @@ class SecurityAnalytics:
             return False
         
         # Check for consistent timing patterns
-        processing_time = event.event_data.get('processing_time_ms', 0)
+        processing_time = event.event_data.get('processing_time_ms', 0) or 0
         threshold = self.detection_rules['timing_attack_detection']['response_time_threshold']
         
         if processing_time < threshold:
             return False
         
-        # Count similar timing patterns
-        pattern_count = 0
-        for recent_event in self.recent_events:
-            recent_time = recent_event.event_data.get('processing_time_ms', 0)
-            if abs(recent_time - processing_time) < 100:  # Within 100ms
-                pattern_count += 1
+        # Count recent events within 100ms of this one
+        times = self.sorted_processing_times
+        pattern_count = (
+            bisect.bisect_left(times, processing_time + 100) - bisect.bisect_right(times, processing_time - 100)
+        )
         
         pattern_threshold = self.detection_rules['timing_attack_detection']['pattern_count_threshold']
         if pattern_count >= pattern_threshold:
@@ -430,17 +517,7 @@ class SecurityAnalytics:
         if not event.ip_address_hash:
             return False
         
-        window_start = datetime.now(timezone.utc) - timedelta(
-            minutes=self.detection_rules['enumeration_detection']['window_minutes']
-        )
-        
-        request_count = 0
-        for recent_event in self.recent_events:
-            if recent_event.timestamp < window_start:
-                continue
-            
-            if recent_event.ip_address_hash == event.ip_address_hash:
-                request_count += 1
+        request_count = self.requests_by_ip.count(event.ip_address_hash)
         
         threshold = self.detection_rules['enumeration_detection']['request_rate_threshold']
         if request_count >= threshold:
@@ -455,21 +532,10 @@ class SecurityAnalytics:
             return False
         
         # Look for rate limit violations
-        if event.event_type != 'rate_limit_exceeded':
+        if event.event_type != 'rate_limit_exceeded' or not event.ip_address_hash:
             return False
         
-        window_start = datetime.now(timezone.utc) - timedelta(
-            minutes=self.detection_rules['rate_limit_bypass_detection']['window_minutes']
-        )
-        
-        violation_count = 0
-        for recent_event in self.recent_events:
-            if recent_event.timestamp < window_start:
-                continue
-            
-            if (recent_event.ip_address_hash == event.ip_address_hash and
-                recent_event.event_type == 'rate_limit_exceeded'):
-                violation_count += 1
+        violation_count = self.rate_limit_violations_by_ip.count(event.ip_address_hash)
         
         threshold = self.detection_rules['rate_limit_bypass_detection']['request_count_threshold']
         if violation_count >= threshold:
@@ -572,8 +638,8 @@ class SecurityAnalytics:
                 event_category="security",
                 severity="warning" if event.threat_score < 0.7 else "critical",
                 message=f"Attack patterns detected: {', '.join(pattern_names)}",
-                user_id=event.user_id_hash,
-                ip_address=event.ip_address_hash,
+                user_id_hash=event.user_id_hash,
+                ip_address_hash=event.ip_address_hash,
                 event_data={
                     "original_event_id": event.event_id,
                     "patterns": pattern_names,
@@ -591,25 +657,37 @@ class SecurityAnalytics:
         except Exception as e:
             self.logger.error(f"Error logging pattern detection: {e}")
     
-    def _update_behavioral_baselines(self):
-        """Update behavioral baselines for users and IPs"""
+    def _update_behavioral_baselines(self, events: List[SecurityEvent]):
+        """Update behavioral baselines of the users and IPs seen in new events"""
         try:
+            user_hashes = {event.user_id_hash for event in events if event.user_id_hash}
+            ip_hashes = {event.ip_address_hash for event in events if event.ip_address_hash}
+            if not user_hashes and not ip_hashes:
+                return
+            
+            # One pass over the buffer for all touched keys
+            user_events = defaultdict(list)
+            ip_events = defaultdict(list)
+            for event in self.recent_events:
+                if event.user_id_hash in user_hashes:
+                    user_events[event.user_id_hash].append(event)
+                if event.ip_address_hash in ip_hashes:
+                    ip_events[event.ip_address_hash].append(event)
+            
             # Update user baselines
-            for user_id_hash in set(event.user_id_hash for event in self.recent_events if event.user_id_hash):
-                self._update_user_baseline(user_id_hash)
+            for user_id_hash, events_for_user in user_events.items():
+                self._update_user_baseline(user_id_hash, events_for_user)
             
             # Update IP baselines
-            for ip_hash in set(event.ip_address_hash for event in self.recent_events if event.ip_address_hash):
-                self._update_ip_baseline(ip_hash)
+            for ip_hash, events_for_ip in ip_events.items():
+                self._update_ip_baseline(ip_hash, events_for_ip)
                 
         except Exception as e:
             self.logger.error(f"Error updating behavioral baselines: {e}")
     
-    def _update_user_baseline(self, user_id_hash: str):
-        """Update baseline behavior for a user"""
+    def _update_user_baseline(self, user_id_hash: str, user_events: List[SecurityEvent]):
+        """Update baseline behavior for a user from their buffered events"""
         try:
-            user_events = [event for event in self.recent_events if event.user_id_hash == user_id_hash]
-            
             if not user_events:
                 return
             
@@ -640,11 +718,9 @@ class SecurityAnalytics:
         except Exception as e:
             self.logger.error(f"Error updating user baseline for {user_id_hash}: {e}")
     
-    def _update_ip_baseline(self, ip_hash: str):
-        """Update baseline behavior for an IP address"""
+    def _update_ip_baseline(self, ip_hash: str, ip_events: List[SecurityEvent]):
+        """Update baseline behavior for an IP address from its buffered events"""
         try:
-            ip_events = [event for event in self.recent_events if event.ip_address_hash == ip_hash]
-            
             if not ip_events:
                 return
             
@@ -675,6 +751,14 @@ class SecurityAnalytics:
             baseline = self.ip_baselines[ip_hash]
             if baseline.get('last_updated', datetime.min.replace(tzinfo=timezone.utc)) < cutoff_time:
                 del self.ip_baselines[ip_hash]
+        
+        # Forget sources that went quiet
+        now = datetime.now(timezone.utc)
+        for window in (
+            self.failures_by_ip, self.failures_by_user, self.failures_by_ip_user,
+            self.auth_attempts_by_ip, self.requests_by_ip, self.rate_limit_violations_by_ip
+        ):
+            window.prune(now)
     
     def get_security_metrics(self) -> Dict[str, Any]:
         """Get current security metrics"""
@@ -8,19 +8,22 @@ including JWT-based session token generation, validation, lifecycle management,
 import secrets
 import hashlib
 import base64
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any, Tuple
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 import json
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 
+from ..crypto.key_manager import end_session as end_session_keys
 from ..models.opaque_auth import OpaqueSession
 from ..models.user import User
 from ..core.config import settings
 from .jwt_service import jwt_service, JWTValidationError
+from .expiry_sweeper import expiry_sweeper, sweep_in_batches
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,7 @@ class SessionService:
     # Session timeouts (configurable via settings)
     DEFAULT_SESSION_IDLE_TIMEOUT = timedelta(hours=24)  # 24 hours idle
     DEFAULT_SESSION_ABSOLUTE_TIMEOUT = timedelta(days=7)  # 7 days absolute
+    EXPIRED_SESSION_RETENTION_DAYS = 7  # Expired sessions are kept this long before deletion
     
     # Security limits
     MAX_CONCURRENT_SESSIONS_PER_USER = 5
@@ -431,30 +435,46 @@ class SessionService:
             logger.error(f"Database error invalidating user sessions: {str(e)}")
             raise SessionTokenError(f"Failed to invalidate user sessions: {str(e)}")
     
-    def cleanup_expired_sessions(self, db: Session) -> int:
+    def cleanup_expired_sessions(self, db: Session, retention_days: Optional[int] = None) -> int:
         """
         Clean up expired sessions from database and JWT blacklist
         
+        Sessions are deleted once they have been expired for the retention
+        period, and their in-memory session keys are ended with them.
+        
         Args:
             db: Database session
+            retention_days: Days to keep expired sessions (EXPIRED_SESSION_RETENTION_DAYS by default)
             
         Returns:
             int: Number of sessions cleaned up
         """
         try:
-            now = datetime.now(UTC)
-            
-            # Find expired sessions
-            expired_sessions = db.query(OpaqueSession).filter(
-                OpaqueSession.expires_at < now
-            ).all()
+            if retention_days is None:
+                retention_days = self.EXPIRED_SESSION_RETENTION_DAYS
+            cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+            
+            # Delete expired sessions in bounded batches without loading them
+            def delete_batch(limit: int):
+                batch = (
+                    select(OpaqueSession.session_id)
+                    .where(OpaqueSession.expires_at < cutoff)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+                return (
+                    delete(OpaqueSession)
+                    .where(OpaqueSession.session_id.in_(batch.scalar_subquery()))
+                    .returning(OpaqueSession.session_id)
+                )
             
-            count = 0
-            for session in expired_sessions:
-                db.delete(session)
-                count += 1
+            def end_sessions(session_ids: List[str]) -> None:
+                for session_id in session_ids:
+                    end_session_keys(session_id)
             
-            db.commit()
+            count = sweep_in_batches(
+                db, delete_batch, batch_size=expiry_sweeper.batch_size, on_batch=end_sessions
+            ).rows
             
             # Also cleanup expired JWT tokens
             jwt_cleanup_count = jwt_service.cleanup_expired_tokens()
@@ -667,4 +687,5 @@ class SessionService:
 
 
 # Global session service instance
-session_service = SessionService() 
\ No newline at end of file
+session_service = SessionService()
+expiry_sweeper.register("expired_sessions", session_service.cleanup_expired_sessions)
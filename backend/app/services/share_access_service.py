@@ -0,0 +1,349 @@
+"""
+Read path and access logging for public share links.
+
+Public share views are served from an in-process cache of the rendered
+response, keyed by share token, so a popular link costs no database work
+after the first view. Entries expire with the share and are dropped when the
+owner updates or deactivates it; the TTL bounds how long another instance
+may keep serving a share deactivated elsewhere.
+
+Views and downloads are appended to an in-memory buffer instead of being
+written per request. A background task flushes it periodically with one
+bulk insert into ``share_access`` and one aggregated counter update per
+share, which replaces the per-view write transaction and row lock on
+``shares``. The buffer is bounded: while the database is unavailable the
+oldest events are dropped beyond ``max_buffered``, and events of shares
+deleted before their flush are discarded instead of failing every batch.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.session_factory import get_session_factory
+from ..models.share import Share, ShareAccess
+from ..schemas.share import SharePublicResponse
+
+logger = logging.getLogger(__name__)
+
+
+def hash_sensitive_data(data: str) -> str:
+    """Hash sensitive data like IP addresses for privacy"""
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+@dataclass
+class CachedPublicShare:
+    """Rendered public view of an active share"""
+    share_id: UUID
+    body: bytes
+    expires_at: float  # time.monotonic() deadline
+
+
+class PublicShareCache:
+    """Size-bounded, thread-safe cache of rendered public share responses."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedPublicShare]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[CachedPublicShare]:
+        """
+        Look up the rendered view of a share.
+
+        Args:
+            token: Public share token
+
+        Returns:
+            Optional[CachedPublicShare]: Cached view, or None on a miss
+        """
+        with self._lock:
+            cached = self._entries.get(token)
+            if cached is not None and cached.expires_at <= time.monotonic():
+                del self._entries[token]
+                cached = None
+
+            if cached is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return cached
+
+    def put(self, share: Share) -> CachedPublicShare:
+        """
+        Render an active, unexpired share and cache it under its token.
+
+        Args:
+            share: Share to render
+
+        Returns:
+            CachedPublicShare: The rendered view
+        """
+        body = SharePublicResponse(
+            title=share.title,
+            content=share.content,
+            created_at=share.created_at,
+            expires_at=share.expires_at,
+            is_expired=share.is_expired
+        ).model_dump_json().encode("utf-8")
+
+        ttl = float(self.ttl_seconds)
+        if share.expires_at is not None:
+            ttl = min(ttl, (share.expires_at - datetime.now(timezone.utc)).total_seconds())
+
+        cached = CachedPublicShare(share_id=share.id, body=body, expires_at=time.monotonic() + ttl)
+        if ttl <= 0:
+            return cached
+
+        with self._lock:
+            self._entries[share.share_token] = cached
+            self._entries.move_to_end(share.share_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, token: str) -> None:
+        """Drop a share from the cache after it changes."""
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class ShareAccessBuffer:
+    """Buffer share access events and write them to the database in batches."""
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 10000, max_buffered: int = 100000):
+        """
+        Initialize the buffer.
+
+        Args:
+            flush_interval: Seconds between background flushes
+            max_pending: Buffered events that trigger an early flush
+            max_buffered: Buffer capacity; further events are dropped
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_buffered = max(max_buffered, max_pending)
+        self.dropped = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        share_id: UUID,
+        *,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        referrer: Optional[str] = None,
+        access_type: str = "view"
+    ) -> None:
+        """
+        Queue an access event; nothing is written until the next flush.
+
+        Args:
+            share_id: Accessed share
+            ip_address: Client IP address (stored hashed)
+            user_agent: Client user agent (stored hashed)
+            referrer: HTTP referrer
+            access_type: view or download
+        """
+        event = {
+            "share_id": share_id,
+            "ip_address_hash": hash_sensitive_data(ip_address) if ip_address else None,
+            "user_agent_hash": hash_sensitive_data(user_agent) if user_agent else None,
+            "referrer": referrer[:255] if referrer else None,  # Truncate if too long
+            "access_type": access_type,
+            "created_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            accepted = len(self._pending) < self.max_buffered
+            if accepted:
+                self._pending.append(event)
+            else:
+                self.dropped += 1
+            pending = len(self._pending)
+
+        if not accepted:
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Share access buffer full, {self.dropped} events dropped so far")
+            return
+        if pending >= self.max_pending:
+            self._request_flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered events"""
+        return len(self._pending)
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is active"""
+        return self._task is not None and not self._task.done()
+
+    def flush(self, db: Session) -> int:
+        """
+        Write buffered events: one bulk insert and one counter update per share.
+
+        Events of shares that no longer exist are discarded; if the write
+        fails otherwise, events are put back in the buffer (up to its capacity).
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of events written
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if not events:
+                return 0
+
+            try:
+                try:
+                    self._write(db, events)
+                except IntegrityError:
+                    # Typically a share deleted since it was viewed: drop its events and retry once
+                    db.rollback()
+                    events = self._discard_orphans(db, events)
+                    if events:
+                        self._write(db, events)
+            except Exception:
+                db.rollback()
+                self._requeue(events)
+                raise
+
+            return len(events)
+
+    def _write(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        counts = Counter(event["share_id"] for event in events)
+        last_seen: Dict[UUID, datetime] = {}
+        for event in events:
+            last_seen[event["share_id"]] = event["created_at"]
+
+        db.execute(insert(ShareAccess), events)
+        db.execute(
+            Share.__table__.update()
+            .where(Share.__table__.c.id == bindparam("b_share_id"))
+            .values(
+                access_count=Share.__table__.c.access_count + bindparam("b_count"),
+                last_accessed_at=bindparam("b_last_accessed_at"),
+                # Access counters are not edits: keep updated_at (and the PDF cache key)
+                updated_at=Share.__table__.c.updated_at
+            ),
+            [
+                {"b_share_id": share_id, "b_count": count, "b_last_accessed_at": last_seen[share_id]}
+                for share_id, count in counts.items()
+            ]
+        )
+        db.commit()
+        logger.info(f"Recorded {len(events)} share accesses across {len(counts)} shares")
+
+    def _discard_orphans(self, db: Session, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        share_ids = {event["share_id"] for event in events}
+        existing = set(db.execute(select(Share.id).where(Share.id.in_(share_ids))).scalars())
+        db.rollback()
+
+        kept = [event for event in events if event["share_id"] in existing]
+        if len(kept) < len(events):
+            logger.warning(
+                f"Discarded {len(events) - len(kept)} access events of {len(share_ids - existing)} deleted shares"
+            )
+        return kept
+
+    def _requeue(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._pending[:0] = events
+            overflow = len(self._pending) - self.max_buffered
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+        if overflow > 0:
+            logger.warning(f"Share access buffer full, dropped the {overflow} oldest events")
+
+    def flush_pending(self) -> int:
+        """Flush buffered events in a new session."""
+        with get_session_factory().get_session_context() as db:
+            return self.flush(db)
+
+    def _request_flush(self) -> None:
+        # Called from request threads; wake the flusher on its own loop
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run_forever(self) -> None:
+        """Flush buffered events until cancelled"""
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+
+            try:
+                await asyncio.to_thread(self.flush_pending)
+            except Exception as e:
+                logger.error(f"Share access flush failed, retrying later: {e}")
+
+    def start(self) -> asyncio.Task:
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write what is left"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._loop = None
+        if not self.pending:
+            return
+
+        try:
+            await asyncio.to_thread(self.flush_pending)
+        except Exception as e:
+            logger.error(f"Final share access flush failed, {self.pending} events lost: {e}")
+
+
+# Global instances
+public_share_cache = PublicShareCache(
+    max_entries=settings.PUBLIC_SHARE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PUBLIC_SHARE_CACHE_TTL_SECONDS
+)
+share_access_buffer = ShareAccessBuffer(
+    flush_interval=settings.SHARE_ACCESS_FLUSH_INTERVAL_SECONDS,
+    max_buffered=settings.SHARE_ACCESS_MAX_BUFFERED
+)
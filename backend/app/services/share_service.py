@@ -1,22 +1,39 @@
+import asyncio
 import logging
 import secrets
-import hashlib
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, case, desc, func, or_, select, update
 
+from ..db.session_factory import get_session_factory
 from ..models.share import Share, ShareAccess
 from ..models.journal_entry import JournalEntry
-from ..schemas.share import ShareCreateRequest, ShareContent, ShareQuestionAnswer
-from ..services.gemini_service import gemini_service
-from ..services.share_template_service import share_template_service
-from ..services.journal_service import journal_service
+from ..models.job import Job
+from ..schemas.share import ShareCreateRequest, ShareContent, ShareQuestionAnswer, ShareResponse
+from ..services.gemini_service import SummaryProgressCallback, gemini_service
+from ..services.job_service import job_service
+from ..services.share_access_service import public_share_cache
+from ..services.template_catalog import template_catalog
+from ..services.expiry_sweeper import expiry_sweeper, sweep_in_batches
 from .base import BaseService
 
 logger = logging.getLogger(__name__)
 
+SHARE_CREATE_JOB = "share.create"
+
+
+@dataclass
+class PreparedShare:
+    """Validated share inputs, resolved before any Gemini call"""
+    template: Any
+    entries: List[Any]  # JournalEntry rows (or column tuples); empty for client plaintext
+    entry_data: List[Dict[str, Any]]
+    questions_list: List[Dict[str, Any]]
+    template_payload: Dict[str, Any]
+
 
 class ShareService(BaseService[Share, ShareCreateRequest, dict]):
     """Service for managing journal entry shares"""
@@ -25,12 +42,6 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
         """Generate a secure random token for share access"""
         return secrets.token_urlsafe(32)
 
-    def hash_sensitive_data(self, data: str) -> str:
-        """Hash sensitive data for privacy-preserving storage"""
-        if not data:
-            return ""
-        return hashlib.sha256(data.encode()).hexdigest()
-
     async def create_share(
         self,
         db: Session,
@@ -39,9 +50,130 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
         request: ShareCreateRequest
     ) -> Share:
         """Create a new share by processing journal entries with Gemini"""
+        prepared = self.prepare_share(db, user_id=user_id, request=request)
+        qa_pairs, gemini_response = await self._generate_answers(request, prepared)
+        return self._persist_share(
+            db,
+            user_id=user_id,
+            request=request,
+            prepared=prepared,
+            qa_pairs=qa_pairs,
+            gemini_response=gemini_response
+        )
+
+    def enqueue_share(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        request: ShareCreateRequest
+    ) -> Job:
+        """
+        Validate a share request and queue its generation as a background job.
         
+        Entries selected by id or date range are re-read by the job; only
+        client-supplied plaintext entries travel with it, inside the request
+        stored as encrypted job input, which is dropped once the job settles.
+        The job result is the ShareResponse.
+        
+        Raises:
+            ValueError: If the template or entries are missing or inaccessible
+        """
+        self.prepare_share(db, user_id=user_id, request=request)
+        return job_service.enqueue(
+            db,
+            job_type=SHARE_CREATE_JOB,
+            user_id=user_id,
+            payload={"template_id": request.template_id, "target_language": request.target_language},
+            input_data=request.model_dump_json().encode("utf-8")
+        )
+
+    async def stream_share(
+        self,
+        *,
+        user_id: UUID,
+        request: ShareCreateRequest,
+        prepared: PreparedShare
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a share while streaming progress and answers as events.
+        
+        Yields ``progress`` events for each generation stage, an ``answer``
+        event per ShareQuestionAnswer as soon as its batch resolves (a later
+        event for the same question_id replaces the earlier one), and a final
+        ``complete`` event with the persisted share, or ``error``.
+        
+        The generator outlives the request that started it, so the share is
+        saved in its own session, in a worker thread.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        sent: Dict[str, ShareQuestionAnswer] = {}
+
+        async def send_answer(answer: ShareQuestionAnswer):
+            if sent.get(answer.question_id) != answer:
+                sent[answer.question_id] = answer
+                await events.put({"event": "answer", "answer": answer.model_dump()})
+
+        async def on_progress(event: str, data: Dict[str, Any]):
+            if event == "stage":
+                await events.put({"event": "progress", "stage": data["stage"]})
+            elif event == "answers":
+                for qa in data["answers"]:
+                    await send_answer(self._to_share_answer(qa))
+
+        async def run() -> Dict[str, Any]:
+            try:
+                qa_pairs, gemini_response = await self._generate_answers(request, prepared, on_progress=on_progress)
+                # Fallback answers (Gemini failure) were never streamed
+                for answer in qa_pairs:
+                    await send_answer(answer)
+                await events.put({"event": "progress", "stage": "saving"})
+                return await asyncio.to_thread(
+                    self._persist_share_response,
+                    user_id=user_id,
+                    request=request,
+                    prepared=prepared,
+                    qa_pairs=qa_pairs,
+                    gemini_response=gemini_response
+                )
+            finally:
+                await events.put(None)
+
+        yield {"event": "progress", "stage": "started", "question_count": len(prepared.questions_list)}
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+
+            share = await task
+            logger.info(f"Created share {share['id']} for user {user_id} (streamed)")
+            yield {"event": "complete", "share": share}
+        except Exception as e:
+            logger.error(f"Streaming share generation failed for user {user_id}: {e}")
+            yield {"event": "error", "detail": "Failed to create share"}
+        finally:
+            # Client went away: stop generating instead of finishing unobserved
+            if not task.done():
+                task.cancel()
+
+    def prepare_share(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        request: ShareCreateRequest
+    ) -> PreparedShare:
+        """
+        Resolve the template and journal entries for a share request.
+        
+        Raises:
+            ValueError: If the template or entries are missing or inaccessible
+        """
         # Get the template
-        template = share_template_service.get_by_template_id(db, template_id=request.template_id)
+        template = template_catalog.get_template(db, request.template_id)
         if not template:
             raise ValueError(f"Template '{request.template_id}' not found")
         
@@ -87,30 +219,26 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
             start_date = datetime.fromisoformat(request.date_range['start'].replace('Z', '+00:00')).date()
             end_date = datetime.fromisoformat(request.date_range['end'].replace('Z', '+00:00')).date()
             
-            # Get entries using journal service
-            journal_entries = journal_service.get_multi_by_user(
-                db=db,
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                limit=1000  # Large limit to get all entries in range
-            )
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            if not journal_entries:
-                raise ValueError("No journal entries found in the specified date range")
-            
-            # Convert journal service entries back to ORM models for processing
-            entry_ids = [entry.id for entry in journal_entries]
+            # Load only the columns the summary needs, oldest first; the journal
+            # listing API caps results and eager-loads tags, which shares don't use
             entries = (
-                db.query(JournalEntry)
+                db.query(JournalEntry.id, JournalEntry.content, JournalEntry.entry_date, JournalEntry.title)
                 .filter(
                     and_(
                         JournalEntry.user_id == user_id,
-                        JournalEntry.id.in_(entry_ids)
+                        JournalEntry.entry_date >= start_datetime,
+                        JournalEntry.entry_date <= end_datetime
                     )
                 )
+                .order_by(JournalEntry.entry_date)
                 .all()
             )
+            
+            if not entries:
+                raise ValueError("No journal entries found in the specified date range")
         
         if not request.entries:
             if not entries:
@@ -156,24 +284,46 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
             'questions': questions_list,
         }
 
+        return PreparedShare(
+            template=template,
+            entries=entries,
+            entry_data=entry_data,
+            questions_list=questions_list,
+            template_payload=template_payload
+        )
+
+    def _to_share_answer(self, qa: Any) -> ShareQuestionAnswer:
+        """Convert a Gemini QuestionAnswer into the share answer format"""
+        return ShareQuestionAnswer(
+            question_id=qa.question_id,
+            question_text=qa.question_text,
+            answer=qa.answer,
+            confidence=qa.confidence
+        )
+
+    async def _generate_answers(
+        self,
+        request: ShareCreateRequest,
+        prepared: PreparedShare,
+        on_progress: Optional[SummaryProgressCallback] = None
+    ) -> Tuple[List[ShareQuestionAnswer], Any]:
+        """Generate Q&A pairs with Gemini, falling back to placeholder answers on failure"""
+        entries = prepared.entries
+        entry_data = prepared.entry_data
+        questions_list = prepared.questions_list
+        template_payload = prepared.template_payload
+
         # Generate summary using Gemini
         try:
             gemini_response = await gemini_service.generate_share_summary(
                 entries=entry_data,
                 template=template_payload,
-                target_language=request.target_language
+                target_language=request.target_language,
+                on_progress=on_progress
             )
             
             # Convert Gemini response to our format
-            qa_pairs = [
-                ShareQuestionAnswer(
-                    question_id=qa.question_id,
-                    question_text=qa.question_text,
-                    answer=qa.answer,
-                    confidence=qa.confidence
-                )
-                for qa in gemini_response.answers
-            ]
+            qa_pairs = [self._to_share_answer(qa) for qa in gemini_response.answers]
             
         except Exception as e:
             logger.error(f"Failed to generate summary with Gemini: {e}")
@@ -230,6 +380,44 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
                 'processing_notes': f"Fallback used - {str(e)}"
             })()
 
+        return qa_pairs, gemini_response
+
+    def _persist_share_response(
+        self,
+        *,
+        user_id: UUID,
+        request: ShareCreateRequest,
+        prepared: PreparedShare,
+        qa_pairs: List[ShareQuestionAnswer],
+        gemini_response: Any
+    ) -> Dict[str, Any]:
+        """Store a generated share in a fresh session and return its ShareResponse fields"""
+        with get_session_factory().get_session_context() as db:
+            share = self._persist_share(
+                db,
+                user_id=user_id,
+                request=request,
+                prepared=prepared,
+                qa_pairs=qa_pairs,
+                gemini_response=gemini_response
+            )
+            return ShareResponse.model_validate(share).model_dump(mode="json")
+
+    def _persist_share(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        request: ShareCreateRequest,
+        prepared: PreparedShare,
+        qa_pairs: List[ShareQuestionAnswer],
+        gemini_response: Any
+    ) -> Share:
+        """Store the generated share and record plaintext consent"""
+        template = prepared.template
+        entries = prepared.entries
+        entry_data = prepared.entry_data
+
         # Create share content
         content = ShareContent(
             answers=qa_pairs,
@@ -305,6 +493,7 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
         logger.info(f"Created share {db_share.id} for user {user_id} with {len(qa_pairs)} Q&A pairs")
         return db_share
 
+
     def get_by_token(self, db: Session, *, token: str) -> Optional[Share]:
         """Get share by public token"""
         return db.query(Share).filter(Share.share_token == token).first()
@@ -332,43 +521,18 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
             .all()
         )
 
-    def access_share(
-        self,
-        db: Session,
-        *,
-        share: Share,
-        ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None,
-        referrer: Optional[str] = None,
-        access_type: str = "view"
-    ) -> Share:
-        """Record share access and update counters"""
-        
-        # Check if share is expired or inactive
+    def ensure_accessible(self, share: Share) -> None:
+        """Raise ValueError if the share is inactive or expired"""
         if not share.is_active:
             raise ValueError("Share is no longer active")
-            
+
         if share.is_expired:
             raise ValueError("Share has expired")
 
-        # Update share access count and timestamp
-        share.access_count += 1
-        share.last_accessed_at = datetime.now(timezone.utc)
-        
-        # Create access log
-        access_log = ShareAccess(
-            share_id=share.id,
-            ip_address_hash=self.hash_sensitive_data(ip_address) if ip_address else None,
-            user_agent_hash=self.hash_sensitive_data(user_agent) if user_agent else None,
-            referrer=referrer[:255] if referrer else None,  # Truncate if too long
-            access_type=access_type
-        )
-        
-        db.add(access_log)
-        db.commit()
-        db.refresh(share)
-        
-        logger.info(f"Recorded {access_type} access to share {share.id}")
+    def update(self, db: Session, *, db_obj: Share, obj_in: Any) -> Share:
+        """Update a share and drop its cached public view"""
+        share = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        public_share_cache.invalidate(share.share_token)
         return share
 
     def deactivate_share(self, db: Session, *, share_id: UUID, user_id: UUID) -> Optional[Share]:
@@ -385,69 +549,119 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
         share.is_active = False
         db.commit()
         db.refresh(share)
+        public_share_cache.invalidate(share.share_token)
         
         logger.info(f"Deactivated share {share_id}")
         return share
 
-    def cleanup_expired_shares(self, db: Session) -> int:
-        """Clean up expired shares (run as background task)"""
+    def cleanup_expired_shares(self, db: Session, *, batch_size: Optional[int] = None) -> int:
+        """
+        Deactivate expired shares in bounded batches (run by the expiry sweeper).
+
+        Args:
+            db: Database session
+            batch_size: Shares per transaction (defaults to the sweeper's)
+
+        Returns:
+            int: Number of shares deactivated
+        """
         now = datetime.now(timezone.utc)
-        
-        # Find expired shares
-        expired_shares = (
-            db.query(Share)
-            .filter(
-                and_(
-                    Share.expires_at < now,
-                    Share.is_active == True
-                )
+
+        def expire_batch(limit: int):
+            batch = (
+                select(Share.id)
+                .where(Share.is_active.is_(True), Share.expires_at < now)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
             )
-            .all()
+            return (
+                update(Share)
+                .where(Share.id.in_(batch.scalar_subquery()))
+                .values(is_active=False)
+                .returning(Share.share_token)
+            )
+
+        def invalidate_batch(tokens: List[str]) -> None:
+            for token in tokens:
+                public_share_cache.invalidate(token)
+
+        result = sweep_in_batches(
+            db,
+            expire_batch,
+            batch_size=batch_size or expiry_sweeper.batch_size,
+            on_batch=invalidate_batch
         )
-        
-        # Deactivate expired shares
-        for share in expired_shares:
-            share.is_active = False
-            
-        if expired_shares:
-            db.commit()
-            logger.info(f"Deactivated {len(expired_shares)} expired shares")
-            
-        return len(expired_shares)
+        if result.rows:
+            logger.info(f"Deactivated {result.rows} expired shares in {result.batches} batches")
+        return result.rows
 
     def get_share_stats(self, db: Session, *, user_id: UUID) -> Dict[str, Any]:
-        """Get share statistics for a user"""
-        shares = self.get_user_shares(db, user_id=user_id, active_only=False, limit=1000)
-        
-        active_shares = [s for s in shares if s.is_active and not s.is_expired]
-        total_accesses = sum(s.access_count for s in shares)
-        
-        # Group by template
-        by_template = {}
-        for share in shares:
-            template_id = share.template_id
-            by_template[template_id] = by_template.get(template_id, 0) + 1
-        
-        # Group by language
-        by_language = {}
-        for share in shares:
-            lang = share.target_language
-            by_language[lang] = by_language.get(lang, 0) + 1
-        
+        """
+        Get share statistics for a user.
+
+        Counts come from one aggregate query grouped by template and language;
+        share content is never loaded.
+
+        Args:
+            db: Database session
+            user_id: Owner of the shares
+
+        Returns:
+            Dict[str, Any]: Totals, per-template and per-language counts, recent activity
+        """
+        now = datetime.now(timezone.utc)
+        is_live = and_(
+            Share.is_active.is_(True),
+            or_(Share.expires_at.is_(None), Share.expires_at > now)
+        )
+        groups = (
+            db.query(
+                Share.template_id,
+                Share.target_language,
+                func.count(Share.id),
+                func.coalesce(func.sum(case((is_live, 1), else_=0)), 0),
+                func.coalesce(func.sum(Share.access_count), 0)
+            )
+            .filter(Share.user_id == user_id)
+            .group_by(Share.template_id, Share.target_language)
+            .all()
+        )
+
+        total_shares = 0
+        active_shares = 0
+        total_accesses = 0
+        by_template: Dict[str, int] = {}
+        by_language: Dict[str, int] = {}
+        for template_id, lang, count, active, accesses in groups:
+            total_shares += count
+            active_shares += int(active)
+            total_accesses += int(accesses)
+            by_template[template_id] = by_template.get(template_id, 0) + count
+            by_language[lang] = by_language.get(lang, 0) + count
+
         # Recent activity (last 10 shares)
-        recent_activity = []
-        for share in shares[:10]:
-            recent_activity.append({
+        recent = (
+            db.query(Share)
+            .options(load_only(Share.id, Share.title, Share.created_at, Share.access_count, Share.is_active))
+            .filter(Share.user_id == user_id)
+            .order_by(desc(Share.created_at))
+            .limit(10)
+            .all()
+        )
+        recent_activity = [
+            {
                 "id": str(share.id),
                 "title": share.title,
                 "created_at": share.created_at.isoformat(),
                 "access_count": share.access_count,
                 "is_active": share.is_active
-            })
-        
+            }
+            for share in recent
+        ]
+
         return {
-            "total_shares": len(shares),
-            "active_shares": len(active_shares),
+            "total_shares": total_shares,
+            "active_shares": active_shares,
             "total_accesses": total_accesses,
             "shares_by_template": by_template,
             "shares_by_language": by_language,
@@ -455,5 +669,15 @@ class ShareService(BaseService[Share, ShareCreateRequest, dict]):
         }
 
 
+async def run_share_job(db: Session, job: Job) -> Dict[str, Any]:
+    """Job handler: generate and persist a queued share"""
+    request = ShareCreateRequest.model_validate_json(job_service.read_input(job))
+    share = await share_service.create_share(db, user_id=job.user_id, request=request)
+    logger.info(f"Created share {share.id} for user {job.user_id} (job {job.id})")
+    return ShareResponse.model_validate(share).model_dump(mode="json")
+
+
 # Create service instance
 share_service = ShareService(Share)
+job_service.register(SHARE_CREATE_JOB, run_share_job)
+expiry_sweeper.register("expired_shares", share_service.cleanup_expired_shares)
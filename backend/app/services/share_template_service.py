@@ -7,6 +7,7 @@ from sqlalchemy import and_
 from ..models.share_template import ShareTemplate
 from ..schemas.share_template import ShareTemplateCreate, ShareTemplateUpdate
 from .base import BaseService
+from .template_catalog import template_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +61,7 @@ class ShareTemplateService(BaseService[ShareTemplate, ShareTemplateCreate, Share
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        template_catalog.invalidate()
         
         logger.info(f"Created share template: {obj_in.template_id}")
         return db_obj
@@ -75,6 +77,7 @@ class ShareTemplateService(BaseService[ShareTemplate, ShareTemplateCreate, Share
         
         db.commit()
         db.refresh(db_obj)
+        template_catalog.invalidate()
         
         logger.info(f"Updated share template: {db_obj.template_id}")
         return db_obj
@@ -90,6 +93,7 @@ class ShareTemplateService(BaseService[ShareTemplate, ShareTemplateCreate, Share
         template.is_active = False
         db.commit()
         db.refresh(template)
+        template_catalog.invalidate()
         
         logger.info(f"Deactivated share template: {template_id}")
         return template
@@ -0,0 +1,237 @@
+"""
+Content-addressed cache for generated share summaries.
+
+Share summaries are keyed by a digest of the normalized journal entries, the
+template (id, version and questions), the target language and the model, so
+regenerating a share over the same inputs is served without another Gemini
+round-trip. Results live in a size-bounded in-process LRU with a TTL and,
+when enabled, in a shared Redis tier visible to every instance.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when prompts or response post-processing change so stale answers are not served
+SUMMARY_PROMPT_VERSION = "1"
+
+REDIS_KEY_PREFIX = "share_summary:"
+
+
+def _normalize_text(value: Any) -> str:
+    """Collapse whitespace so formatting-only edits map to the same digest."""
+    return " ".join(str(value or "").split())
+
+
+def summary_cache_key(
+    entries: List[Dict[str, Any]],
+    template: Dict[str, Any],
+    target_language: str,
+    model_name: str
+) -> str:
+    """
+    Build the content address of a share summary.
+
+    Args:
+        entries: Journal entries sent to the model
+        template: Template payload (template_id, version, questions)
+        target_language: Output language
+        model_name: Primary model used for generation
+
+    Returns:
+        str: Hex SHA-256 digest identifying the summary
+    """
+    normalized_entries = sorted(
+        (
+            _normalize_text(entry.get("entry_date")),
+            _normalize_text(entry.get("title")),
+            _normalize_text(entry.get("content")),
+        )
+        for entry in entries
+    )
+    questions = [
+        question if isinstance(question, str) else [question.get("id"), question.get("text")]
+        for question in template.get("questions", [])
+    ]
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {
+            "prompt_version": SUMMARY_PROMPT_VERSION,
+            "model": model_name,
+            "language": target_language,
+            "template_id": template.get("template_id"),
+            "template_version": template.get("version"),
+            "questions": questions,
+        },
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    ).encode("utf-8"))
+    for entry in normalized_entries:
+        digest.update(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\x1e")
+
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """Two-tier (memory LRU + optional Redis) TTL cache for serialized summaries."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: int = 86400,
+        redis_client: Optional[Any] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[str]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get_local(self, key: str) -> Optional[str]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl_seconds), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value, promoting shared-tier hits into memory.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[str]: Cached value or None
+        """
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.redis is not None:
+            try:
+                redis_key = REDIS_KEY_PREFIX + key
+                value, ttl_ms = await asyncio.gather(self.redis.get(redis_key), self.redis.pttl(redis_key))
+                if value is not None:
+                    if isinstance(value, bytes):
+                        value = value.decode("utf-8")
+                    self._set_local(key, value, ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None)
+                    self.hits += 1
+                    return value
+            except Exception as e:
+                logger.warning(f"Summary cache shared tier read failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """
+        Store a value in memory and, when configured, in the shared tier.
+
+        Args:
+            key: Cache key
+            value: Serialized summary
+        """
+        self._set_local(key, value)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(REDIS_KEY_PREFIX + key, value, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Summary cache shared tier write failed: {e}")
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Tuple[str, bool]]]
+    ) -> Tuple[str, bool]:
+        """
+        Return the cached value or build it once, coalescing concurrent callers.
+
+        Args:
+            key: Cache key
+            factory: Coroutine factory returning (value, cacheable)
+
+        Returns:
+            Tuple[str, bool]: (value, served_from_cache)
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached, True
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value, cacheable = await factory()
+            if cacheable:
+                await self.set(key, value)
+            future.set_result(value)
+            return value, False
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def invalidate(self, key: str) -> None:
+        """Drop a key from the in-process tier."""
+        self._entries.pop(key, None)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_tier": self.redis is not None,
+        }
+
+
+def create_summary_cache() -> SummaryCache:
+    """Create the summary cache from settings; the Redis tier is opt-in."""
+    redis_client = None
+    if settings.SHARE_SUMMARY_CACHE_SHARED and settings.REDIS_URL:
+        try:
+            import redis.asyncio as redis_asyncio
+            redis_client = redis_asyncio.from_url(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"Summary cache shared tier unavailable, using memory only: {e}")
+
+    return SummaryCache(
+        max_entries=settings.SHARE_SUMMARY_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SHARE_SUMMARY_CACHE_TTL_SECONDS,
+        redis_client=redis_client,
+    )
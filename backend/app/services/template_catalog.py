@@ -0,0 +1,171 @@
+"""
+In-process catalog of share templates.
+
+Templates change rarely but are read on every template browse and every
+share creation. The whole table is loaded into an immutable, versioned
+snapshot that serves those reads without touching the database. The
+snapshot is dropped when a template is created, updated or deactivated
+through this process and reloaded at most every ``ttl_seconds`` to pick up
+changes made by other instances. Its version is a digest of the catalog
+contents and doubles as the ETag of the template endpoints.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.share_template import ShareTemplate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogTemplate:
+    """Read-only snapshot of a share template row"""
+    id: UUID
+    template_id: str
+    name: str
+    description: Optional[str]
+    category: Optional[str]
+    version: str
+    questions: List[Dict[str, Any]]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def question_count(self) -> int:
+        """Get the number of questions in this template."""
+        return len(self.questions) if isinstance(self.questions, list) else 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Lightweight summary for UI dropdowns"""
+        return {
+            "id": self.id,
+            "template_id": self.template_id,
+            "name": self.name,
+            "description": self.description,
+            "category": self.category,
+            "question_count": self.question_count
+        }
+
+
+@dataclass(frozen=True)
+class TemplateCatalog:
+    """All share templates at one point in time"""
+    version: str
+    templates: Dict[str, CatalogTemplate]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def get(self, template_id: str) -> Optional[CatalogTemplate]:
+        """Get a template (active or not) by template_id"""
+        return self.templates.get(template_id)
+
+    def active(self, category: Optional[str] = None) -> List[CatalogTemplate]:
+        """Active templates, optionally of one category"""
+        return [
+            template for template in self.templates.values()
+            if template.is_active and (category is None or template.category == category)
+        ]
+
+
+class TemplateCatalogCache:
+    """Load, serve and invalidate the template catalog."""
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._catalog: Optional[TemplateCatalog] = None
+        self._generation = 0  # bumped by invalidate(); loads started earlier are not kept
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def get(self, db: Session) -> TemplateCatalog:
+        """
+        Get the current catalog, loading it if missing or stale.
+
+        Args:
+            db: Database session (only used on a reload)
+
+        Returns:
+            TemplateCatalog: Current snapshot
+        """
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - catalog.loaded_at < self.ttl_seconds:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None or time.monotonic() - catalog.loaded_at >= self.ttl_seconds:
+                generation = self._generation
+                catalog = self._load(db)
+                with self._state_lock:
+                    # A template changed while loading: serve this snapshot
+                    # to the caller but let the next read reload
+                    if generation == self._generation:
+                        self._catalog = catalog
+        return catalog
+
+    def get_template(self, db: Session, template_id: str) -> Optional[CatalogTemplate]:
+        """Get a template (active or not) by template_id"""
+        return self.get(db).get(template_id)
+
+    def invalidate(self) -> None:
+        """Drop the catalog after a template changes."""
+        with self._state_lock:
+            self._generation += 1
+            self._catalog = None
+
+    def _load(self, db: Session) -> TemplateCatalog:
+        rows = db.query(ShareTemplate).order_by(ShareTemplate.created_at, ShareTemplate.template_id).all()
+        templates = {
+            row.template_id: CatalogTemplate(
+                id=row.id,
+                template_id=row.template_id,
+                name=row.name,
+                description=row.description,
+                category=row.category,
+                version=row.version,
+                questions=row.questions or [],
+                is_active=row.is_active,
+                created_at=row.created_at,
+                updated_at=row.updated_at
+            )
+            for row in rows
+        }
+
+        digest = hashlib.sha256()
+        for template in templates.values():
+            digest.update(json.dumps(
+                [
+                    template.template_id,
+                    template.name,
+                    template.description,
+                    template.category,
+                    template.version,
+                    template.questions,
+                    template.is_active,
+                    template.updated_at,
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8"))
+
+        logger.info(f"Loaded share template catalog with {len(templates)} templates")
+        return TemplateCatalog(version=digest.hexdigest()[:32], templates=templates)
+
+
+# Create cache instance
+template_catalog = TemplateCatalogCache(ttl_seconds=settings.TEMPLATE_CATALOG_TTL_SECONDS)
@@ -0,0 +1,133 @@
+"""
+Database-backed cache of template extractions.
+
+Clinics upload the same standard questionnaires over and over. Each
+document is identified by the SHA-256 of its bytes; the parsed text and the
+Gemini extraction are kept in ``template_extractions`` so a repeat import,
+on any instance and after restarts, needs neither parsing nor an LLM call.
+Extractions are only reused for the prompt version that produced them,
+while the parsed text stays valid across prompt changes. Documents unused
+for ``TEMPLATE_EXTRACTION_RETENTION_DAYS`` are removed by the expiry sweeper.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.template_extraction import TemplateExtraction
+from .expiry_sweeper import expiry_sweeper, sweep_in_batches
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateExtractionCache:
+    """Look up and store parsed documents and extractions by document digest."""
+
+    def document_digest(self, file_content: bytes) -> str:
+        """Hex SHA-256 of an uploaded file"""
+        return hashlib.sha256(file_content).hexdigest()
+
+    def get(self, db: Session, digest: str) -> Optional[TemplateExtraction]:
+        """
+        Look up a document, counting the hit.
+
+        Args:
+            db: Database session
+            digest: Document digest
+
+        Returns:
+            Optional[TemplateExtraction]: Cached row, or None on a miss or error
+        """
+        try:
+            row = db.get(TemplateExtraction, digest)
+            if row is not None:
+                # Increment in SQL so concurrent hits on other instances are not lost
+                db.execute(
+                    update(TemplateExtraction)
+                    .where(TemplateExtraction.document_digest == digest)
+                    .values(hit_count=TemplateExtraction.hit_count + 1, last_used_at=datetime.now(timezone.utc))
+                )
+                db.commit()
+            return row
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Template extraction cache read failed: {e}")
+            return None
+
+    def store(
+        self,
+        db: Session,
+        digest: str,
+        *,
+        parsed_document: Dict[str, Any],
+        extraction: Optional[Dict[str, Any]] = None,
+        prompt_version: Optional[str] = None
+    ) -> None:
+        """
+        Store the parsed text and, when available, the extraction of a document.
+
+        Args:
+            db: Database session
+            digest: Document digest
+            parsed_document: Parser output
+            extraction: TemplateExtractionResponse as a dict
+            prompt_version: Extraction prompt version of ``extraction``
+        """
+        parsed_document = {key: value for key, value in parsed_document.items() if key != 'filename'}
+        try:
+            row = db.get(TemplateExtraction, digest)
+            if row is None:
+                row = TemplateExtraction(
+                    document_digest=digest,
+                    document_type=parsed_document.get('document_type', 'unknown'),
+                    parsed_document=parsed_document,
+                    hit_count=0
+                )
+                db.add(row)
+            if extraction is not None:
+                row.extraction = extraction
+                row.prompt_version = prompt_version
+            db.commit()
+        except SQLAlchemyError as e:
+            # e.g. another instance stored the same document concurrently
+            db.rollback()
+            logger.warning(f"Template extraction cache write failed: {e}")
+
+    def cleanup_unused(self, db: Session) -> int:
+        """
+        Delete documents not used within the retention period.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of documents deleted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.TEMPLATE_EXTRACTION_RETENTION_DAYS)
+        last_used = func.coalesce(TemplateExtraction.last_used_at, TemplateExtraction.created_at)
+
+        def delete_batch(limit: int):
+            batch = (
+                select(TemplateExtraction.document_digest)
+                .where(last_used < cutoff)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            return (
+                delete(TemplateExtraction)
+                .where(TemplateExtraction.document_digest.in_(batch.scalar_subquery()))
+                .returning(TemplateExtraction.document_digest)
+            )
+
+        return sweep_in_batches(db, delete_batch, batch_size=expiry_sweeper.batch_size).rows
+
+
+# Create cache instance
+template_extraction_cache = TemplateExtractionCache()
+expiry_sweeper.register("unused_template_extractions", template_extraction_cache.cleanup_unused)
@@ -0,0 +1,248 @@
+"""
+Template Import Service
+
+Turns an uploaded PDF/DOCX into a reviewable template: the document is
+parsed, questions are extracted with Gemini and the result is kept as an
+import session until the user confirms it. Import sessions are stored as
+rows of the background job queue, so they survive restarts, are shared by
+all instances and extraction can run either inline or on a worker.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models.job import Job
+from ..schemas.template_import import (
+    DocumentInfo,
+    ExtractedQuestion,
+    TemplateImportRequest,
+    TemplateImportResponse
+)
+from .document_parser_service import DocumentParsingError, document_parser_service
+from .gemini_service import (
+    TEMPLATE_EXTRACTION_PROMPT_VERSION,
+    GeminiError,
+    TemplateExtractionResponse,
+    gemini_service,
+)
+from .job_service import JobError, job_service
+from .template_extraction_cache import template_extraction_cache
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_IMPORT_JOB = "template.import"
+
+MAX_IMPORT_FILE_SIZE_MB = 10
+
+
+class TemplateImportService:
+    """Extract templates from uploaded documents"""
+
+    def validate_upload(self, file_content: bytes, content_type: str, filename: Optional[str]) -> None:
+        """
+        Check an uploaded file before it is parsed or queued.
+
+        Raises:
+            ValueError: If the file is unnamed, too large or of an unsupported type
+        """
+        if not filename:
+            raise ValueError("File must have a filename")
+
+        if not document_parser_service.validate_file_size(file_content, max_size_mb=MAX_IMPORT_FILE_SIZE_MB):
+            raise ValueError(f"File size exceeds {MAX_IMPORT_FILE_SIZE_MB}MB limit")
+
+        if not document_parser_service.is_supported_type(content_type):
+            raise ValueError(f"Unsupported file type: {content_type}. Supported types: PDF, DOCX")
+
+    async def extract_template(
+        self,
+        db: Session,
+        *,
+        import_id: str,
+        file_content: bytes,
+        content_type: str,
+        filename: str,
+        request_params: TemplateImportRequest
+    ) -> TemplateImportResponse:
+        """
+        Parse a document and extract a template from it with Gemini.
+
+        Parsed text and extractions are reused for documents seen before.
+
+        Args:
+            db: Database session (extraction cache)
+            import_id: Import session ID
+            file_content: Uploaded file bytes
+            content_type: MIME type of the file
+            filename: Original filename
+            request_params: Import options
+
+        Returns:
+            TemplateImportResponse: Extracted template for review
+
+        Raises:
+            DocumentParsingError: If the document cannot be parsed
+        """
+        start_time = time.time()
+
+        digest = template_extraction_cache.document_digest(file_content)
+        cached = template_extraction_cache.get(db, digest)
+
+        if cached is not None:
+            parsed_doc = dict(cached.parsed_document, filename=filename)
+        else:
+            parsed_doc = await document_parser_service.parse_file_async(
+                file_content=file_content,
+                content_type=content_type,
+                filename=filename
+            )
+
+        # Extract template using Gemini unless this document was extracted before
+        try:
+            if cached is not None and cached.extraction and cached.prompt_version == TEMPLATE_EXTRACTION_PROMPT_VERSION:
+                gemini_response = TemplateExtractionResponse(**cached.extraction)
+                # Template ids are unique; each import proposes its own
+                gemini_response.template_id = f"imported-{uuid.uuid4().hex[:8]}"
+                logger.info(f"Reused cached template extraction for document {digest[:12]}")
+            else:
+                gemini_response = await gemini_service.extract_template_from_document(
+                    document_text=parsed_doc['text'],
+                    document_type=parsed_doc['document_type']
+                )
+                template_extraction_cache.store(
+                    db,
+                    digest,
+                    parsed_document=parsed_doc,
+                    extraction=gemini_response.model_dump(mode="json"),
+                    prompt_version=TEMPLATE_EXTRACTION_PROMPT_VERSION
+                )
+        except GeminiError as e:
+            # Keep the parsed text so a retry skips parsing; fallbacks are not cached
+            if cached is None:
+                template_extraction_cache.store(db, digest, parsed_document=parsed_doc)
+            logger.error(f"Gemini template extraction failed: {e}")
+            # Create fallback response
+            fallback_questions = [
+                {
+                    "id": "q1",
+                    "text": {"en": "Please describe your main concerns or symptoms."},
+                    "type": "open",
+                    "required": True,
+                    "help_text": "Extracted from uploaded document - please review and edit"
+                }
+            ]
+
+            gemini_response = type('FallbackResponse', (), {
+                'template_id': f"imported-{uuid.uuid4().hex[:8]}",
+                'name': f"Imported Template - {filename}",
+                'description': "Template imported from document with fallback extraction",
+                'category': request_params.target_category or "imported",
+                'questions': fallback_questions,
+                'extraction_confidence': 0.3,
+                'extraction_notes': f"AI extraction failed: {e}. Using fallback template."
+            })()
+
+        # Process extracted questions
+        extracted_questions = []
+        for i, question_data in enumerate(gemini_response.questions):
+            # Ensure proper structure
+            question_text = question_data.get('text', {})
+            if isinstance(question_text, str):
+                question_text = {"en": question_text}
+
+            extracted_question = ExtractedQuestion(
+                id=question_data.get('id', f'q{i+1}'),
+                text=question_text,
+                type=question_data.get('type', 'open'),
+                required=question_data.get('required', True),
+                options=question_data.get('options'),
+                help_text=question_data.get('help_text'),
+                confidence=question_data.get('confidence', 0.8),
+                original_text=question_data.get('original_text')
+            )
+            extracted_questions.append(extracted_question)
+
+        # Limit questions if requested
+        if len(extracted_questions) > request_params.max_questions:
+            extracted_questions = extracted_questions[:request_params.max_questions]
+
+        # Create document info
+        document_info = DocumentInfo(
+            filename=filename,
+            document_type=parsed_doc['document_type'],
+            file_size_mb=len(file_content) / (1024 * 1024),
+            word_count=parsed_doc['word_count'],
+            character_count=parsed_doc['character_count'],
+            metadata=parsed_doc['metadata']
+        )
+
+        return TemplateImportResponse(
+            import_id=import_id,
+            document_info=document_info,
+            extracted_template={
+                'template_id': gemini_response.template_id,
+                'name': request_params.custom_name or gemini_response.name,
+                'description': gemini_response.description,
+                'category': request_params.target_category or gemini_response.category,
+                'version': '1.0',
+                'questions': [q.model_dump() for q in extracted_questions]
+            },
+            questions=extracted_questions,
+            extraction_confidence=gemini_response.extraction_confidence,
+            extraction_notes=gemini_response.extraction_notes,
+            processing_time_ms=int((time.time() - start_time) * 1000),
+            created_at=datetime.now(timezone.utc)
+        )
+
+    def import_payload(self, filename: str, content_type: str, request_params: TemplateImportRequest) -> Dict[str, Any]:
+        """Job payload describing an import (no document content)"""
+        return {
+            "filename": filename,
+            "content_type": content_type,
+            "request": request_params.model_dump(),
+            "is_confirmed": False
+        }
+
+    def get_session(self, db: Session, import_id: str) -> Optional[Job]:
+        """Get the job backing an import session"""
+        try:
+            job_id = uuid.UUID(import_id)
+        except ValueError:
+            return None
+        job = db.get(Job, job_id)
+        if job is None or job.job_type != TEMPLATE_IMPORT_JOB:
+            return None
+        return job
+
+    def mark_confirmed(self, db: Session, job: Job, template_id: uuid.UUID) -> None:
+        """Record that an import session produced a saved template"""
+        job.payload = {**job.payload, "is_confirmed": True, "confirmed_template_id": str(template_id)}
+        db.commit()
+
+
+async def run_template_import_job(db: Session, job: Job) -> Dict[str, Any]:
+    """Job handler: extract a template from the uploaded document"""
+    payload = job.payload
+    try:
+        response = await template_import_service.extract_template(
+            db,
+            import_id=str(job.id),
+            file_content=job_service.read_input(job),
+            content_type=payload["content_type"],
+            filename=payload["filename"],
+            request_params=TemplateImportRequest(**payload.get("request", {}))
+        )
+    except DocumentParsingError as e:
+        raise JobError(f"Document parsing failed: {e}")
+
+    return response.model_dump(mode="json")
+
+
+# Global template import service instance
+template_import_service = TemplateImportService()
+job_service.register(TEMPLATE_IMPORT_JOB, run_template_import_job)
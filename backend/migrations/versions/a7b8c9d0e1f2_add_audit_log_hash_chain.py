@@ -0,0 +1,39 @@
+"""add_audit_log_hash_chain
+
+Revision ID: a7b8c9d0e1f2
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-18 17:00:00.000000
+
+Adds the hash-chain columns to a security_audit_logs table that predates
+f7a8b9c0d1e2 (which already creates them); a no-op on fresh databases.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f7a8b9c0d1e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash chain of the batched audit writer (sequence order, previous link)
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('security_audit_logs')}
+    if 'sequence' not in columns:
+        op.add_column('security_audit_logs', sa.Column('sequence', sa.BigInteger(), nullable=True))
+    if 'previous_signature' not in columns:
+        op.add_column('security_audit_logs', sa.Column('previous_signature', sa.String(length=128), nullable=True))
+    if 'log_signature' not in columns:
+        op.add_column('security_audit_logs', sa.Column('log_signature', sa.String(length=128), nullable=True))
+
+    indexes = {index['name'] for index in inspector.get_indexes('security_audit_logs')}
+    if 'idx_security_audit_logs_sequence' not in indexes:
+        op.create_index('idx_security_audit_logs_sequence', 'security_audit_logs', ['sequence'], unique=False)
+
+
+def downgrade() -> None:
+    # The chain columns belong to the table created in f7a8b9c0d1e2
+    pass
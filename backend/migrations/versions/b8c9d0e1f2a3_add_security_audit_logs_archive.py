@@ -0,0 +1,45 @@
+"""add_security_audit_logs_archive
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 18:00:00.000000
+
+Adds security_audit_logs_archive, an unpartitioned copy of the
+security_audit_logs columns. When a month of audit logs expires, the
+partition manager moves its sensitive entries here and drops the whole
+partition. Columns added to security_audit_logs later must be added here
+too. Postgres only: elsewhere the audit table is not partitioned and
+sensitive rows are simply not deleted.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not sa.inspect(bind).has_table('security_audit_logs'):
+        return
+
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS security_audit_logs_archive '
+        '(LIKE security_audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS, PRIMARY KEY (id))'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_security_audit_logs_archive_timestamp '
+        'ON security_audit_logs_archive ("timestamp")'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_security_audit_logs_archive_sequence '
+        'ON security_audit_logs_archive (sequence)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TABLE IF EXISTS security_audit_logs_archive')
@@ -0,0 +1,37 @@
+"""add_template_extractions_table
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create template_extractions table (document digest -> parsed text and extracted template)
+    op.create_table('template_extractions',
+        sa.Column('document_digest', sa.String(length=64), nullable=False),
+        sa.Column('document_type', sa.String(length=20), nullable=False),
+        sa.Column('parsed_document', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('prompt_version', sa.String(length=20), nullable=True),
+        sa.Column('extraction', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=False),
+        sa.Column('last_used_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('document_digest')
+    )
+
+
+def downgrade() -> None:
+    # Drop table
+    op.drop_table('template_extractions')
@@ -0,0 +1,26 @@
+"""add_shares_user_active_created_index
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Share listings and stats filter by owner and status, newest first
+    op.create_index(
+        'ix_shares_user_active_created', 'shares', ['user_id', 'is_active', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    # Drop index
+    op.drop_index('ix_shares_user_active_created', table_name='shares')
@@ -0,0 +1,146 @@
+"""partition_log_tables_by_month
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 16:00:00.000000
+
+Converts the append-only log tables to native range partitioning by month so
+retention drops partitions instead of deleting rows. Each table is rebuilt:
+the existing rows are copied into monthly partitions named <table>_pYYYYMM
+(plus <table>_default), the primary key becomes (id, <partition column>) as
+Postgres requires, and the table's indexes and outgoing foreign keys are
+recreated. Foreign keys pointing at a converted table cannot reference id
+alone and are dropped (alert_escalations.alert_id). Tables that do not
+exist are skipped.
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+# Table -> partition column
+PARTITIONED_TABLES = {
+    'security_audit_logs': 'timestamp',
+    'share_access': 'created_at',
+    'system_health': 'timestamp',
+    'service_health': 'timestamp',
+    'alerts': 'created_at',
+}
+
+MONTHS_AHEAD = 2
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace"
+    ), {"table": table}).first() is not None
+
+
+def _table_definitions(bind, table: str):
+    """Secondary indexes and outgoing foreign keys, to recreate after the rebuild"""
+    indexes = bind.execute(sa.text(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = CAST(:table AS regclass) AND NOT indisprimary AND NOT indisunique"
+    ), {"table": table}).scalars().all()
+    foreign_keys = bind.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+    ), {"table": table}).all()
+    return [index.replace(" ON ONLY ", " ON ") for index in indexes], foreign_keys
+
+
+def _partition_table(bind, table: str, column: str) -> None:
+    if not sa.inspect(bind).has_table(table) or _is_partitioned(bind, table):
+        return
+
+    indexes, foreign_keys = _table_definitions(bind, table)
+    oldest = bind.execute(sa.text(f'SELECT min("{column}") FROM "{table}"')).scalar()
+    current = _month_start(datetime.now(timezone.utc))
+    month = _month_start(oldest) if oldest is not None and _month_start(oldest) < current else current
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned"')
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{table}_unpartitioned" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{column}")'
+    )
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{table}_unpartitioned"')
+    op.execute(f'DROP TABLE "{table}_unpartitioned" CASCADE')
+
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, "{column}")')
+    for name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    for index in indexes:
+        op.execute(index)
+
+
+def _unpartition_table(bind, table: str) -> None:
+    if not sa.inspect(bind).has_table(table) or not _is_partitioned(bind, table):
+        return
+
+    indexes, foreign_keys = _table_definitions(bind, table)
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{table}_partitioned"')
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{table}_partitioned" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{table}_partitioned"')
+    op.execute(f'DROP TABLE "{table}_partitioned" CASCADE')
+
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id)')
+    for name, definition in foreign_keys:
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    for index in indexes:
+        op.execute(index)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # alert_escalations.alert_id cannot reference alerts(id) once alerts is partitioned
+    if sa.inspect(bind).has_table('alert_escalations'):
+        op.execute('ALTER TABLE alert_escalations DROP CONSTRAINT IF EXISTS alert_escalations_alert_id_fkey')
+
+    for table, column in PARTITIONED_TABLES.items():
+        _partition_table(bind, table, column)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table in PARTITIONED_TABLES:
+        _unpartition_table(bind, table)
+
+    if sa.inspect(bind).has_table('alert_escalations') and sa.inspect(bind).has_table('alerts'):
+        op.create_foreign_key(
+            'alert_escalations_alert_id_fkey', 'alert_escalations', 'alerts', ['alert_id'], ['id']
+        )
@@ -0,0 +1,95 @@
+"""create_security_audit_logs_table
+
+Revision ID: f7a8b9c0d1e2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 16:30:00.000000
+
+Recreates security_audit_logs (dropped in 9fe92bee46fb) for the batched,
+hash-chained audit writer. On Postgres the table is created range-partitioned
+by month on timestamp, with partitions for the current and upcoming months
+plus a default partition, so the partition manager maintains it like the
+other log tables.
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'f7a8b9c0d1e2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+INDEXES = {
+    'idx_security_audit_logs_event_type': ['event_type'],
+    'idx_security_audit_logs_event_category': ['event_category'],
+    'idx_security_audit_logs_severity': ['severity'],
+    'idx_security_audit_logs_user_id_hash': ['user_id_hash'],
+    'idx_security_audit_logs_correlation_id': ['correlation_id'],
+    'idx_security_audit_logs_timestamp': ['timestamp'],
+    'idx_security_audit_logs_sequence': ['sequence'],
+}
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('security_audit_logs'):
+        return
+
+    is_postgres = bind.dialect.name == 'postgresql'
+    # Postgres requires the partition column in the primary key
+    primary_key = ['id', 'timestamp'] if is_postgres else ['id']
+    table_kwargs = {'postgresql_partition_by': 'RANGE ("timestamp")'} if is_postgres else {}
+
+    op.create_table('security_audit_logs',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('event_category', sa.String(length=30), nullable=False),
+        sa.Column('severity', sa.String(length=20), nullable=False),
+        sa.Column('user_id_hash', sa.String(length=64), nullable=True),
+        sa.Column('session_id_hash', sa.String(length=64), nullable=True),
+        sa.Column('correlation_id', sa.UUID(), nullable=True),
+        sa.Column('request_id', sa.UUID(), nullable=True),
+        sa.Column('ip_address_hash', sa.String(length=64), nullable=True),
+        sa.Column('user_agent_hash', sa.String(length=64), nullable=True),
+        sa.Column('event_data', sa.Text(), nullable=True),
+        sa.Column('event_message', sa.String(length=500), nullable=False),
+        sa.Column('is_sensitive', sa.Boolean(), nullable=False),
+        sa.Column('success', sa.Boolean(), nullable=True),
+        sa.Column('error_code', sa.String(length=50), nullable=True),
+        sa.Column('processing_time_ms', sa.Integer(), nullable=True),
+        sa.Column('timestamp', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sequence', sa.BigInteger(), nullable=True),
+        sa.Column('previous_signature', sa.String(length=128), nullable=True),
+        sa.Column('log_signature', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint(*primary_key, name='security_audit_logs_pkey'),
+        **table_kwargs
+    )
+
+    if is_postgres:
+        current = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(MONTHS_AHEAD + 1):
+            month = _add_months(current, offset)
+            op.execute(
+                f'CREATE TABLE "security_audit_logs_p{month:%Y%m}" PARTITION OF security_audit_logs '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute('CREATE TABLE security_audit_logs_default PARTITION OF security_audit_logs DEFAULT')
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'security_audit_logs', columns, unique=False)
+
+
+def downgrade() -> None:
+    # Partitions are dropped with the parent table
+    op.drop_table('security_audit_logs')
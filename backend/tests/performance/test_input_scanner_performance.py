@@ -0,0 +1,67 @@
+"""
+Microbenchmarks for the input threat scanner.
+
+These benchmarks exercise the scanner with payloads shaped like real journal
+traffic: plain prose entries, share question answers, base64 ciphertext
+fields and actual attack strings.
+"""
+
+import base64
+import os
+
+import pytest
+
+from app.security.input_validator import InputValidator
+from app.security.threat_scanner import threat_scanner
+
+JOURNAL_ENTRY = (
+    "Today I went for a long walk by the river (finally!) and it's the first time "
+    "in weeks that I felt calm. Work has been stressful: deadlines, meetings and "
+    "a lot of back-and-forth with the team. I want to set aside time every morning "
+    "to write, and maybe join a running group again. "
+) * 3
+
+SHARE_ANSWER = (
+    "Over the past two weeks my mood improved - mostly after I started sleeping "
+    "earlier. I noticed I feel anxious when I skip breakfast."
+)
+
+CIPHERTEXT = base64.b64encode(os.urandom(4096)).decode()
+
+ATTACK = "1' OR 1=1; DROP TABLE users -- <script>alert(document.cookie)</script>"
+
+JOURNAL_PAYLOAD = {
+    "title": "Sunday reflections",
+    "content": JOURNAL_ENTRY,
+    "tags": ["gratitude", "work", "running"],
+    "answers": [SHARE_ANSWER] * 10,
+}
+
+
+@pytest.mark.performance
+class TestThreatScannerPerformance:
+    """Benchmark suite for single-pass input scanning."""
+
+    @pytest.fixture(scope="class")
+    def validator(self):
+        return InputValidator()
+
+    def test_scan_journal_entry(self, benchmark):
+        result = benchmark(threat_scanner.scan, JOURNAL_ENTRY)
+        assert not result.is_sql_injection and not result.is_xss
+
+    def test_scan_share_answer(self, benchmark):
+        result = benchmark(threat_scanner.scan, SHARE_ANSWER)
+        assert not result.is_sql_injection and not result.is_xss
+
+    def test_scan_ciphertext_is_short_circuited(self, benchmark):
+        result = benchmark(threat_scanner.scan, CIPHERTEXT)
+        assert result.skipped_opaque
+
+    def test_scan_attack_payload(self, benchmark):
+        result = benchmark(threat_scanner.scan, ATTACK)
+        assert result.is_sql_injection and result.is_xss
+
+    def test_sanitize_nested_journal_payload(self, benchmark, validator):
+        sanitized = benchmark(validator.sanitize_recursive, JOURNAL_PAYLOAD)
+        assert sanitized["tags"] == JOURNAL_PAYLOAD["tags"]
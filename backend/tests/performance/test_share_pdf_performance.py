@@ -0,0 +1,64 @@
+"""
+Benchmarks for share PDF rendering.
+
+Shares with 10, 50 and 200 Q&A pairs are rendered with the shared
+stylesheet; the pages-per-second figure is attached to each benchmark's
+extra info.
+"""
+
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.pdf_service import pdf_service
+
+ANSWER = (
+    "Over the past two weeks my mood improved, mostly after I started sleeping "
+    "earlier. I noticed I feel anxious when I skip breakfast, and evening walks "
+    "helped me unwind after long days at work. "
+)
+
+PAGE_PATTERN = re.compile(rb"/Type /Page[^s]")
+
+
+def make_share_content(pair_count: int, language: str = "en") -> dict:
+    return {
+        "answers": [
+            {
+                "question_text": f"How did things go with item {i}?",
+                "answer": ANSWER * (1 + i % 4),
+                "confidence": 0.6 if i % 5 == 0 else 0.9,
+            }
+            for i in range(pair_count)
+        ],
+        "template_info": {"name": "Wellness check-in", "description": "Two-week summary"},
+        "generation_metadata": {"ai_model": "gemini-2.5-flash"},
+        "target_language": language,
+        "entry_count": 14,
+    }
+
+
+@pytest.mark.performance
+class TestSharePdfPerformance:
+    """Benchmark suite for share PDF generation."""
+
+    @pytest.mark.parametrize("pair_count", [10, 50, 200])
+    def test_render_share_pdf(self, benchmark, pair_count):
+        content = make_share_content(pair_count)
+        created_at = datetime.now(timezone.utc)
+
+        pdf_bytes = benchmark(pdf_service.generate_share_pdf, content, "Weekly summary", created_at)
+
+        pages = len(PAGE_PATTERN.findall(pdf_bytes))
+        benchmark.extra_info["pages"] = pages
+        benchmark.extra_info["pages_per_second"] = pages / benchmark.stats.stats.mean
+        assert pages >= 1
+
+    def test_render_cjk_share_pdf(self, benchmark):
+        content = make_share_content(50, language="ja")
+        content["answers"] = [dict(qa, answer="よく眠れて、気分も穏やかでした。" * 10) for qa in content["answers"]]
+
+        pdf_bytes = benchmark(pdf_service.generate_share_pdf, content, "週のまとめ", datetime.now(timezone.utc))
+
+        assert pdf_bytes.startswith(b"%PDF")